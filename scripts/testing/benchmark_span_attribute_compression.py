@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Compares the storage size and read latency of span attributes with and without
+compression of large string values (PHOENIX_SPAN_ATTRIBUTE_COMPRESSION_THRESHOLD).
+
+Usage:
+    python scripts/testing/benchmark_span_attribute_compression.py [sqlite-or-postgresql-url]
+
+Defaults to a temporary SQLite database. The database is migrated if needed, and the
+benchmark projects are deleted afterwards.
+"""
+
+import asyncio
+import json
+from argparse import ArgumentParser
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from random import choice, getrandbits, randint
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from phoenix.db import models
+from phoenix.db.engines import create_engine
+from phoenix.db.insertion.span import insert_spans
+from phoenix.trace.dsl import SpanQuery
+from phoenix.trace.schemas import Span, SpanContext, SpanKind, SpanStatusCode
+
+_WORDS = (
+    "the quick brown fox jumps over the lazy dog while the assistant answers questions "
+    "about retrieval augmented generation with citations from the knowledge base"
+).split()
+
+
+def _text(num_chars: int) -> str:
+    words: list[str] = []
+    size = 0
+    while size < num_chars:
+        words.append(word := choice(_WORDS))
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def _spans(num_spans: int, project_name: str) -> list[tuple[Span, str]]:
+    start_time = datetime.now(timezone.utc)
+    spans = []
+    for i in range(num_spans):
+        prompt = _text(randint(50_000, 200_000))
+        completion = _text(randint(1_000, 20_000))
+        attributes: dict[str, Any] = {
+            "input": {"value": json.dumps({"prompt": prompt}), "mime_type": "application/json"},
+            "output": {"value": completion},
+            "llm": {
+                "input_messages": [{"message": {"role": "user", "content": prompt}}],
+                "output_messages": [{"message": {"role": "assistant", "content": completion}}],
+            },
+        }
+        spans.append(
+            (
+                Span(
+                    name=f"span-{i}",
+                    context=SpanContext(
+                        trace_id=f"{getrandbits(128):032x}", span_id=f"{getrandbits(64):016x}"
+                    ),
+                    span_kind=SpanKind.LLM,
+                    parent_id=None,
+                    start_time=start_time,
+                    end_time=start_time + timedelta(milliseconds=randint(1, 1000)),
+                    status_code=SpanStatusCode.OK,
+                    status_message="",
+                    attributes=attributes,
+                    events=[],
+                    conversation=None,
+                ),
+                project_name,
+            )
+        )
+    return spans
+
+
+async def _benchmark(url: str, num_spans: int, batch_size: int, threshold: int) -> None:
+    engine = create_engine(url)
+    db = async_sessionmaker(engine, expire_on_commit=False)
+    dialect = engine.dialect.name
+    size = func.pg_column_size if dialect == "postgresql" else func.length
+    queries = {
+        "all columns": SpanQuery(),
+        "input.value": SpanQuery().select(input="input.value"),
+        "filter": SpanQuery().where("'fox' in output.value").select("name"),
+    }
+    try:
+        for compression_threshold in (None, threshold):
+            label = "compressed" if compression_threshold else "plain"
+            project_name = f"benchmark-span-attribute-compression-{label}"
+            spans = _spans(num_spans, project_name)
+            start = perf_counter()
+            for i in range(0, len(spans), batch_size):
+                async with db.begin() as session:
+                    await insert_spans(
+                        session,
+                        spans[i : i + batch_size],
+                        compression_threshold=compression_threshold,
+                    )
+            elapsed = perf_counter() - start
+            async with db() as session:
+                num_bytes = await session.scalar(
+                    select(func.sum(size(models.Span.attributes)))
+                    .join(models.Trace)
+                    .join(models.Project)
+                    .where(models.Project.name == project_name)
+                )
+            print(
+                f"{label:>10}: inserted {num_spans} spans in {elapsed:.2f}s, "
+                f"attributes take {(num_bytes or 0) / 1024 / 1024:,.1f} MiB"
+            )
+            for name, query in queries.items():
+                timings = []
+                for _ in range(3):
+                    start = perf_counter()
+                    async with db() as session:
+                        df = await session.run_sync(query, project_name=project_name, limit=None)
+                    timings.append(perf_counter() - start)
+                print(f"{'':>12}{name}: {len(df)} rows in {min(timings) * 1000:,.0f} ms")
+            async with db.begin() as session:
+                await session.execute(
+                    delete(models.Project).where(models.Project.name == project_name)
+                )
+    finally:
+        await engine.dispose()
+
+
+def _main(url: Optional[str], num_spans: int, batch_size: int, threshold: int) -> None:
+    if url:
+        asyncio.run(_benchmark(url, num_spans, batch_size, threshold))
+        return
+    with TemporaryDirectory() as tmp:
+        asyncio.run(
+            _benchmark(f"sqlite:///{Path(tmp) / 'phoenix.db'}", num_spans, batch_size, threshold)
+        )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("url", nargs="?", help="SQLite or PostgreSQL connection string")
+    parser.add_argument("--spans", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--threshold", type=int, default=4096)
+    args = parser.parse_args()
+    _main(args.url, args.spans, args.batch_size, args.threshold)
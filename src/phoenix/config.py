@@ -1,3 +1,4 @@
+import json
 import logging
 import os
 import re
@@ -7,7 +8,7 @@ from datetime import timedelta
 from enum import Enum
 from importlib.metadata import version
 from pathlib import Path
-from typing import Optional, cast, overload
+from typing import Any, Optional, cast, overload
 from urllib.parse import urlparse
 
 from phoenix.utilities.logging import log_a_list
@@ -59,6 +60,62 @@ ENV_PHOENIX_SQL_DATABASE_SCHEMA = "PHOENIX_SQL_DATABASE_SCHEMA"
 The schema to use for the PostgresSQL database. (This is ignored for SQLite.)
 See e.g. https://www.postgresql.org/docs/current/ddl-schemas.html
 """
+ENV_PHOENIX_SQL_DATABASE_READ_URL = "PHOENIX_SQL_DATABASE_READ_URL"
+"""
+The URL of a read replica of the PostgreSQL database, e.g. a streaming replica, which is
+used by queries that don't write, e.g. those of the UI, while writes and the queries that
+follow them in the same request go to PHOENIX_SQL_DATABASE_URL. Unset by default. (This
+is ignored for SQLite.)
+"""
+ENV_PHOENIX_SQL_DATABASE_READ_MAX_LAG_SECONDS = "PHOENIX_SQL_DATABASE_READ_MAX_LAG_SECONDS"
+"""
+The maximum replay lag, in seconds, of the read replica (see
+PHOENIX_SQL_DATABASE_READ_URL), beyond which queries go to the primary database until the
+replica catches up. Defaults to 10.
+"""
+ENV_PHOENIX_SQL_DATABASE_POOL_SIZE = "PHOENIX_SQL_DATABASE_POOL_SIZE"
+"""
+The number of connections to the PostgreSQL database that are kept open, per engine,
+i.e. for the primary database and its read replica, if any (see
+PHOENIX_SQL_DATABASE_READ_URL). Defaults to 5. Set to 0 for no limit. (This is ignored
+for SQLite.)
+"""
+ENV_PHOENIX_SQL_DATABASE_POOL_MAX_OVERFLOW = "PHOENIX_SQL_DATABASE_POOL_MAX_OVERFLOW"
+"""
+The number of connections to the PostgreSQL database that can be opened beyond
+PHOENIX_SQL_DATABASE_POOL_SIZE when all of those are in use, and which are closed when
+they are returned. Defaults to 10. (This is ignored for SQLite.)
+"""
+ENV_PHOENIX_SQL_DATABASE_POOL_RECYCLE_SECONDS = "PHOENIX_SQL_DATABASE_POOL_RECYCLE_SECONDS"
+"""
+The age, in seconds, beyond which connections to the PostgreSQL database are replaced
+when they are checked out, e.g. to stay below the idle timeouts of proxies and load
+balancers. Unset by default, i.e. connections are never replaced for their age. (This is
+ignored for SQLite.)
+"""
+ENV_PHOENIX_SQL_DATABASE_POOL_PRE_PING = "PHOENIX_SQL_DATABASE_POOL_PRE_PING"
+"""
+Whether to test connections to the PostgreSQL database when they are checked out, so that
+connections that have been closed by the server are replaced instead of failing the
+queries, at the cost of a round trip per checkout. Defaults to false. (This is ignored
+for SQLite.)
+"""
+ENV_PHOENIX_SQL_DATABASE_STATEMENT_CACHE_SIZE = "PHOENIX_SQL_DATABASE_STATEMENT_CACHE_SIZE"
+"""
+The number of prepared statements that are cached per connection to the PostgreSQL
+database. Defaults to that of SQLAlchemy's asyncpg dialect, i.e. 100. Set to 0 when
+connecting through a proxy that doesn't keep prepared statements across transactions,
+e.g. PgBouncer in transaction mode, in which case the statements are also given unique
+names. (This is ignored for SQLite.)
+"""
+ENV_PHOENIX_SQLITE_READ_POOL_SIZE = "PHOENIX_SQLITE_READ_POOL_SIZE"
+"""
+The number of read-only connections to an SQLite database that are used by queries,
+e.g. those of the UI, alongside the single connection used by ingestion and other
+writes, so that queries don't have to wait for writes. Defaults to 0, in which case
+the single connection is used for everything. (This is ignored for PostgreSQL and
+in-memory SQLite databases.)
+"""
 ENV_PHOENIX_ENABLE_PROMETHEUS = "PHOENIX_ENABLE_PROMETHEUS"
 """
 Whether to enable Prometheus. Defaults to false.
@@ -154,6 +211,98 @@ ENV_PHOENIX_SMTP_VALIDATE_CERTS = "PHOENIX_SMTP_VALIDATE_CERTS"
 Whether to validate SMTP server certificates. Defaults to true.
 """
 
+# Ingestion settings
+ENV_PHOENIX_INGESTION_BUFFER_MAX_ITEMS = "PHOENIX_INGESTION_BUFFER_MAX_ITEMS"
+"""
+The maximum number of spans and evaluations waiting to be inserted into the database,
+above which new export requests are rejected so that clients back off and retry later.
+Defaults to 100,000.
+"""
+ENV_PHOENIX_INGESTION_BUFFER_MAX_BYTES = "PHOENIX_INGESTION_BUFFER_MAX_BYTES"
+"""
+The maximum approximate size, in bytes, of the spans and evaluations waiting to be
+inserted into the database, above which new export requests are rejected so that
+clients back off and retry later. Defaults to 512 MiB.
+"""
+ENV_PHOENIX_INGESTION_SPOOL_DIR = "PHOENIX_INGESTION_SPOOL_DIR"
+"""
+The directory of an optional write-ahead log in which spans and evaluations are persisted
+until they are inserted into the database, so that they are not lost if the server restarts
+or the database is unavailable. Unset by default, in which case they are only held in memory.
+"""
+ENV_PHOENIX_INGESTION_USE_COPY = "PHOENIX_INGESTION_USE_COPY"
+"""
+Whether to load batches of spans into PostgreSQL with COPY through a temporary staging
+table, rather than with multi-row INSERT statements. Has no effect on SQLite. Defaults
+to false.
+"""
+ENV_PHOENIX_SPAN_ATTRIBUTE_COMPRESSION_THRESHOLD = "PHOENIX_SPAN_ATTRIBUTE_COMPRESSION_THRESHOLD"
+"""
+The minimum length, in characters, of the input and output values and message contents
+of spans that are stored compressed with zstd. Requires the `zstandard` package. Unset
+by default, in which case nothing is compressed.
+"""
+ENV_PHOENIX_SPAN_ATTRIBUTE_DEDUPLICATION_THRESHOLD = (
+    "PHOENIX_SPAN_ATTRIBUTE_DEDUPLICATION_THRESHOLD"
+)
+"""
+The minimum length, in characters, of the input and output values, message contents,
+prompt templates, tool schemas and retrieved document contents of spans that are stored
+once per distinct value in a separate table and referred to by hash. Unset by default,
+in which case nothing is deduplicated.
+"""
+ENV_PHOENIX_TRACE_RETENTION_POLICIES = "PHOENIX_TRACE_RETENTION_POLICIES"
+"""
+The retention policies of traces as a JSON object keyed by project name, where the key
+`*` applies to the projects without a policy of their own, e.g. `{"*": {"max_age_days":
+30}, "chatbot": {"max_spans": 1000000, "max_bytes": 10000000000}}`. The oldest traces of
+a project are deleted in the background for as long as any of its limits is exceeded.
+Unset by default, in which case nothing is deleted.
+"""
+ENV_PHOENIX_TRACE_RETENTION_SWEEP_INTERVAL_SECONDS = (
+    "PHOENIX_TRACE_RETENTION_SWEEP_INTERVAL_SECONDS"
+)
+"""
+The interval, in seconds, at which the trace retention policies are applied. Defaults to
+600.
+"""
+ENV_PHOENIX_TRACE_ARCHIVE_DIR = "PHOENIX_TRACE_ARCHIVE_DIR"
+"""
+The directory of an archive of Parquet files into which old traces are moved out of the
+database (see PHOENIX_TRACE_ARCHIVE_AFTER_DAYS), and whose spans are included in the
+results of span queries. Unset by default, in which case nothing is archived.
+"""
+ENV_PHOENIX_TRACE_ARCHIVE_AFTER_DAYS = "PHOENIX_TRACE_ARCHIVE_AFTER_DAYS"
+"""
+The age, in days, of the start times of the traces that are moved into the archive when
+PHOENIX_TRACE_ARCHIVE_DIR is set. Defaults to 30.
+"""
+ENV_PHOENIX_SPAN_PARTITION_INTERVAL = "PHOENIX_SPAN_PARTITION_INTERVAL"
+"""
+The interval (either 'day' or 'week') by which the spans table is partitioned on the
+start times of the spans when using PostgreSQL. The spans table is not converted by the
+database migrations, but by running the `partition_spans_table` data migration script
+with this set. Once the table is partitioned, partitions are created ahead of time in
+the background while this is set, and the trace retention policies drop whole
+partitions when every project has a maximum age. Unset by default, in which case
+partitions are not created. (This is ignored for SQLite.)
+"""
+ENV_PHOENIX_PROMOTED_SPAN_ATTRIBUTES = "PHOENIX_PROMOTED_SPAN_ATTRIBUTES"
+"""
+A comma-separated list of span attributes, e.g. `metadata.tenant,tag.tags`, whose string
+values get an index of their own in addition to those of `llm.model_name`, `llm.provider`,
+`session.id`, `user.id` and `openinference.span.kind`. Span filters that compare these
+attributes use the indexes, which are created at startup. Each attribute is a path of
+keys separated by periods, and each key may only contain letters, digits, underscores
+and hyphens. Unset by default.
+"""
+ENV_PHOENIX_OTLP_DECODING_PROCESSES = "PHOENIX_OTLP_DECODING_PROCESSES"
+"""
+The number of worker processes used to decode large OTLP export requests in parallel.
+Set to -1 to use one process per available CPU core. Defaults to 0, in which case
+requests are decoded in a thread of the server process.
+"""
+
 # API extension settings
 ENV_PHOENIX_FASTAPI_MIDDLEWARE_PATHS = "PHOENIX_FASTAPI_MIDDLEWARE_PATHS"
 ENV_PHOENIX_GQL_EXTENSION_PATHS = "PHOENIX_GQL_EXTENSION_PATHS"
@@ -394,6 +543,177 @@ def get_env_smtp_validate_certs() -> bool:
     return _bool_val(ENV_PHOENIX_SMTP_VALIDATE_CERTS, True)
 
 
+def get_env_ingestion_buffer_max_items() -> int:
+    max_items = _int_val(ENV_PHOENIX_INGESTION_BUFFER_MAX_ITEMS, 100_000)
+    if max_items <= 0:
+        raise ValueError(
+            f"Invalid value for environment variable {ENV_PHOENIX_INGESTION_BUFFER_MAX_ITEMS}: "
+            f"{max_items}. Value must be a positive integer."
+        )
+    return max_items
+
+
+def get_env_ingestion_buffer_max_bytes() -> int:
+    max_bytes = _int_val(ENV_PHOENIX_INGESTION_BUFFER_MAX_BYTES, 512 * 1024 * 1024)
+    if max_bytes <= 0:
+        raise ValueError(
+            f"Invalid value for environment variable {ENV_PHOENIX_INGESTION_BUFFER_MAX_BYTES}: "
+            f"{max_bytes}. Value must be a positive integer."
+        )
+    return max_bytes
+
+
+def get_env_ingestion_spool_dir() -> Optional[Path]:
+    if not (spool_dir := os.getenv(ENV_PHOENIX_INGESTION_SPOOL_DIR)):
+        return None
+    return Path(spool_dir)
+
+
+def get_env_ingestion_use_copy() -> bool:
+    return _bool_val(ENV_PHOENIX_INGESTION_USE_COPY, False)
+
+
+def get_env_span_attribute_compression_threshold() -> Optional[int]:
+    if (threshold := _int_val(ENV_PHOENIX_SPAN_ATTRIBUTE_COMPRESSION_THRESHOLD)) is None:
+        return None
+    if threshold <= 0:
+        raise ValueError(
+            "Invalid value for environment variable "
+            f"{ENV_PHOENIX_SPAN_ATTRIBUTE_COMPRESSION_THRESHOLD}: {threshold}. "
+            "Value must be a positive integer."
+        )
+    return threshold
+
+
+def get_env_span_attribute_deduplication_threshold() -> Optional[int]:
+    if (threshold := _int_val(ENV_PHOENIX_SPAN_ATTRIBUTE_DEDUPLICATION_THRESHOLD)) is None:
+        return None
+    if threshold <= 0:
+        raise ValueError(
+            "Invalid value for environment variable "
+            f"{ENV_PHOENIX_SPAN_ATTRIBUTE_DEDUPLICATION_THRESHOLD}: {threshold}. "
+            "Value must be a positive integer."
+        )
+    return threshold
+
+
+@dataclass(frozen=True)
+class TraceRetentionPolicy:
+    max_age: Optional[timedelta] = None
+    max_spans: Optional[int] = None
+    max_bytes: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, obj: Any) -> "TraceRetentionPolicy":
+        if not isinstance(obj, dict):
+            raise ValueError("A trace retention policy must be a JSON object")
+        if unknown_keys := set(obj) - {"max_age_days", "max_spans", "max_bytes"}:
+            raise ValueError(f"Unknown keys in trace retention policy: {sorted(unknown_keys)}")
+        for key, value in obj.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                raise ValueError(f"The {key} of a trace retention policy must be a positive number")
+        return cls(
+            max_age=timedelta(days=obj["max_age_days"]) if "max_age_days" in obj else None,
+            max_spans=int(obj["max_spans"]) if "max_spans" in obj else None,
+            max_bytes=int(obj["max_bytes"]) if "max_bytes" in obj else None,
+        )
+
+
+def get_env_trace_retention_policies() -> dict[str, TraceRetentionPolicy]:
+    if not (policies := os.getenv(ENV_PHOENIX_TRACE_RETENTION_POLICIES)):
+        return {}
+    try:
+        obj = json.loads(policies)
+        if not isinstance(obj, dict):
+            raise ValueError("Value must be a JSON object keyed by project name")
+        return {
+            project_name: TraceRetentionPolicy.from_dict(policy)
+            for project_name, policy in obj.items()
+        }
+    except ValueError as e:
+        raise ValueError(
+            f"Invalid value for environment variable {ENV_PHOENIX_TRACE_RETENTION_POLICIES}: "
+            f"{policies}. {e}"
+        ) from e
+
+
+def get_env_trace_retention_sweep_interval_seconds() -> float:
+    seconds = _float_val(ENV_PHOENIX_TRACE_RETENTION_SWEEP_INTERVAL_SECONDS, 600)
+    if seconds <= 0:
+        raise ValueError(
+            "Invalid value for environment variable "
+            f"{ENV_PHOENIX_TRACE_RETENTION_SWEEP_INTERVAL_SECONDS}: {seconds}. "
+            "Value must be a positive number."
+        )
+    return seconds
+
+
+def get_env_trace_archive_dir() -> Optional[Path]:
+    if not (archive_dir := os.getenv(ENV_PHOENIX_TRACE_ARCHIVE_DIR)):
+        return None
+    return Path(archive_dir)
+
+
+def get_env_trace_archive_after_days() -> float:
+    days = _float_val(ENV_PHOENIX_TRACE_ARCHIVE_AFTER_DAYS, 30)
+    if days <= 0:
+        raise ValueError(
+            "Invalid value for environment variable "
+            f"{ENV_PHOENIX_TRACE_ARCHIVE_AFTER_DAYS}: {days}. "
+            "Value must be a positive number."
+        )
+    return days
+
+
+class SpanPartitionInterval(Enum):
+    DAY = "day"
+    WEEK = "week"
+
+
+def get_env_span_partition_interval() -> Optional[SpanPartitionInterval]:
+    if not (interval := os.getenv(ENV_PHOENIX_SPAN_PARTITION_INTERVAL)):
+        return None
+    try:
+        return SpanPartitionInterval(interval.lower().strip())
+    except ValueError:
+        raise ValueError(
+            f"Invalid value for environment variable {ENV_PHOENIX_SPAN_PARTITION_INTERVAL}: "
+            f"{interval}. Value must be one of "
+            f"{log_a_list([i.value for i in SpanPartitionInterval], 'or')} (case-insensitive)."
+        )
+
+
+def get_env_promoted_span_attributes() -> list[tuple[str, ...]]:
+    if not (attributes := os.getenv(ENV_PHOENIX_PROMOTED_SPAN_ATTRIBUTES)):
+        return []
+    promoted: list[tuple[str, ...]] = []
+    for attribute in attributes.split(","):
+        if not (attribute := attribute.strip()):
+            continue
+        if not re.fullmatch(r"[\w-]+(\.[\w-]+)*", attribute, flags=re.ASCII):
+            raise ValueError(
+                f"Invalid value for environment variable {ENV_PHOENIX_PROMOTED_SPAN_ATTRIBUTES}: "
+                f"{attribute}. Keys must be separated by periods and may only contain letters, "
+                "digits, underscores and hyphens."
+            )
+        promoted.append(tuple(attribute.split(".")))
+    return promoted
+
+
+def get_env_otlp_decoding_processes() -> int:
+    processes = _int_val(ENV_PHOENIX_OTLP_DECODING_PROCESSES, 0)
+    if processes == -1:
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+    if processes < 0:
+        raise ValueError(
+            f"Invalid value for environment variable {ENV_PHOENIX_OTLP_DECODING_PROCESSES}: "
+            f"{processes}. Value must be -1 or a non-negative integer."
+        )
+    return processes
+
+
 def get_env_enable_websockets() -> Optional[bool]:
     return _bool_val(ENV_PHOENIX_ENABLE_WEBSOCKETS)
 
@@ -612,6 +932,80 @@ def get_env_database_schema() -> Optional[str]:
     return os.getenv(ENV_PHOENIX_SQL_DATABASE_SCHEMA)
 
 
+def get_env_database_read_connection_str() -> Optional[str]:
+    if get_env_database_connection_str().startswith("sqlite"):
+        return None
+    return os.getenv(ENV_PHOENIX_SQL_DATABASE_READ_URL) or None
+
+
+def get_env_database_read_max_lag_seconds() -> float:
+    max_lag_seconds = _float_val(ENV_PHOENIX_SQL_DATABASE_READ_MAX_LAG_SECONDS, 10)
+    if max_lag_seconds < 0:
+        raise ValueError(
+            "Invalid value for environment variable "
+            f"{ENV_PHOENIX_SQL_DATABASE_READ_MAX_LAG_SECONDS}: {max_lag_seconds}. "
+            "Value must be a non-negative number."
+        )
+    return max_lag_seconds
+
+
+def get_env_database_pool_size() -> int:
+    pool_size = _int_val(ENV_PHOENIX_SQL_DATABASE_POOL_SIZE, 5)
+    if pool_size < 0:
+        raise ValueError(
+            f"Invalid value for environment variable {ENV_PHOENIX_SQL_DATABASE_POOL_SIZE}: "
+            f"{pool_size}. Value must be a non-negative integer."
+        )
+    return pool_size
+
+
+def get_env_database_pool_max_overflow() -> int:
+    max_overflow = _int_val(ENV_PHOENIX_SQL_DATABASE_POOL_MAX_OVERFLOW, 10)
+    if max_overflow < 0:
+        raise ValueError(
+            "Invalid value for environment variable "
+            f"{ENV_PHOENIX_SQL_DATABASE_POOL_MAX_OVERFLOW}: {max_overflow}. "
+            "Value must be a non-negative integer."
+        )
+    return max_overflow
+
+
+def get_env_database_pool_recycle_seconds() -> Optional[int]:
+    recycle_seconds = _int_val(ENV_PHOENIX_SQL_DATABASE_POOL_RECYCLE_SECONDS)
+    if recycle_seconds is not None and recycle_seconds <= 0:
+        raise ValueError(
+            "Invalid value for environment variable "
+            f"{ENV_PHOENIX_SQL_DATABASE_POOL_RECYCLE_SECONDS}: {recycle_seconds}. "
+            "Value must be a positive integer."
+        )
+    return recycle_seconds
+
+
+def get_env_database_pool_pre_ping() -> bool:
+    return _bool_val(ENV_PHOENIX_SQL_DATABASE_POOL_PRE_PING, False)
+
+
+def get_env_database_statement_cache_size() -> Optional[int]:
+    cache_size = _int_val(ENV_PHOENIX_SQL_DATABASE_STATEMENT_CACHE_SIZE)
+    if cache_size is not None and cache_size < 0:
+        raise ValueError(
+            "Invalid value for environment variable "
+            f"{ENV_PHOENIX_SQL_DATABASE_STATEMENT_CACHE_SIZE}: {cache_size}. "
+            "Value must be a non-negative integer."
+        )
+    return cache_size
+
+
+def get_env_sqlite_read_pool_size() -> int:
+    pool_size = _int_val(ENV_PHOENIX_SQLITE_READ_POOL_SIZE, 0)
+    if pool_size < 0:
+        raise ValueError(
+            f"Invalid value for environment variable {ENV_PHOENIX_SQLITE_READ_POOL_SIZE}: "
+            f"{pool_size}. Value must be a non-negative integer."
+        )
+    return pool_size
+
+
 def get_env_enable_prometheus() -> bool:
     if (enable_promotheus := os.getenv(ENV_PHOENIX_ENABLE_PROMETHEUS)) is None or (
         enable_promotheus_lower := enable_promotheus.lower()
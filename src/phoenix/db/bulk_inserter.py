@@ -1,13 +1,14 @@
 import asyncio
 import logging
 from asyncio import Queue, as_completed
-from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Mapping, Sequence
 from dataclasses import dataclass, field
 from functools import singledispatchmethod
-from itertools import islice
-from time import perf_counter
-from typing import Any, Optional, cast
+from itertools import islice, repeat
+from time import monotonic, perf_counter, time
+from typing import Any, NamedTuple, Optional, Protocol, cast
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing_extensions import TypeAlias
 
 import phoenix.trace.v1 as pb
@@ -18,8 +19,17 @@ from phoenix.db.insertion.evaluation import (
     insert_evaluation,
 )
 from phoenix.db.insertion.helpers import DataManipulation, DataManipulationEvent
-from phoenix.db.insertion.span import SpanInsertionEvent, insert_span
+from phoenix.db.insertion.identity_cache import IdentityCache
+from phoenix.db.insertion.scheduler import AdaptiveScheduler
+from phoenix.db.insertion.span import (
+    MAX_SPANS_PER_STATEMENT,
+    ClearProjectSpansEvent,
+    SpanInsertionEvent,
+    insert_span,
+    insert_spans,
+)
 from phoenix.db.insertion.span_annotation import SpanAnnotationQueueInserter
+from phoenix.db.insertion.spool import Spool, encode_evaluation, encode_spans
 from phoenix.db.insertion.trace_annotation import TraceAnnotationQueueInserter
 from phoenix.db.insertion.types import Insertables, Precursors
 from phoenix.server.dml_event import DmlEvent, SpanInsertEvent
@@ -28,7 +38,13 @@ from phoenix.trace.schemas import Span
 
 logger = logging.getLogger(__name__)
 
+# The delay before the first retry of the spans and evaluations of the spool, which
+# doubles with each retry.
+_MIN_RETRY_DELAY_SEC = 0.1
+
 ProjectRowId: TypeAlias = int
+ProjectName: TypeAlias = str
+Transport: TypeAlias = str
 
 
 @dataclass(frozen=True)
@@ -36,6 +52,19 @@ class TransactionResult:
     updated_project_rowids: set[ProjectRowId] = field(default_factory=set)
 
 
+class QueueSpans(Protocol):
+    def __call__(
+        self,
+        spans: Sequence[tuple[Span, ProjectName]],
+        transport: Transport = "internal",
+    ) -> Awaitable[None]: ...
+
+
+class _Arrival(NamedTuple):
+    received_at: float
+    transport: Transport
+
+
 class BulkInserter:
     def __init__(
         self,
@@ -50,49 +79,132 @@ class BulkInserter:
         enable_prometheus: bool = False,
         retry_delay_sec: float = DEFAULT_RETRY_DELAY_SEC,
         retry_allowance: int = DEFAULT_RETRY_ALLOWANCE,
+        identity_cache_size: int = 10_000,
+        max_buffered_items: int = 100_000,
+        max_buffered_bytes: int = 512 * 1024 * 1024,
+        spool: Optional[Spool] = None,
+        use_copy: bool = False,
+        compression_threshold: Optional[int] = None,
+        deduplication_threshold: Optional[int] = None,
     ) -> None:
         """
         :param db: A function to initiate a new database session.
         :param initial_batch_of_spans: Initial batch of spans to insert.
-        :param sleep: The time to sleep between bulk insertions
+        :param sleep: The initial time to sleep between bulk insertions, which is then
+        tuned from the depth of the queue.
         :param max_ops_per_transaction: The maximum number of operations to dequeue from
-        the operations queue for each transaction.
+        the operations queue for each transaction, and the initial number of spans inserted
+        per transaction, which is then tuned from the measured commit latency.
         :param max_queue_size: The maximum length of the operations queue.
         :param enable_prometheus: Whether Prometheus is enabled.
+        :param identity_cache_size: The maximum number of projects, traces and sessions
+        (each) whose row IDs are cached to avoid looking them up for every batch of spans.
+        :param max_buffered_items: The high-water mark for the number of spans and evaluations
+        waiting to be inserted, above which new export requests are rejected.
+        :param max_buffered_bytes: The high-water mark for the approximate size (in bytes) of
+        the spans and evaluations waiting to be inserted, above which new export requests are
+        rejected.
+        :param spool: An optional write-ahead log in which spans and evaluations are persisted
+        until they are inserted, so that they survive a restart or an outage of the database.
+        Spans and evaluations whose transactions keep failing are retried with a backoff of up
+        to `retry_delay_sec` between rounds, until `retry_allowance` rounds in a row have
+        failed, after which they are moved to the dead letters of the spool.
+        :param use_copy: Whether to load spans with `COPY` on PostgreSQL.
+        :param compression_threshold: The minimum length of the large string attribute
+        values that are compressed, if any.
+        :param deduplication_threshold: The minimum length of the large string attribute
+        values that are stored once each in the blob table and referred to by hash, if any.
         """
         self._db = db
         self._running = False
-        self._sleep = sleep
         self._max_ops_per_transaction = max_ops_per_transaction
         self._operations: Optional[Queue[DataManipulation]] = None
         self._max_queue_size = max_queue_size
         self._spans: list[tuple[Span, str]] = (
             [] if initial_batch_of_spans is None else list(initial_batch_of_spans)
         )
+        self._span_arrivals: list[_Arrival] = [_Arrival(monotonic(), "internal")] * len(self._spans)
+        self._inflight_since: Optional[float] = None
         self._evaluations: list[pb.Evaluation] = (
             [] if initial_batch_of_evaluations is None else list(initial_batch_of_evaluations)
         )
+        self._max_buffered_items = max_buffered_items
+        self._max_buffered_bytes = max_buffered_bytes
+        self._buffered_bytes = sum(_approximate_size(span) for span, _ in self._spans) + sum(
+            evaluation.ByteSize() for evaluation in self._evaluations
+        )
         self._task: Optional[asyncio.Task[None]] = None
         self._event_queue = event_queue
         self._enable_prometheus = enable_prometheus
         self._retry_delay_sec = retry_delay_sec
         self._retry_allowance = retry_allowance
         self._queue_inserters = _QueueInserters(db, self._retry_delay_sec, self._retry_allowance)
+        self._spool = spool
+        self._spool_retries = 0
+        self._use_copy = use_copy
+        self._compression_threshold = compression_threshold
+        self._deduplication_threshold = deduplication_threshold
+        self._scheduler = AdaptiveScheduler(
+            batch_size=max_ops_per_transaction,
+            min_batch_size=min(100, max_ops_per_transaction),
+            # Larger batches would be split into several statements anyway.
+            max_batch_size=MAX_SPANS_PER_STATEMENT,
+            flush_interval=sleep,
+            min_flush_interval=min(0.01, sleep),
+            max_flush_interval=max(0.25, sleep),
+            enable_prometheus=enable_prometheus,
+        )
+        self._flush: Optional[asyncio.Event] = None
+        self._idle = False
+        self._identity_cache = IdentityCache(
+            maxsize=identity_cache_size,
+            enable_prometheus=enable_prometheus,
+        )
+
+    @property
+    def identity_cache(self) -> IdentityCache:
+        return self._identity_cache
+
+    def admit(self) -> bool:
+        """
+        Returns whether a new export request should be admitted, i.e. whether
+        the buffer of spans and evaluations waiting to be inserted is below its
+        high-water marks. Requests already admitted are never rejected, so the
+        buffer can overshoot by at most the size of the requests in flight.
+        """
+        if (
+            len(self._spans) + len(self._evaluations) < self._max_buffered_items
+            and self._buffered_bytes < self._max_buffered_bytes
+        ):
+            return True
+        if self._enable_prometheus:
+            from phoenix.server.prometheus import BULK_LOADER_REJECTIONS
+
+            BULK_LOADER_REJECTIONS.inc()
+        return False
 
     async def __aenter__(
         self,
     ) -> tuple[
         Callable[[Any], Awaitable[None]],
-        Callable[[Span, str], Awaitable[None]],
+        QueueSpans,
         Callable[[pb.Evaluation], Awaitable[None]],
         Callable[[DataManipulation], None],
     ]:
+        if self._spool is not None:
+            spans, evaluations = self._spool.open()
+            self._requeue(spans, [_Arrival(monotonic(), "spool")] * len(spans), evaluations)
+        if self._enable_prometheus:
+            from phoenix.server.prometheus import INGESTION_LAG
+
+            INGESTION_LAG.set_function(self._ingestion_lag)
         self._running = True
         self._operations = Queue(maxsize=self._max_queue_size)
+        self._flush = asyncio.Event()
         self._task = asyncio.create_task(self._bulk_insert())
         return (
             self._enqueue,
-            self._queue_span,
+            self._queue_spans,
             self._queue_evaluation,
             self._enqueue_operation,
         )
@@ -102,24 +214,91 @@ class BulkInserter:
         if self._task:
             self._task.cancel()
             self._task = None
+        if self._spool is not None:
+            self._spool.close()
 
     async def _enqueue(self, *items: Any) -> None:
         await self._queue_inserters.enqueue(*items)
+        self._notify()
 
     def _enqueue_operation(self, operation: DataManipulation) -> None:
         cast("Queue[DataManipulation]", self._operations).put_nowait(operation)
+        self._notify()
 
-    async def _queue_span(self, span: Span, project_name: str) -> None:
-        self._spans.append((span, project_name))
+    async def _queue_spans(
+        self,
+        spans: Sequence[tuple[Span, ProjectName]],
+        transport: Transport = "internal",
+    ) -> None:
+        if self._spool is not None:
+            records = await asyncio.get_running_loop().run_in_executor(None, encode_spans, spans)
+            self._spool.append(records)
+        self._spans.extend(spans)
+        self._span_arrivals.extend(repeat(_Arrival(monotonic(), transport), len(spans)))
+        self._buffered_bytes += sum(_approximate_size(span) for span, _ in spans)
+        self._notify()
 
     async def _queue_evaluation(self, evaluation: pb.Evaluation) -> None:
+        if self._spool is not None:
+            self._spool.append([encode_evaluation(evaluation)])
         self._evaluations.append(evaluation)
+        self._buffered_bytes += evaluation.ByteSize()
+        self._notify()
+
+    def _requeue(
+        self,
+        spans: Sequence[tuple[Span, ProjectName]],
+        span_arrivals: Sequence[_Arrival],
+        evaluations: Sequence[pb.Evaluation],
+    ) -> None:
+        self._spans[:0] = spans
+        self._span_arrivals[:0] = span_arrivals
+        self._evaluations[:0] = evaluations
+        self._buffered_bytes += sum(_approximate_size(span) for span, _ in spans) + sum(
+            evaluation.ByteSize() for evaluation in evaluations
+        )
 
-    async def _process_events(self, events: Iterable[Optional[DataManipulationEvent]]) -> None: ...
+    def _ingestion_lag(self) -> float:
+        """
+        Returns the time elapsed since the oldest span yet to be inserted was received.
+        """
+        received_at = [] if (since := self._inflight_since) is None else [since]
+        if arrivals := self._span_arrivals:
+            received_at.append(arrivals[0].received_at)
+        return monotonic() - min(received_at) if received_at else 0.0
+
+    def _notify(self) -> None:
+        """
+        Wakes up the insertion loop if it is idle, or if the buffer holds a full batch.
+        """
+        if self._flush is not None and (
+            self._idle or self._scheduler.should_flush(len(self._spans) + len(self._evaluations))
+        ):
+            self._flush.set()
+
+    async def _wait(self, timeout: float) -> bool:
+        """
+        Waits until notified or until the timeout expires, and returns whether notified.
+        """
+        assert self._flush is not None
+        try:
+            await asyncio.wait_for(self._flush.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._flush.clear()
+
+    async def _process_events(self, events: Iterable[Optional[DataManipulationEvent]]) -> None:
+        for event in events:
+            if isinstance(event, ClearProjectSpansEvent):
+                self._identity_cache.invalidate_project(event.project_rowid, keep_project=True)
 
     async def _bulk_insert(self) -> None:
         assert isinstance(self._operations, Queue)
         spans_buffer, evaluations_buffer = None, None
+        span_arrivals: list[_Arrival] = []
+        trigger = "interval"
         # start first insert immediately if the inserter has not run recently
         while (
             self._running
@@ -128,89 +307,229 @@ class BulkInserter:
             or self._spans
             or self._evaluations
         ):
+            if self._enable_prometheus:
+                from phoenix.server.prometheus import (
+                    BULK_LOADER_BUFFERED_BYTES,
+                    BULK_LOADER_BUFFERED_ITEMS,
+                )
+
+                BULK_LOADER_BUFFERED_ITEMS.set(len(self._spans) + len(self._evaluations))
+                BULK_LOADER_BUFFERED_BYTES.set(self._buffered_bytes)
             if (
                 self._queue_inserters.empty
                 and self._operations.empty()
                 and not self._spans
                 and not self._evaluations
             ):
-                await asyncio.sleep(self._sleep)
+                # Nothing to do, so wait for the next item to arrive instead of polling.
+                self._idle = True
+                if await self._wait(self._scheduler.max_flush_interval):
+                    trigger = "arrival"
+                self._idle = False
                 continue
+            if self._enable_prometheus:
+                from phoenix.server.prometheus import BULK_LOADER_FLUSHES
+
+                BULK_LOADER_FLUSHES.labels(trigger=trigger).inc()
             ops_remaining = self._max_ops_per_transaction
+            events: list[Optional[DataManipulationEvent]] = []
             async with self._db() as session:
                 while ops_remaining and not self._operations.empty():
                     ops_remaining -= 1
                     op = await self._operations.get()
                     try:
                         async with session.begin_nested():
-                            await op(session)
+                            events.append(await op(session))
                     except Exception as e:
                         if self._enable_prometheus:
                             from phoenix.server.prometheus import BULK_LOADER_EXCEPTIONS
 
                             BULK_LOADER_EXCEPTIONS.inc()
                         logger.exception(str(e))
+            await self._process_events(events)
             # It's important to grab the buffers at the same time so there's
             # no race condition, since an eval insertion will fail if the span
             # it references doesn't exist. Grabbing the eval buffer later may
             # include an eval whose span is in the queue but missed being
             # included in the span buffer that was grabbed previously.
+            # For the same reason, the spool must be synced right before.
+            spool_position = self._spool.sync() if self._spool is not None else None
+            self._scheduler.observe_backlog(len(self._spans) + len(self._evaluations))
             if self._spans:
                 spans_buffer = self._spans
+                span_arrivals = self._span_arrivals
                 self._spans = []
+                self._span_arrivals = []
             if self._evaluations:
                 evaluations_buffer = self._evaluations
                 self._evaluations = []
+            self._buffered_bytes = 0
             # Spans should be inserted before the evaluations, since an evaluation
             # insertion will fail if the span it references doesn't exist.
+            failed_spans: list[tuple[Span, ProjectName]] = []
+            failed_span_arrivals: list[_Arrival] = []
+            failed_evaluations: list[pb.Evaluation] = []
             if spans_buffer:
-                await self._insert_spans(spans_buffer)
+                failed_spans, failed_span_arrivals = await self._insert_spans(
+                    spans_buffer, span_arrivals
+                )
                 spans_buffer = None
             if evaluations_buffer:
-                await self._insert_evaluations(evaluations_buffer)
+                failed_evaluations = await self._insert_evaluations(evaluations_buffer)
                 evaluations_buffer = None
+            if self._spool is not None and spool_position is not None:
+                if not failed_spans and not failed_evaluations:
+                    self._spool_retries = 0
+                    self._spool.commit(spool_position)
+                elif self._spool_retries < self._retry_allowance:
+                    # Retry them in the next round after a backoff. The checkpoint can
+                    # only advance once everything before it has been inserted.
+                    self._spool_retries += 1
+                    self._requeue(failed_spans, failed_span_arrivals, failed_evaluations)
+                    await asyncio.sleep(
+                        min(
+                            self._retry_delay_sec,
+                            _MIN_RETRY_DELAY_SEC * 2 ** (self._spool_retries - 1),
+                        )
+                    )
+                else:
+                    # Give up on them, so that they are not replayed forever.
+                    self._spool_retries = 0
+                    records = encode_spans(failed_spans) + [
+                        encode_evaluation(evaluation) for evaluation in failed_evaluations
+                    ]
+                    path = self._spool.dead_letter(records)
+                    logger.error(
+                        f"Failed to insert {len(failed_spans)} spans and "
+                        f"{len(failed_evaluations)} evaluations after {self._retry_allowance} "
+                        f"retries, so they were moved to {path}"
+                    )
+                    self._spool.commit(spool_position)
             async for event in self._queue_inserters.insert():
                 self._event_queue.put(event)
-            await asyncio.sleep(self._sleep)
+            if await self._wait(self._scheduler.flush_interval):
+                trigger = "threshold"
+            else:
+                trigger = "interval"
 
-    async def _insert_spans(self, spans: list[tuple[Span, str]]) -> None:
-        project_ids = set()
-        for i in range(0, len(spans), self._max_ops_per_transaction):
+    async def _insert_spans(
+        self,
+        spans: list[tuple[Span, ProjectName]],
+        arrivals: Optional[list[_Arrival]] = None,
+    ) -> tuple[list[tuple[Span, ProjectName]], list[_Arrival]]:
+        """
+        Returns the spans whose transactions failed as a whole, e.g. because the
+        database was unavailable, as opposed to spans that were rejected, along
+        with their arrivals.
+        """
+        if arrivals is None:
+            arrivals = [_Arrival(monotonic(), "internal")] * len(spans)
+        if not spans:
+            return [], []
+        self._inflight_since = min(arrival.received_at for arrival in arrivals)
+        if self._enable_prometheus:
+            from phoenix.server.prometheus import INGESTION_BUFFER_WAIT_TIME
+
+            now = monotonic()
+            for arrival, project_name in set(zip(arrivals, (p for _, p in spans))):
+                INGESTION_BUFFER_WAIT_TIME.labels(
+                    project=project_name, transport=arrival.transport
+                ).observe(now - arrival.received_at)
+        project_ids: set[ProjectRowId] = set()
+        failed: list[tuple[Span, ProjectName]] = []
+        failed_arrivals: list[_Arrival] = []
+        i = 0
+        while i < len(spans):
+            batch = spans[i : i + self._scheduler.batch_size]
+            batch_arrivals = arrivals[i : i + len(batch)]
+            i += len(batch)
             try:
                 start = perf_counter()
                 async with self._db() as session:
-                    for span, project_name in islice(spans, i, i + self._max_ops_per_transaction):
-                        if self._enable_prometheus:
-                            from phoenix.server.prometheus import BULK_LOADER_SPAN_INSERTIONS
-
-                            BULK_LOADER_SPAN_INSERTIONS.inc()
-                        result: Optional[SpanInsertionEvent] = None
-                        try:
-                            async with session.begin_nested():
-                                result = await insert_span(session, span, project_name)
-                        except Exception:
-                            if self._enable_prometheus:
-                                from phoenix.server.prometheus import BULK_LOADER_EXCEPTIONS
+                    if self._enable_prometheus:
+                        from phoenix.server.prometheus import BULK_LOADER_SPAN_INSERTIONS
 
-                                BULK_LOADER_EXCEPTIONS.inc()
-                            logger.exception(
-                                f"Failed to insert span with span_id={span.context.span_id}"
+                        BULK_LOADER_SPAN_INSERTIONS.inc(len(batch))
+                    try:
+                        async with session.begin_nested():
+                            events = await insert_spans(
+                                session,
+                                batch,
+                                self._identity_cache,
+                                self._use_copy,
+                                self._compression_threshold,
+                                self._deduplication_threshold,
                             )
-                        if result is not None:
-                            project_ids.add(result.project_rowid)
+                        fell_back = False
+                    except Exception:
+                        if self._enable_prometheus:
+                            from phoenix.server.prometheus import BULK_LOADER_EXCEPTIONS
+
+                            BULK_LOADER_EXCEPTIONS.inc()
+                        # The batch may have failed because of a stale cache entry, e.g.
+                        # for a trace deleted without a corresponding DML event.
+                        self._identity_cache.clear()
+                        logger.exception(
+                            "Failed to insert batch of spans, falling back to one span at a time"
+                        )
+                        events = await self._insert_spans_one_by_one(session, batch)
+                        fell_back = True
+                    project_ids.update(event.project_rowid for event in events)
+                elapsed = perf_counter() - start
+                if fell_back:
+                    self._scheduler.observe_failure(len(batch))
+                else:
+                    self._scheduler.observe_commit(len(batch), elapsed)
                 if self._enable_prometheus:
                     from phoenix.server.prometheus import BULK_LOADER_INSERTION_TIME
 
-                    BULK_LOADER_INSERTION_TIME.observe(perf_counter() - start)
+                    BULK_LOADER_INSERTION_TIME.observe(elapsed)
+                    _observe_inserted_spans(batch, batch_arrivals, elapsed)
             except Exception:
                 if self._enable_prometheus:
                     from phoenix.server.prometheus import BULK_LOADER_EXCEPTIONS
 
                     BULK_LOADER_EXCEPTIONS.inc()
+                self._identity_cache.clear()
                 logger.exception("Failed to insert spans")
+                failed.extend(batch)
+                failed_arrivals.extend(batch_arrivals)
+        self._inflight_since = None
         self._event_queue.put(SpanInsertEvent(tuple(project_ids)))
+        return failed, failed_arrivals
 
-    async def _insert_evaluations(self, evaluations: list[pb.Evaluation]) -> None:
+    async def _insert_spans_one_by_one(
+        self,
+        session: AsyncSession,
+        spans: Iterable[tuple[Span, str]],
+    ) -> list[SpanInsertionEvent]:
+        events = []
+        for span, project_name in spans:
+            result: Optional[SpanInsertionEvent] = None
+            try:
+                async with session.begin_nested():
+                    result = await insert_span(
+                        session,
+                        span,
+                        project_name,
+                        self._compression_threshold,
+                        self._deduplication_threshold,
+                    )
+            except Exception:
+                if self._enable_prometheus:
+                    from phoenix.server.prometheus import BULK_LOADER_EXCEPTIONS
+
+                    BULK_LOADER_EXCEPTIONS.inc()
+                logger.exception(f"Failed to insert span with span_id={span.context.span_id}")
+            if result is not None:
+                events.append(result)
+        return events
+
+    async def _insert_evaluations(self, evaluations: list[pb.Evaluation]) -> list[pb.Evaluation]:
+        """
+        Returns the evaluations whose transactions failed as a whole.
+        """
+        failed: list[pb.Evaluation] = []
         for i in range(0, len(evaluations), self._max_ops_per_transaction):
             try:
                 start = perf_counter()
@@ -239,6 +558,55 @@ class BulkInserter:
 
                     BULK_LOADER_EXCEPTIONS.inc()
                 logger.exception("Failed to insert evaluations")
+                failed.extend(islice(evaluations, i, i + self._max_ops_per_transaction))
+        return failed
+
+
+def _observe_inserted_spans(
+    spans: Sequence[tuple[Span, ProjectName]],
+    arrivals: Sequence[_Arrival],
+    transaction_time: float,
+) -> None:
+    from phoenix.server.prometheus import (
+        INGESTION_END_TO_VISIBLE_TIME,
+        INGESTION_TRANSACTION_TIME,
+    )
+
+    now = time()
+    for project_name, transport in {(p, a.transport) for (_, p), a in zip(spans, arrivals)}:
+        INGESTION_TRANSACTION_TIME.labels(project=project_name, transport=transport).observe(
+            transaction_time
+        )
+    for (span, project_name), arrival in zip(spans, arrivals):
+        INGESTION_END_TO_VISIBLE_TIME.labels(
+            project=project_name, transport=arrival.transport
+        ).observe(max(now - span.end_time.timestamp(), 0.0))
+
+
+def _approximate_size(span: Span) -> int:
+    """
+    Approximates the memory footprint of a span by the lengths of its strings,
+    which dominate the size of spans carrying LLM inputs and outputs.
+    """
+    return (
+        len(span.name)
+        + len(span.status_message)
+        + _approximate_size_of_value(span.attributes)
+        + sum(
+            len(event.name) + _approximate_size_of_value(event.attributes) for event in span.events
+        )
+        + 128
+    )
+
+
+def _approximate_size_of_value(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, Mapping):
+        return sum(len(k) + _approximate_size_of_value(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_approximate_size_of_value(v) for v in value)
+    return 8
 
 
 class _QueueInserters:
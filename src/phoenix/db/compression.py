@@ -0,0 +1,127 @@
+"""
+Opt-in compression of the large string values in span attributes, i.e. the input
+and output values and the contents of the input and output messages of LLM spans.
+
+At ingestion, each such string at least as long as the configured threshold is
+replaced in the attributes by `{"__zstd__": "<base64 of the zstd frame>"}`,
+provided that this is smaller. Readers decompress the values only when they
+read them (see `decompress_attributes`). Since the database cannot look inside
+the compressed values, filter conditions on them are evaluated on the
+decompressed values after the fact (see `SpanFilter.post_filter`).
+
+Compression requires the `zstandard` package, whereas decompression only
+imports it when a compressed value is actually encountered.
+"""
+
+import base64
+import json
+from collections.abc import Mapping, Sequence
+from typing import Any, Union
+
+COMPRESSED_KEY = "__zstd__"
+
+COMPRESSIBLE_PATHS: tuple[tuple[str, ...], ...] = (
+    ("input", "value"),
+    ("output", "value"),
+    ("llm", "input_messages", "*", "message", "content"),
+    ("llm", "output_messages", "*", "message", "content"),
+)
+"""
+Paths of the attributes that may be compressed, where `*` matches any position in
+a list.
+"""
+
+_COMPRESSION_LEVEL = 3
+
+
+def compress_attributes(attributes: Mapping[str, Any], threshold: int) -> Mapping[str, Any]:
+    """
+    Returns the attributes with every compressible string of at least `threshold`
+    characters compressed. The attributes are copied only along the paths of the
+    values that are compressed.
+    """
+    for path in COMPRESSIBLE_PATHS:
+        attributes = _compress(attributes, path, threshold)
+    return attributes
+
+
+def is_compressed(value: Any) -> bool:
+    return isinstance(value, Mapping) and isinstance(value.get(COMPRESSED_KEY), str)
+
+
+def has_compressed_values(value: Any) -> bool:
+    if is_compressed(value):
+        return True
+    if isinstance(value, Mapping):
+        return any(map(has_compressed_values, value.values()))
+    if isinstance(value, list):
+        return any(map(has_compressed_values, value))
+    return False
+
+
+def decompress_attributes(value: Any) -> Any:
+    """
+    Returns the value with every compressed string in it decompressed. The value
+    is copied only along the paths of the compressed strings.
+    """
+    if is_compressed(value):
+        return _decompress(value[COMPRESSED_KEY])
+    if isinstance(value, Mapping):
+        decompressed = {k: decompress_attributes(v) for k, v in value.items()}
+        return value if all(decompressed[k] is v for k, v in value.items()) else decompressed
+    if isinstance(value, list):
+        items = [decompress_attributes(v) for v in value]
+        return value if all(x is v for x, v in zip(items, value)) else items
+    return value
+
+
+def decompress_text(value: str) -> str:
+    """
+    Decompresses a value extracted from the attributes as text in SQL, in which
+    case a compressed string comes back as the JSON text of its placeholder.
+    """
+    if not value.startswith("{") or COMPRESSED_KEY not in value:
+        return value
+    try:
+        obj = json.loads(value)
+    except ValueError:
+        return value
+    return _decompress(obj[COMPRESSED_KEY]) if is_compressed(obj) else value
+
+
+def is_compressible_path(keys: Sequence[Union[str, int]]) -> bool:
+    return any(
+        len(keys) == len(path)
+        and all(p == "*" and isinstance(k, int) or p == k for k, p in zip(keys, path))
+        for path in COMPRESSIBLE_PATHS
+    )
+
+
+def _compress(value: Any, path: Sequence[str], threshold: int) -> Any:
+    if not path:
+        if isinstance(value, str) and len(value) >= threshold:
+            import zstandard
+
+            data = base64.b64encode(
+                zstandard.compress(value.encode("utf-8"), _COMPRESSION_LEVEL)
+            ).decode("ascii")
+            if len(data) < len(value):
+                return {COMPRESSED_KEY: data}
+        return value
+    key, rest = path[0], path[1:]
+    if key == "*":
+        if not isinstance(value, list):
+            return value
+        items = [_compress(v, rest, threshold) for v in value]
+        return value if all(x is v for x, v in zip(items, value)) else items
+    if not isinstance(value, Mapping) or key not in value:
+        return value
+    child = value[key]
+    compressed = _compress(child, rest, threshold)
+    return value if compressed is child else {**value, key: compressed}
+
+
+def _decompress(data: str) -> str:
+    import zstandard
+
+    return zstandard.decompress(base64.b64decode(data)).decode("utf-8")
@@ -4,20 +4,32 @@ from collections.abc import Callable
 from datetime import datetime
 from enum import Enum
 from sqlite3 import Connection
-from typing import Any
+from typing import Any, Optional
+from uuid import uuid4
 
 import aiosqlite
 import numpy as np
 import sqlalchemy
 import sqlean
-from sqlalchemy import URL, StaticPool, event, make_url
+from sqlalchemy import URL, AsyncAdaptedQueuePool, Pool, StaticPool, event, make_url
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from typing_extensions import assert_never
 
-from phoenix.config import LoggingMode, get_env_database_schema
+from phoenix.config import (
+    LoggingMode,
+    get_env_database_pool_max_overflow,
+    get_env_database_pool_pre_ping,
+    get_env_database_pool_recycle_seconds,
+    get_env_database_pool_size,
+    get_env_database_read_connection_str,
+    get_env_database_schema,
+    get_env_database_statement_cache_size,
+    get_env_enable_prometheus,
+    get_env_sqlite_read_pool_size,
+)
 from phoenix.db.helpers import SupportedSQLDialect
 from phoenix.db.migrate import migrate_in_thread
-from phoenix.db.models import init_models
+from phoenix.db.models import Base, init_models
 from phoenix.settings import Settings
 
 sqlean.extensions.enable("text", "stats")
@@ -112,19 +124,11 @@ def aio_sqlite_engine(
         url = url.set(query={**url.query, "cache": "shared"}, database=":memory:")
     database = url.render_as_string().partition("///")[-1]
 
-    def async_creator() -> aiosqlite.Connection:
-        conn = aiosqlite.Connection(
-            lambda: sqlean.connect(f"file:{database}", uri=True),
-            iter_chunk_size=64,
-        )
-        conn.daemon = True
-        return conn
-
     engine = create_async_engine(
         url=url,
         echo=log_to_stdout,
         json_serializer=_dumps,
-        async_creator=async_creator,
+        async_creator=_sqlite_async_creator(database),
         poolclass=StaticPool,
     )
     event.listen(engine.sync_engine, "connect", set_sqlite_pragma)
@@ -148,6 +152,104 @@ def aio_sqlite_engine(
     return engine
 
 
+def _sqlite_async_creator(database: str) -> Callable[[], aiosqlite.Connection]:
+    def async_creator() -> aiosqlite.Connection:
+        conn = aiosqlite.Connection(
+            lambda: sqlean.connect(f"file:{database}", uri=True),
+            iter_chunk_size=64,
+        )
+        conn.daemon = True
+        return conn
+
+    return async_creator
+
+
+def create_read_engine(
+    connection_str: str,
+    log_to_stdout: bool = False,
+) -> Optional[AsyncEngine]:
+    """
+    Returns an engine of read-only connections to the database for queries that
+    don't write, i.e. a pool of connections to the same SQLite database or the
+    engine of a read replica of a PostgreSQL database, or None if queries should go
+    through the engine of `create_engine`. The database must have been migrated
+    already.
+    """
+    url = get_async_db_url(connection_str)
+    backend = SupportedSQLDialect(url.get_backend_name())
+    if backend is SupportedSQLDialect.SQLITE:
+        if not (pool_size := get_env_sqlite_read_pool_size()):
+            return None
+        return aio_sqlite_read_engine(url=url, pool_size=pool_size, log_to_stdout=log_to_stdout)
+    elif backend is SupportedSQLDialect.POSTGRESQL:
+        if (read_connection_str := get_env_database_read_connection_str()) is None:
+            return None
+        return aio_postgresql_engine(
+            url=get_async_db_url(read_connection_str),
+            migrate=False,
+            log_to_stdout=log_to_stdout,
+            pool_name="read_replica",
+        )
+    else:
+        assert_never(backend)
+
+
+def aio_sqlite_read_engine(
+    url: URL,
+    pool_size: int,
+    log_to_stdout: bool = False,
+) -> Optional[AsyncEngine]:
+    """
+    Returns an engine of a pool of read-only connections to an SQLite database,
+    which can read concurrently with the connection that writes because of the
+    write-ahead log, or None if the database is in memory.
+    """
+    database = url.database or ":memory:"
+    if database.startswith("file:"):
+        database = database[5:]
+    if database.startswith(":memory:"):
+        return None
+    database = url.render_as_string().partition("///")[-1]
+
+    engine = create_async_engine(
+        url=url,
+        echo=log_to_stdout,
+        json_serializer=_dumps,
+        async_creator=_sqlite_async_creator(database),
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=0,
+    )
+    event.listen(engine.sync_engine, "connect", set_sqlite_read_pragma)
+    return engine
+
+
+def set_sqlite_read_pragma(connection: Connection, _: Any) -> None:
+    cursor = connection.cursor()
+    cursor.execute("PRAGMA query_only = ON;")
+    cursor.execute("PRAGMA cache_size = -32000;")
+    cursor.execute("PRAGMA busy_timeout = 10000;")
+    cursor.close()
+
+
+def sqlite_memory_engine() -> sqlalchemy.Engine:
+    """
+    Returns a synchronous engine of a new private in-memory SQLite database with the
+    tables of the models, e.g. for running span queries on spans that are not in the
+    main database.
+    """
+    engine = sqlalchemy.create_engine(
+        url="sqlite://",
+        json_serializer=_dumps,
+        creator=lambda: sqlean.connect(":memory:"),
+        poolclass=StaticPool,
+    )
+    if schema := get_env_database_schema():
+        engine = engine.execution_options(schema_translate_map={schema: None})
+    Base.metadata.create_all(engine)
+    return engine
+
+
 def set_postgresql_search_path(schema: str) -> Callable[[Connection, Any], None]:
     def _(connection: Connection, _: Any) -> None:
         cursor = connection.cursor()
@@ -157,14 +259,38 @@ def set_postgresql_search_path(schema: str) -> Callable[[Connection, Any], None]
     return _
 
 
+def _get_prepared_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
 def aio_postgresql_engine(
     url: URL,
     migrate: bool = True,
     log_to_stdout: bool = False,
     log_migrations_to_stdout: bool = True,
+    pool_name: str = "primary",
 ) -> AsyncEngine:
     url_query = dict(url.query)
     sslmode = url_query.pop("sslmode", None) or url_query.pop("ssl", None)
+    connect_args: dict[str, Any] = {}
+    if (statement_cache_size := get_env_database_statement_cache_size()) is not None:
+        # The prepared statements are cached by SQLAlchemy's adapter of asyncpg rather
+        # than by asyncpg itself, whose cache is only used by its own queries.
+        # https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#prepared-statement-cache
+        url_query["prepared_statement_cache_size"] = str(statement_cache_size)
+        if not statement_cache_size:
+            # A proxy may run the statements of a connection on different server
+            # connections, e.g. PgBouncer in transaction mode, so the names of the
+            # statements that are prepared have to be unique across connections.
+            # https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#prepared-statement-name-with-pgbouncer
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = _get_prepared_statement_name
+    if enable_prometheus := get_env_enable_prometheus():
+        from phoenix.server.prometheus import PrometheusQueuePool
+
+        poolclass: type[Pool] = PrometheusQueuePool
+    else:
+        poolclass = AsyncAdaptedQueuePool
     engine = create_async_engine(
         url=url.set(
             # https://github.com/MagicStack/asyncpg/issues/737
@@ -172,7 +298,18 @@ def aio_postgresql_engine(
         ),
         echo=log_to_stdout,
         json_serializer=_dumps,
+        connect_args=connect_args,
+        poolclass=poolclass,
+        pool_size=get_env_database_pool_size(),
+        max_overflow=get_env_database_pool_max_overflow(),
+        pool_recycle=get_env_database_pool_recycle_seconds() or -1,
+        pool_pre_ping=get_env_database_pool_pre_ping(),
+        pool_logging_name=pool_name,
     )
+    if enable_prometheus:
+        from phoenix.server.prometheus import instrument_pool
+
+        instrument_pool(engine)
     if not migrate:
         return engine
     sync_engine = sqlalchemy.create_engine(
@@ -22,6 +22,7 @@ from phoenix.auth import (
 from phoenix.config import get_env_default_admin_initial_password
 from phoenix.db import models
 from phoenix.db.enums import COLUMN_ENUMS, UserRole
+from phoenix.db.promoted_attributes import ensure_promoted_span_attribute_indexes
 from phoenix.server.types import DbSessionFactory
 
 
@@ -29,8 +30,9 @@ class Facilitator:
     """
     Facilitates the creation of database records necessary for Phoenix to function. This includes
     ensuring that all enum values are present in their respective tables, ensuring that all user
-    roles are present, and ensuring that the admin user has a password hash. These tasks will be
-    carried out as callbacks at the very beginning of Starlette's lifespan process.
+    roles are present, ensuring that the admin user has a password hash, and ensuring that the
+    promoted span attributes are indexed. These tasks will be carried out as callbacks at the very
+    beginning of Starlette's lifespan process.
     """
 
     def __init__(self, *, db: DbSessionFactory) -> None:
@@ -44,6 +46,10 @@ class Facilitator:
             ):
                 async with session.begin_nested():
                     await fn(session)
+        # The indexes are created in a session of their own because on PostgreSQL they
+        # are created concurrently, which can't be done inside a transaction.
+        async with self._db() as session:
+            await ensure_promoted_span_attribute_indexes(session)
 
 
 async def _ensure_enums(session: AsyncSession) -> None:
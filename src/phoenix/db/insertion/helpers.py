@@ -1,9 +1,10 @@
 from abc import ABC
 from collections.abc import Awaitable, Callable, Iterable, Iterator, Mapping, Sequence
 from enum import Enum, auto
-from typing import Any, Optional
+from itertools import islice
+from typing import Any, Optional, TypeVar
 
-from sqlalchemy import Insert
+from sqlalchemy import Insert, text
 from sqlalchemy.dialects.postgresql import insert as insert_postgresql
 from sqlalchemy.dialects.sqlite import insert as insert_sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,6 +15,25 @@ from phoenix.db import models
 from phoenix.db.helpers import SupportedSQLDialect
 from phoenix.db.models import Base
 
+MAX_BIND_PARAMETERS = 32766
+"""
+The maximum number of parameters that can be bound to a single statement, i.e. the
+lower of the limits of asyncpg (32767) and SQLite (32766 by default). Statements that
+bind parameters per row or per element of an `IN (...)` list are split into chunks
+(see `chunks`) so that large batches stay below it.
+"""
+
+_T = TypeVar("_T")
+
+
+def chunks(items: Iterable[_T], size: int) -> Iterator[list[_T]]:
+    """
+    Splits the items into lists of at most `size` items.
+    """
+    iterator = iter(items)
+    while chunk := list(islice(iterator, max(1, size))):
+        yield chunk
+
 
 class DataManipulationEvent(ABC):
     """
@@ -74,6 +94,63 @@ def insert_on_conflict(
     assert_never(dialect)
 
 
+async def copy_on_conflict_do_nothing(
+    session: AsyncSession,
+    *records: Mapping[str, Any],
+    table: type[Base],
+    unique_by: Sequence[str],
+) -> None:
+    """
+    PostgreSQL counterpart of `insert_on_conflict` with `OnConflict.DO_NOTHING` for
+    large batches of records, which must all have the same keys.
+
+    The records are streamed with `COPY` into a temporary staging table, which is
+    then merged into the table with a single `INSERT ... SELECT ... ON CONFLICT DO
+    NOTHING`, so that no statement has to bind a parameter for every value.
+    """
+    if not records:
+        return
+    dialect = session.bind.dialect
+    assert SupportedSQLDialect(dialect.name) is SupportedSQLDialect.POSTGRESQL
+    columns = [table.__table__.c[key] for key in records[0]]
+    processors = [c.type.dialect_impl(dialect).bind_processor(dialect) for c in columns]
+    preparer = dialect.identifier_preparer
+    staging_name = f"_staging_{table.__tablename__}"
+    staging = preparer.quote(staging_name)
+    column_names = ", ".join(preparer.quote(c.name) for c in columns)
+    await session.execute(
+        text(
+            f"CREATE TEMPORARY TABLE {staging} ON COMMIT DROP AS "
+            f"SELECT {column_names} FROM {preparer.quote(table.__tablename__)} WITH NO DATA"
+        )
+    )
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    assert raw_connection.driver_connection is not None
+    await raw_connection.driver_connection.copy_records_to_table(
+        staging_name,
+        records=[
+            tuple(
+                value if processor is None else processor(value)
+                for processor, value in zip(processors, record.values())
+            )
+            for record in records
+        ],
+        columns=[c.name for c in columns],
+    )
+    constraint = "_".join(("uq", table.__tablename__, *unique_by))
+    await session.execute(
+        insert_postgresql(table)
+        .from_select(
+            [c.name for c in columns],
+            text(f"SELECT {column_names} FROM {staging}").columns(*columns),
+        )
+        .on_conflict_do_nothing(constraint=constraint)
+    )
+    # Dropped explicitly, so that the staging table can be reused in the same transaction.
+    await session.execute(text(f"DROP TABLE {staging}"))
+
+
 def _clean(
     kv: Iterable[tuple[str, KeyedColumnElement[Any]]],
 ) -> Iterator[tuple[str, KeyedColumnElement[Any]]]:
@@ -0,0 +1,135 @@
+from collections import Counter
+from datetime import datetime
+from typing import Literal, NamedTuple, Optional, TypeVar
+
+from cachetools import LRUCache
+from typing_extensions import TypeAlias
+
+from phoenix.server.dml_event import DmlEvent, ProjectDeleteEvent, SpanDeleteEvent
+
+ProjectRowId: TypeAlias = int
+_Kind: TypeAlias = Literal["project", "trace", "project_session", "blob"]
+_T = TypeVar("_T")
+
+
+class CachedTrace(NamedTuple):
+    rowid: int
+    project_rowid: ProjectRowId
+    start_time: datetime
+    end_time: datetime
+    project_session_rowid: Optional[int]
+
+
+class CachedProjectSession(NamedTuple):
+    rowid: int
+    project_rowid: ProjectRowId
+
+
+class IdentityCache:
+    """
+    Bounded LRU identity map of the rows most recently touched by span ingestion,
+    so that spans of hot projects, traces and sessions can be inserted without
+    looking those rows up in the database.
+
+    The cached start and end times of a trace are never wider than the ones in
+    the database (they only grow), so they can safely be used to skip updates.
+    Entries must be invalidated whenever the corresponding rows are deleted.
+
+    The hashes of the span attribute blobs already written are also kept, so
+    that values repeated across batches are not sent to the database again.
+    """
+
+    def __init__(self, maxsize: int = 10_000, enable_prometheus: bool = False) -> None:
+        self._projects: LRUCache[str, ProjectRowId] = LRUCache(maxsize=maxsize)
+        self._traces: LRUCache[str, CachedTrace] = LRUCache(maxsize=maxsize)
+        self._project_sessions: LRUCache[str, CachedProjectSession] = LRUCache(maxsize=maxsize)
+        self._blobs: LRUCache[str, bool] = LRUCache(maxsize=maxsize)
+        self._enable_prometheus = enable_prometheus
+        self.hits: Counter[_Kind] = Counter()
+        self.misses: Counter[_Kind] = Counter()
+
+    def get_project_rowid(self, name: str) -> Optional[ProjectRowId]:
+        return self._record("project", self._projects.get(name))
+
+    def get_trace(self, trace_id: str) -> Optional[CachedTrace]:
+        return self._record("trace", self._traces.get(trace_id))
+
+    def get_project_session(self, session_id: str) -> Optional[CachedProjectSession]:
+        return self._record("project_session", self._project_sessions.get(session_id))
+
+    def has_blob(self, blob_hash: str) -> bool:
+        return self._record("blob", self._blobs.get(blob_hash)) is not None
+
+    def put_project_rowid(self, name: str, rowid: ProjectRowId) -> None:
+        self._projects[name] = rowid
+
+    def put_trace(self, trace_id: str, trace: CachedTrace) -> None:
+        self._traces[trace_id] = trace
+
+    def put_project_session(self, session_id: str, project_session: CachedProjectSession) -> None:
+        self._project_sessions[session_id] = project_session
+
+    def put_blob(self, blob_hash: str) -> None:
+        self._blobs[blob_hash] = True
+
+    def invalidate_project(self, project_rowid: ProjectRowId, keep_project: bool = False) -> None:
+        """
+        Evicts the traces and sessions of a project, along with the project itself
+        unless `keep_project` is set, e.g. when only its spans have been cleared.
+        """
+        if not keep_project:
+            for name in [k for k, v in self._projects.items() if v == project_rowid]:
+                del self._projects[name]
+        session_rowids = set()
+        for trace_id, trace in list(self._traces.items()):
+            if trace.project_rowid == project_rowid:
+                if trace.project_session_rowid is not None:
+                    session_rowids.add(trace.project_session_rowid)
+                del self._traces[trace_id]
+        for session_id, project_session in list(self._project_sessions.items()):
+            if (
+                project_session.project_rowid == project_rowid
+                or project_session.rowid in session_rowids
+            ):
+                del self._project_sessions[session_id]
+        # Traces of other projects may belong to a deleted session.
+        for trace_id, trace in list(self._traces.items()):
+            if trace.project_session_rowid in session_rowids:
+                del self._traces[trace_id]
+
+    def clear(self) -> None:
+        self._projects.clear()
+        self._traces.clear()
+        self._project_sessions.clear()
+        self._blobs.clear()
+
+    def put(self, event: DmlEvent) -> None:
+        if isinstance(event, ProjectDeleteEvent):
+            for project_rowid in event.ids:
+                self.invalidate_project(project_rowid)
+        elif isinstance(event, SpanDeleteEvent):
+            for project_rowid in event.ids:
+                self.invalidate_project(project_rowid, keep_project=True)
+        else:
+            return
+        # The blobs of the deleted spans may be deleted too once they are unreferenced.
+        self._blobs.clear()
+
+    def _record(self, kind: _Kind, value: Optional[_T]) -> Optional[_T]:
+        if value is None:
+            self.misses[kind] += 1
+        else:
+            self.hits[kind] += 1
+        if self._enable_prometheus:
+            from phoenix.server.prometheus import (
+                BULK_LOADER_IDENTITY_CACHE_HITS,
+                BULK_LOADER_IDENTITY_CACHE_MISSES,
+            )
+
+            counter = (
+                BULK_LOADER_IDENTITY_CACHE_MISSES
+                if value is None
+                else BULK_LOADER_IDENTITY_CACHE_HITS
+            )
+            counter.labels(kind=kind).inc()
+        return value
@@ -0,0 +1,121 @@
+from typing import Optional
+
+
+class AdaptiveScheduler:
+    """
+    Tunes the number of spans inserted per transaction and the interval between
+    flushes of the bulk inserter from the measured commit latency and queue depth.
+
+    The batch size is hill-climbed: it keeps moving in the same direction for as
+    long as the commit time per span falls, and reverses when it rises, but always
+    shrinks when a single commit takes longer than `max_commit_seconds`, so that
+    transactions stay short. Only full batches are taken into account, since a
+    partial batch says nothing about the cost of the current batch size. A batch
+    that fails as a whole halves the batch size (see `observe_failure`).
+
+    The flush interval halves whenever a flush finds a backlog of at least a full
+    batch, so that bursts are drained quickly, and grows back gradually while the
+    queue stays shallow, so that light traffic is coalesced into fewer transactions.
+    Independently of the interval, a flush should be triggered as soon as the
+    buffer holds a full batch (see `should_flush`).
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int = 1000,
+        min_batch_size: int = 100,
+        max_batch_size: int = 10_000,
+        flush_interval: float = 0.1,
+        min_flush_interval: float = 0.01,
+        max_flush_interval: float = 0.25,
+        max_commit_seconds: float = 1.0,
+        step: float = 1.25,
+        tolerance: float = 0.05,
+        enable_prometheus: bool = False,
+    ) -> None:
+        assert 0 < min_batch_size <= max_batch_size
+        assert 0 <= min_flush_interval <= max_flush_interval
+        assert step > 1
+        self._min_batch_size = min_batch_size
+        self._max_batch_size = max_batch_size
+        self._min_flush_interval = min_flush_interval
+        self._max_flush_interval = max_flush_interval
+        self._max_commit_seconds = max_commit_seconds
+        self._step = step
+        self._tolerance = tolerance
+        self._enable_prometheus = enable_prometheus
+        self._batch_size = min(max(batch_size, min_batch_size), max_batch_size)
+        self._flush_interval = min(max(flush_interval, min_flush_interval), max_flush_interval)
+        self._direction = 1
+        self._last_seconds_per_item: Optional[float] = None
+        self._export_metrics()
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    @property
+    def flush_interval(self) -> float:
+        return self._flush_interval
+
+    @property
+    def max_flush_interval(self) -> float:
+        return self._max_flush_interval
+
+    def should_flush(self, num_buffered_items: int) -> bool:
+        return num_buffered_items >= self._batch_size
+
+    def observe_commit(self, num_items: int, seconds: float) -> None:
+        """
+        Records the time taken to insert and commit a batch of `num_items` spans.
+        """
+        if num_items < self._batch_size:
+            return
+        seconds_per_item = seconds / num_items
+        if seconds > self._max_commit_seconds:
+            self._direction = -1
+        elif (last := self._last_seconds_per_item) is not None and seconds_per_item > last * (
+            1 + self._tolerance
+        ):
+            self._direction = -self._direction
+        self._last_seconds_per_item = seconds_per_item
+        batch_size = (
+            self._batch_size * self._step if self._direction > 0 else self._batch_size / self._step
+        )
+        self._batch_size = min(max(round(batch_size), self._min_batch_size), self._max_batch_size)
+        if self._batch_size in (self._min_batch_size, self._max_batch_size):
+            # Probe back from the bounds, since the optimum may have moved.
+            self._direction = 1 if self._batch_size == self._min_batch_size else -1
+        self._export_metrics()
+
+    def observe_failure(self, num_items: int) -> None:
+        """
+        Records that a batch of `num_items` spans failed to be inserted as a whole,
+        e.g. because it was too large for a single transaction.
+        """
+        batch_size = min(self._batch_size, num_items) / 2
+        self._batch_size = min(max(round(batch_size), self._min_batch_size), self._max_batch_size)
+        self._direction = -1
+        self._last_seconds_per_item = None
+        self._export_metrics()
+
+    def observe_backlog(self, num_buffered_items: int) -> None:
+        """
+        Records the number of spans and evaluations found in the buffer at a flush.
+        """
+        if num_buffered_items >= self._batch_size:
+            self._flush_interval = max(self._flush_interval / 2, self._min_flush_interval)
+        else:
+            self._flush_interval = min(self._flush_interval * self._step, self._max_flush_interval)
+        self._export_metrics()
+
+    def _export_metrics(self) -> None:
+        if self._enable_prometheus:
+            from phoenix.server.prometheus import (
+                BULK_LOADER_BATCH_SIZE,
+                BULK_LOADER_FLUSH_INTERVAL,
+            )
+
+            BULK_LOADER_BATCH_SIZE.set(self._batch_size)
+            BULK_LOADER_FLUSH_INTERVAL.set(self._flush_interval)
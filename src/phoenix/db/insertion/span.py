@@ -1,22 +1,63 @@
-from dataclasses import asdict
-from typing import NamedTuple, Optional, cast
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, NamedTuple, Optional, cast
 
 from openinference.semconv.trace import SpanAttributes
-from sqlalchemy import func, insert, select, update
+from sqlalchemy import (
+    BindParameter,
+    ColumnElement,
+    Integer,
+    bindparam,
+    case,
+    column,
+    func,
+    insert,
+    select,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from typing_extensions import assert_never
 
 from phoenix.db import models
+from phoenix.db.compression import compress_attributes
 from phoenix.db.helpers import SupportedSQLDialect
-from phoenix.db.insertion.helpers import OnConflict, insert_on_conflict
+from phoenix.db.insertion.helpers import (
+    MAX_BIND_PARAMETERS,
+    DataManipulationEvent,
+    OnConflict,
+    chunks,
+    copy_on_conflict_do_nothing,
+    insert_on_conflict,
+)
+from phoenix.db.insertion.identity_cache import CachedProjectSession, CachedTrace, IdentityCache
+from phoenix.db.rollups import SpanRollups
+from phoenix.db.session_aggregates import (
+    SessionContribution,
+    add_to_session_aggregates,
+    get_session_contributions,
+)
+from phoenix.db.span_attribute_blobs import extract_blobs
+from phoenix.db.span_vectors import extract_vectors
+from phoenix.db.trace_aggregates import get_trace_aggregates
 from phoenix.trace.attributes import get_attribute_value
 from phoenix.trace.schemas import Span, SpanStatusCode
 
+MAX_SPANS_PER_STATEMENT = MAX_BIND_PARAMETERS // len(models.Span.__table__.columns)
+"""
+The number of spans that `insert_spans` can insert with a single statement.
+"""
+
 
 class SpanInsertionEvent(NamedTuple):
     project_rowid: int
 
 
-class ClearProjectSpansEvent(NamedTuple):
+@dataclass(frozen=True)
+class ClearProjectSpansEvent(DataManipulationEvent):
     project_rowid: int
 
 
@@ -24,6 +65,8 @@ async def insert_span(
     session: AsyncSession,
     span: Span,
     project_name: str,
+    compression_threshold: Optional[int] = None,
+    deduplication_threshold: Optional[int] = None,
 ) -> Optional[SpanInsertionEvent]:
     dialect = SupportedSQLDialect(session.bind.dialect.name)
     if (
@@ -40,24 +83,31 @@ async def insert_span(
     trace: models.Trace = await session.scalar(
         select(models.Trace).filter_by(trace_id=trace_id)
     ) or models.Trace(trace_id=trace_id)
+    contributions: dict[int, SessionContribution] = {}
+    if trace.project_session_rowid is not None:
+        contributions = await get_session_contributions(session, [trace.id])
 
+    rollups = SpanRollups()
     if trace.id is not None:
         # Trace record may need to be updated.
+        persisted = (trace.project_rowid, trace.start_time, trace.end_time)
         if trace.end_time < span.end_time:
             trace.end_time = span.end_time
             trace.project_rowid = project_rowid
         if span.start_time < trace.start_time:
             trace.start_time = span.start_time
+        if persisted != (trace.project_rowid, trace.start_time, trace.end_time):
+            rollups.add_trace(*persisted, count=-1)
+            rollups.add_trace(trace.project_rowid, trace.start_time, trace.end_time)
     else:
         # Trace record needs to be persisted for the first time.
         trace.start_time = span.start_time
         trace.end_time = span.end_time
         trace.project_rowid = project_rowid
         session.add(trace)
+        rollups.add_trace(project_rowid, span.start_time, span.end_time)
 
-    session_id = get_attribute_value(span.attributes, SpanAttributes.SESSION_ID)
-    session_id = str(session_id).strip() if session_id is not None else ""
-    assert isinstance(session_id, str)
+    session_id = _get_session_id(span)
 
     project_session: Optional[models.ProjectSession] = None
     if trace.project_session_rowid is not None:
@@ -100,30 +150,9 @@ async def insert_span(
     )
 
     cumulative_error_count = int(span.status_code is SpanStatusCode.ERROR)
-    try:
-        cumulative_llm_token_count_prompt = int(
-            get_attribute_value(span.attributes, SpanAttributes.LLM_TOKEN_COUNT_PROMPT) or 0
-        )
-    except BaseException:
-        cumulative_llm_token_count_prompt = 0
-    try:
-        cumulative_llm_token_count_completion = int(
-            get_attribute_value(span.attributes, SpanAttributes.LLM_TOKEN_COUNT_COMPLETION) or 0
-        )
-    except BaseException:
-        cumulative_llm_token_count_completion = 0
-    try:
-        llm_token_count_prompt = int(
-            get_attribute_value(span.attributes, SpanAttributes.LLM_TOKEN_COUNT_PROMPT) or 0
-        )
-    except BaseException:
-        llm_token_count_prompt = 0
-    try:
-        llm_token_count_completion = int(
-            get_attribute_value(span.attributes, SpanAttributes.LLM_TOKEN_COUNT_COMPLETION) or 0
-        )
-    except BaseException:
-        llm_token_count_completion = 0
+    llm_token_count_prompt, llm_token_count_completion = _get_llm_token_counts(span)
+    cumulative_llm_token_count_prompt = llm_token_count_prompt
+    cumulative_llm_token_count_completion = llm_token_count_completion
     if accumulation := (
         await session.execute(
             select(
@@ -136,20 +165,18 @@ async def insert_span(
         cumulative_error_count += cast(int, accumulation[0] or 0)
         cumulative_llm_token_count_prompt += cast(int, accumulation[1] or 0)
         cumulative_llm_token_count_completion += cast(int, accumulation[2] or 0)
+    attributes, vectors = extract_vectors(span.attributes)
+    blobs: dict[str, str] = {}
+    if deduplication_threshold:
+        attributes, blobs = extract_blobs(attributes, deduplication_threshold)
+    if compression_threshold:
+        attributes = compress_attributes(attributes, compression_threshold)
     span_rowid = await session.scalar(
         insert_on_conflict(
-            dict(
-                span_id=span.context.span_id,
+            _as_record(
+                span,
+                attributes,
                 trace_rowid=trace.id,
-                parent_id=span.parent_id,
-                span_kind=span.span_kind.value,
-                name=span.name,
-                start_time=span.start_time,
-                end_time=span.end_time,
-                attributes=span.attributes,
-                events=[asdict(event) for event in span.events],
-                status_code=span.status_code.value,
-                status_message=span.status_message,
                 cumulative_error_count=cumulative_error_count,
                 cumulative_llm_token_count_prompt=cumulative_llm_token_count_prompt,
                 cumulative_llm_token_count_completion=cumulative_llm_token_count_completion,
@@ -163,14 +190,732 @@ async def insert_span(
         ).returning(models.Span.id)
     )
     if span_rowid is None:
+        await rollups.upsert(session)
+        if project_session is not None:
+            await add_to_session_aggregates(
+                session, contributions, await get_session_contributions(session, [trace.id])
+            )
         return None
+    rollups.add(
+        trace.project_rowid,
+        span.start_time,
+        span.end_time,
+        span.span_kind.value,
+        span.parent_id is None,
+        span.status_code.value,
+        llm_token_count_prompt,
+        llm_token_count_completion,
+    )
+    await rollups.upsert(session)
+    await _add_to_trace_aggregates(
+        session,
+        {
+            trace.id: (
+                1,
+                int(span.status_code is SpanStatusCode.ERROR),
+                *_get_llm_token_counts(span),
+            )
+        },
+        {trace.id} if span.parent_id is None else set(),
+    )
+    if vectors:
+        await _insert_span_vectors(session, dialect, {span_rowid: vectors})
+    if blobs:
+        await _insert_span_attribute_blobs(session, dialect, blobs)
+        await _insert_span_attribute_blob_references(session, dialect, {span_rowid: set(blobs)})
     # Propagate cumulative values to ancestors. This is usually a no-op, since
     # the parent usually arrives after the child. But in the event that a
     # child arrives after its parent, we need to make sure that all the
     # ancestors' cumulative values are updated.
+    await _propagate_to_ancestors(
+        session,
+        span.parent_id,
+        cumulative_error_count,
+        cumulative_llm_token_count_prompt,
+        cumulative_llm_token_count_completion,
+    )
+    if project_session is not None:
+        await add_to_session_aggregates(
+            session, contributions, await get_session_contributions(session, [trace.id])
+        )
+    return SpanInsertionEvent(project_rowid)
+
+
+async def insert_spans(
+    session: AsyncSession,
+    spans: Sequence[tuple[Span, str]],
+    cache: Optional[IdentityCache] = None,
+    use_copy: bool = False,
+    compression_threshold: Optional[int] = None,
+    deduplication_threshold: Optional[int] = None,
+) -> list[SpanInsertionEvent]:
+    """
+    Set-based counterpart of `insert_span` for a whole batch of spans.
+
+    Projects, traces and project sessions are each resolved with a single
+    `IN (...)` query, or from the optional identity cache, and written with
+    multi-row statements, and all spans are inserted with one multi-row
+    `INSERT ... ON CONFLICT DO NOTHING`. The cumulative counts are computed from
+    an in-memory parent/child graph of the batch and rolled up to persisted
+    ancestors once per batch, instead of once per span. The resulting rows are
+    the same as those produced by calling `insert_span` on each span in order.
+
+    On PostgreSQL, `use_copy` loads the spans with `COPY` through a staging table
+    instead, which is considerably faster for large batches.
+
+    If `compression_threshold` is set, the large string attribute values of at least
+    that many characters are compressed (see `phoenix.db.compression`).
+
+    If `deduplication_threshold` is set, the large string attribute values of at
+    least that many characters are stored once each in the blob table and referred
+    to by hash (see `phoenix.db.span_attribute_blobs`). Blobs known to the identity
+    cache are not written again.
+    """
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    batch: dict[str, tuple[Span, str]] = {}
+    for span, project_name in spans:
+        batch.setdefault(span.context.span_id, (span, project_name))
+    for span_ids in chunks(list(batch), MAX_BIND_PARAMETERS):
+        for span_id in await session.scalars(
+            select(models.Span.span_id).where(models.Span.span_id.in_(span_ids))
+        ):
+            del batch[span_id]
+    if not batch:
+        return []
+
+    project_rowids = await _get_or_create_project_rowids(
+        session, dialect, {project_name for _, project_name in batch.values()}, cache
+    )
+    traces = await _get_traces(
+        session, {span.context.trace_id for span, _ in batch.values()}, cache
+    )
+    # Cached traces may lag behind the database, so their contributions to their
+    # sessions are looked up regardless of whether they are known to have sessions.
+    contributions = await get_session_contributions(
+        session, (trace.rowid for trace in traces.values() if trace.rowid is not None)
+    )
+    # As in `insert_span`, the session_id on a span is only considered when its trace
+    # is not yet associated with a ProjectSession, so the first one seen wins.
+    session_ids: dict[str, str] = {}
+    for span, project_name in batch.values():
+        project_rowid = project_rowids[project_name]
+        trace_id = span.context.trace_id
+        if (trace := traces.get(trace_id)) is None:
+            traces[trace_id] = trace = _Trace(
+                trace_id=trace_id,
+                project_rowid=project_rowid,
+                start_time=span.start_time,
+                end_time=span.end_time,
+            )
+        else:
+            if trace.end_time < span.end_time:
+                trace.end_time = span.end_time
+                trace.project_rowid = project_rowid
+            if span.start_time < trace.start_time:
+                trace.start_time = span.start_time
+        if (
+            trace.project_session_rowid is None
+            and trace_id not in session_ids
+            and (session_id := _get_session_id(span))
+        ):
+            session_ids[trace_id] = session_id
+
+    # A ProjectSession only needs to be written if one of its traces is new, has
+    # grown, or has just joined it, since it always spans all of its traces.
+    session_rowids = await _get_project_session_rowids(session, set(session_ids.values()), cache)
+    new_project_sessions: dict[str, dict[str, Any]] = {}
+    session_time_ranges: dict[int, tuple[datetime, datetime]] = {}
+    for trace_id, trace in traces.items():
+        if trace.project_session_rowid is None and trace_id in session_ids:
+            session_id = session_ids[trace_id]
+            if (session_rowid := session_rowids.get(session_id)) is None:
+                if (record := new_project_sessions.get(session_id)) is None:
+                    new_project_sessions[session_id] = dict(
+                        session_id=session_id,
+                        project_id=trace.project_rowid,
+                        start_time=trace.start_time,
+                        end_time=trace.end_time,
+                    )
+                else:
+                    record["start_time"] = min(record["start_time"], trace.start_time)
+                    record["end_time"] = max(record["end_time"], trace.end_time)
+                continue
+            trace.project_session_rowid = session_rowid
+        elif trace.project_session_rowid is None or not trace.dirty:
+            continue
+        start_time, end_time = session_time_ranges.get(
+            trace.project_session_rowid, (trace.start_time, trace.end_time)
+        )
+        session_time_ranges[trace.project_session_rowid] = (
+            min(start_time, trace.start_time),
+            max(end_time, trace.end_time),
+        )
+    if new_project_sessions:
+        for chunk in _chunks_of_records(list(new_project_sessions.values())):
+            await session.execute(
+                insert_on_conflict(
+                    *chunk,
+                    dialect=dialect,
+                    table=models.ProjectSession,
+                    unique_by=("session_id",),
+                    on_conflict=OnConflict.DO_NOTHING,
+                )
+            )
+        session_rowids.update(
+            await _get_project_session_rowids(session, set(new_project_sessions), cache)
+        )
+        for trace_id, session_id in session_ids.items():
+            if (trace := traces[trace_id]).project_session_rowid is None:
+                trace.project_session_rowid = session_rowids[session_id]
+    if session_time_ranges:
+        connection = await session.connection()
+        await connection.execute(
+            update(models.ProjectSession)
+            .where(models.ProjectSession.id == bindparam("_id"))
+            .values(
+                start_time=_least(models.ProjectSession.start_time, "_start_time"),
+                end_time=_greatest(models.ProjectSession.end_time, "_end_time"),
+            ),
+            [
+                dict(_id=session_rowid, _start_time=start_time, _end_time=end_time)
+                for session_rowid, (start_time, end_time) in session_time_ranges.items()
+            ],
+        )
+
+    if new_traces := [trace for trace in traces.values() if trace.rowid is None]:
+        trace_records = [
+            dict(
+                trace_id=trace.trace_id,
+                project_rowid=trace.project_rowid,
+                project_session_rowid=trace.project_session_rowid,
+                start_time=trace.start_time,
+                end_time=trace.end_time,
+            )
+            for trace in new_traces
+        ]
+        for chunk in _chunks_of_records(trace_records):
+            await session.execute(
+                insert_on_conflict(
+                    *chunk,
+                    dialect=dialect,
+                    table=models.Trace,
+                    unique_by=("trace_id",),
+                    on_conflict=OnConflict.DO_NOTHING,
+                )
+            )
+        for trace_ids in chunks((trace.trace_id for trace in new_traces), MAX_BIND_PARAMETERS):
+            async for trace_id, trace_rowid in await session.stream(
+                select(models.Trace.trace_id, models.Trace.id).where(
+                    models.Trace.trace_id.in_(trace_ids)
+                )
+            ):
+                traces[trace_id].rowid = trace_rowid
+    if dirty_traces := [
+        trace for trace in traces.values() if trace.persisted is not None and trace.dirty
+    ]:
+        # The updates are monotonic, so they are correct even if the
+        # cached time range of a trace lags behind the database.
+        connection = await session.connection()
+        await connection.execute(
+            update(models.Trace)
+            .where(models.Trace.id == bindparam("_id"))
+            .values(
+                project_rowid=case(
+                    (
+                        models.Trace.end_time
+                        < bindparam("_end_time", type_=models.Trace.end_time.type),
+                        bindparam("_project_rowid"),
+                    ),
+                    else_=models.Trace.project_rowid,
+                ),
+                start_time=_least(models.Trace.start_time, "_start_time"),
+                end_time=_greatest(models.Trace.end_time, "_end_time"),
+                project_session_rowid=func.coalesce(
+                    models.Trace.project_session_rowid, bindparam("_project_session_rowid")
+                ),
+            ),
+            [
+                dict(
+                    _id=trace.rowid,
+                    _project_rowid=trace.project_rowid,
+                    _start_time=trace.start_time,
+                    _end_time=trace.end_time,
+                    _project_session_rowid=trace.project_session_rowid,
+                )
+                for trace in dirty_traces
+            ],
+        )
+    if cache is not None:
+        for trace in traces.values():
+            assert trace.rowid is not None
+            cache.put_trace(
+                trace.trace_id,
+                CachedTrace(
+                    trace.rowid,
+                    trace.project_rowid,
+                    trace.start_time,
+                    trace.end_time,
+                    trace.project_session_rowid,
+                ),
+            )
+
+    counts = {span_id: _get_cumulative_counts(span) for span_id, (span, _) in batch.items()}
+    for span_ids in chunks(list(batch), MAX_BIND_PARAMETERS):
+        async for parent_id, *child_counts in await session.stream(
+            select(
+                models.Span.parent_id,
+                func.sum(models.Span.cumulative_error_count),
+                func.sum(models.Span.cumulative_llm_token_count_prompt),
+                func.sum(models.Span.cumulative_llm_token_count_completion),
+            )
+            .where(models.Span.parent_id.in_(span_ids))
+            .group_by(models.Span.parent_id)
+        ):
+            counts[parent_id] = _add_counts(counts[parent_id], child_counts)
+    cumulative_counts = dict(counts)
+    ancestor_deltas: defaultdict[str, tuple[int, int, int]] = defaultdict(lambda: (0, 0, 0))
+    for span_id, (span, _) in batch.items():
+        # Walk up the in-batch ancestors; whatever is left over at the top of the
+        # batch needs to be propagated to ancestors that are already persisted.
+        seen = {span_id}
+        parent_id = span.parent_id
+        while parent_id is not None and parent_id in batch and parent_id not in seen:
+            seen.add(parent_id)
+            cumulative_counts[parent_id] = _add_counts(
+                cumulative_counts[parent_id], counts[span_id]
+            )
+            parent_id = batch[parent_id][0].parent_id
+        if parent_id is not None and parent_id not in seen:
+            ancestor_deltas[parent_id] = _add_counts(ancestor_deltas[parent_id], counts[span_id])
+
+    records = []
+    span_vectors: dict[str, dict[str, bytes]] = {}
+    blobs: dict[str, str] = {}
+    span_blob_hashes: dict[str, set[str]] = {}
+    rollups = SpanRollups()
+    trace_counts: defaultdict[int, tuple[int, int, int, int]] = defaultdict(lambda: (0, 0, 0, 0))
+    root_trace_rowids: set[int] = set()
+    for trace in traces.values():
+        if (persisted := trace.persisted) is None:
+            rollups.add_trace(trace.project_rowid, trace.start_time, trace.end_time)
+        elif (trace.project_rowid, trace.start_time, trace.end_time) != (
+            persisted.project_rowid,
+            persisted.start_time,
+            persisted.end_time,
+        ):
+            rollups.add_trace(
+                persisted.project_rowid, persisted.start_time, persisted.end_time, count=-1
+            )
+            rollups.add_trace(trace.project_rowid, trace.start_time, trace.end_time)
+    for span_id, (span, _) in batch.items():
+        llm_token_count_prompt, llm_token_count_completion = _get_llm_token_counts(span)
+        trace_rowid = traces[span.context.trace_id].rowid
+        assert trace_rowid is not None
+        num_spans, num_error_spans, prompt, completion = trace_counts[trace_rowid]
+        trace_counts[trace_rowid] = (
+            num_spans + 1,
+            num_error_spans + int(span.status_code is SpanStatusCode.ERROR),
+            prompt + llm_token_count_prompt,
+            completion + llm_token_count_completion,
+        )
+        if span.parent_id is None:
+            root_trace_rowids.add(trace_rowid)
+        rollups.add(
+            traces[span.context.trace_id].project_rowid,
+            span.start_time,
+            span.end_time,
+            span.span_kind.value,
+            span.parent_id is None,
+            span.status_code.value,
+            llm_token_count_prompt,
+            llm_token_count_completion,
+        )
+        cumulative_error_count, cumulative_prompt, cumulative_completion = cumulative_counts[
+            span_id
+        ]
+        attributes, vectors = extract_vectors(span.attributes)
+        if deduplication_threshold:
+            attributes, span_blobs = extract_blobs(attributes, deduplication_threshold)
+            blobs.update(span_blobs)
+            if span_blobs:
+                span_blob_hashes[span_id] = set(span_blobs)
+        if compression_threshold:
+            attributes = compress_attributes(attributes, compression_threshold)
+        if vectors:
+            span_vectors[span_id] = vectors
+        records.append(
+            _as_record(
+                span,
+                attributes,
+                trace_rowid=trace_rowid,
+                cumulative_error_count=cumulative_error_count,
+                cumulative_llm_token_count_prompt=cumulative_prompt,
+                cumulative_llm_token_count_completion=cumulative_completion,
+                llm_token_count_prompt=llm_token_count_prompt,
+                llm_token_count_completion=llm_token_count_completion,
+            )
+        )
+    if use_copy and dialect is SupportedSQLDialect.POSTGRESQL:
+        await copy_on_conflict_do_nothing(
+            session,
+            *records,
+            table=models.Span,
+            unique_by=("span_id",),
+        )
+    else:
+        for chunk in _chunks_of_records(records):
+            await session.execute(
+                insert_on_conflict(
+                    *chunk,
+                    dialect=dialect,
+                    table=models.Span,
+                    unique_by=("span_id",),
+                    on_conflict=OnConflict.DO_NOTHING,
+                )
+            )
+    span_rowids: dict[int, str] = {}
+    for span_ids in chunks(
+        list(span_vectors.keys() | span_blob_hashes.keys()), MAX_BIND_PARAMETERS
+    ):
+        span_rowids.update(
+            (
+                await session.execute(
+                    select(models.Span.id, models.Span.span_id).where(
+                        models.Span.span_id.in_(span_ids)
+                    )
+                )
+            )
+            .tuples()
+            .all()
+        )
+    if span_vectors:
+        await _insert_span_vectors(
+            session,
+            dialect,
+            {
+                span_rowid: span_vectors[span_id]
+                for span_rowid, span_id in span_rowids.items()
+                if span_id in span_vectors
+            },
+        )
+    if cache is not None:
+        blobs = {
+            blob_hash: value for blob_hash, value in blobs.items() if not cache.has_blob(blob_hash)
+        }
+    if blobs:
+        await _insert_span_attribute_blobs(session, dialect, blobs)
+        if cache is not None:
+            for blob_hash in blobs:
+                cache.put_blob(blob_hash)
+    if span_blob_hashes:
+        await _insert_span_attribute_blob_references(
+            session,
+            dialect,
+            {
+                span_rowid: span_blob_hashes[span_id]
+                for span_rowid, span_id in span_rowids.items()
+                if span_id in span_blob_hashes
+            },
+        )
+    await roll_up_cumulative_counts(session, ancestor_deltas)
+    await rollups.upsert(session)
+    await _add_to_trace_aggregates(session, trace_counts, root_trace_rowids)
+    await add_to_session_aggregates(
+        session,
+        contributions,
+        await get_session_contributions(
+            session, (trace.rowid for trace in traces.values() if trace.rowid is not None)
+        ),
+    )
+    return [
+        SpanInsertionEvent(project_rowid)
+        for project_rowid in {project_rowids[project_name] for _, project_name in batch.values()}
+    ]
+
+
+async def roll_up_cumulative_counts(
+    session: AsyncSession,
+    deltas: Mapping[str, tuple[int, int, int]],
+) -> None:
+    """
+    Adds cumulative error and LLM token count deltas to persisted spans and all
+    of their persisted ancestors.
+
+    The deltas are keyed by the span_id of the nearest persisted ancestor of a
+    newly inserted subtree. The ancestor chains of all keys are resolved with a
+    single recursive query, the deltas are summed once per affected ancestor in
+    memory, and the totals are applied with a single bulk `UPDATE`, so a batch
+    of spans costs O(1) statements regardless of trace depth (short of splitting
+    statements that would bind too many parameters, see `MAX_BIND_PARAMETERS`).
+    """
+    if not (deltas := {k: v for k, v in deltas.items() if any(v)}):
+        return
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    totals: defaultdict[int, tuple[int, int, int]] = defaultdict(lambda: (0, 0, 0))
+    for span_ids in chunks(list(deltas), MAX_BIND_PARAMETERS):
+        ancestors = (
+            select(
+                models.Span.span_id.label("origin"),
+                models.Span.id,
+                models.Span.parent_id,
+            )
+            .where(models.Span.span_id.in_(span_ids))
+            .cte(recursive=True)
+        )
+        child = ancestors.alias()
+        ancestors = ancestors.union_all(
+            select(child.c.origin, models.Span.id, models.Span.parent_id).join(
+                child, models.Span.span_id == child.c.parent_id
+            )
+        )
+        async for origin, span_rowid in await session.stream(
+            select(ancestors.c.origin, ancestors.c.id)
+        ):
+            totals[span_rowid] = _add_counts(totals[span_rowid], deltas[origin])
+    if not totals:
+        return
+    if dialect is SupportedSQLDialect.POSTGRESQL:
+        for chunk in chunks(totals.items(), MAX_BIND_PARAMETERS // 4):
+            totals_ = values(
+                column("id", Integer),
+                column("cumulative_error_count", Integer),
+                column("cumulative_llm_token_count_prompt", Integer),
+                column("cumulative_llm_token_count_completion", Integer),
+                name="totals",
+            ).data([(span_rowid, *counts) for span_rowid, counts in chunk])
+            await session.execute(
+                update(models.Span)
+                .where(models.Span.id == totals_.c.id)
+                .values(
+                    cumulative_error_count=models.Span.cumulative_error_count
+                    + totals_.c.cumulative_error_count,
+                    cumulative_llm_token_count_prompt=models.Span.cumulative_llm_token_count_prompt
+                    + totals_.c.cumulative_llm_token_count_prompt,
+                    cumulative_llm_token_count_completion=models.Span.cumulative_llm_token_count_completion
+                    + totals_.c.cumulative_llm_token_count_completion,
+                )
+                .execution_options(synchronize_session=False)
+            )
+    elif dialect is SupportedSQLDialect.SQLITE:
+        # SQLite cannot alias the columns of a VALUES clause in a FROM clause, but
+        # since it runs in-process a prepared executemany is just as cheap. The
+        # statement goes through the connection to bypass ORM bulk UPDATE semantics.
+        connection = await session.connection()
+        await connection.execute(
+            update(models.Span)
+            .where(models.Span.id == bindparam("_id"))
+            .values(
+                cumulative_error_count=models.Span.cumulative_error_count + bindparam("_error"),
+                cumulative_llm_token_count_prompt=models.Span.cumulative_llm_token_count_prompt
+                + bindparam("_prompt"),
+                cumulative_llm_token_count_completion=models.Span.cumulative_llm_token_count_completion
+                + bindparam("_completion"),
+            ),
+            [
+                dict(_id=span_rowid, _error=error, _prompt=prompt, _completion=completion)
+                for span_rowid, (error, prompt, completion) in totals.items()
+            ],
+        )
+    else:
+        assert_never(dialect)
+
+
+@dataclass
+class _Trace:
+    trace_id: str
+    project_rowid: int
+    start_time: datetime
+    end_time: datetime
+    project_session_rowid: Optional[int] = None
+    rowid: Optional[int] = None
+    persisted: Optional[CachedTrace] = None
+
+    @property
+    def dirty(self) -> bool:
+        return (
+            (persisted := self.persisted) is None
+            or self.start_time < persisted.start_time
+            or persisted.end_time < self.end_time
+            or self.project_session_rowid != persisted.project_session_rowid
+        )
+
+
+async def _get_or_create_project_rowids(
+    session: AsyncSession,
+    dialect: SupportedSQLDialect,
+    project_names: set[str],
+    cache: Optional[IdentityCache] = None,
+) -> dict[str, int]:
+    project_rowids: dict[str, int] = {}
+    if cache is not None:
+        for project_name in project_names:
+            if (project_rowid := cache.get_project_rowid(project_name)) is not None:
+                project_rowids[project_name] = project_rowid
+    if missing := project_names.difference(project_rowids):
+        stmt = select(models.Project.name, models.Project.id).where(
+            models.Project.name.in_(missing)
+        )
+        project_rowids.update((await session.execute(stmt)).tuples().all())
+        if missing := project_names.difference(project_rowids):
+            await session.execute(
+                insert_on_conflict(
+                    *(dict(name=project_name) for project_name in sorted(missing)),
+                    dialect=dialect,
+                    table=models.Project,
+                    unique_by=("name",),
+                    on_conflict=OnConflict.DO_NOTHING,
+                )
+            )
+            project_rowids.update((await session.execute(stmt)).tuples().all())
+        if cache is not None:
+            for project_name, project_rowid in project_rowids.items():
+                cache.put_project_rowid(project_name, project_rowid)
+    return project_rowids
+
+
+async def _get_traces(
+    session: AsyncSession,
+    trace_ids: set[str],
+    cache: Optional[IdentityCache] = None,
+) -> dict[str, _Trace]:
+    traces: dict[str, _Trace] = {}
+    if cache is not None:
+        for trace_id in trace_ids:
+            if (cached := cache.get_trace(trace_id)) is not None:
+                traces[trace_id] = _Trace(
+                    trace_id=trace_id,
+                    project_rowid=cached.project_rowid,
+                    start_time=cached.start_time,
+                    end_time=cached.end_time,
+                    project_session_rowid=cached.project_session_rowid,
+                    rowid=cached.rowid,
+                    persisted=cached,
+                )
+    for missing in chunks(trace_ids.difference(traces), MAX_BIND_PARAMETERS):
+        async for trace in await session.stream(
+            select(
+                models.Trace.trace_id,
+                models.Trace.id,
+                models.Trace.project_rowid,
+                models.Trace.start_time,
+                models.Trace.end_time,
+                models.Trace.project_session_rowid,
+            ).where(models.Trace.trace_id.in_(missing))
+        ):
+            persisted = CachedTrace(
+                trace.id,
+                trace.project_rowid,
+                trace.start_time,
+                trace.end_time,
+                trace.project_session_rowid,
+            )
+            traces[trace.trace_id] = _Trace(
+                trace_id=trace.trace_id,
+                project_rowid=trace.project_rowid,
+                start_time=trace.start_time,
+                end_time=trace.end_time,
+                project_session_rowid=trace.project_session_rowid,
+                rowid=trace.id,
+                persisted=persisted,
+            )
+    return traces
+
+
+async def _get_project_session_rowids(
+    session: AsyncSession,
+    session_ids: set[str],
+    cache: Optional[IdentityCache] = None,
+) -> dict[str, int]:
+    session_rowids: dict[str, int] = {}
+    if cache is not None:
+        for session_id in session_ids:
+            if (cached := cache.get_project_session(session_id)) is not None:
+                session_rowids[session_id] = cached.rowid
+    for missing in chunks(session_ids.difference(session_rowids), MAX_BIND_PARAMETERS):
+        async for session_id, new_session_rowid, project_rowid in await session.stream(
+            select(
+                models.ProjectSession.session_id,
+                models.ProjectSession.id,
+                models.ProjectSession.project_id,
+            ).where(models.ProjectSession.session_id.in_(missing))
+        ):
+            session_rowids[session_id] = new_session_rowid
+            if cache is not None:
+                cache.put_project_session(
+                    session_id, CachedProjectSession(new_session_rowid, project_rowid)
+                )
+    return session_rowids
+
+
+def _least(column: InstrumentedAttribute[datetime], key: str) -> ColumnElement[datetime]:
+    value: BindParameter[datetime] = bindparam(key, type_=column.type)
+    return case((value < column, value), else_=column)
+
+
+def _greatest(column: InstrumentedAttribute[datetime], key: str) -> ColumnElement[datetime]:
+    value: BindParameter[datetime] = bindparam(key, type_=column.type)
+    return case((column < value, value), else_=column)
+
+
+async def _add_to_trace_aggregates(
+    session: AsyncSession,
+    trace_counts: Mapping[int, tuple[int, int, int, int]],
+    root_trace_rowids: set[int],
+) -> None:
+    """
+    Adds the numbers of spans and error spans and the prompt and completion token
+    counts of newly inserted spans, by trace rowid, to the aggregates of their traces,
+    and sets the root spans of the traces that had none if a root span was inserted.
+    """
+    connection = await session.connection()
+    if trace_counts:
+        await connection.execute(
+            update(models.Trace)
+            .where(models.Trace.id == bindparam("_id"))
+            .values(
+                num_spans=models.Trace.num_spans + bindparam("_num_spans"),
+                num_error_spans=models.Trace.num_error_spans + bindparam("_num_error_spans"),
+                llm_token_count_prompt=models.Trace.llm_token_count_prompt + bindparam("_prompt"),
+                llm_token_count_completion=models.Trace.llm_token_count_completion
+                + bindparam("_completion"),
+            ),
+            [
+                dict(
+                    _id=trace_rowid,
+                    _num_spans=num_spans,
+                    _num_error_spans=num_error_spans,
+                    _prompt=prompt,
+                    _completion=completion,
+                )
+                for trace_rowid, (
+                    num_spans,
+                    num_error_spans,
+                    prompt,
+                    completion,
+                ) in trace_counts.items()
+            ],
+        )
+    for trace_rowids in chunks(root_trace_rowids, MAX_BIND_PARAMETERS):
+        await connection.execute(
+            update(models.Trace)
+            .where(models.Trace.id.in_(trace_rowids))
+            .where(models.Trace.root_span_rowid.is_(None))
+            .values(root_span_rowid=get_trace_aggregates()["root_span_rowid"])
+        )
+
+
+async def _propagate_to_ancestors(
+    session: AsyncSession,
+    parent_id: Optional[str],
+    cumulative_error_count: int,
+    cumulative_llm_token_count_prompt: int,
+    cumulative_llm_token_count_completion: int,
+) -> None:
+    if parent_id is None:
+        return
     ancestors = (
         select(models.Span.id, models.Span.parent_id)
-        .where(models.Span.span_id == span.parent_id)
+        .where(models.Span.span_id == parent_id)
         .cte(recursive=True)
     )
     child = ancestors.alias()
@@ -190,4 +935,127 @@ async def insert_span(
             + cumulative_llm_token_count_completion,
         )
     )
-    return SpanInsertionEvent(project_rowid)
+
+
+async def _insert_span_vectors(
+    session: AsyncSession,
+    dialect: SupportedSQLDialect,
+    span_vectors: Mapping[int, Mapping[str, bytes]],
+) -> None:
+    records = [
+        dict(span_rowid=span_rowid, path=path, vector=vector)
+        for span_rowid, vectors in span_vectors.items()
+        for path, vector in vectors.items()
+    ]
+    for chunk in _chunks_of_records(records):
+        await session.execute(
+            insert_on_conflict(
+                *chunk,
+                dialect=dialect,
+                table=models.SpanVector,
+                unique_by=("span_rowid", "path"),
+                on_conflict=OnConflict.DO_NOTHING,
+            )
+        )
+
+
+async def _insert_span_attribute_blobs(
+    session: AsyncSession,
+    dialect: SupportedSQLDialect,
+    blobs: Mapping[str, str],
+) -> None:
+    records = [dict(hash=blob_hash, value=value) for blob_hash, value in blobs.items()]
+    for chunk in _chunks_of_records(records):
+        await session.execute(
+            insert_on_conflict(
+                *chunk,
+                dialect=dialect,
+                table=models.SpanAttributeBlob,
+                unique_by=("hash",),
+                on_conflict=OnConflict.DO_NOTHING,
+            )
+        )
+
+
+async def _insert_span_attribute_blob_references(
+    session: AsyncSession,
+    dialect: SupportedSQLDialect,
+    blob_hashes: Mapping[int, Iterable[str]],
+) -> None:
+    records = [
+        dict(span_rowid=span_rowid, blob_hash=blob_hash)
+        for span_rowid, hashes in blob_hashes.items()
+        for blob_hash in hashes
+    ]
+    for chunk in _chunks_of_records(records):
+        await session.execute(
+            insert_on_conflict(
+                *chunk,
+                dialect=dialect,
+                table=models.SpanAttributeBlobReference,
+                unique_by=("span_rowid", "blob_hash"),
+                on_conflict=OnConflict.DO_NOTHING,
+            )
+        )
+
+
+def _chunks_of_records(records: Sequence[Mapping[str, Any]]) -> Iterator[list[Mapping[str, Any]]]:
+    """
+    Splits the records of a multi-row INSERT, which all have the same keys, so that
+    each statement binds at most `MAX_BIND_PARAMETERS` parameters.
+    """
+    if not records:
+        return iter(())
+    return chunks(records, MAX_BIND_PARAMETERS // len(records[0]))
+
+
+def _as_record(span: Span, attributes: Mapping[str, Any], **kwargs: Any) -> dict[str, Any]:
+    return dict(
+        span_id=span.context.span_id,
+        parent_id=span.parent_id,
+        span_kind=span.span_kind.value,
+        name=span.name,
+        start_time=span.start_time,
+        end_time=span.end_time,
+        attributes=attributes,
+        events=[asdict(event) for event in span.events],
+        status_code=span.status_code.value,
+        status_message=span.status_message,
+        **kwargs,
+    )
+
+
+def _get_session_id(span: Span) -> str:
+    session_id = get_attribute_value(span.attributes, SpanAttributes.SESSION_ID)
+    return str(session_id).strip() if session_id is not None else ""
+
+
+def _get_llm_token_counts(span: Span) -> tuple[int, int]:
+    try:
+        llm_token_count_prompt = int(
+            get_attribute_value(span.attributes, SpanAttributes.LLM_TOKEN_COUNT_PROMPT) or 0
+        )
+    except BaseException:
+        llm_token_count_prompt = 0
+    try:
+        llm_token_count_completion = int(
+            get_attribute_value(span.attributes, SpanAttributes.LLM_TOKEN_COUNT_COMPLETION) or 0
+        )
+    except BaseException:
+        llm_token_count_completion = 0
+    return llm_token_count_prompt, llm_token_count_completion
+
+
+def _get_cumulative_counts(span: Span) -> tuple[int, int, int]:
+    return (int(span.status_code is SpanStatusCode.ERROR), *_get_llm_token_counts(span))
+
+
+def _add_counts(
+    counts: tuple[int, int, int],
+    other: Sequence[Optional[int]],
+) -> tuple[int, int, int]:
+    return (
+        counts[0] + int(other[0] or 0),
+        counts[1] + int(other[1] or 0),
+        counts[2] + int(other[2] or 0),
+    )
@@ -0,0 +1,240 @@
+import logging
+import os
+import struct
+import zlib
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Sequence
+from enum import IntEnum
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from openinference.semconv.resource import ResourceAttributes
+from opentelemetry.proto.common.v1.common_pb2 import AnyValue, KeyValue
+from opentelemetry.proto.resource.v1.resource_pb2 import Resource
+from opentelemetry.proto.trace.v1.trace_pb2 import ResourceSpans, ScopeSpans
+from typing_extensions import TypeAlias
+
+import phoenix.trace.v1 as pb
+from phoenix.trace.otel import decode_otlp_spans, encode_span_to_otlp
+from phoenix.trace.schemas import Span
+
+logger = logging.getLogger(__name__)
+
+ProjectName: TypeAlias = str
+
+_HEADER = struct.Struct(">BII")  # kind, length, crc32
+_SEGMENT_SUFFIX = ".log"
+_CHECKPOINT = "checkpoint"
+_DEAD_LETTERS = "dead_letters"
+
+
+class RecordKind(IntEnum):
+    RESOURCE_SPANS = 1
+    EVALUATION = 2
+
+
+class Record(NamedTuple):
+    kind: RecordKind
+    payload: bytes
+
+
+class SpoolPosition(NamedTuple):
+    segment: int
+    offset: int
+
+
+class Spool:
+    """
+    Append-only, segment-rotated write-ahead log of the spans and evaluations
+    waiting to be inserted into the database.
+
+    Records are length-prefixed and checksummed serialized OTLP `ResourceSpans`
+    (one per project in a batch of spans) or `pb.Evaluation` messages. Appends
+    are written through to the operating system immediately, so they survive a
+    crash of the process, whereas `sync` flushes them to disk in batches. Once
+    the records up to a position have been inserted, `commit` checkpoints that
+    position and deletes the segments before it. On `open`, records after the
+    last checkpoint are replayed. Records that can't be inserted are moved to a
+    separate log of dead letters by `dead_letter`, which is never replayed.
+    """
+
+    def __init__(self, directory: Path, max_segment_bytes: int = 64 * 1024 * 1024) -> None:
+        self._directory = directory
+        self._max_segment_bytes = max_segment_bytes
+        self._fd: Optional[int] = None
+        self._segment = 0
+        self._offset = 0
+        self._dirty = False
+
+    @property
+    def position(self) -> SpoolPosition:
+        return SpoolPosition(self._segment, self._offset)
+
+    def open(self) -> tuple[list[tuple[Span, ProjectName]], list[pb.Evaluation]]:
+        """
+        Returns the spans and evaluations that were appended but not committed
+        before the spool was last closed, and starts a new segment for appends.
+        """
+        self._directory.mkdir(parents=True, exist_ok=True)
+        checkpoint = self._read_checkpoint()
+        spans: list[tuple[Span, ProjectName]] = []
+        evaluations: list[pb.Evaluation] = []
+        segments = self._segments()
+        for segment in segments:
+            if segment < checkpoint.segment:
+                continue
+            offset = checkpoint.offset if segment == checkpoint.segment else 0
+            for record in _read_records(self._path(segment), offset):
+                if record.kind is RecordKind.RESOURCE_SPANS:
+                    resource_spans = ResourceSpans()
+                    resource_spans.ParseFromString(record.payload)
+                    spans.extend(decode_otlp_spans([resource_spans]))
+                elif record.kind is RecordKind.EVALUATION:
+                    evaluation = pb.Evaluation()
+                    evaluation.ParseFromString(record.payload)
+                    evaluations.append(evaluation)
+        if spans or evaluations:
+            logger.info(
+                f"Replaying {len(spans)} spans and {len(evaluations)} evaluations "
+                f"from the ingestion spool at {self._directory}"
+            )
+        self._open_segment(max(segments, default=checkpoint.segment) + 1)
+        return spans, evaluations
+
+    def append(self, records: Iterable[Record]) -> None:
+        if self._fd is None:
+            raise RuntimeError("Spool is not open")
+        data = _encode_records(records)
+        if not data:
+            return
+        if self._offset and self._offset + len(data) > self._max_segment_bytes:
+            self._sync()
+            self._open_segment(self._segment + 1)
+        os.write(self._fd, data)
+        self._offset += len(data)
+        self._dirty = True
+
+    def sync(self) -> SpoolPosition:
+        """
+        Flushes the appended records to disk, and returns the position after them.
+        """
+        self._sync()
+        return self.position
+
+    def commit(self, position: SpoolPosition) -> None:
+        """
+        Records that everything before `position` has been inserted into the database.
+        """
+        path = self._directory / _CHECKPOINT
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(f"{position.segment} {position.offset}")
+        os.replace(tmp, path)
+        for segment in self._segments():
+            if segment < position.segment:
+                self._path(segment).unlink(missing_ok=True)
+
+    def dead_letter(self, records: Iterable[Record]) -> Path:
+        """
+        Appends records that can't be inserted to the log of dead letters, where
+        they are kept for inspection, and returns the path of the log.
+        """
+        path = self._directory / f"{_DEAD_LETTERS}{_SEGMENT_SUFFIX}"
+        data = _encode_records(records)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        try:
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        return path
+
+    def close(self) -> None:
+        if self._fd is None:
+            return
+        self._sync()
+        os.close(self._fd)
+        self._fd = None
+
+    def _sync(self) -> None:
+        if self._fd is not None and self._dirty:
+            os.fsync(self._fd)
+            self._dirty = False
+
+    def _open_segment(self, segment: int) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(self._path(segment), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        self._segment, self._offset = segment, 0
+
+    def _path(self, segment: int) -> Path:
+        return self._directory / f"{segment:020d}{_SEGMENT_SUFFIX}"
+
+    def _segments(self) -> list[int]:
+        return sorted(
+            int(path.stem)
+            for path in self._directory.glob(f"*{_SEGMENT_SUFFIX}")
+            if path.stem.isdigit()
+        )
+
+    def _read_checkpoint(self) -> SpoolPosition:
+        try:
+            segment, offset = (self._directory / _CHECKPOINT).read_text().split()
+            return SpoolPosition(int(segment), int(offset))
+        except FileNotFoundError:
+            return SpoolPosition(0, 0)
+
+
+def encode_spans(spans: Sequence[tuple[Span, ProjectName]]) -> list[Record]:
+    """
+    Encodes a batch of spans as one `ResourceSpans` record per project.
+    """
+    spans_by_project: defaultdict[ProjectName, list[Span]] = defaultdict(list)
+    for span, project_name in spans:
+        spans_by_project[project_name].append(span)
+    return [
+        Record(
+            RecordKind.RESOURCE_SPANS,
+            ResourceSpans(
+                resource=Resource(
+                    attributes=[
+                        KeyValue(
+                            key=ResourceAttributes.PROJECT_NAME,
+                            value=AnyValue(string_value=project_name),
+                        )
+                    ]
+                ),
+                scope_spans=[ScopeSpans(spans=[encode_span_to_otlp(s) for s in project_spans])],
+            ).SerializeToString(),
+        )
+        for project_name, project_spans in spans_by_project.items()
+    ]
+
+
+def encode_evaluation(evaluation: pb.Evaluation) -> Record:
+    return Record(RecordKind.EVALUATION, evaluation.SerializeToString())
+
+
+def _encode_records(records: Iterable[Record]) -> bytes:
+    return b"".join(
+        _HEADER.pack(kind, len(payload), zlib.crc32(payload)) + payload for kind, payload in records
+    )
+
+
+def _read_records(path: Path, offset: int) -> Iterator[Record]:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while header := f.read(_HEADER.size):
+            if len(header) < _HEADER.size:
+                break
+            kind, length, crc = _HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            try:
+                record_kind = RecordKind(kind)
+            except ValueError:
+                break
+            yield Record(record_kind, payload)
+        else:
+            return
+    logger.warning(f"Ignoring torn record at the end of ingestion spool segment {path}")
@@ -0,0 +1,120 @@
+"""
+Mergeable sketches of latencies, from which quantiles are estimated with a bounded
+relative error, in the manner of DDSketch (https://arxiv.org/abs/1908.10693).
+
+A positive latency `x` falls into the bin of index `ceil(log(x) / log(gamma))`,
+where `gamma = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)`, and every
+latency in a bin is estimated by the same value, which is within
+`RELATIVE_ACCURACY` of each of them. Latencies that are not positive fall into the
+bin of `ZERO_INDEX`, which is estimated by zero. A sketch is then just the counts
+of its bins, so that sketches are merged by adding up their counts, e.g. with
+`GROUP BY` over the rows of the `latency_sketch_bins` table (see
+`phoenix.db.rollups`), and the bin of a latency can be computed in SQL as well as
+in Python (see `get_index_expression`).
+"""
+
+import math
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Optional
+
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    Integer,
+    SQLColumnExpression,
+    case,
+    cast,
+    func,
+    literal_column,
+)
+
+RELATIVE_ACCURACY = 0.01
+"""
+Upper bound of the relative error of the estimated latencies.
+"""
+
+ZERO_INDEX = -(2**31)
+"""
+Index of the bin of the latencies that are not positive.
+"""
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LN_GAMMA = math.log(_GAMMA)
+
+
+def get_index(latency_ms: float) -> int:
+    """
+    Returns the index of the bin of a latency, which must be rounded as it is in the
+    database (see `models.LatencyMs`) for the indexes to agree.
+    """
+    if latency_ms <= 0:
+        return ZERO_INDEX
+    return math.ceil(math.log(latency_ms) / _LN_GAMMA)
+
+
+def get_index_expression(latency_ms: SQLColumnExpression[float]) -> ColumnElement[int]:
+    """
+    Returns the SQL expression of the index of the bin of a latency, which is free
+    of bound parameters so that it can be grouped by.
+    """
+    x = cast(latency_ms, Float)
+    return case(
+        (x <= literal_column("0"), literal_column(str(ZERO_INDEX))),
+        else_=cast(func.ceil(func.ln(x) / literal_column(repr(_LN_GAMMA))), Integer),
+    )
+
+
+def get_value(index: int) -> float:
+    """
+    Returns the estimate of the latencies in the bin of the index.
+    """
+    if index == ZERO_INDEX:
+        return 0.0
+    return 2 * _GAMMA**index / (_GAMMA + 1)
+
+
+class LatencySketch:
+    """
+    Counts of latencies per bin.
+    """
+
+    def __init__(self, bins: Iterable[tuple[int, int]] = ()) -> None:
+        self._counts: defaultdict[int, int] = defaultdict(int)
+        for index, count in bins:
+            self.add_bin(index, count)
+
+    def add(self, latency_ms: float) -> None:
+        self._counts[get_index(latency_ms)] += 1
+
+    def add_bin(self, index: int, count: int) -> None:
+        self._counts[index] += count
+
+    def merge(self, other: "LatencySketch") -> None:
+        for index, count in other._counts.items():
+            self._counts[index] += count
+
+    def quantile(self, probability: float) -> Optional[float]:
+        """
+        Returns the estimate of the quantile of the latencies, interpolated between
+        the closest ranks in the same way as `percentile_cont`, or None if the sketch
+        is empty.
+        """
+        bins = sorted((index, count) for index, count in self._counts.items() if count > 0)
+        if not bins:
+            return None
+        total_count = sum(count for _, count in bins)
+        rank = probability * (total_count - 1)
+        lower_rank = math.floor(rank)
+        upper_rank = min(lower_rank + 1, total_count - 1)
+        lower = upper = None
+        cumulative_count = 0
+        for index, count in bins:
+            cumulative_count += count
+            if lower is None and lower_rank < cumulative_count:
+                lower = get_value(index)
+            if upper_rank < cumulative_count:
+                upper = get_value(index)
+                break
+        assert lower is not None and upper is not None
+        return lower + (upper - lower) * (rank - lower_rank)
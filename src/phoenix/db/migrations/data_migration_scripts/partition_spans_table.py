@@ -0,0 +1,89 @@
+# /// script
+# dependencies = [
+#   "arize-phoenix[pg]",
+# ]
+# ///
+"""
+Partition the `spans` table of a PostgreSQL database by range on the start times of
+the spans, or revert the partitioning with `--revert`.
+
+The existing spans are attached as a single partition without being copied, but the
+spans table is locked while it is converted, so the Phoenix server should be stopped
+beforehand. Once the table is partitioned, the server creates the partitions of the
+following periods and drops expired ones (see `phoenix.db.partitioning`). In
+partitioned mode, the tables that refer to spans have no foreign keys on the spans
+table, and span_ids are only unique within the spans that start at the same time.
+Reverting the partitioning restores them.
+
+Environment variables.
+
+- `PHOENIX_SQL_DATABASE_URL` must be set to the database connection string.
+- `PHOENIX_SPAN_PARTITION_INTERVAL` must be set to the partition interval, i.e.
+  `day` or `week`, unless the partitioning is reverted.
+- (optional) Postgresql schema can be set via `PHOENIX_SQL_DATABASE_SCHEMA`.
+"""
+
+import os
+import sys
+from argparse import ArgumentParser
+from time import perf_counter
+
+from sqlalchemy import Engine, NullPool, create_engine, event, make_url
+
+from phoenix.config import (
+    ENV_PHOENIX_SPAN_PARTITION_INTERVAL,
+    ENV_PHOENIX_SQL_DATABASE_SCHEMA,
+    get_env_database_connection_str,
+    get_env_span_partition_interval,
+)
+from phoenix.db.engines import set_postgresql_search_path
+from phoenix.db.partitioning import partition_spans_table, unpartition_spans_table
+
+
+def convert_spans_table(engine: Engine, revert: bool = False) -> None:
+    start_time = perf_counter()
+    with engine.begin() as conn:
+        if revert:
+            unpartition_spans_table(conn)
+        else:
+            interval = get_env_span_partition_interval()
+            if interval is None:
+                sys.exit(f"{ENV_PHOENIX_SPAN_PARTITION_INTERVAL} must be set.")
+            partition_spans_table(conn, interval)
+    elapsed_time = perf_counter() - start_time
+    action = "Unpartitioned" if revert else "Partitioned"
+    print(f"✅ {action} the spans table in {elapsed_time:.3f} seconds.")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--revert",
+        action="store_true",
+        help="Convert the partitioned spans table back into an unpartitioned table.",
+    )
+    args = parser.parse_args()
+    sql_database_url = make_url(get_env_database_connection_str())
+    print(f"Using database URL: {sql_database_url}")
+    ans = input("Is that correct? [y]/n: ")
+    if ans.lower().startswith("n"):
+        url = input("Please enter the correct database URL: ")
+        sql_database_url = make_url(url)
+    if (backend := sql_database_url.get_backend_name()) != "postgresql":
+        raise ValueError(f"Only PostgreSQL databases can be partitioned, not {backend}")
+    schema = os.getenv(ENV_PHOENIX_SQL_DATABASE_SCHEMA)
+    if schema:
+        print(f"Using schema: {schema}")
+    else:
+        print("No PostgreSQL schema set. (This is the default.)")
+    ans = input("Is that correct? [y]/n: ")
+    if ans.lower().startswith("n"):
+        schema = input("Please enter the correct schema: ")
+    engine = create_engine(
+        url=sql_database_url.set(drivername="postgresql+psycopg"),
+        poolclass=NullPool,
+        echo=True,
+    )
+    if schema:
+        event.listen(engine, "connect", set_postgresql_search_path(schema))
+    convert_spans_table(engine, revert=args.revert)
@@ -0,0 +1,39 @@
+"""create span_vectors table
+
+Revision ID: 8a3764fe7f1a
+Revises: 4ded9e43755f
+Create Date: 2024-10-21 10:12:37.914215
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8a3764fe7f1a"
+down_revision: Union[str, None] = "4ded9e43755f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "span_vectors",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column(
+            "span_rowid",
+            sa.Integer,
+            sa.ForeignKey("spans.id", ondelete="CASCADE"),
+            nullable=False,
+            index=True,
+        ),
+        sa.Column("path", sa.String, nullable=False),
+        sa.Column("vector", sa.LargeBinary, nullable=False),
+        sa.UniqueConstraint("span_rowid", "path"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("span_vectors")
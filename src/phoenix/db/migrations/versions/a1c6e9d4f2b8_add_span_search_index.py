@@ -0,0 +1,93 @@
+"""add span search index
+
+Adds the full-text index of the names, input and output values, and status
+messages of the spans, which is searched for substrings. On SQLite, it is an FTS5
+table with a trigram tokenizer that is kept in sync with the spans table by
+triggers and is filled from the existing spans, leaving out the input and output
+values that are compressed or deduplicated. On PostgreSQL, it is a set of
+trigram GIN indexes on the spans table, which are only created if the pg_trgm
+extension can be installed, since substring searches are correct without them.
+
+Revision ID: a1c6e9d4f2b8
+Revises: f7d2b4e8a6c3
+Create Date: 2024-11-11 10:17:32.845261
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a1c6e9d4f2b8"
+down_revision: Union[str, None] = "f7d2b4e8a6c3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must agree with `phoenix.db.models.SPAN_SEARCH_TABLE` and
+# `phoenix.db.models.SPAN_SEARCH_EXPRESSIONS`.
+_TABLE = "span_search"
+_EXPRESSIONS = {
+    "name": "name",
+    "input": "(attributes #>> '{input,value}')",
+    "output": "(attributes #>> '{output,value}')",
+    "status_message": "status_message",
+}
+_COLUMNS = ", ".join(_EXPRESSIONS)
+# Values replaced by placeholders, i.e. compressed or deduplicated, are not indexed.
+_VALUES = (
+    "{0}.id, {0}.name, "
+    "CASE WHEN json_type({0}.attributes, '$.input.value') NOT IN ('object', 'array') "
+    "THEN json_extract({0}.attributes, '$.input.value') END, "
+    "CASE WHEN json_type({0}.attributes, '$.output.value') NOT IN ('object', 'array') "
+    "THEN json_extract({0}.attributes, '$.output.value') END, "
+    "{0}.status_message"
+)
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    if connection.dialect.name == "postgresql":
+        try:
+            with connection.begin_nested():
+                connection.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        except sa.exc.DBAPIError:
+            return
+        for field, expression in _EXPRESSIONS.items():
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_spans_{field}_trgm ON spans "
+                f"USING gin ({expression} gin_trgm_ops)"
+            )
+        return
+    op.execute(
+        f"CREATE VIRTUAL TABLE {_TABLE} USING fts5({_COLUMNS}, "
+        "tokenize='trigram case_sensitive 1', content='', contentless_delete=1)"
+    )
+    op.execute(
+        f"CREATE TRIGGER {_TABLE}_insert AFTER INSERT ON spans BEGIN "
+        f"INSERT INTO {_TABLE} (rowid, {_COLUMNS}) VALUES ({_VALUES.format('new')}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {_TABLE}_update "
+        "AFTER UPDATE OF name, attributes, status_message ON spans BEGIN "
+        f"DELETE FROM {_TABLE} WHERE rowid = old.id; "
+        f"INSERT INTO {_TABLE} (rowid, {_COLUMNS}) VALUES ({_VALUES.format('new')}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {_TABLE}_delete AFTER DELETE ON spans BEGIN "
+        f"DELETE FROM {_TABLE} WHERE rowid = old.id; END"
+    )
+    op.execute(
+        f"INSERT INTO {_TABLE} (rowid, {_COLUMNS}) SELECT {_VALUES.format('spans')} FROM spans"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for field in _EXPRESSIONS:
+            op.execute(f"DROP INDEX IF EXISTS ix_spans_{field}_trgm")
+        return
+    for kind in ("delete", "update", "insert"):
+        op.execute(f"DROP TRIGGER IF EXISTS {_TABLE}_{kind}")
+    op.execute(f"DROP TABLE IF EXISTS {_TABLE}")
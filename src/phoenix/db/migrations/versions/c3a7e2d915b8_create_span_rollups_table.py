@@ -0,0 +1,71 @@
+"""create span_rollups table
+
+Creates the table of the hourly rollups of the spans of each project, and fills it
+from the existing spans.
+
+Revision ID: c3a7e2d915b8
+Revises: f5590d210fd4
+Create Date: 2024-10-28 09:41:18.526613
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3a7e2d915b8"
+down_revision: Union[str, None] = "f5590d210fd4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "span_rollups",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column(
+            "project_rowid",
+            sa.Integer,
+            sa.ForeignKey("projects.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("hour", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("span_kind", sa.String, nullable=False),
+        sa.Column("is_root", sa.Boolean, nullable=False),
+        sa.Column("status_code", sa.String, nullable=False),
+        sa.Column("span_count", sa.Integer, nullable=False),
+        sa.Column("llm_token_count_prompt", sa.Integer, nullable=False),
+        sa.Column("llm_token_count_completion", sa.Integer, nullable=False),
+        sa.Column("min_start_time", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("max_end_time", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.UniqueConstraint(
+            "project_rowid",
+            "hour",
+            "span_kind",
+            "is_root",
+            "status_code",
+            name="uq_span_rollups_key",
+        ),
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        hour = "timezone('UTC', date_trunc('hour', timezone('UTC', spans.start_time)))"
+    else:
+        hour = "strftime('%Y-%m-%d %H:00:00.000000', spans.start_time)"
+    op.execute(
+        "INSERT INTO span_rollups (project_rowid, hour, span_kind, is_root, status_code, "
+        "span_count, llm_token_count_prompt, llm_token_count_completion, "
+        "min_start_time, max_end_time) "
+        f"SELECT traces.project_rowid, {hour}, spans.span_kind, spans.parent_id IS NULL, "
+        "spans.status_code, count(*), coalesce(sum(spans.llm_token_count_prompt), 0), "
+        "coalesce(sum(spans.llm_token_count_completion), 0), "
+        "min(spans.start_time), max(spans.end_time) "
+        "FROM spans JOIN traces ON traces.id = spans.trace_rowid "
+        f"GROUP BY traces.project_rowid, {hour}, spans.span_kind, spans.parent_id IS NULL, "
+        "spans.status_code"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("span_rollups")
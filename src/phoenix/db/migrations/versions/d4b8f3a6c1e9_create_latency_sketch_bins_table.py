@@ -0,0 +1,84 @@
+"""create latency_sketch_bins table
+
+Creates the table of the hourly latency sketches of the spans and traces of each
+project, and fills it from the existing spans and traces.
+
+Revision ID: d4b8f3a6c1e9
+Revises: c3a7e2d915b8
+Create Date: 2024-11-04 14:12:37.902154
+
+"""
+
+import math
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4b8f3a6c1e9"
+down_revision: Union[str, None] = "c3a7e2d915b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must agree with `phoenix.db.latency_sketches`.
+_RELATIVE_ACCURACY = 0.01
+_LN_GAMMA = math.log((1 + _RELATIVE_ACCURACY) / (1 - _RELATIVE_ACCURACY))
+_ZERO_INDEX = -(2**31)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "latency_sketch_bins",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column(
+            "project_rowid",
+            sa.Integer,
+            sa.ForeignKey("projects.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("hour", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column(
+            "kind",
+            sa.String,
+            sa.CheckConstraint("kind IN ('span', 'trace')", name="valid_kind"),
+            nullable=False,
+        ),
+        sa.Column("bin_index", sa.Integer, nullable=False),
+        sa.Column("count", sa.Integer, nullable=False),
+        sa.UniqueConstraint(
+            "project_rowid",
+            "hour",
+            "kind",
+            "bin_index",
+            name="uq_latency_sketch_bins_key",
+        ),
+    )
+    for kind, table in (("span", "spans"), ("trace", "traces")):
+        if op.get_bind().dialect.name == "postgresql":
+            hour = f"timezone('UTC', date_trunc('hour', timezone('UTC', {table}.start_time)))"
+            latency = (
+                f"round(CAST((extract(EPOCH FROM {table}.end_time) - "
+                f"extract(EPOCH FROM {table}.start_time)) * 1000 AS NUMERIC), 1)"
+            )
+        else:
+            hour = f"strftime('%Y-%m-%d %H:00:00.000000', {table}.start_time)"
+            latency = (
+                f"round((unixepoch({table}.end_time, 'subsec') - "
+                f"unixepoch({table}.start_time, 'subsec')) * 1000, 1)"
+            )
+        bin_index = (
+            f"CASE WHEN CAST({latency} AS FLOAT) <= 0 THEN {_ZERO_INDEX} "
+            f"ELSE CAST(ceil(ln(CAST({latency} AS FLOAT)) / {_LN_GAMMA!r}) AS INTEGER) END"
+        )
+        join = "JOIN traces ON traces.id = spans.trace_rowid " if table == "spans" else ""
+        op.execute(
+            "INSERT INTO latency_sketch_bins (project_rowid, hour, kind, bin_index, count) "
+            f"SELECT traces.project_rowid, {hour}, '{kind}', {bin_index}, count(*) "
+            f"FROM {table} {join}"
+            f"GROUP BY traces.project_rowid, {hour}, {bin_index}"
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("latency_sketch_bins")
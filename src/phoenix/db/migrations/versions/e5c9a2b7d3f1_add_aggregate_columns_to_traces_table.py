@@ -0,0 +1,54 @@
+"""add aggregate columns to traces table
+
+Adds the root span, the numbers of spans and error spans, and the token counts of
+each trace to the traces table, and fills them from the existing spans.
+
+Revision ID: e5c9a2b7d3f1
+Revises: d4b8f3a6c1e9
+Create Date: 2024-11-06 09:41:15.318270
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5c9a2b7d3f1"
+down_revision: Union[str, None] = "d4b8f3a6c1e9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COUNT_COLUMNS = (
+    "num_spans",
+    "num_error_spans",
+    "llm_token_count_prompt",
+    "llm_token_count_completion",
+)
+
+
+def upgrade() -> None:
+    op.add_column("traces", sa.Column("root_span_rowid", sa.Integer, nullable=True))
+    for name in _COUNT_COLUMNS:
+        op.add_column(
+            "traces",
+            sa.Column(name, sa.Integer, nullable=False, server_default=sa.text("0")),
+        )
+    spans = "FROM spans WHERE spans.trace_rowid = traces.id"
+    op.execute(
+        "UPDATE traces SET "
+        f"root_span_rowid = (SELECT min(spans.id) {spans} AND spans.parent_id IS NULL), "
+        f"num_spans = (SELECT count(*) {spans}), "
+        f"num_error_spans = (SELECT count(*) {spans} AND spans.status_code = 'ERROR'), "
+        "llm_token_count_prompt = "
+        f"(SELECT coalesce(sum(spans.llm_token_count_prompt), 0) {spans}), "
+        "llm_token_count_completion = "
+        f"(SELECT coalesce(sum(spans.llm_token_count_completion), 0) {spans})"
+    )
+
+
+def downgrade() -> None:
+    for name in reversed(_COUNT_COLUMNS):
+        op.drop_column("traces", name)
+    op.drop_column("traces", "root_span_rowid")
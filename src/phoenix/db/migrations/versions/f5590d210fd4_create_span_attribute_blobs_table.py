@@ -0,0 +1,57 @@
+"""create span_attribute_blobs table
+
+Also creates the table of the references of spans to the blobs, which is used to
+find the blobs that are no longer referenced.
+
+Revision ID: f5590d210fd4
+Revises: 8a3764fe7f1a
+Create Date: 2024-10-23 15:41:08.527360
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f5590d210fd4"
+down_revision: Union[str, None] = "8a3764fe7f1a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "span_attribute_blobs",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("hash", sa.String, nullable=False, unique=True),
+        sa.Column("value", sa.String, nullable=False),
+    )
+    op.create_table(
+        "span_attribute_blob_references",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column(
+            "span_rowid",
+            sa.Integer,
+            sa.ForeignKey("spans.id", ondelete="CASCADE"),
+            nullable=False,
+            index=True,
+        ),
+        sa.Column(
+            "blob_hash",
+            sa.String,
+            sa.ForeignKey(
+                "span_attribute_blobs.hash",
+                name="fk_span_attribute_blob_references_blob_hash",
+            ),
+            nullable=False,
+            index=True,
+        ),
+        sa.UniqueConstraint("span_rowid", "blob_hash"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("span_attribute_blob_references")
+    op.drop_table("span_attribute_blobs")
@@ -0,0 +1,154 @@
+"""add aggregate columns to project_sessions table
+
+Adds the numbers of traces and error traces, the token counts, and previews of
+the first input and last output of each session to the project_sessions table,
+and fills them from the existing traces and spans.
+
+Revision ID: f7d2b4e8a6c3
+Revises: e5c9a2b7d3f1
+Create Date: 2024-11-07 16:25:49.604117
+
+"""
+
+import base64
+import json
+from typing import Any, Optional, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f7d2b4e8a6c3"
+down_revision: Union[str, None] = "e5c9a2b7d3f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COUNT_COLUMNS = (
+    "num_traces",
+    "num_error_traces",
+    "llm_token_count_prompt",
+    "llm_token_count_completion",
+)
+_PREVIEW_COLUMNS = (
+    "first_input_value",
+    "first_input_mime_type",
+    "last_output_value",
+    "last_output_mime_type",
+)
+
+# Must agree with `phoenix.db.session_aggregates`.
+_MAX_PREVIEW_LENGTH = 1000
+# Must agree with `phoenix.db.compression` and `phoenix.db.span_attribute_blobs`.
+_COMPRESSED_KEY = "__zstd__"
+_BLOB_REFERENCE_KEY = "__blob__"
+
+
+def upgrade() -> None:
+    for name in _COUNT_COLUMNS:
+        op.add_column(
+            "project_sessions",
+            sa.Column(name, sa.Integer, nullable=False, server_default=sa.text("0")),
+        )
+    for name in _PREVIEW_COLUMNS:
+        op.add_column("project_sessions", sa.Column(name, sa.String, nullable=True))
+    op.create_index(
+        "ix_project_sessions_project_id_num_traces",
+        "project_sessions",
+        ["project_id", "num_traces"],
+    )
+    op.create_index(
+        "ix_project_sessions_project_id_llm_token_count_total",
+        "project_sessions",
+        ["project_id", sa.text("(llm_token_count_prompt + llm_token_count_completion)")],
+    )
+    traces = "FROM traces WHERE traces.project_session_rowid = project_sessions.id"
+    root_spans = (
+        "FROM traces JOIN spans ON spans.id = traces.root_span_rowid "
+        "WHERE traces.project_session_rowid = project_sessions.id"
+    )
+    op.execute(
+        "UPDATE project_sessions SET "
+        f"num_traces = (SELECT count(*) {traces}), "
+        "num_error_traces = "
+        f"(SELECT count(*) {root_spans} AND spans.cumulative_error_count > 0), "
+        "llm_token_count_prompt = "
+        f"(SELECT coalesce(sum(spans.cumulative_llm_token_count_prompt), 0) {root_spans}), "
+        "llm_token_count_completion = "
+        f"(SELECT coalesce(sum(spans.cumulative_llm_token_count_completion), 0) {root_spans})"
+    )
+    connection = op.get_bind()
+    for kind, key, time, order in (
+        ("first_input", "input", "start_time", "ASC"),
+        ("last_output", "output", "end_time", "DESC"),
+    ):
+        if connection.dialect.name == "postgresql":
+            value = f"spans.attributes #>> '{{{key},value}}'"
+            mime_type = f"spans.attributes #>> '{{{key},mime_type}}'"
+        else:
+            value = f"json_extract(spans.attributes, '$.{key}.value')"
+            mime_type = f"json_extract(spans.attributes, '$.{key}.mime_type')"
+        rows = connection.execute(
+            sa.text(
+                "SELECT id_, value, mime_type FROM ("
+                "SELECT traces.project_session_rowid AS id_, "
+                f"{value} AS value, {mime_type} AS mime_type, "
+                "row_number() OVER (PARTITION BY traces.project_session_rowid "
+                f"ORDER BY traces.{time} {order}, traces.id {order}) AS row_number "
+                "FROM traces JOIN spans ON spans.id = traces.root_span_rowid "
+                "WHERE traces.project_session_rowid IS NOT NULL"
+                ") AS ranked WHERE row_number = 1 AND value IS NOT NULL"
+            )
+        ).all()
+        if not rows:
+            continue
+        connection.execute(
+            sa.text(
+                f"UPDATE project_sessions SET {kind}_value = :value, "
+                f"{kind}_mime_type = :mime_type WHERE id = :id"
+            ),
+            [
+                dict(
+                    id=id_,
+                    value=_get_text(connection, value)[:_MAX_PREVIEW_LENGTH],
+                    mime_type=mime_type,
+                )
+                for id_, value, mime_type in rows
+            ],
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_project_sessions_project_id_llm_token_count_total", table_name="project_sessions"
+    )
+    op.drop_index("ix_project_sessions_project_id_num_traces", table_name="project_sessions")
+    for name in reversed(_PREVIEW_COLUMNS):
+        op.drop_column("project_sessions", name)
+    for name in reversed(_COUNT_COLUMNS):
+        op.drop_column("project_sessions", name)
+
+
+def _get_text(connection: sa.Connection, value: str) -> str:
+    """
+    Returns the original text of a value extracted from the attributes, which may
+    be compressed or deduplicated.
+    """
+    if not value.startswith("{"):
+        return value
+    try:
+        obj: Any = json.loads(value)
+    except ValueError:
+        return value
+    if not isinstance(obj, dict):
+        return value
+    if isinstance(data := obj.get(_COMPRESSED_KEY), str):
+        import zstandard
+
+        return str(zstandard.decompress(base64.b64decode(data)).decode("utf-8"))
+    if isinstance(blob_hash := obj.get(_BLOB_REFERENCE_KEY), str):
+        blob: Optional[str] = connection.scalar(
+            sa.text("SELECT value FROM span_attribute_blobs WHERE hash = :hash"),
+            dict(hash=blob_hash),
+        )
+        return value if blob is None else blob
+    return value
@@ -3,6 +3,7 @@ from enum import Enum
 from typing import Any, Optional, TypedDict
 
 from sqlalchemy import (
+    DDL,
     JSON,
     NUMERIC,
     TIMESTAMP,
@@ -12,15 +13,21 @@ from sqlalchemy import (
     Float,
     ForeignKey,
     Index,
+    LargeBinary,
     MetaData,
     String,
     TypeDecorator,
     UniqueConstraint,
+    and_,
     case,
+    event,
     func,
     insert,
+    literal,
+    literal_column,
     not_,
     select,
+    table,
     text,
 )
 from sqlalchemy.dialects import postgresql
@@ -167,11 +174,36 @@ class ProjectSession(Base):
     )
     start_time: Mapped[datetime] = mapped_column(UtcTimeStamp, index=True, nullable=False)
     end_time: Mapped[datetime] = mapped_column(UtcTimeStamp, index=True, nullable=False)
+    # The aggregates of the traces of the session, which are kept up to date as
+    # traces are inserted and deleted, and truncated previews of the input of its
+    # first trace, i.e. the one that starts first, and the output of its last trace,
+    # i.e. the one that ends last.
+    num_traces: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    num_error_traces: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    llm_token_count_prompt: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    llm_token_count_completion: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    first_input_value: Mapped[Optional[str]]
+    first_input_mime_type: Mapped[Optional[str]]
+    last_output_value: Mapped[Optional[str]]
+    last_output_mime_type: Mapped[Optional[str]]
+
+    @hybrid_property
+    def llm_token_count_total(self) -> int:
+        return self.llm_token_count_prompt + self.llm_token_count_completion
+
     traces: Mapped[list["Trace"]] = relationship(
         "Trace",
         back_populates="project_session",
         uselist=True,
     )
+    __table_args__ = (
+        Index("ix_project_sessions_project_id_num_traces", "project_id", "num_traces"),
+        Index(
+            "ix_project_sessions_project_id_llm_token_count_total",
+            "project_id",
+            text("(llm_token_count_prompt + llm_token_count_completion)"),
+        ),
+    )
 
 
 class Trace(Base):
@@ -189,6 +221,14 @@ class Trace(Base):
     )
     start_time: Mapped[datetime] = mapped_column(UtcTimeStamp, index=True)
     end_time: Mapped[datetime] = mapped_column(UtcTimeStamp)
+    # The aggregates of the spans of the trace, which are kept up to date as spans
+    # are inserted. There is no foreign key on the root span, since the spans table
+    # may be partitioned.
+    root_span_rowid: Mapped[Optional[int]]
+    num_spans: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    num_error_spans: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    llm_token_count_prompt: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    llm_token_count_completion: Mapped[int] = mapped_column(default=0, server_default=text("0"))
 
     @hybrid_property
     def latency_ms(self) -> float:
@@ -201,6 +241,10 @@ class Trace(Base):
         # See https://docs.sqlalchemy.org/en/20/orm/extensions/hybrid.html
         return LatencyMs(cls.start_time, cls.end_time)
 
+    @hybrid_property
+    def llm_token_count_total(self) -> int:
+        return self.llm_token_count_prompt + self.llm_token_count_completion
+
     project: Mapped["Project"] = relationship(
         "Project",
         back_populates="traces",
@@ -356,6 +400,140 @@ def _(element: Any, compiler: Any, **kw: Any) -> Any:
     return compiler.process(func.text_contains(string, substring) > 0, **kw)
 
 
+SPAN_SEARCH_TABLE = "span_search"
+"""
+Full-text index of the text of spans that is searched for substrings, i.e. their
+names, input and output values, and status messages, which carry the messages of
+the exceptions of failed spans. On SQLite, it is an FTS5 table with a trigram
+tokenizer that is kept in sync with the spans table by triggers. On PostgreSQL,
+it is a set of trigram GIN indexes on the spans table, which are created by the
+migration only if the pg_trgm extension is available.
+"""
+
+SPAN_SEARCH_EXPRESSIONS = {
+    "name": "spans.name",
+    "input": "(spans.attributes #>> '{input,value}')",
+    "output": "(spans.attributes #>> '{output,value}')",
+    "status_message": "spans.status_message",
+}
+"""
+The fields of the full-text index, i.e. the columns of the FTS5 table on SQLite,
+and the expressions of the spans table that are indexed for them on PostgreSQL.
+"""
+
+# Values replaced by placeholders, i.e. compressed or deduplicated, are not indexed.
+_SPAN_SEARCH_VALUES = (
+    "new.id, new.name, "
+    "CASE WHEN json_type(new.attributes, '$.input.value') NOT IN ('object', 'array') "
+    "THEN json_extract(new.attributes, '$.input.value') END, "
+    "CASE WHEN json_type(new.attributes, '$.output.value') NOT IN ('object', 'array') "
+    "THEN json_extract(new.attributes, '$.output.value') END, "
+    "new.status_message"
+)
+_SPAN_SEARCH_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SPAN_SEARCH_TABLE} USING fts5("
+    f"{', '.join(SPAN_SEARCH_EXPRESSIONS)}, tokenize='trigram case_sensitive 1', "
+    "content='', contentless_delete=1)",
+    f"CREATE TRIGGER IF NOT EXISTS {SPAN_SEARCH_TABLE}_insert AFTER INSERT ON spans BEGIN "
+    f"INSERT INTO {SPAN_SEARCH_TABLE} (rowid, {', '.join(SPAN_SEARCH_EXPRESSIONS)}) "
+    f"VALUES ({_SPAN_SEARCH_VALUES}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SPAN_SEARCH_TABLE}_update "
+    "AFTER UPDATE OF name, attributes, status_message ON spans BEGIN "
+    f"DELETE FROM {SPAN_SEARCH_TABLE} WHERE rowid = old.id; "
+    f"INSERT INTO {SPAN_SEARCH_TABLE} (rowid, {', '.join(SPAN_SEARCH_EXPRESSIONS)}) "
+    f"VALUES ({_SPAN_SEARCH_VALUES}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SPAN_SEARCH_TABLE}_delete AFTER DELETE ON spans BEGIN "
+    f"DELETE FROM {SPAN_SEARCH_TABLE} WHERE rowid = old.id; END",
+)
+# The migrations create the same table and triggers; these are for databases whose
+# schema is created from the models, e.g. in-memory databases.
+for _statement in _SPAN_SEARCH_DDL:
+    event.listen(
+        Span.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),  # type: ignore[no-untyped-call]
+    )
+event.listen(
+    Span.__table__,
+    "after_drop",
+    DDL(f"DROP TABLE IF EXISTS {SPAN_SEARCH_TABLE}").execute_if(  # type: ignore[no-untyped-call]
+        dialect="sqlite"
+    ),
+)
+
+
+class SpanTextContains(expression.FunctionElement[str]):
+    """
+    `TextContains` on a field of the spans that is covered by the full-text index
+    (see `SPAN_SEARCH_TABLE`), which narrows down the spans to search when the
+    substring is a string of at least three characters, i.e. at least one trigram.
+    The spans table must be in the FROM clause under its own name.
+
+    Like `TextContains`, it cannot see through the input and output values that are
+    compressed or deduplicated, so the spans with such values must be searched
+    separately, e.g. as `SpanFilter.apply` does.
+    """
+
+    # See https://docs.sqlalchemy.org/en/20/core/compiler.html
+    inherit_cache = True
+    type = String()
+    name = "span_text_contains"
+
+    def __init__(self, field: str, string: Any, substring: Any) -> None:
+        if not isinstance(substring, str) or len(substring) < 3:
+            super().__init__(string, substring)
+            return
+        quoted = '"' + substring.replace('"', '""') + '"'
+        escaped = substring.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        super().__init__(
+            string,
+            substring,
+            # The full-text query, restricted to the column of the field.
+            literal(f"{{{field}}} : {quoted}", String),
+            # The indexed expression and the LIKE pattern that it is matched against.
+            literal_column(SPAN_SEARCH_EXPRESSIONS[field]),
+            literal(f"%{escaped}%", String),
+        )
+
+
+@compiles(SpanTextContains)
+def _(element: Any, compiler: Any, **kw: Any) -> Any:
+    # See https://docs.sqlalchemy.org/en/20/core/compiler.html
+    string, substring, *_ = list(element.clauses)
+    return compiler.process(TextContains(string, substring), **kw)
+
+
+@compiles(SpanTextContains, "postgresql")
+def _(element: Any, compiler: Any, **kw: Any) -> Any:
+    # See https://docs.sqlalchemy.org/en/20/core/compiler.html
+    clauses = list(element.clauses)
+    if len(clauses) == 2:
+        return compiler.process(TextContains(*clauses), **kw)
+    *_, expression_, pattern = clauses
+    return compiler.process(expression_.like(pattern), **kw)
+
+
+@compiles(SpanTextContains, "sqlite")
+def _(element: Any, compiler: Any, **kw: Any) -> Any:
+    # See https://docs.sqlalchemy.org/en/20/core/compiler.html
+    clauses = list(element.clauses)
+    if len(clauses) == 2:
+        return compiler.process(TextContains(*clauses), **kw)
+    string, substring, query, *_ = clauses
+    span_search = table(SPAN_SEARCH_TABLE)
+    return compiler.process(
+        and_(
+            Span.id.in_(
+                select(literal_column("rowid"))
+                .select_from(span_search)
+                .where(literal_column(SPAN_SEARCH_TABLE).op("MATCH")(query))
+            ),
+            TextContains(string, substring),
+        ),
+        **kw,
+    )
+
+
 async def init_models(engine: AsyncEngine) -> None:
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -367,6 +545,136 @@ async def init_models(engine: AsyncEngine) -> None:
         )
 
 
+class SpanVector(Base):
+    """
+    Embedding vectors and other long arrays of floats found in span attributes,
+    stored apart from the attributes as little-endian float32 bytes. In the span
+    attributes, each array is replaced by a reference to its path (see
+    `phoenix.db.span_vectors`).
+    """
+
+    __tablename__ = "span_vectors"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    span_rowid: Mapped[int] = mapped_column(
+        ForeignKey("spans.id", ondelete="CASCADE"),
+        index=True,
+    )
+    path: Mapped[str]
+    vector: Mapped[bytes] = mapped_column(LargeBinary)
+    __table_args__ = (
+        UniqueConstraint(
+            "span_rowid",
+            "path",
+        ),
+    )
+
+
+class SpanAttributeBlob(Base):
+    """
+    Large string values found in span attributes, stored once per distinct value
+    and keyed by the hex digest of their SHA-256 hash. In the span attributes,
+    each value is replaced by a reference to its hash (see
+    `phoenix.db.span_attribute_blobs`).
+    """
+
+    __tablename__ = "span_attribute_blobs"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    hash: Mapped[str] = mapped_column(String, unique=True)
+    value: Mapped[str]
+
+
+class SpanAttributeBlobReference(Base):
+    """
+    References of spans to the blobs of their attributes, which are deleted along
+    with the spans, so that the blobs no longer referenced by any span can be found
+    and deleted (see `phoenix.db.span_attribute_blobs.delete_unreferenced_blobs`).
+    """
+
+    __tablename__ = "span_attribute_blob_references"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    span_rowid: Mapped[int] = mapped_column(
+        ForeignKey("spans.id", ondelete="CASCADE"),
+        index=True,
+    )
+    blob_hash: Mapped[str] = mapped_column(
+        ForeignKey(
+            "span_attribute_blobs.hash",
+            # The name that the naming convention gives is too long for PostgreSQL.
+            name="fk_span_attribute_blob_references_blob_hash",
+        ),
+        index=True,
+    )
+    __table_args__ = (
+        UniqueConstraint(
+            "span_rowid",
+            "blob_hash",
+        ),
+    )
+
+
+class SpanRollup(Base):
+    """
+    Aggregates of the spans of a project per hour of their start times, span kind,
+    whether they are root spans, and status code, which are kept up to date as
+    spans are inserted and deleted (see `phoenix.db.rollups`).
+    """
+
+    __tablename__ = "span_rollups"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    project_rowid: Mapped[int] = mapped_column(
+        ForeignKey("projects.id", ondelete="CASCADE"),
+    )
+    hour: Mapped[datetime] = mapped_column(UtcTimeStamp)
+    span_kind: Mapped[str]
+    is_root: Mapped[bool]
+    status_code: Mapped[str]
+    span_count: Mapped[int]
+    llm_token_count_prompt: Mapped[int]
+    llm_token_count_completion: Mapped[int]
+    min_start_time: Mapped[datetime] = mapped_column(UtcTimeStamp)
+    max_end_time: Mapped[datetime] = mapped_column(UtcTimeStamp)
+    __table_args__ = (
+        UniqueConstraint(
+            "project_rowid",
+            "hour",
+            "span_kind",
+            "is_root",
+            "status_code",
+            # The name that the naming convention gives is too long for PostgreSQL.
+            name="uq_span_rollups_key",
+        ),
+    )
+
+
+class LatencySketchBin(Base):
+    """
+    Number of the spans or traces of a project per hour of their start times whose
+    latencies fall into a bin of a latency sketch (see `phoenix.db.latency_sketches`),
+    which is kept up to date along with the span rollups (see `phoenix.db.rollups`).
+    """
+
+    __tablename__ = "latency_sketch_bins"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    project_rowid: Mapped[int] = mapped_column(
+        ForeignKey("projects.id", ondelete="CASCADE"),
+    )
+    hour: Mapped[datetime] = mapped_column(UtcTimeStamp)
+    kind: Mapped[str] = mapped_column(
+        CheckConstraint("kind IN ('span', 'trace')", name="valid_kind"),
+    )
+    bin_index: Mapped[int]
+    count: Mapped[int]
+    __table_args__ = (
+        UniqueConstraint(
+            "project_rowid",
+            "hour",
+            "kind",
+            "bin_index",
+            name="uq_latency_sketch_bins_key",
+        ),
+    )
+
+
 class SpanAnnotation(Base):
     __tablename__ = "span_annotations"
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -0,0 +1,371 @@
+"""
+Partitioning of the spans table by range on the start times of the spans, which is
+an opt-in schema mode of PostgreSQL databases that lets expired spans be dropped a
+partition at a time.
+
+The database migrations always leave the spans table unpartitioned. It is converted
+explicitly, by running the `partition_spans_table` data migration script (see
+`partition_spans_table`), which attaches the existing table as the partition of all
+the spans that start before the next period, so that its rows are not copied, along
+with a default partition for the spans that fall outside of every other partition.
+The conversion is reverted by the same script (see `unpartition_spans_table`).
+Once converted, one partition per period is created ahead of time (see
+`create_partitions`), and expired partitions are dropped as a whole (see
+`drop_partitions`) instead of having their rows deleted.
+
+Since the primary and unique keys of a partitioned table must include its partition
+key, they become (id, start_time) and (span_id, start_time) in partitioned mode, so
+span_ids are only kept unique by ingestion, which skips the spans that already
+exist. For the same reason, the rows that refer to spans by id, i.e. their
+annotations, vectors, blob references and dataset examples, can't have foreign keys
+on a partitioned spans table. Their foreign keys are dropped in partitioned mode,
+and orphaned rows are instead purged after the fact (see
+`delete_orphaned_span_references`). Unpartitioned spans tables keep all of their
+keys and foreign keys.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import Connection, text
+from typing_extensions import assert_never
+
+from phoenix.config import SpanPartitionInterval
+from phoenix.db import models
+
+SPANS = models.Span.__tablename__
+DEFAULT_PARTITION = f"{SPANS}_default"
+LEGACY_PARTITION = f"{SPANS}_legacy"
+_PARTITIONED = f"{SPANS}_partitioned"
+_KEYS = ("pk_spans", "uq_spans_span_id")
+_REFERENCING_FOREIGN_KEYS = (
+    ("span_annotations", "fk_span_annotations_span_rowid_spans", "CASCADE"),
+    ("document_annotations", "fk_document_annotations_span_rowid_spans", "CASCADE"),
+    ("span_vectors", "fk_span_vectors_span_rowid_spans", "CASCADE"),
+    (
+        "span_attribute_blob_references",
+        "fk_span_attribute_blob_references_span_rowid_spans",
+        "CASCADE",
+    ),
+    ("dataset_examples", "fk_dataset_examples_span_rowid_spans", "SET NULL"),
+)
+
+
+@dataclass(frozen=True)
+class SpanPartition:
+    name: str
+    lower: Optional[datetime]
+    """
+    Inclusive lower bound of the start times of the spans in the partition, or None
+    if it is unbounded.
+    """
+    upper: Optional[datetime]
+    """
+    Exclusive upper bound of the start times of the spans in the partition, or None
+    if it is unbounded.
+    """
+    is_default: bool = False
+
+
+def get_period_start(t: datetime, interval: SpanPartitionInterval) -> datetime:
+    """
+    Returns the start of the period of the interval that contains the time, where
+    days start at midnight UTC and weeks start on Mondays.
+    """
+    t = t.astimezone(timezone.utc)
+    start = datetime(t.year, t.month, t.day, tzinfo=timezone.utc)
+    if interval is SpanPartitionInterval.DAY:
+        return start
+    if interval is SpanPartitionInterval.WEEK:
+        return start - timedelta(days=start.weekday())
+    assert_never(interval)
+
+
+def get_period_length(interval: SpanPartitionInterval) -> timedelta:
+    if interval is SpanPartitionInterval.DAY:
+        return timedelta(days=1)
+    if interval is SpanPartitionInterval.WEEK:
+        return timedelta(weeks=1)
+    assert_never(interval)
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(
+        conn.scalar(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:table))"
+            ),
+            {"table": SPANS},
+        )
+    )
+
+
+def partition_spans_table(conn: Connection, interval: SpanPartitionInterval) -> None:
+    """
+    Converts the unpartitioned spans table of a PostgreSQL database into a table
+    partitioned by range on the start times of the spans, and drops the foreign
+    keys of the tables that refer to spans.
+    """
+    if conn.dialect.name != "postgresql":
+        raise ValueError("Only the spans table of a PostgreSQL database can be partitioned")
+    if is_partitioned(conn):
+        return
+    conn.execute(text(f"LOCK TABLE {SPANS} IN ACCESS EXCLUSIVE MODE"))
+    for table, constraint, _ in _REFERENCING_FOREIGN_KEYS:
+        conn.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}"))
+    indexes, foreign_keys, sequence = _get_definitions(conn)
+    max_start_time = conn.scalar(text(f"SELECT max(start_time) FROM {SPANS}"))
+    conn.execute(text(f"ALTER TABLE {SPANS} RENAME TO {LEGACY_PARTITION}"))
+    for name, _ in indexes:
+        conn.execute(text(f"ALTER INDEX {name} RENAME TO {LEGACY_PARTITION}_{name}"))
+    conn.execute(
+        text(
+            f"CREATE TABLE {SPANS} (LIKE {LEGACY_PARTITION} INCLUDING DEFAULTS "
+            "INCLUDING CONSTRAINTS INCLUDING STORAGE) PARTITION BY RANGE (start_time)"
+        )
+    )
+    conn.execute(text(f"ALTER TABLE {SPANS} ADD CONSTRAINT pk_spans PRIMARY KEY (id, start_time)"))
+    conn.execute(
+        text(f"ALTER TABLE {SPANS} ADD CONSTRAINT uq_spans_span_id UNIQUE (span_id, start_time)")
+    )
+    _restore_definitions(conn, indexes, foreign_keys, sequence)
+    # The existing spans go into a partition that ends with the current period, or
+    # with the period of the latest span if it starts in the future.
+    now = datetime.now(timezone.utc)
+    latest = max(now, max_start_time) if max_start_time else now
+    upper = get_period_start(latest, interval) + get_period_length(interval)
+    # The keys of the partition are replaced by those of the partitioned table.
+    for constraint in _KEYS:
+        conn.execute(
+            text(f"ALTER TABLE {LEGACY_PARTITION} DROP CONSTRAINT {LEGACY_PARTITION}_{constraint}")
+        )
+    conn.execute(
+        text(
+            f"ALTER TABLE {SPANS} ATTACH PARTITION {LEGACY_PARTITION} "
+            f"FOR VALUES FROM (MINVALUE) TO ('{upper.isoformat()}')"
+        )
+    )
+    conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {SPANS} DEFAULT"))
+
+
+def unpartition_spans_table(conn: Connection) -> None:
+    """
+    Converts the partitioned spans table of a PostgreSQL database back into an
+    unpartitioned table, and restores the foreign keys of the tables that refer to
+    spans. Spans that share the same span_id are deduplicated, and rows that refer
+    to spans that no longer exist are deleted or unlinked.
+    """
+    if not is_partitioned(conn):
+        return
+    conn.execute(text(f"LOCK TABLE {SPANS} IN ACCESS EXCLUSIVE MODE"))
+    indexes, foreign_keys, sequence = _get_definitions(conn)
+    conn.execute(text(f"ALTER TABLE {SPANS} RENAME TO {_PARTITIONED}"))
+    for name, _ in indexes:
+        conn.execute(text(f"ALTER INDEX {name} RENAME TO {_PARTITIONED}_{name}"))
+    conn.execute(
+        text(
+            f"CREATE TABLE {SPANS} (LIKE {_PARTITIONED} INCLUDING DEFAULTS "
+            "INCLUDING CONSTRAINTS INCLUDING STORAGE)"
+        )
+    )
+    conn.execute(
+        text(
+            f"INSERT INTO {SPANS} SELECT DISTINCT ON (span_id) * FROM {_PARTITIONED} "
+            "ORDER BY span_id, id"
+        )
+    )
+    conn.execute(text(f"ALTER TABLE {SPANS} ADD CONSTRAINT pk_spans PRIMARY KEY (id)"))
+    conn.execute(text(f"ALTER TABLE {SPANS} ADD CONSTRAINT uq_spans_span_id UNIQUE (span_id)"))
+    _restore_definitions(conn, indexes, foreign_keys, sequence)
+    conn.execute(text(f"DROP TABLE {_PARTITIONED}"))
+    while delete_orphaned_span_references(conn, 10_000):
+        pass
+    for table, constraint, on_delete in _REFERENCING_FOREIGN_KEYS:
+        conn.execute(
+            text(
+                f"ALTER TABLE {table} ADD CONSTRAINT {constraint} FOREIGN KEY (span_rowid) "
+                f"REFERENCES {SPANS} (id) ON DELETE {on_delete}"
+            )
+        )
+
+
+def get_partitions(conn: Connection) -> list[SpanPartition]:
+    """
+    Returns the partitions of the spans table ordered by their lower bounds, with the
+    default partition last.
+    """
+    # Bounds are rendered in the time zone of the session.
+    conn.execute(text("SET LOCAL TimeZone = 'UTC'"))
+    rows = conn.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": SPANS},
+    ).all()
+    partitions = []
+    for name, bound in rows:
+        if bound == "DEFAULT":
+            partitions.append(SpanPartition(name, None, None, is_default=True))
+            continue
+        match = re.fullmatch(r"FOR VALUES FROM \((.+)\) TO \((.+)\)", bound)
+        assert match, f"Unexpected partition bound of {name}: {bound}"
+        partitions.append(SpanPartition(name, _parse_bound(match[1]), _parse_bound(match[2])))
+    return sorted(
+        partitions,
+        key=lambda p: (p.is_default, p.lower or datetime.min.replace(tzinfo=timezone.utc)),
+    )
+
+
+def create_partitions(
+    conn: Connection,
+    interval: SpanPartitionInterval,
+    until: datetime,
+) -> list[str]:
+    """
+    Creates the partitions of the periods that follow the last partition up to the
+    period that contains `until`, and returns their names. The spans of these
+    periods that were inserted into the default partition are moved into them.
+    """
+    partitions = get_partitions(conn)
+    uppers = [p.upper for p in partitions if p.upper is not None]
+    lower = max(uppers) if uppers else get_period_start(datetime.now(timezone.utc), interval)
+    has_default = any(p.is_default for p in partitions)
+    names = []
+    while lower <= until:
+        upper = get_period_start(lower, interval) + get_period_length(interval)
+        name = f"{SPANS}_p{lower:%Y%m%d}"
+        bounds = f"FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        condition = f"start_time >= '{lower.isoformat()}' AND start_time < '{upper.isoformat()}'"
+        if has_default and conn.scalar(
+            text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {condition})")
+        ):
+            # A partition can't be created while the default partition holds rows that
+            # belong to it, so the rows are moved into a table that is then attached.
+            conn.execute(
+                text(
+                    f"CREATE TABLE {name} "
+                    f"(LIKE {SPANS} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE)"
+                )
+            )
+            conn.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {condition} "
+                    f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+                )
+            )
+            conn.execute(text(f"ALTER TABLE {SPANS} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+        else:
+            conn.execute(text(f"CREATE TABLE {name} PARTITION OF {SPANS} FOR VALUES {bounds}"))
+        names.append(name)
+        lower = upper
+    return names
+
+
+def drop_partitions(conn: Connection, before: datetime) -> list[SpanPartition]:
+    """
+    Drops the partitions of the spans that all start before the given time, and
+    returns them.
+    """
+    dropped = []
+    for partition in get_partitions(conn):
+        if partition.upper is not None and partition.upper <= before:
+            conn.execute(text(f"DROP TABLE {partition.name}"))
+            dropped.append(partition)
+    return dropped
+
+
+def delete_orphaned_span_references(conn: Connection, limit: int) -> int:
+    """
+    Deletes at most `limit` of the annotations, vectors and blob references of each
+    kind that refer to spans that no longer exist, and unlinks the dataset examples
+    from such spans. Returns the number of rows affected.
+    """
+    num_rows = 0
+    for table in (
+        models.SpanAnnotation.__tablename__,
+        models.DocumentAnnotation.__tablename__,
+        models.SpanVector.__tablename__,
+        models.SpanAttributeBlobReference.__tablename__,
+    ):
+        num_rows += conn.execute(
+            text(
+                f"DELETE FROM {table} WHERE id IN (SELECT id FROM {table} t WHERE NOT EXISTS "
+                f"(SELECT 1 FROM {SPANS} s WHERE s.id = t.span_rowid) LIMIT :limit)"
+            ),
+            {"limit": limit},
+        ).rowcount
+    table = models.DatasetExample.__tablename__
+    num_rows += conn.execute(
+        text(
+            f"UPDATE {table} SET span_rowid = NULL WHERE id IN (SELECT id FROM {table} t "
+            f"WHERE t.span_rowid IS NOT NULL AND NOT EXISTS "
+            f"(SELECT 1 FROM {SPANS} s WHERE s.id = t.span_rowid) LIMIT :limit)"
+        ),
+        {"limit": limit},
+    ).rowcount
+    return num_rows
+
+
+def _get_definitions(
+    conn: Connection,
+) -> tuple[list[tuple[str, str]], list[tuple[str, str]], str]:
+    """
+    Returns the names and definitions of the indexes of the spans table, the names
+    and definitions of its foreign keys, and the name of the sequence of its ids.
+    """
+    indexes = [
+        (name, definition)
+        for name, definition in conn.execute(
+            text(
+                "SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+                "JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE i.indrelid = to_regclass(:table)"
+            ),
+            {"table": SPANS},
+        ).tuples()
+    ]
+    foreign_keys = [
+        (name, definition)
+        for name, definition in conn.execute(
+            text(
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE contype = 'f' AND conrelid = to_regclass(:table)"
+            ),
+            {"table": SPANS},
+        ).tuples()
+    ]
+    sequence = conn.scalar(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": SPANS})
+    assert sequence
+    return indexes, foreign_keys, sequence
+
+
+def _restore_definitions(
+    conn: Connection,
+    indexes: list[tuple[str, str]],
+    foreign_keys: list[tuple[str, str]],
+    sequence: str,
+) -> None:
+    # The definitions refer to the spans table by name, which is now the new table,
+    # while the indexes of the primary and unique keys differ between the tables.
+    for name, definition in indexes:
+        if name not in _KEYS:
+            conn.execute(text(definition))
+    for name, definition in foreign_keys:
+        conn.execute(text(f"ALTER TABLE {SPANS} ADD CONSTRAINT {name} {definition}"))
+    conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {SPANS}.id"))
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    value = value.strip("'")
+    if re.search(r"[+-]\d{2}$", value):
+        value += ":00"
+    return datetime.fromisoformat(value).astimezone(timezone.utc)
@@ -0,0 +1,190 @@
+"""
+Span attributes that are frequently filtered on, e.g. `llm.model_name`, and whose
+string values are indexed by expression indexes on the spans table, so that the
+values don't have to be extracted from the attributes of every span. The indexes
+are created at startup (see `ensure_promoted_span_attribute_indexes`) for the
+default attributes and those configured by PHOENIX_PROMOTED_SPAN_ATTRIBUTES.
+
+An expression index is only used by queries that repeat its expression verbatim,
+whereas SQLAlchemy passes the paths of JSON values as bound parameters, so span
+filters refer to promoted attributes by `PromotedSpanAttribute` instead (see
+`phoenix.trace.dsl.filter`).
+"""
+
+import hashlib
+import re
+from collections.abc import Sequence
+from typing import Any
+
+from openinference.semconv.trace import SpanAttributes
+from sqlalchemy import literal_column, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import expression
+from sqlalchemy.types import String
+from typing_extensions import assert_never
+
+from phoenix.config import get_env_promoted_span_attributes
+from phoenix.db import models
+from phoenix.db.helpers import SupportedSQLDialect
+from phoenix.db.partitioning import SPANS, is_partitioned
+
+DEFAULT_PROMOTED_SPAN_ATTRIBUTES: tuple[tuple[str, ...], ...] = tuple(
+    tuple(key.split("."))
+    for key in (
+        SpanAttributes.LLM_MODEL_NAME,
+        SpanAttributes.LLM_PROVIDER,
+        SpanAttributes.SESSION_ID,
+        SpanAttributes.USER_ID,
+        SpanAttributes.OPENINFERENCE_SPAN_KIND,
+    )
+)
+
+
+def get_promoted_span_attributes() -> tuple[tuple[str, ...], ...]:
+    """
+    Returns the keys of the promoted span attributes, i.e. the default ones and
+    those configured by PHOENIX_PROMOTED_SPAN_ATTRIBUTES.
+    """
+    return tuple(
+        dict.fromkeys((*DEFAULT_PROMOTED_SPAN_ATTRIBUTES, *get_env_promoted_span_attributes()))
+    )
+
+
+class PromotedSpanAttribute(expression.FunctionElement[str]):
+    """
+    The string value of a promoted span attribute, i.e. the same as
+    `models.Span.attributes[keys].as_string()`, written the way its index is. The
+    spans table must be in the FROM clause under its own name.
+    """
+
+    # See https://docs.sqlalchemy.org/en/20/core/compiler.html
+    inherit_cache = True
+    type = String()
+    name = "promoted_span_attribute"
+
+    def __init__(self, *keys: str) -> None:
+        super().__init__(
+            literal_column(_get_expression(keys, SupportedSQLDialect.SQLITE, "spans.")),
+            literal_column(_get_expression(keys, SupportedSQLDialect.POSTGRESQL, "spans.")),
+            models.Span.attributes[list(keys)].as_string(),
+        )
+
+
+@compiles(PromotedSpanAttribute)
+def _(element: Any, compiler: Any, **kw: Any) -> Any:
+    # See https://docs.sqlalchemy.org/en/20/core/compiler.html
+    *_, default = list(element.clauses)
+    return compiler.process(default, **kw)
+
+
+@compiles(PromotedSpanAttribute, "sqlite")
+def _(element: Any, compiler: Any, **kw: Any) -> Any:
+    # See https://docs.sqlalchemy.org/en/20/core/compiler.html
+    sqlite, *_ = list(element.clauses)
+    return compiler.process(sqlite, **kw)
+
+
+@compiles(PromotedSpanAttribute, "postgresql")
+def _(element: Any, compiler: Any, **kw: Any) -> Any:
+    # See https://docs.sqlalchemy.org/en/20/core/compiler.html
+    _, postgresql, _ = list(element.clauses)
+    return compiler.process(postgresql, **kw)
+
+
+async def ensure_promoted_span_attribute_indexes(session: AsyncSession) -> None:
+    """
+    Creates the missing indexes of the promoted span attributes. The indexes of
+    attributes that are no longer promoted are left in place.
+
+    On PostgreSQL, the indexes are created concurrently, so that spans can still be
+    inserted by other servers sharing the database while the indexes are built. An
+    index can't be created concurrently inside a transaction, so the session must
+    not have been used yet, and its connection is put in autocommit mode. When the
+    spans table is partitioned (see `phoenix.db.partitioning`), the indexes of its
+    partitions are created concurrently instead.
+    """
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    if dialect is SupportedSQLDialect.SQLITE:
+        for keys in get_promoted_span_attributes():
+            await session.execute(
+                text(
+                    f"CREATE INDEX IF NOT EXISTS {_get_index_name(keys)} "
+                    f"ON spans ({_get_expression(keys, dialect)})"
+                )
+            )
+    elif dialect is SupportedSQLDialect.POSTGRESQL:
+        conn = await session.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+        partitioned = await conn.run_sync(is_partitioned)
+        for keys in get_promoted_span_attributes():
+            name = _get_index_name(keys)
+            expression = _get_expression(keys, dialect)
+            if not partitioned:
+                await _create_index_concurrently(conn, name, SPANS, expression)
+                continue
+            # An index can't be created concurrently on a partitioned table, so the index
+            # of the partitioned table is created on its own, and the indexes of the
+            # partitions are created concurrently and attached to it. The index becomes
+            # valid once those of all the partitions are attached.
+            await conn.execute(
+                text(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {SPANS} ({expression})")
+            )
+            partitions = await conn.scalars(
+                text(
+                    "SELECT c.relname FROM pg_inherits p JOIN pg_class c ON c.oid = p.inhrelid "
+                    "WHERE p.inhparent = to_regclass(:table) AND NOT EXISTS ("
+                    "SELECT 1 FROM pg_inherits x JOIN pg_index i ON i.indexrelid = x.inhrelid "
+                    "WHERE x.inhparent = to_regclass(:name) AND i.indrelid = p.inhrelid)"
+                ),
+                {"table": SPANS, "name": name},
+            )
+            for partition in list(partitions):
+                partition_index = _get_index_name(keys, partition)
+                await _create_index_concurrently(conn, partition_index, partition, expression)
+                await conn.execute(text(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}"))
+    else:
+        assert_never(dialect)
+
+
+async def _create_index_concurrently(
+    conn: AsyncConnection,
+    name: str,
+    table: str,
+    expression: str,
+) -> None:
+    # An index whose concurrent creation was interrupted is left invalid and has to be
+    # dropped before it can be created again.
+    if await conn.scalar(
+        text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name},
+    ):
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    await conn.execute(
+        text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({expression})")
+    )
+
+
+def _get_expression(
+    keys: Sequence[str],
+    dialect: SupportedSQLDialect,
+    prefix: str = "",
+) -> str:
+    if dialect is SupportedSQLDialect.SQLITE:
+        path = "$" + "".join(f'."{key}"' for key in keys)
+        return f"json_extract({prefix}attributes, '{path}')"
+    if dialect is SupportedSQLDialect.POSTGRESQL:
+        return f"({prefix}attributes #>> '{{{','.join(keys)}}}')"
+    assert_never(dialect)
+
+
+def _get_index_name(keys: Sequence[str], table: str = SPANS) -> str:
+    name = f"ix_{table}_attributes_" + re.sub(r"\W", "_", "_".join(keys), flags=re.ASCII)
+    if len(name) > _MAX_IDENTIFIER_LENGTH or name != name.lower():
+        # Unquoted identifiers are case-insensitive, hence the digest of the keys.
+        digest = hashlib.md5(".".join(keys).encode()).hexdigest()[:8]
+        name = f"{name[: _MAX_IDENTIFIER_LENGTH - 9].lower()}_{digest}"
+    return name
+
+
+# The maximum length of identifiers on PostgreSQL.
+_MAX_IDENTIFIER_LENGTH = 63
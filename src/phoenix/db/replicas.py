@@ -0,0 +1,67 @@
+"""
+Read replicas of PostgreSQL databases (see PHOENIX_SQL_DATABASE_READ_URL), which
+serve the queries that don't write for as long as they keep up with the primary
+database. Their replay lag is checked periodically (see `ReplicaLag`), and the
+queries go to the primary database while a replica lags behind by more than
+PHOENIX_SQL_DATABASE_READ_MAX_LAG_SECONDS or can't be reached.
+"""
+
+import logging
+from time import monotonic
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# The lag is zero when everything that has been received has also been replayed,
+# since the time of the last replayed transaction only grows while the primary
+# database is idle.
+_LAG_SECONDS = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE coalesce("
+    "extract(epoch FROM now() - pg_last_xact_replay_timestamp())::float8, "
+    "'Infinity'::float8) "
+    "END"
+)
+
+
+class ReplicaLag:
+    """
+    Tells whether the replay lag of a read replica is acceptable, checking it at
+    most once per interval.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        max_lag_seconds: float,
+        check_interval_seconds: float = 5,
+    ) -> None:
+        self._engine = engine
+        self._max_lag_seconds = max_lag_seconds
+        self._check_interval_seconds = check_interval_seconds
+        self._checked_at = -float("inf")
+        self._acceptable = False
+
+    async def is_acceptable(self) -> bool:
+        if monotonic() - self._checked_at < self._check_interval_seconds:
+            return self._acceptable
+        self._checked_at = monotonic()
+        try:
+            async with self._engine.connect() as conn:
+                lag_seconds = await conn.scalar(_LAG_SECONDS)
+        except Exception:
+            logger.exception("Failed to get the replay lag of the read replica")
+            self._acceptable = False
+        else:
+            acceptable = lag_seconds is not None and lag_seconds <= self._max_lag_seconds
+            if acceptable != self._acceptable:
+                logger.info(
+                    f"Reading from the {'read replica' if acceptable else 'primary database'} "
+                    f"(replay lag of the read replica: {lag_seconds} seconds)"
+                )
+            self._acceptable = acceptable
+        return self._acceptable
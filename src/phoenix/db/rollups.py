@@ -0,0 +1,460 @@
+"""
+Hourly rollups of the spans of each project (see `models.SpanRollup`), from which
+the counts, token sums and time bounds of the spans of a project are computed over
+whole hours without scanning the spans table.
+
+Rollups are incremented in the same transaction as the spans they count (see
+`insert_span_rollups` and `SpanRollups`), and are recomputed from the remaining
+spans for the hours of the spans that are deleted (see `refresh_span_rollups`).
+Aggregates over a time range are taken from the rollups of the whole hours in the
+range, and from the spans themselves for the partial hours at either end (see
+`split_time_range`).
+
+The latency sketches of the spans and traces of each project (see
+`models.LatencySketchBin`) are maintained along with the rollups, per hour of the
+start times of the spans and traces. Since the latency of a trace grows with its
+spans, a trace is moved from its old bin to its new one when it is extended (see
+`SpanRollups.add_trace`).
+"""
+
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from typing import Any, Literal, NamedTuple, Optional
+
+from sqlalchemy import (
+    ColumnElement,
+    Insert,
+    Select,
+    SQLColumnExpression,
+    and_,
+    case,
+    delete,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import insert as insert_postgresql
+from sqlalchemy.dialects.sqlite import insert as insert_sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing_extensions import assert_never
+
+from phoenix.db import models
+from phoenix.db.helpers import SupportedSQLDialect
+from phoenix.db.latency_sketches import get_index, get_index_expression
+
+ROLLUP_PERIOD = timedelta(hours=1)
+
+_KEY = ("project_rowid", "hour", "span_kind", "is_root", "status_code")
+_COLUMNS = (
+    *_KEY,
+    "span_count",
+    "llm_token_count_prompt",
+    "llm_token_count_completion",
+    "min_start_time",
+    "max_end_time",
+)
+_BIN_KEY = ("project_rowid", "hour", "kind", "bin_index")
+_BIN_COLUMNS = (*_BIN_KEY, "count")
+
+
+class RollupKey(NamedTuple):
+    project_rowid: int
+    hour: datetime
+    span_kind: str
+    is_root: bool
+    status_code: str
+
+
+class BinKey(NamedTuple):
+    project_rowid: int
+    hour: datetime
+    kind: Literal["span", "trace"]
+    bin_index: int
+
+
+class HourRange(NamedTuple):
+    lower: Optional[datetime]
+    """
+    Inclusive lower bound of the hours, or None if it is unbounded.
+    """
+    upper: Optional[datetime]
+    """
+    Exclusive upper bound of the hours, or None if it is unbounded.
+    """
+
+    def __call__(
+        self,
+        stmt: Select[Any],
+        hour: SQLColumnExpression[datetime] = models.SpanRollup.hour,
+    ) -> Select[Any]:
+        """
+        Restricts a statement on the rollups, or on the latency sketches, to the hours
+        in the range.
+        """
+        if self.lower is not None:
+            stmt = stmt.where(self.lower <= hour)
+        if self.upper is not None:
+            stmt = stmt.where(hour < self.upper)
+        return stmt
+
+
+def get_hour(t: datetime) -> datetime:
+    """
+    Returns the start of the hour that contains the time, in UTC.
+    """
+    t = t.astimezone(timezone.utc) if t.tzinfo else t.replace(tzinfo=timezone.utc)
+    return t.replace(minute=0, second=0, microsecond=0)
+
+
+def split_time_range(
+    start_time: Optional[datetime],
+    end_time: Optional[datetime],
+    start_column: SQLColumnExpression[datetime] = models.Span.start_time,
+) -> tuple[Optional[HourRange], Optional[ColumnElement[bool]]]:
+    """
+    Splits a half-open time range of span start times, or of the start times in
+    another column, into the range of the whole hours in it, if any, whose spans are
+    counted by the rollups, and the condition satisfied by the spans that start in
+    the remaining partial hours, if any.
+    """
+    lower = None if start_time is None else get_hour(start_time)
+    if lower is not None and start_time is not None and lower < start_time:
+        lower += ROLLUP_PERIOD
+    upper = None if end_time is None else get_hour(end_time)
+    if lower is not None and upper is not None and upper <= lower:
+        conditions = [start_column < end_time] if end_time is not None else []
+        if start_time is not None:
+            conditions.append(start_time <= start_column)
+        return None, and_(*conditions)
+    edges: list[ColumnElement[bool]] = []
+    if start_time is not None and lower is not None and start_time < lower:
+        edges.append(and_(start_time <= start_column, start_column < lower))
+    if end_time is not None and upper is not None and upper < end_time:
+        edges.append(and_(upper <= start_column, start_column < end_time))
+    return HourRange(lower, upper), or_(*edges) if edges else None
+
+
+class SpanRollups:
+    """
+    Accumulates the rollups of spans, which are then added to the rollups table with
+    a single statement (see `upsert`).
+    """
+
+    def __init__(self) -> None:
+        self._rows: dict[RollupKey, dict[str, Any]] = {}
+        self._bins: dict[BinKey, int] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._rows) or any(self._bins.values())
+
+    def add(
+        self,
+        project_rowid: int,
+        start_time: datetime,
+        end_time: datetime,
+        span_kind: str,
+        is_root: bool,
+        status_code: str,
+        llm_token_count_prompt: Optional[int],
+        llm_token_count_completion: Optional[int],
+    ) -> None:
+        key = RollupKey(project_rowid, get_hour(start_time), span_kind, is_root, status_code)
+        if (row := self._rows.get(key)) is None:
+            self._rows[key] = row = {
+                **key._asdict(),
+                "span_count": 0,
+                "llm_token_count_prompt": 0,
+                "llm_token_count_completion": 0,
+                "min_start_time": start_time,
+                "max_end_time": end_time,
+            }
+        row["span_count"] += 1
+        row["llm_token_count_prompt"] += llm_token_count_prompt or 0
+        row["llm_token_count_completion"] += llm_token_count_completion or 0
+        row["min_start_time"] = min(row["min_start_time"], start_time)
+        row["max_end_time"] = max(row["max_end_time"], end_time)
+        self._add_bin(project_rowid, start_time, end_time, "span", 1)
+
+    def add_trace(
+        self,
+        project_rowid: int,
+        start_time: datetime,
+        end_time: datetime,
+        count: int = 1,
+    ) -> None:
+        """
+        Adds a trace to the latency sketches, or removes it if `count` is negative,
+        e.g. to move a trace that is extended from its old bin to its new one.
+        """
+        self._add_bin(project_rowid, start_time, end_time, "trace", count)
+
+    def _add_bin(
+        self,
+        project_rowid: int,
+        start_time: datetime,
+        end_time: datetime,
+        kind: Literal["span", "trace"],
+        count: int,
+    ) -> None:
+        # Rounded as it is in the database (see `models.LatencyMs`).
+        latency_ms = round((end_time - start_time).total_seconds() * 1000, 1)
+        key = BinKey(project_rowid, get_hour(start_time), kind, get_index(latency_ms))
+        self._bins[key] = self._bins.get(key, 0) + count
+
+    def add_span(self, project_rowid: int, span: models.Span) -> None:
+        self.add(
+            project_rowid,
+            span.start_time,
+            span.end_time,
+            span.span_kind,
+            span.parent_id is None,
+            span.status_code,
+            span.llm_token_count_prompt,
+            span.llm_token_count_completion,
+        )
+
+    async def upsert(self, session: AsyncSession) -> None:
+        """
+        Adds the accumulated rollups to those in the table.
+        """
+        dialect = SupportedSQLDialect(session.bind.dialect.name)
+        if self._rows:
+            await session.execute(_upsert(dialect, list(self._rows.values())))
+            self._rows.clear()
+        if bins := [
+            {**key._asdict(), "count": count} for key, count in self._bins.items() if count
+        ]:
+            await session.execute(_upsert_bins(dialect, bins))
+        self._bins.clear()
+
+
+async def insert_span_rollups(session: AsyncSession, spans: Iterable[models.Span]) -> None:
+    """
+    Adds the spans, which must have been flushed along with their traces, to the
+    rollups, and their traces, which must be new, to the latency sketches.
+    """
+    rollups = SpanRollups()
+    traces: dict[int, models.Trace] = {}
+    for span in spans:
+        rollups.add_span(span.trace.project_rowid, span)
+        traces[span.trace.id] = span.trace
+    for trace in traces.values():
+        rollups.add_trace(trace.project_rowid, trace.start_time, trace.end_time)
+    await rollups.upsert(session)
+
+
+async def refresh_span_rollups(
+    session: AsyncSession,
+    project_rowid: Optional[int] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+) -> None:
+    """
+    Recomputes from the spans the rollups and the latency sketches of the project, or
+    of every project, for the hours from the one that contains `start_time` to the one
+    that contains `end_time`, e.g. after the spans in that time range are deleted.
+    """
+    dialect = SupportedSQLDialect(session.bind.dialect.name)
+    lower = None if start_time is None else get_hour(start_time)
+    upper = None if end_time is None else get_hour(end_time) + ROLLUP_PERIOD
+    for table in (models.SpanRollup, models.LatencySketchBin):
+        stmt_delete = delete(table)
+        if project_rowid is not None:
+            stmt_delete = stmt_delete.where(table.project_rowid == project_rowid)
+        if lower is not None:
+            stmt_delete = stmt_delete.where(lower <= table.hour)
+        if upper is not None:
+            stmt_delete = stmt_delete.where(table.hour < upper)
+        await session.execute(stmt_delete)
+    await session.execute(
+        insert(models.SpanRollup).from_select(
+            _COLUMNS,
+            select_span_rollups(dialect).where(
+                *_in_range(models.Span.start_time, project_rowid, lower, upper)
+            ),
+        )
+    )
+    start_columns: dict[Literal["span", "trace"], SQLColumnExpression[datetime]] = {
+        "span": models.Span.start_time,
+        "trace": models.Trace.start_time,
+    }
+    for kind, start_column in start_columns.items():
+        await session.execute(
+            insert(models.LatencySketchBin).from_select(
+                _BIN_COLUMNS,
+                select_latency_sketch_bins(
+                    dialect, kind, *_in_range(start_column, project_rowid, lower, upper)
+                ),
+            )
+        )
+
+
+async def refresh_span_rollups_of_traces(
+    session: AsyncSession,
+    traces: Iterable[tuple[int, datetime, datetime]],
+) -> None:
+    """
+    Recomputes the rollups of the hours of the spans of traces, given as tuples of
+    their project rowids, start times and end times, e.g. after they are deleted.
+    """
+    time_ranges: dict[int, tuple[datetime, datetime]] = {}
+    for project_rowid, start_time, end_time in traces:
+        if (time_range := time_ranges.get(project_rowid)) is not None:
+            start_time = min(start_time, time_range[0])
+            end_time = max(end_time, time_range[1])
+        time_ranges[project_rowid] = (start_time, end_time)
+    for project_rowid, (start_time, end_time) in time_ranges.items():
+        await refresh_span_rollups(session, project_rowid, start_time, end_time)
+
+
+def select_span_rollups(dialect: SupportedSQLDialect) -> Select[Any]:
+    """
+    Returns the rollups of the spans, with the columns of the rollups table in the
+    order of `_COLUMNS`.
+    """
+    hour = get_hour_expression(dialect, models.Span.start_time)
+    is_root = models.Span.parent_id.is_(None)
+    return (
+        select(
+            models.Trace.project_rowid,
+            hour,
+            models.Span.span_kind,
+            is_root,
+            models.Span.status_code,
+            func.count(),
+            func.coalesce(func.sum(models.Span.llm_token_count_prompt), 0),
+            func.coalesce(func.sum(models.Span.llm_token_count_completion), 0),
+            func.min(models.Span.start_time),
+            func.max(models.Span.end_time),
+        )
+        .join_from(models.Span, models.Trace)
+        .group_by(
+            models.Trace.project_rowid,
+            hour,
+            models.Span.span_kind,
+            is_root,
+            models.Span.status_code,
+        )
+    )
+
+
+def select_latency_sketch_bins(
+    dialect: SupportedSQLDialect,
+    kind: Literal["span", "trace"],
+    *whereclause: ColumnElement[bool],
+) -> Select[Any]:
+    """
+    Returns the bins of the latency sketches of the spans or of the traces that
+    satisfy the conditions, with the columns of the latency sketch bins table in the
+    order of `_BIN_COLUMNS`.
+    """
+    if kind == "span":
+        start_time, latency_ms = models.Span.start_time, models.Span.latency_ms
+    elif kind == "trace":
+        start_time, latency_ms = models.Trace.start_time, models.Trace.latency_ms
+    else:
+        assert_never(kind)
+    # The latencies are computed in a subquery, since their expression has bound
+    # parameters, which PostgreSQL does not recognize as the same when grouped by.
+    stmt = select(
+        models.Trace.project_rowid,
+        get_hour_expression(dialect, start_time).label("hour"),
+        get_index_expression(latency_ms).label("bin_index"),
+    ).where(*whereclause)
+    if kind == "span":
+        stmt = stmt.join_from(models.Span, models.Trace)
+    latencies = stmt.subquery()
+    return select(
+        latencies.c.project_rowid,
+        latencies.c.hour,
+        literal_column(f"'{kind}'").label("kind"),
+        latencies.c.bin_index,
+        func.count().label("count"),
+    ).group_by(latencies.c.project_rowid, latencies.c.hour, latencies.c.bin_index)
+
+
+def get_hour_expression(
+    dialect: SupportedSQLDialect,
+    column: SQLColumnExpression[datetime],
+) -> ColumnElement[Any]:
+    """
+    Returns the SQL expression of the start of the hour of a timestamp, in UTC, which
+    is free of bound parameters so that it can be grouped by.
+    """
+    if dialect is SupportedSQLDialect.POSTGRESQL:
+        utc: ColumnElement[str] = literal_column("'UTC'")
+        return func.timezone(
+            utc, func.date_trunc(literal_column("'hour'"), func.timezone(utc, column))
+        )
+    if dialect is SupportedSQLDialect.SQLITE:
+        # The format in which SQLAlchemy stores timestamps in SQLite.
+        return func.strftime(literal_column("'%Y-%m-%d %H:00:00.000000'"), column)
+    assert_never(dialect)
+
+
+def _in_range(
+    start_column: SQLColumnExpression[datetime],
+    project_rowid: Optional[int],
+    lower: Optional[datetime],
+    upper: Optional[datetime],
+) -> list[ColumnElement[bool]]:
+    conditions = []
+    if project_rowid is not None:
+        conditions.append(models.Trace.project_rowid == project_rowid)
+    if lower is not None:
+        conditions.append(lower <= start_column)
+    if upper is not None:
+        conditions.append(start_column < upper)
+    return conditions
+
+
+def _upsert(dialect: SupportedSQLDialect, records: list[dict[str, Any]]) -> Insert:
+    table = models.SpanRollup
+    if dialect is SupportedSQLDialect.POSTGRESQL:
+        stmt_postgresql = insert_postgresql(table).values(records)
+        return stmt_postgresql.on_conflict_do_update(
+            constraint="uq_span_rollups_key",
+            set_=_accumulate(stmt_postgresql.excluded),
+        )
+    if dialect is SupportedSQLDialect.SQLITE:
+        stmt_sqlite = insert_sqlite(table).values(records)
+        return stmt_sqlite.on_conflict_do_update(_KEY, set_=_accumulate(stmt_sqlite.excluded))
+    assert_never(dialect)
+
+
+def _upsert_bins(dialect: SupportedSQLDialect, records: list[dict[str, Any]]) -> Insert:
+    table = models.LatencySketchBin
+    if dialect is SupportedSQLDialect.POSTGRESQL:
+        stmt_postgresql = insert_postgresql(table).values(records)
+        return stmt_postgresql.on_conflict_do_update(
+            constraint="uq_latency_sketch_bins_key",
+            set_={"count": table.count + stmt_postgresql.excluded.count},
+        )
+    if dialect is SupportedSQLDialect.SQLITE:
+        stmt_sqlite = insert_sqlite(table).values(records)
+        return stmt_sqlite.on_conflict_do_update(
+            _BIN_KEY,
+            set_={"count": table.count + stmt_sqlite.excluded.count},
+        )
+    assert_never(dialect)
+
+
+def _accumulate(excluded: Any) -> dict[str, Any]:
+    table = models.SpanRollup
+    return {
+        "span_count": table.span_count + excluded.span_count,
+        "llm_token_count_prompt": table.llm_token_count_prompt + excluded.llm_token_count_prompt,
+        "llm_token_count_completion": (
+            table.llm_token_count_completion + excluded.llm_token_count_completion
+        ),
+        "min_start_time": case(
+            (excluded.min_start_time < table.min_start_time, excluded.min_start_time),
+            else_=table.min_start_time,
+        ),
+        "max_end_time": case(
+            (table.max_end_time < excluded.max_end_time, excluded.max_end_time),
+            else_=table.max_end_time,
+        ),
+    }
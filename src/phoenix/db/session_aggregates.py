@@ -0,0 +1,369 @@
+"""
+Aggregates of the traces of each project session that are stored on the session
+itself, i.e. its numbers of traces and error traces, its token counts, and
+previews of the input of its first trace and the output of its last trace (see
+`models.ProjectSession`), so that sessions can be listed and sorted without
+reading their traces and spans.
+
+The counts are derived from the cumulative counts of the root spans of the traces,
+which are looked up by `models.Trace.root_span_rowid` (see
+`phoenix.db.trace_aggregates`). As spans are inserted, the counts are incremented
+by the changes in what their traces contribute to their sessions, and the previews
+are only rewritten when a changed trace is the first or the last of its session
+(see `add_to_session_aggregates`). Since traces only ever start earlier and end
+later as spans are inserted, the first trace is the one that starts first and the
+last trace is the one that ends last. When traces are deleted, the aggregates are
+recomputed instead (see `refresh_session_aggregates`). Only the beginnings of the
+input and output values are kept, since they are only ever shown as previews.
+"""
+
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from typing import Any, Literal, NamedTuple, Optional
+
+from openinference.semconv.trace import SpanAttributes
+from sqlalchemy import ColumnElement, and_, bindparam, exists, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.functions import coalesce
+from typing_extensions import assert_never
+
+from phoenix.db import models
+from phoenix.db.compression import decompress_text
+from phoenix.db.insertion.helpers import MAX_BIND_PARAMETERS, chunks
+from phoenix.db.span_attribute_blobs import get_blob_hash_from_text, get_blobs
+
+MAX_PREVIEW_LENGTH = 1000
+"""
+Number of characters of the input and output values that are kept as previews.
+"""
+
+
+class SessionContribution(NamedTuple):
+    """
+    What a trace contributes to the aggregates of its session.
+    """
+
+    project_session_rowid: int
+    start_time: datetime
+    end_time: datetime
+    root_span_rowid: Optional[int]
+    num_error_traces: int
+    llm_token_count_prompt: int
+    llm_token_count_completion: int
+
+
+async def get_session_contributions(
+    session: AsyncSession,
+    trace_rowids: Iterable[int],
+) -> dict[int, SessionContribution]:
+    """
+    Returns what each of the traces that belong to a session contributes to the
+    aggregates of its session, by trace rowid.
+    """
+    contributions: dict[int, SessionContribution] = {}
+    for chunk in chunks(set(trace_rowids), MAX_BIND_PARAMETERS):
+        async for trace_rowid, *contribution in await session.stream(
+            select(
+                models.Trace.id,
+                models.Trace.project_session_rowid,
+                models.Trace.start_time,
+                models.Trace.end_time,
+                models.Trace.root_span_rowid,
+                coalesce(models.Span.cumulative_error_count, 0),
+                coalesce(models.Span.cumulative_llm_token_count_prompt, 0),
+                coalesce(models.Span.cumulative_llm_token_count_completion, 0),
+            )
+            .outerjoin_from(
+                models.Trace, models.Span, models.Span.id == models.Trace.root_span_rowid
+            )
+            .where(models.Trace.id.in_(chunk))
+            .where(models.Trace.project_session_rowid.isnot(None))
+        ):
+            project_session_rowid, start_time, end_time, root_span_rowid, errors, *tokens = (
+                contribution
+            )
+            contributions[trace_rowid] = SessionContribution(
+                project_session_rowid,
+                start_time,
+                end_time,
+                root_span_rowid,
+                int(errors > 0),
+                *tokens,
+            )
+    return contributions
+
+
+async def add_to_session_aggregates(
+    session: AsyncSession,
+    before: Mapping[int, SessionContribution],
+    after: Mapping[int, SessionContribution],
+) -> None:
+    """
+    Adds the changes in what traces contribute to their sessions, given the
+    contributions of the traces by trace rowid before and after spans were inserted,
+    to the aggregates of their sessions, and rewrites the previews of the sessions
+    whose first or last trace has changed.
+    """
+    deltas: defaultdict[int, tuple[int, int, int, int]] = defaultdict(lambda: (0, 0, 0, 0))
+    preview_candidates: dict[Literal["first_input", "last_output"], set[int]] = {
+        "first_input": set(),
+        "last_output": set(),
+    }
+    for trace_rowid, contribution in after.items():
+        if (previous := before.get(trace_rowid)) == contribution:
+            continue
+        if previous is not None:
+            deltas[previous.project_session_rowid] = _add_counts(
+                deltas[previous.project_session_rowid], _get_counts(previous), -1
+            )
+        deltas[contribution.project_session_rowid] = _add_counts(
+            deltas[contribution.project_session_rowid], _get_counts(contribution)
+        )
+        if (
+            previous is None
+            or previous.project_session_rowid != contribution.project_session_rowid
+            or previous.root_span_rowid != contribution.root_span_rowid
+        ):
+            preview_candidates["first_input"].add(trace_rowid)
+            preview_candidates["last_output"].add(trace_rowid)
+        else:
+            if previous.start_time != contribution.start_time:
+                preview_candidates["first_input"].add(trace_rowid)
+            if previous.end_time != contribution.end_time:
+                preview_candidates["last_output"].add(trace_rowid)
+    if changes := {rowid: delta for rowid, delta in deltas.items() if any(delta)}:
+        # The statement goes through the connection to bypass ORM bulk UPDATE semantics.
+        connection = await session.connection()
+        await connection.execute(
+            update(models.ProjectSession)
+            .where(models.ProjectSession.id == bindparam("_id"))
+            .values(
+                num_traces=models.ProjectSession.num_traces + bindparam("_num_traces"),
+                num_error_traces=models.ProjectSession.num_error_traces
+                + bindparam("_num_error_traces"),
+                llm_token_count_prompt=models.ProjectSession.llm_token_count_prompt
+                + bindparam("_prompt"),
+                llm_token_count_completion=models.ProjectSession.llm_token_count_completion
+                + bindparam("_completion"),
+            ),
+            [
+                dict(
+                    _id=session_rowid,
+                    _num_traces=num_traces,
+                    _num_error_traces=num_error_traces,
+                    _prompt=prompt,
+                    _completion=completion,
+                )
+                for session_rowid, (
+                    num_traces,
+                    num_error_traces,
+                    prompt,
+                    completion,
+                ) in changes.items()
+            ],
+        )
+    for kind, trace_rowids in preview_candidates.items():
+        session_rowids: set[int] = set()
+        for chunk in chunks(trace_rowids, MAX_BIND_PARAMETERS):
+            session_rowids.update(
+                await session.scalars(
+                    select(models.Trace.project_session_rowid)
+                    .where(models.Trace.id.in_(chunk))
+                    .where(_is_first_or_last_trace(kind))
+                )
+            )
+        await _write_previews(session, kind, session_rowids)
+
+
+async def refresh_session_aggregates(
+    session: AsyncSession,
+    *whereclause: ColumnElement[bool],
+) -> None:
+    """
+    Recomputes from the traces the aggregates of the sessions that satisfy the
+    conditions.
+    """
+    await session.execute(
+        update(models.ProjectSession)
+        .where(*whereclause)
+        .values(**_get_session_counts())
+        .execution_options(synchronize_session=False)
+    )
+    session_rowids = set(
+        await session.scalars(select(models.ProjectSession.id).where(*whereclause))
+    )
+    await _write_previews(session, "first_input", session_rowids)
+    await _write_previews(session, "last_output", session_rowids)
+
+
+async def refresh_session_aggregates_of_traces(
+    session: AsyncSession,
+    project_session_rowids: Iterable[Optional[int]],
+) -> None:
+    """
+    Recomputes the aggregates of the sessions of traces that have been inserted,
+    updated or deleted, given the project_session_rowid of each trace.
+    """
+    rowids = {rowid for rowid in project_session_rowids if rowid is not None}
+    for chunk in chunks(rowids, MAX_BIND_PARAMETERS):
+        await refresh_session_aggregates(session, models.ProjectSession.id.in_(chunk))
+
+
+def _get_session_counts() -> dict[str, Any]:
+    traces = select().where(models.Trace.project_session_rowid == models.ProjectSession.id)
+    root_spans = traces.join_from(
+        models.Trace, models.Span, models.Span.id == models.Trace.root_span_rowid
+    )
+    return {
+        "num_traces": traces.add_columns(func.count()).scalar_subquery(),
+        "num_error_traces": (
+            root_spans.add_columns(func.count()).where(models.Span.cumulative_error_count > 0)
+        ).scalar_subquery(),
+        "llm_token_count_prompt": root_spans.add_columns(
+            coalesce(func.sum(models.Span.cumulative_llm_token_count_prompt), 0)
+        ).scalar_subquery(),
+        "llm_token_count_completion": root_spans.add_columns(
+            coalesce(func.sum(models.Span.cumulative_llm_token_count_completion), 0)
+        ).scalar_subquery(),
+    }
+
+
+def _get_counts(contribution: SessionContribution) -> tuple[int, int, int, int]:
+    return (
+        1,
+        contribution.num_error_traces,
+        contribution.llm_token_count_prompt,
+        contribution.llm_token_count_completion,
+    )
+
+
+def _add_counts(
+    counts: tuple[int, int, int, int],
+    other: tuple[int, int, int, int],
+    sign: int = 1,
+) -> tuple[int, int, int, int]:
+    a, b, c, d = counts
+    w, x, y, z = other
+    return a + sign * w, b + sign * x, c + sign * y, d + sign * z
+
+
+def _get_trace_order(
+    kind: Literal["first_input", "last_output"],
+) -> list[ColumnElement[Any]]:
+    if kind == "first_input":
+        return [models.Trace.start_time.asc(), models.Trace.id.asc()]
+    if kind == "last_output":
+        return [models.Trace.end_time.desc(), models.Trace.id.desc()]
+    assert_never(kind)
+
+
+def _is_first_or_last_trace(kind: Literal["first_input", "last_output"]) -> ColumnElement[bool]:
+    """
+    Returns the condition that a trace is the first trace of its session, or the
+    last one, in the order of `_get_trace_order`.
+    """
+    other = aliased(models.Trace)
+    if kind == "first_input":
+        precedes = or_(
+            other.start_time < models.Trace.start_time,
+            and_(other.start_time == models.Trace.start_time, other.id < models.Trace.id),
+        )
+    elif kind == "last_output":
+        precedes = or_(
+            other.end_time > models.Trace.end_time,
+            and_(other.end_time == models.Trace.end_time, other.id > models.Trace.id),
+        )
+    else:
+        assert_never(kind)
+    return ~exists().where(
+        other.project_session_rowid == models.Trace.project_session_rowid, precedes
+    )
+
+
+async def _write_previews(
+    session: AsyncSession,
+    kind: Literal["first_input", "last_output"],
+    session_rowids: Iterable[int],
+) -> None:
+    """
+    Rewrites the previews of the given kind of the sessions from their traces.
+    """
+    # The statement goes through the connection to bypass ORM bulk UPDATE semantics.
+    connection = await session.connection()
+    for chunk in chunks(session_rowids, MAX_BIND_PARAMETERS):
+        previews = await _get_preview_values(session, kind, chunk)
+        await connection.execute(
+            update(models.ProjectSession)
+            .where(models.ProjectSession.id == bindparam("_id"))
+            .values(
+                {
+                    f"{kind}_value": bindparam("_value"),
+                    f"{kind}_mime_type": bindparam("_mime_type"),
+                }
+            ),
+            [
+                dict(_id=session_rowid, _value=value, _mime_type=mime_type)
+                for session_rowid in chunk
+                for value, mime_type in [previews.get(session_rowid, (None, None))]
+            ],
+        )
+
+
+async def _get_preview_values(
+    session: AsyncSession,
+    kind: Literal["first_input", "last_output"],
+    session_rowids: Iterable[int],
+) -> dict[int, tuple[str, Optional[str]]]:
+    """
+    Returns the truncated input value of the root span of the first trace of each
+    session, or the output value of the root span of the last trace, along with
+    its mime type, by session rowid.
+    """
+    if kind == "first_input":
+        value, mime_type = INPUT_VALUE, INPUT_MIME_TYPE
+    elif kind == "last_output":
+        value, mime_type = OUTPUT_VALUE, OUTPUT_MIME_TYPE
+    else:
+        assert_never(kind)
+    subq = (
+        select(
+            models.Trace.project_session_rowid.label("id_"),
+            models.Span.attributes[value].as_string().label("value"),
+            models.Span.attributes[mime_type].as_string().label("mime_type"),
+            func.row_number()
+            .over(partition_by=models.Trace.project_session_rowid, order_by=_get_trace_order(kind))
+            .label("rank"),
+        )
+        .join_from(models.Trace, models.Span, models.Span.id == models.Trace.root_span_rowid)
+        .where(models.Trace.project_session_rowid.in_(list(session_rowids)))
+    ).subquery()
+    stmt = (
+        select(subq.c.id_, subq.c.value, subq.c.mime_type)
+        .filter_by(rank=1)
+        .where(subq.c.value.isnot(None))
+    )
+    result: dict[int, tuple[str, Optional[str]]] = {
+        id_: (decompress_text(value), mime_type)
+        async for id_, value, mime_type in await session.stream(stmt)
+    }
+    hashes = {
+        id_: blob_hash
+        for id_, (value, _) in result.items()
+        if (blob_hash := get_blob_hash_from_text(value)) is not None
+    }
+    if hashes:
+        blobs = await get_blobs(session, set(hashes.values()))
+        for id_, blob_hash in hashes.items():
+            if (blob := blobs.get(blob_hash)) is not None:
+                result[id_] = (blob, result[id_][1])
+    return {
+        id_: (value[:MAX_PREVIEW_LENGTH], mime_type) for id_, (value, mime_type) in result.items()
+    }
+
+
+INPUT_VALUE = SpanAttributes.INPUT_VALUE.split(".")
+INPUT_MIME_TYPE = SpanAttributes.INPUT_MIME_TYPE.split(".")
+OUTPUT_VALUE = SpanAttributes.OUTPUT_VALUE.split(".")
+OUTPUT_MIME_TYPE = SpanAttributes.OUTPUT_MIME_TYPE.split(".")
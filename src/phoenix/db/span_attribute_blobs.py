@@ -0,0 +1,270 @@
+"""
+Opt-in content-addressed deduplication of the large string values in span
+attributes, e.g. system prompts, prompt templates and tool schemas that repeat
+verbatim across many spans.
+
+At ingestion, each such string at least as long as the configured threshold is
+stored once in the `span_attribute_blobs` table, keyed by its SHA-256 digest,
+and is replaced in the attributes by `{"__blob__": "<hex digest>"}`. Readers
+resolve the references through a process-wide LRU cache (see `get_blobs`), so
+that the values shared by many spans are loaded from the database only once.
+Since blobs are immutable, cached values never go stale. Filter conditions on
+deduplicated values are evaluated on the resolved values after the fact (see
+`SpanFilter.post_filter`).
+
+The references of the spans to their blobs are also recorded in a table of their
+own, whose rows are deleted along with the spans, so that the blobs that are no
+longer referenced can be deleted once the spans are (see
+`delete_unreferenced_blobs`).
+"""
+
+import hashlib
+import json
+from collections.abc import Iterable, Mapping, Sequence
+from itertools import islice
+from threading import Lock
+from typing import Any, Optional, Union
+
+from cachetools import LRUCache
+from sqlalchemy import Select, delete, exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing_extensions import TypeAlias
+
+from phoenix.db import models
+
+BlobHash: TypeAlias = str
+
+BLOB_REFERENCE_KEY = "__blob__"
+
+DEDUPLICATED_PATHS: tuple[tuple[str, ...], ...] = (
+    ("input", "value"),
+    ("output", "value"),
+    ("llm", "prompt_template", "template"),
+    ("llm", "input_messages", "*", "message", "content"),
+    ("llm", "output_messages", "*", "message", "content"),
+    ("llm", "tools", "*", "tool", "json_schema"),
+    ("retrieval", "documents", "*", "document", "content"),
+)
+"""
+Paths of the attributes that may be deduplicated, where `*` matches any position
+in a list.
+"""
+
+_BATCH_SIZE = 1000
+
+
+class BlobCache:
+    """
+    Thread-safe LRU cache of blob values by hash, bounded by the total number of
+    characters held.
+    """
+
+    def __init__(self, max_chars: int = 64 * 1024 * 1024) -> None:
+        self._cache: LRUCache[BlobHash, str] = LRUCache(maxsize=max_chars, getsizeof=len)
+        self._lock = Lock()
+
+    def get_many(self, hashes: Iterable[BlobHash]) -> tuple[dict[BlobHash, str], set[BlobHash]]:
+        """
+        Returns the cached values along with the hashes that aren't cached.
+        """
+        found: dict[BlobHash, str] = {}
+        missing: set[BlobHash] = set()
+        with self._lock:
+            for blob_hash in hashes:
+                if (value := self._cache.get(blob_hash)) is not None:
+                    found[blob_hash] = value
+                else:
+                    missing.add(blob_hash)
+        return found, missing
+
+    def put_many(self, blobs: Mapping[BlobHash, str]) -> None:
+        with self._lock:
+            for blob_hash, value in blobs.items():
+                if len(value) <= self._cache.maxsize:
+                    self._cache[blob_hash] = value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+BLOB_CACHE = BlobCache()
+"""
+The cache shared by all readers of the process.
+"""
+
+
+def extract_blobs(
+    attributes: Mapping[str, Any],
+    threshold: int,
+) -> tuple[Mapping[str, Any], dict[BlobHash, str]]:
+    """
+    Returns the attributes with every deduplicable string of at least `threshold`
+    characters replaced by a reference, along with the strings keyed by their
+    hashes. The attributes are copied only along the paths of the strings that
+    are replaced.
+    """
+    blobs: dict[BlobHash, str] = {}
+    for path in DEDUPLICATED_PATHS:
+        attributes = _extract(attributes, path, threshold, blobs)
+    return attributes, blobs
+
+
+def hash_blob(value: str) -> BlobHash:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def is_blob_reference(value: Any) -> bool:
+    return isinstance(value, Mapping) and isinstance(value.get(BLOB_REFERENCE_KEY), str)
+
+
+def has_blob_references(value: Any) -> bool:
+    if is_blob_reference(value):
+        return True
+    if isinstance(value, Mapping):
+        return any(map(has_blob_references, value.values()))
+    if isinstance(value, list):
+        return any(map(has_blob_references, value))
+    return False
+
+
+def get_blob_hashes(value: Any) -> set[BlobHash]:
+    """
+    Returns the hashes of the blobs referenced in the value.
+    """
+    hashes: set[BlobHash] = set()
+    _collect_hashes(value, hashes)
+    return hashes
+
+
+def resolve_blobs(value: Any, blobs: Mapping[BlobHash, str]) -> Any:
+    """
+    Returns the value with every blob reference in it replaced by the blob value.
+    References whose blobs are missing are left in place. The value is copied only
+    along the paths of the references that are replaced.
+    """
+    if is_blob_reference(value):
+        return blobs.get(value[BLOB_REFERENCE_KEY], value)
+    if isinstance(value, Mapping):
+        resolved = {k: resolve_blobs(v, blobs) for k, v in value.items()}
+        return value if all(resolved[k] is v for k, v in value.items()) else resolved
+    if isinstance(value, list):
+        items = [resolve_blobs(v, blobs) for v in value]
+        return value if all(x is v for x, v in zip(items, value)) else items
+    return value
+
+
+def get_blob_hash_from_text(value: str) -> Optional[BlobHash]:
+    """
+    Returns the hash of the blob referenced by a value extracted from the
+    attributes as text in SQL, in which case a reference comes back as its JSON
+    text, or None if the value is not a reference.
+    """
+    if not value.startswith("{") or BLOB_REFERENCE_KEY not in value:
+        return None
+    try:
+        obj = json.loads(value)
+    except ValueError:
+        return None
+    return obj[BLOB_REFERENCE_KEY] if is_blob_reference(obj) else None
+
+
+def is_deduplicated_path(keys: Sequence[Union[str, int]]) -> bool:
+    return any(
+        len(keys) == len(path)
+        and all(p == "*" and isinstance(k, int) or p == k for k, p in zip(keys, path))
+        for path in DEDUPLICATED_PATHS
+    )
+
+
+def select_blobs(hashes: Iterable[BlobHash]) -> Select[tuple[BlobHash, str]]:
+    return select(
+        models.SpanAttributeBlob.hash,
+        models.SpanAttributeBlob.value,
+    ).where(models.SpanAttributeBlob.hash.in_(hashes))
+
+
+async def get_blobs(
+    session: AsyncSession,
+    hashes: Iterable[BlobHash],
+    cache: BlobCache = BLOB_CACHE,
+) -> dict[BlobHash, str]:
+    """
+    Returns the values of the blobs, looking up in the database only the ones that
+    are not cached. Hashes of missing blobs are left out.
+    """
+    blobs, missing = cache.get_many(hashes)
+    for batch in _batched(missing):
+        loaded = dict((await session.execute(select_blobs(batch))).tuples().all())
+        cache.put_many(loaded)
+        blobs.update(loaded)
+    return blobs
+
+
+def get_blobs_sync(
+    session: Session,
+    hashes: Iterable[BlobHash],
+    cache: BlobCache = BLOB_CACHE,
+) -> dict[BlobHash, str]:
+    blobs, missing = cache.get_many(hashes)
+    for batch in _batched(missing):
+        loaded = dict(session.execute(select_blobs(batch)).tuples().all())
+        cache.put_many(loaded)
+        blobs.update(loaded)
+    return blobs
+
+
+async def delete_unreferenced_blobs(session: AsyncSession, limit: int) -> int:
+    """
+    Deletes at most `limit` of the blobs that are no longer referenced by any span,
+    and returns the number of blobs deleted.
+    """
+    table = models.SpanAttributeBlob
+    unreferenced = ~exists().where(models.SpanAttributeBlobReference.blob_hash == table.hash)
+    blob_rowids = list(await session.scalars(select(table.id).where(unreferenced).limit(limit)))
+    if blob_rowids:
+        # The condition is checked again in case the blobs were referenced meanwhile.
+        await session.execute(delete(table).where(table.id.in_(blob_rowids)).where(unreferenced))
+    return len(blob_rowids)
+
+
+def _extract(
+    value: Any,
+    path: Sequence[str],
+    threshold: int,
+    blobs: dict[BlobHash, str],
+) -> Any:
+    if not path:
+        if isinstance(value, str) and len(value) >= threshold:
+            blobs[blob_hash := hash_blob(value)] = value
+            return {BLOB_REFERENCE_KEY: blob_hash}
+        return value
+    key, rest = path[0], path[1:]
+    if key == "*":
+        if not isinstance(value, list):
+            return value
+        items = [_extract(v, rest, threshold, blobs) for v in value]
+        return value if all(x is v for x, v in zip(items, value)) else items
+    if not isinstance(value, Mapping) or key not in value:
+        return value
+    child = value[key]
+    extracted = _extract(child, rest, threshold, blobs)
+    return value if extracted is child else {**value, key: extracted}
+
+
+def _collect_hashes(value: Any, hashes: set[BlobHash]) -> None:
+    if is_blob_reference(value):
+        hashes.add(value[BLOB_REFERENCE_KEY])
+    elif isinstance(value, Mapping):
+        for v in value.values():
+            _collect_hashes(v, hashes)
+    elif isinstance(value, list):
+        for v in value:
+            _collect_hashes(v, hashes)
+
+
+def _batched(hashes: Iterable[BlobHash]) -> Iterable[list[BlobHash]]:
+    it = iter(hashes)
+    while batch := list(islice(it, _BATCH_SIZE)):
+        yield batch
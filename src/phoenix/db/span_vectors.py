@@ -0,0 +1,172 @@
+"""
+Side-car storage for embedding vectors and other long arrays of floats in span
+attributes.
+
+At ingestion, each such array is moved out of the attributes into the
+`span_vectors` table as little-endian float32 bytes, and is replaced in the
+attributes by a small reference, e.g. `{"__vector__": "embedding.embeddings.0.
+embedding.vector", "dimensions": 1536}`. Readers that need the values back load
+them by span row id and re-hydrate the references (see `hydrate`), whereas
+readers that don't (e.g. the GraphQL API, which only displays the number of
+dimensions) never pay for them.
+"""
+
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Mapping
+from itertools import islice
+from typing import Any, Union
+
+import numpy as np
+import numpy.typing as npt
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing_extensions import TypeAlias
+
+from phoenix.db import models
+
+SpanRowId: TypeAlias = int
+AttributePath: TypeAlias = str
+Vector: TypeAlias = list[float]
+
+VECTOR_REFERENCE_KEY = "__vector__"
+MIN_VECTOR_LENGTH = 16
+"""
+Arrays of floats shorter than this are left in place, since the reference would
+take up about as much space as the values.
+"""
+
+_EXCLUDED_KEYS = frozenset({"metadata"})
+"""
+Top-level attributes whose contents are user-defined and kept verbatim.
+"""
+
+_DTYPE = np.dtype("<f4")
+_BATCH_SIZE = 1000
+
+
+def extract_vectors(
+    attributes: Mapping[str, Any],
+) -> tuple[Mapping[str, Any], dict[AttributePath, bytes]]:
+    """
+    Returns the attributes with every long array of floats replaced by a
+    reference, along with the encoded arrays keyed by their attribute paths. The
+    attributes are copied only along the paths of the arrays that are replaced.
+    """
+    vectors: dict[AttributePath, bytes] = {}
+    extracted = {}
+    for key, value in attributes.items():
+        extracted[key] = value if key in _EXCLUDED_KEYS else _extract(value, key, vectors)
+    return (extracted if vectors else attributes), vectors
+
+
+def encode_vector(values: Union[Iterable[float], npt.NDArray[Any]]) -> bytes:
+    return np.asarray(values, dtype=_DTYPE).tobytes()
+
+
+def decode_vector(data: bytes) -> Vector:
+    return np.frombuffer(data, dtype=_DTYPE).tolist()  # type: ignore[no-any-return]
+
+
+def is_vector_reference(value: Any) -> bool:
+    return isinstance(value, Mapping) and isinstance(value.get(VECTOR_REFERENCE_KEY), str)
+
+
+def has_vector_references(value: Any) -> bool:
+    if is_vector_reference(value):
+        return True
+    if isinstance(value, Mapping):
+        return any(map(has_vector_references, value.values()))
+    if isinstance(value, list):
+        return any(map(has_vector_references, value))
+    return False
+
+
+def replace_vector_references(value: Any, replace: Callable[[Mapping[str, Any]], Any]) -> Any:
+    """
+    Returns the value with every vector reference in it replaced by the result of
+    `replace`. The value is copied only along the paths of the references.
+    """
+    if is_vector_reference(value):
+        return replace(value)
+    if isinstance(value, Mapping):
+        replaced = {k: replace_vector_references(v, replace) for k, v in value.items()}
+        return value if all(replaced[k] is v for k, v in value.items()) else replaced
+    if isinstance(value, list):
+        items = [replace_vector_references(v, replace) for v in value]
+        return value if all(x is v for x, v in zip(items, value)) else items
+    return value
+
+
+def hydrate(value: Any, vectors: Mapping[AttributePath, Vector]) -> Any:
+    """
+    Replaces the vector references in `value` by the vectors of a span. References
+    whose vectors are missing are left in place.
+    """
+    if not vectors:
+        return value
+    return replace_vector_references(
+        value,
+        lambda reference: vectors.get(reference[VECTOR_REFERENCE_KEY], reference),
+    )
+
+
+def select_span_vectors(
+    span_rowids: Iterable[SpanRowId],
+) -> Select[tuple[SpanRowId, AttributePath, bytes]]:
+    return select(
+        models.SpanVector.span_rowid,
+        models.SpanVector.path,
+        models.SpanVector.vector,
+    ).where(models.SpanVector.span_rowid.in_(span_rowids))
+
+
+async def get_span_vectors(
+    session: AsyncSession,
+    span_rowids: Iterable[SpanRowId],
+) -> dict[SpanRowId, dict[AttributePath, Vector]]:
+    vectors: defaultdict[SpanRowId, dict[AttributePath, Vector]] = defaultdict(dict)
+    for batch in _batched(span_rowids):
+        for span_rowid, path, data in await session.execute(select_span_vectors(batch)):
+            vectors[span_rowid][path] = decode_vector(data)
+    return vectors
+
+
+def get_span_vectors_sync(
+    session: Session,
+    span_rowids: Iterable[SpanRowId],
+) -> dict[SpanRowId, dict[AttributePath, Vector]]:
+    vectors: defaultdict[SpanRowId, dict[AttributePath, Vector]] = defaultdict(dict)
+    for batch in _batched(span_rowids):
+        for span_rowid, path, data in session.execute(select_span_vectors(batch)):
+            vectors[span_rowid][path] = decode_vector(data)
+    return vectors
+
+
+def _extract(value: Any, path: AttributePath, vectors: dict[AttributePath, bytes]) -> Any:
+    if _is_vector(value):
+        vectors[path] = encode_vector(value)
+        return {VECTOR_REFERENCE_KEY: path, "dimensions": len(value)}
+    if isinstance(value, Mapping):
+        extracted = {k: _extract(v, f"{path}.{k}", vectors) for k, v in value.items()}
+        return value if all(extracted[k] is v for k, v in value.items()) else extracted
+    if isinstance(value, list):
+        items = [_extract(v, f"{path}.{i}", vectors) for i, v in enumerate(value)]
+        return value if all(x is v for x, v in zip(items, value)) else items
+    return value
+
+
+def _is_vector(value: Any) -> bool:
+    if isinstance(value, np.ndarray):
+        return value.ndim == 1 and value.dtype.kind == "f" and len(value) >= MIN_VECTOR_LENGTH
+    return (
+        isinstance(value, list)
+        and len(value) >= MIN_VECTOR_LENGTH
+        and all(type(v) is float for v in value)
+    )
+
+
+def _batched(span_rowids: Iterable[SpanRowId]) -> Iterable[list[SpanRowId]]:
+    it = iter(span_rowids)
+    while batch := list(islice(it, _BATCH_SIZE)):
+        yield batch
@@ -0,0 +1,60 @@
+"""
+Aggregates of the spans of each trace that are stored on the trace itself, i.e. its
+root span, its numbers of spans and error spans, and its token counts (see
+`models.Trace`), so that traces can be listed without reading their spans.
+
+The aggregates are incremented as spans are inserted (see
+`phoenix.db.insertion.span`). Since spans are otherwise only deleted along with
+their traces, they only need to be recomputed from the spans when spans are
+deleted without their traces, i.e. when partitions of the spans table are dropped
+(see `refresh_trace_aggregates`).
+"""
+
+from typing import Any
+
+from sqlalchemy import ColumnElement, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.functions import coalesce
+
+from phoenix.db import models
+
+
+async def refresh_trace_aggregates(
+    session: AsyncSession,
+    *whereclause: ColumnElement[bool],
+) -> None:
+    """
+    Recomputes from the spans the aggregates of the traces that satisfy the
+    conditions.
+    """
+    await session.execute(
+        update(models.Trace)
+        .where(*whereclause)
+        .values(**get_trace_aggregates())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_trace_aggregates() -> dict[str, Any]:
+    """
+    Returns the correlated subqueries of the aggregates of the spans of a trace, by
+    column name.
+    """
+    spans = select().where(models.Span.trace_rowid == models.Trace.id)
+    return {
+        "root_span_rowid": (
+            spans.add_columns(func.min(models.Span.id))
+            .where(models.Span.parent_id.is_(None))
+            .scalar_subquery()
+        ),
+        "num_spans": spans.add_columns(func.count()).scalar_subquery(),
+        "num_error_spans": (
+            spans.add_columns(func.count()).where(models.Span.status_code == "ERROR")
+        ).scalar_subquery(),
+        "llm_token_count_prompt": spans.add_columns(
+            coalesce(func.sum(models.Span.llm_token_count_prompt), 0)
+        ).scalar_subquery(),
+        "llm_token_count_completion": spans.add_columns(
+            coalesce(func.sum(models.Span.llm_token_count_completion), 0)
+        ).scalar_subquery(),
+    }
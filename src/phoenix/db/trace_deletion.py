@@ -0,0 +1,129 @@
+"""
+Deletion of traces along with everything that is derived from them, shared by the
+API, the trace retention policies and the trace archive.
+
+The spans of the traces, along with their vectors, annotations and blob references,
+are deleted by cascade, whereas the rollups of their spans and the aggregates of
+their sessions are recomputed (see `phoenix.db.rollups` and
+`phoenix.db.session_aggregates`), the project sessions left without traces are
+deleted, and the span attribute blobs left without references are deleted once all
+the traces are (see `phoenix.db.span_attribute_blobs`).
+"""
+
+from asyncio import sleep
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Optional
+
+from sqlalchemy import ColumnElement, delete, exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from phoenix.db import models
+from phoenix.db.insertion.helpers import MAX_BIND_PARAMETERS, chunks
+from phoenix.db.rollups import refresh_span_rollups_of_traces
+from phoenix.db.session_aggregates import refresh_session_aggregates_of_traces
+from phoenix.db.span_attribute_blobs import delete_unreferenced_blobs
+from phoenix.server.dml_event import DmlEvent, SpanDeleteEvent
+from phoenix.server.types import CanPutItem, DbSessionFactory
+
+
+async def delete_traces_in_chunks(
+    db: DbSessionFactory,
+    event_queue: CanPutItem[DmlEvent],
+    *whereclause: ColumnElement[bool],
+    chunk_size: int = 100,
+    pause_seconds: float = 0,
+    before_delete: Optional[Callable[[list[int]], Awaitable[None]]] = None,
+) -> int:
+    """
+    Deletes the traces that satisfy the conditions, oldest first, in chunks of at
+    most `chunk_size` traces, each in a transaction of its own and followed by a
+    pause, and returns the number of traces deleted. A `SpanDeleteEvent` is emitted
+    after each chunk so that caches are invalidated.
+
+    If `before_delete` is given, it is awaited with the rowids of each chunk of
+    traces before they are deleted.
+    """
+    num_deleted_traces = 0
+    while True:
+        async with db() as session:
+            trace_rowids = list(
+                await session.scalars(
+                    select(models.Trace.id)
+                    .where(*whereclause)
+                    .order_by(models.Trace.start_time)
+                    .limit(chunk_size)
+                )
+            )
+        if not trace_rowids:
+            break
+        if before_delete is not None:
+            await before_delete(trace_rowids)
+        async with db() as session:
+            project_rowids = await delete_traces(session, trace_rowids)
+        num_deleted_traces += len(trace_rowids)
+        event_queue.put(SpanDeleteEvent(tuple(project_rowids)))
+        await sleep(pause_seconds)
+    if num_deleted_traces:
+        await delete_unreferenced_blobs_in_chunks(
+            db, chunk_size=chunk_size, pause_seconds=pause_seconds
+        )
+    return num_deleted_traces
+
+
+async def delete_traces(session: AsyncSession, trace_rowids: Iterable[int]) -> set[int]:
+    """
+    Deletes the traces, recomputes the rollups of their spans and the aggregates of
+    their sessions, and deletes the sessions left without traces. Returns the rowids
+    of the projects of the traces.
+    """
+    project_rowids: set[int] = set()
+    project_session_rowids: set[int] = set()
+    for chunk in chunks(trace_rowids, MAX_BIND_PARAMETERS):
+        deleted_traces = (
+            (
+                await session.execute(
+                    delete(models.Trace)
+                    .where(models.Trace.id.in_(chunk))
+                    .returning(
+                        models.Trace.project_session_rowid,
+                        models.Trace.project_rowid,
+                        models.Trace.start_time,
+                        models.Trace.end_time,
+                    )
+                )
+            )
+            .tuples()
+            .all()
+        )
+        await refresh_span_rollups_of_traces(session, (trace[1:] for trace in deleted_traces))
+        project_rowids.update(trace[1] for trace in deleted_traces)
+        project_session_rowids.update(trace[0] for trace in deleted_traces if trace[0] is not None)
+    for chunk in chunks(project_session_rowids, MAX_BIND_PARAMETERS):
+        await session.execute(
+            delete(models.ProjectSession)
+            .where(models.ProjectSession.id.in_(chunk))
+            .where(~exists().where(models.Trace.project_session_rowid == models.ProjectSession.id))
+        )
+    await refresh_session_aggregates_of_traces(session, project_session_rowids)
+    return project_rowids
+
+
+async def delete_unreferenced_blobs_in_chunks(
+    db: DbSessionFactory,
+    *,
+    chunk_size: int = 100,
+    pause_seconds: float = 0,
+) -> int:
+    """
+    Deletes the span attribute blobs that are no longer referenced by any span, in
+    chunks of at most `chunk_size` blobs, each in a transaction of its own and
+    followed by a pause, and returns the number of blobs deleted.
+    """
+    num_deleted_blobs = 0
+    while True:
+        async with db() as session:
+            num_deleted = await delete_unreferenced_blobs(session, chunk_size)
+        num_deleted_blobs += num_deleted
+        if num_deleted < chunk_size:
+            return num_deleted_blobs
+        await sleep(pause_seconds)
@@ -19,12 +19,9 @@ from .latency_ms_quantile import LatencyMsQuantileCache, LatencyMsQuantileDataLo
 from .min_start_or_max_end_times import MinStartOrMaxEndTimeCache, MinStartOrMaxEndTimeDataLoader
 from .project_by_name import ProjectByNameDataLoader
 from .record_counts import RecordCountCache, RecordCountDataLoader
-from .session_io import SessionIODataLoader
-from .session_num_traces import SessionNumTracesDataLoader
-from .session_num_traces_with_error import SessionNumTracesWithErrorDataLoader
-from .session_token_usages import SessionTokenUsagesDataLoader
 from .session_trace_latency_ms_quantile import SessionTraceLatencyMsQuantileDataLoader
 from .span_annotations import SpanAnnotationsDataLoader
+from .span_attribute_blobs import SpanAttributeBlobsDataLoader
 from .span_dataset_examples import SpanDatasetExamplesDataLoader
 from .span_descendants import SpanDescendantsDataLoader
 from .span_projects import SpanProjectsDataLoader
@@ -51,10 +48,6 @@ __all__ = [
     "LatencyMsQuantileDataLoader",
     "MinStartOrMaxEndTimeDataLoader",
     "RecordCountDataLoader",
-    "SessionIODataLoader",
-    "SessionNumTracesDataLoader",
-    "SessionNumTracesWithErrorDataLoader",
-    "SessionTokenUsagesDataLoader",
     "SessionTraceLatencyMsQuantileDataLoader",
     "SpanDatasetExamplesDataLoader",
     "SpanDescendantsDataLoader",
@@ -64,6 +57,7 @@ __all__ = [
     "TraceRootSpansDataLoader",
     "ProjectByNameDataLoader",
     "SpanAnnotationsDataLoader",
+    "SpanAttributeBlobsDataLoader",
     "UsersDataLoader",
     "UserRolesDataLoader",
 ]
@@ -88,8 +88,11 @@ class AnnotationSummaryDataLoader(DataLoader[Key, Result]):
             segment, param = _cache_key_fn(key)
             arguments[segment][param].append(position)
         for segment, params in arguments.items():
+            kind, _, _, filter_condition = segment
             stmt = _get_stmt(segment, *params.keys())
-            async with self._db() as session:
+            async with self._db.read() as session:
+                if kind == "span" and filter_condition:
+                    stmt = await SpanFilter(filter_condition).apply(session, stmt)
                 data = await session.stream(stmt)
                 async for annotation_name, group in groupby(data, lambda row: row.name):
                     summary = AnnotationSummary(pd.DataFrame(group))
@@ -102,16 +105,13 @@ def _get_stmt(
     segment: Segment,
     *annotation_names: Param,
 ) -> Select[Any]:
-    kind, project_rowid, (start_time, end_time), filter_condition = segment
+    kind, project_rowid, (start_time, end_time), _ = segment
     stmt = select()
     if kind == "span":
         msa = models.SpanAnnotation
         name_column, label_column, score_column = msa.name, msa.label, msa.score
         time_column = models.Span.start_time
         stmt = stmt.join(models.Span).join_from(models.Span, models.Trace)
-        if filter_condition:
-            sf = SpanFilter(filter_condition)
-            stmt = sf(stmt)
     elif kind == "trace":
         mta = models.TraceAnnotation
         name_column, label_column, score_column = mta.name, mta.label, mta.score
@@ -43,7 +43,7 @@ class AverageExperimentRunLatencyDataLoader(DataLoader[Key, Result]):
             )
             .group_by(resolved_experiment_ids.c.id)
         )
-        async with self._db() as session:
+        async with self._db.read() as session:
             avg_latencies = {
                 experiment_id: avg_latency
                 async for experiment_id, avg_latency in await session.stream(query)
@@ -89,9 +89,13 @@ class DocumentEvaluationSummaryDataLoader(DataLoader[Key, Result]):
             segment, param = _cache_key_fn(key)
             arguments[segment][param].append(position)
         for segment, params in arguments.items():
-            async with self._db() as session:
+            async with self._db.read() as session:
                 dialect = SupportedSQLDialect(session.bind.dialect.name)
                 stmt = _get_stmt(dialect, segment, *params.keys())
+                _, _, filter_condition = segment
+                if filter_condition:
+                    span_filter = SpanFilter(condition=filter_condition)
+                    stmt = await span_filter.apply(session, stmt)
                 data = await session.stream(stmt)
                 async for eval_name, group in groupby(data, lambda d: d.name):
                     metrics_collection = []
@@ -116,7 +120,7 @@ def _get_stmt(
     segment: Segment,
     *eval_names: Param,
 ) -> Select[Any]:
-    project_rowid, (start_time, end_time), filter_condition = segment
+    project_rowid, (start_time, end_time), _ = segment
     mda = models.DocumentAnnotation
     stmt = (
         select(
@@ -138,7 +142,4 @@ def _get_stmt(
         stmt = stmt.where(start_time <= models.Span.start_time)
     if end_time:
         stmt = stmt.where(models.Span.start_time < end_time)
-    if filter_condition:
-        span_filter = SpanFilter(condition=filter_condition)
-        stmt = span_filter(stmt)
     return stmt
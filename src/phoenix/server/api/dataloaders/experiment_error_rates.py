@@ -47,7 +47,7 @@ class ExperimentErrorRatesDataLoader(DataLoader[Key, Result]):
             )
             .group_by(resolved_experiment_ids.c.id)
         )
-        async with self._db() as session:
+        async with self._db.read() as session:
             error_rates = {
                 experiment_id: error_rate
                 async for experiment_id, error_rate in await session.stream(query)
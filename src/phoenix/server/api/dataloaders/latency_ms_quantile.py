@@ -1,5 +1,5 @@
 from collections import defaultdict
-from collections.abc import AsyncIterator, Mapping
+from collections.abc import AsyncIterator, Iterator, Mapping
 from datetime import datetime
 from typing import Any, Literal, Optional, cast
 
@@ -23,6 +23,8 @@ from typing_extensions import TypeAlias, assert_never
 
 from phoenix.db import models
 from phoenix.db.helpers import SupportedSQLDialect
+from phoenix.db.latency_sketches import LatencySketch
+from phoenix.db.rollups import select_latency_sketch_bins, split_time_range
 from phoenix.server.api.dataloaders.cache import TwoTierCache
 from phoenix.server.api.input_types.TimeRange import TimeRange
 from phoenix.server.types import DbSessionFactory
@@ -97,7 +99,7 @@ class LatencyMsQuantileDataLoader(DataLoader[Key, Result]):
         for position, key in enumerate(keys):
             segment, param = _cache_key_fn(key)
             arguments[segment][param].append(position)
-        async with self._db() as session:
+        async with self._db.read() as session:
             dialect = SupportedSQLDialect(session.bind.dialect.name)
             for segment, params in arguments.items():
                 async for position, quantile_value in _get_results(
@@ -114,6 +116,12 @@ async def _get_results(
     params: Mapping[Param, list[ResultPosition]],
 ) -> AsyncIterator[tuple[ResultPosition, QuantileValue]]:
     kind, (start_time, end_time), filter_condition = segment
+    if not filter_condition:
+        async for position, quantile_value in _get_results_from_sketches(
+            dialect, session, segment, params
+        ):
+            yield position, quantile_value
+        return
     stmt = select(models.Trace.project_rowid)
     if kind == "trace":
         latency_column = cast(FloatCol, models.Trace.latency_ms)
@@ -122,15 +130,14 @@ async def _get_results(
         latency_column = cast(FloatCol, models.Span.latency_ms)
         time_column = models.Span.start_time
         stmt = stmt.join(models.Span)
-        if filter_condition:
-            sf = SpanFilter(filter_condition)
-            stmt = sf(stmt)
     else:
         assert_never(kind)
     if start_time:
         stmt = stmt.where(start_time <= time_column)
     if end_time:
         stmt = stmt.where(time_column < end_time)
+    if kind == "span":
+        stmt = await SpanFilter(filter_condition).apply(session, stmt)
     if dialect is SupportedSQLDialect.POSTGRESQL:
         results = _get_results_postgresql(session, stmt, latency_column, params)
     elif dialect is SupportedSQLDialect.SQLITE:
@@ -141,6 +148,64 @@ async def _get_results(
         yield position, quantile_value
 
 
+async def _get_results_from_sketches(
+    dialect: SupportedSQLDialect,
+    session: AsyncSession,
+    segment: Segment,
+    params: Mapping[Param, list[ResultPosition]],
+) -> AsyncIterator[tuple[ResultPosition, QuantileValue]]:
+    """
+    Estimates the quantiles from the latency sketches, which are merged over the whole
+    hours in the time range, and merged with the sketches of the spans or traces that
+    start in the remaining partial hours.
+    """
+    sketches: defaultdict[ProjectRowId, LatencySketch] = defaultdict(LatencySketch)
+    for stmt in _get_bin_stmts(dialect, segment, *params.keys()):
+        data = await session.stream(stmt)
+        async for project_rowid, bin_index, count in data:
+            # The sums are decimals on PostgreSQL.
+            sketches[project_rowid].add_bin(bin_index, int(count))
+    for (project_rowid, probability), positions in params.items():
+        if (sketch := sketches.get(project_rowid)) is None:
+            continue
+        if (quantile_value := sketch.quantile(probability)) is None:
+            continue
+        for position in positions:
+            yield position, quantile_value
+
+
+def _get_bin_stmts(
+    dialect: SupportedSQLDialect,
+    segment: Segment,
+    *params: Param,
+) -> Iterator[Select[Any]]:
+    kind, (start_time, end_time), _ = segment
+    project_rowids = {project_rowid for project_rowid, _ in params}
+    if kind == "trace":
+        start_column = models.Trace.start_time
+    elif kind == "span":
+        start_column = models.Span.start_time
+    else:
+        assert_never(kind)
+    hours, edges = split_time_range(start_time, end_time, start_column)
+    if hours is not None:
+        table = models.LatencySketchBin
+        yield hours(
+            select(table.project_rowid, table.bin_index, func.sum(table.count))
+            .where(table.kind == kind)
+            .where(table.project_rowid.in_(project_rowids))
+            .group_by(table.project_rowid, table.bin_index),
+            table.hour,
+        )
+    if edges is not None:
+        bins = select_latency_sketch_bins(
+            dialect, kind, edges, models.Trace.project_rowid.in_(project_rowids)
+        ).subquery()
+        yield select(bins.c.project_rowid, bins.c.bin_index, func.sum(bins.c.count)).group_by(
+            bins.c.project_rowid, bins.c.bin_index
+        )
+
+
 async def _get_results_sqlite(
     session: AsyncSession,
     base_stmt: Select[Any],
@@ -60,17 +60,19 @@ class MinStartOrMaxEndTimeDataLoader(DataLoader[Key, Result]):
         for position, key in enumerate(keys):
             segment, param = key
             arguments[segment][param].append(position)
-        pid = models.Trace.project_rowid
+        # The start and end times of the traces are those of their earliest and latest
+        # spans, so they are found in the rollups of the spans.
+        pid = models.SpanRollup.project_rowid
         stmt = (
             select(
                 pid,
-                func.min(models.Trace.start_time).label("min_start"),
-                func.max(models.Trace.end_time).label("max_end"),
+                func.min(models.SpanRollup.min_start_time).label("min_start"),
+                func.max(models.SpanRollup.max_end_time).label("max_end"),
             )
             .where(pid.in_(arguments.keys()))
             .group_by(pid)
         )
-        async with self._db() as session:
+        async with self._db.read() as session:
             data = await session.stream(stmt)
             async for project_rowid, min_start, max_end in data:
                 for kind, positions in arguments[project_rowid].items():
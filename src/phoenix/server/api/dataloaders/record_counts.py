@@ -1,4 +1,5 @@
 from collections import defaultdict
+from collections.abc import Iterator
 from datetime import datetime
 from typing import Any, Literal, Optional
 
@@ -8,6 +9,7 @@ from strawberry.dataloader import AbstractCache, DataLoader
 from typing_extensions import TypeAlias, assert_never
 
 from phoenix.db import models
+from phoenix.db.rollups import split_time_range
 from phoenix.server.api.dataloaders.cache import TwoTierCache
 from phoenix.server.api.input_types.TimeRange import TimeRange
 from phoenix.server.types import DbSessionFactory
@@ -79,29 +81,57 @@ class RecordCountDataLoader(DataLoader[Key, Result]):
         for position, key in enumerate(keys):
             segment, param = _cache_key_fn(key)
             arguments[segment][param].append(position)
-        async with self._db() as session:
+        async with self._db.read() as session:
             for segment, params in arguments.items():
-                stmt = _get_stmt(segment, *params.keys())
-                data = await session.stream(stmt)
-                async for project_rowid, count in data:
-                    for position in params[project_rowid]:
-                        results[position] = count
+                kind, _, filter_condition = segment
+                span_filter = (
+                    SpanFilter(filter_condition) if kind == "span" and filter_condition else None
+                )
+                for stmt in _get_stmts(segment, *params.keys()):
+                    if span_filter:
+                        stmt = await span_filter.apply(session, stmt)
+                    data = await session.stream(stmt)
+                    async for project_rowid, count in data:
+                        for position in params[project_rowid]:
+                            results[position] += count
         return results
 
 
+def _get_stmts(
+    segment: Segment,
+    *project_rowids: Param,
+) -> Iterator[Select[Any]]:
+    """
+    Yields the statements whose counts add up to the result, where the spans of the
+    whole hours in the time range are counted from the rollups unless they are
+    filtered, in which case the filter is left to be applied to the statement.
+    """
+    kind, (start_time, end_time), filter_condition = segment
+    if kind == "trace" or filter_condition:
+        yield _get_stmt(segment, *project_rowids)
+        return
+    hours, edges = split_time_range(start_time, end_time)
+    if hours is not None:
+        pid = models.SpanRollup.project_rowid
+        yield hours(
+            select(pid, func.sum(models.SpanRollup.span_count))
+            .where(pid.in_(project_rowids))
+            .group_by(pid)
+        )
+    if edges is not None:
+        yield _get_stmt((kind, (None, None), None), *project_rowids).where(edges)
+
+
 def _get_stmt(
     segment: Segment,
     *project_rowids: Param,
 ) -> Select[Any]:
-    kind, (start_time, end_time), filter_condition = segment
+    kind, (start_time, end_time), _ = segment
     pid = models.Trace.project_rowid
     stmt = select(pid)
     if kind == "span":
         time_column = models.Span.start_time
         stmt = stmt.join(models.Span)
-        if filter_condition:
-            sf = SpanFilter(filter_condition)
-            stmt = sf(stmt)
     elif kind == "trace":
         time_column = models.Trace.start_time
     else:
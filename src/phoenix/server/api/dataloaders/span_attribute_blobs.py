@@ -0,0 +1,22 @@
+from typing import Optional
+
+from strawberry.dataloader import DataLoader
+from typing_extensions import TypeAlias
+
+from phoenix.db.span_attribute_blobs import get_blobs
+from phoenix.server.types import DbSessionFactory
+
+BlobHash: TypeAlias = str
+Key: TypeAlias = BlobHash
+Result: TypeAlias = Optional[str]
+
+
+class SpanAttributeBlobsDataLoader(DataLoader[Key, Result]):
+    def __init__(self, db: DbSessionFactory) -> None:
+        super().__init__(load_fn=self._load_fn)
+        self._db = db
+
+    async def _load_fn(self, keys: list[Key]) -> list[Result]:
+        async with self._db.read() as session:
+            blobs = await get_blobs(session, keys)
+        return [blobs.get(key) for key in keys]
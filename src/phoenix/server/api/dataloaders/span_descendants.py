@@ -50,7 +50,7 @@ class SpanDescendantsDataLoader(DataLoader[Key, Result]):
             .order_by(descendant_ids.c[root_id_label])
         )
         results: dict[SpanId, Result] = {key: [] for key in keys}
-        async with self._db() as session:
+        async with self._db.read() as session:
             data = await session.stream(stmt)
             async for root_id, group in groupby(data, key=lambda d: d[0]):
                 results[root_id].extend(span for _, span in group)
@@ -1,4 +1,5 @@
 from collections import defaultdict
+from collections.abc import Iterator
 from datetime import datetime
 from typing import Any, Literal, Optional
 
@@ -9,6 +10,7 @@ from strawberry.dataloader import AbstractCache, DataLoader
 from typing_extensions import TypeAlias
 
 from phoenix.db import models
+from phoenix.db.rollups import split_time_range
 from phoenix.server.api.dataloaders.cache import TwoTierCache
 from phoenix.server.api.input_types.TimeRange import TimeRange
 from phoenix.server.types import DbSessionFactory
@@ -80,25 +82,61 @@ class TokenCountDataLoader(DataLoader[Key, Result]):
         for position, key in enumerate(keys):
             segment, param = _cache_key_fn(key)
             arguments[segment][param].append(position)
-        async with self._db() as session:
+        async with self._db.read() as session:
             for segment, params in arguments.items():
-                stmt = _get_stmt(segment, *params.keys())
-                data = await session.stream(stmt)
-                async for project_rowid, prompt, completion, total in data:
-                    for position in params[(project_rowid, "prompt")]:
-                        results[position] = prompt
-                    for position in params[(project_rowid, "completion")]:
-                        results[position] = completion
-                    for position in params[(project_rowid, "total")]:
-                        results[position] = total
+                _, filter_condition = segment
+                span_filter = SpanFilter(filter_condition) if filter_condition else None
+                for stmt in _get_stmts(segment, *params.keys()):
+                    if span_filter:
+                        stmt = await span_filter.apply(session, stmt)
+                    data = await session.stream(stmt)
+                    async for project_rowid, prompt, completion, total in data:
+                        for position in params[(project_rowid, "prompt")]:
+                            results[position] += prompt
+                        for position in params[(project_rowid, "completion")]:
+                            results[position] += completion
+                        for position in params[(project_rowid, "total")]:
+                            results[position] += total
         return results
 
 
+def _get_stmts(
+    segment: Segment,
+    *params: Param,
+) -> Iterator[Select[Any]]:
+    """
+    Yields the statements whose token counts add up to the result, where the spans
+    of the whole hours in the time range are counted from the rollups unless they
+    are filtered, in which case the filter is left to be applied to the statement.
+    """
+    (start_time, end_time), filter_condition = segment
+    if filter_condition:
+        yield _get_stmt(segment, *params)
+        return
+    hours, edges = split_time_range(start_time, end_time)
+    if hours is not None:
+        prompt = coalesce(func.sum(models.SpanRollup.llm_token_count_prompt), 0)
+        completion = coalesce(func.sum(models.SpanRollup.llm_token_count_completion), 0)
+        pid = models.SpanRollup.project_rowid
+        yield hours(
+            select(
+                pid,
+                prompt.label("prompt"),
+                completion.label("completion"),
+                (prompt + completion).label("total"),
+            )
+            .where(pid.in_([rowid for rowid, _ in params]))
+            .group_by(pid)
+        )
+    if edges is not None:
+        yield _get_stmt(((None, None), None), *params).where(edges)
+
+
 def _get_stmt(
     segment: Segment,
     *params: Param,
 ) -> Select[Any]:
-    (start_time, end_time), filter_condition = segment
+    (start_time, end_time), _ = segment
     prompt = coalesce(func.sum(models.Span.llm_token_count_prompt), 0)
     completion = coalesce(func.sum(models.Span.llm_token_count_completion), 0)
     total = prompt + completion
@@ -117,8 +155,5 @@ def _get_stmt(
         stmt = stmt.where(start_time <= models.Span.start_time)
     if end_time:
         stmt = stmt.where(models.Span.start_time < end_time)
-    if filter_condition:
-        sf = SpanFilter(filter_condition)
-        stmt = sf(stmt)
     stmt = stmt.where(pid.in_([rowid for rowid, _ in params]))
     return stmt
@@ -20,12 +20,11 @@ class TraceRootSpansDataLoader(DataLoader[Key, Result]):
     async def _load_fn(self, keys: List[Key]) -> List[Result]:
         stmt = (
             select(models.Span)
-            .join(models.Trace)
-            .where(models.Span.parent_id.is_(None))
+            .join(models.Trace, models.Span.id == models.Trace.root_span_rowid)
             .where(models.Trace.id.in_(keys))
             .options(contains_eager(models.Span.trace).load_only(models.Trace.trace_id))
         )
-        async with self._db() as session:
+        async with self._db.read() as session:
             result: dict[Key, models.Span] = {
                 span.trace_rowid: span async for span in await session.stream_scalars(stmt)
             }
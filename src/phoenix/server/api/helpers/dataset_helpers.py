@@ -10,19 +10,25 @@ from openinference.semconv.trace import (
     ToolCallAttributes,
 )
 
+from phoenix.db.compression import decompress_attributes
 from phoenix.db.models import Span
+from phoenix.db.span_attribute_blobs import resolve_blobs
 from phoenix.trace.attributes import get_attribute_value
 
 
-def get_dataset_example_input(span: Span) -> dict[str, Any]:
+def get_dataset_example_input(
+    span: Span,
+    blobs: Optional[Mapping[str, str]] = None,
+) -> dict[str, Any]:
     """
     Extracts the input value from a span and returns it as a dictionary. Input
     values from LLM spans are extracted from the input messages and prompt
     template variables (if present). For other span kinds, the input is
-    extracted from the input value and input mime type attributes.
+    extracted from the input value and input mime type attributes. The values of
+    deduplicated attributes are resolved from `blobs`, keyed by hash.
     """
     span_kind = span.span_kind
-    attributes = span.attributes
+    attributes = resolve_blobs(decompress_attributes(span.attributes), blobs or {})
     input_value = get_attribute_value(attributes, INPUT_VALUE)
     input_mime_type = get_attribute_value(attributes, INPUT_MIME_TYPE)
     prompt_template_variables = get_attribute_value(attributes, LLM_PROMPT_TEMPLATE_VARIABLES)
@@ -37,16 +43,20 @@ def get_dataset_example_input(span: Span) -> dict[str, Any]:
     return _get_generic_io_value(io_value=input_value, mime_type=input_mime_type, kind="input")
 
 
-def get_dataset_example_output(span: Span) -> dict[str, Any]:
+def get_dataset_example_output(
+    span: Span,
+    blobs: Optional[Mapping[str, str]] = None,
+) -> dict[str, Any]:
     """
     Extracts the output value from a span and returns it as a dictionary. Output
     values from LLM spans are extracted from the output messages (if present).
     Output from retriever spans are extracted from the retrieval documents (if
     present). For other span kinds, the output is extracted from the output
-    value and output mime type attributes.
+    value and output mime type attributes. The values of deduplicated attributes
+    are resolved from `blobs`, keyed by hash.
     """
     span_kind = span.span_kind
-    attributes = span.attributes
+    attributes = resolve_blobs(decompress_attributes(span.attributes), blobs or {})
     output_value = get_attribute_value(attributes, OUTPUT_VALUE)
     output_mime_type = get_attribute_value(attributes, OUTPUT_MIME_TYPE)
     output_messages = get_attribute_value(attributes, LLM_OUTPUT_MESSAGES)
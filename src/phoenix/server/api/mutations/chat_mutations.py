@@ -25,6 +25,8 @@ from typing_extensions import assert_never
 from phoenix.datetime_utils import local_now, normalize_datetime
 from phoenix.db import models
 from phoenix.db.helpers import get_dataset_example_revisions
+from phoenix.db.rollups import insert_span_rollups
+from phoenix.db.trace_aggregates import refresh_trace_aggregates
 from phoenix.server.api.auth import IsLocked, IsNotReadOnly
 from phoenix.server.api.context import Context
 from phoenix.server.api.exceptions import BadRequest, CustomGraphQLError, NotFound
@@ -436,6 +438,8 @@ class ChatCompletionMutationMixin:
             session.add(trace)
             session.add(span)
             await session.flush()
+            await insert_span_rollups(session, [span])
+            await refresh_trace_aggregates(session, models.Trace.id == trace.id)
 
         gql_span = to_gql_span(span)
 
@@ -12,6 +12,7 @@ from strawberry.types import Info
 
 from phoenix.db import models
 from phoenix.db.helpers import get_eval_trace_ids_for_datasets, get_project_names_for_datasets
+from phoenix.db.span_attribute_blobs import get_blob_hashes, get_blobs
 from phoenix.server.api.auth import IsLocked, IsNotReadOnly
 from phoenix.server.api.context import Context
 from phoenix.server.api.exceptions import BadRequest, NotFound
@@ -164,6 +165,9 @@ class DatasetMutationMixin:
                     "annotator_kind": annotation.annotator_kind,
                 }
 
+            blobs = await get_blobs(
+                session, {h for span in spans for h in get_blob_hashes(span.attributes)}
+            )
             DatasetExample = models.DatasetExample
             dataset_example_rowids = (
                 await session.scalars(
@@ -187,8 +191,8 @@ class DatasetMutationMixin:
                     {
                         DatasetExampleRevision.dataset_example_id.key: dataset_example_rowid,
                         DatasetExampleRevision.dataset_version_id.key: dataset_version_rowid,
-                        DatasetExampleRevision.input.key: get_dataset_example_input(span),
-                        DatasetExampleRevision.output.key: get_dataset_example_output(span),
+                        DatasetExampleRevision.input.key: get_dataset_example_input(span, blobs),
+                        DatasetExampleRevision.output.key: get_dataset_example_output(span, blobs),
                         DatasetExampleRevision.metadata_.key: {
                             "span_kind": span.span_kind,
                             **(
@@ -355,8 +359,8 @@ class DatasetMutationMixin:
             if not (dataset := await session.scalar(stmt)):
                 raise NotFound(f"Unknown dataset: {input.dataset_id}")
         await asyncio.gather(
-            delete_projects(info.context.db, *project_names),
-            delete_traces(info.context.db, *eval_trace_ids),
+            delete_projects(info.context.db, info.context.event_queue, *project_names),
+            delete_traces(info.context.db, info.context.event_queue, *eval_trace_ids),
             return_exceptions=True,
         )
         info.context.event_queue.put(DatasetDeleteEvent((dataset.id,)))
@@ -63,8 +63,8 @@ class ExperimentMutationMixin:
                     )
                 )
         await asyncio.gather(
-            delete_projects(info.context.db, *project_names),
-            delete_traces(info.context.db, *eval_trace_ids),
+            delete_projects(info.context.db, info.context.event_queue, *project_names),
+            delete_traces(info.context.db, info.context.event_queue, *eval_trace_ids),
             return_exceptions=True,
         )
         info.context.event_queue.put(ExperimentDeleteEvent(tuple(experiments.keys())))
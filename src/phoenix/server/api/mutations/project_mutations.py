@@ -6,6 +6,8 @@ from strawberry.types import Info
 
 from phoenix.config import DEFAULT_PROJECT_NAME
 from phoenix.db import models
+from phoenix.db.rollups import refresh_span_rollups_of_traces
+from phoenix.db.trace_deletion import delete_unreferenced_blobs_in_chunks
 from phoenix.server.api.auth import IsNotReadOnly
 from phoenix.server.api.context import Context
 from phoenix.server.api.input_types.ClearProjectInput import ClearProjectInput
@@ -31,6 +33,7 @@ class ProjectMutationMixin:
                 raise ValueError(f"Cannot delete the {DEFAULT_PROJECT_NAME} project")
             await session.delete(project)
         info.context.event_queue.put(ProjectDeleteEvent((project_id,)))
+        await delete_unreferenced_blobs_in_chunks(info.context.db)
         return Query()
 
     @strawberry.mutation(permission_classes=[IsNotReadOnly])  # type: ignore
@@ -41,12 +44,24 @@ class ProjectMutationMixin:
         delete_statement = (
             delete(models.Trace)
             .where(models.Trace.project_rowid == project_id)
-            .returning(models.Trace.project_session_rowid)
+            .returning(
+                models.Trace.project_session_rowid,
+                models.Trace.project_rowid,
+                models.Trace.start_time,
+                models.Trace.end_time,
+            )
         )
         if input.end_time:
             delete_statement = delete_statement.where(models.Trace.start_time < input.end_time)
         async with info.context.db() as session:
-            deleted_trace_project_session_ids = await session.scalars(delete_statement)
+            deleted_traces = (await session.execute(delete_statement)).tuples().all()
+            await refresh_span_rollups_of_traces(
+                session,
+                ((project_rowid, start, end) for _, project_rowid, start, end in deleted_traces),
+            )
+            deleted_trace_project_session_ids = [
+                project_session_rowid for project_session_rowid, *_ in deleted_traces
+            ]
             if deleted_trace_project_session_ids:
                 await session.execute(
                     delete(models.ProjectSession).where(
@@ -54,4 +69,5 @@ class ProjectMutationMixin:
                     )
                 )
         info.context.event_queue.put(SpanDeleteEvent((project_id,)))
+        await delete_unreferenced_blobs_in_chunks(info.context.db)
         return Query()
@@ -169,7 +169,7 @@ class Query:
             .order_by(models.User.email)
             .options(joinedload(models.User.role))
         )
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             users = await session.stream_scalars(stmt)
             data = [to_gql_user(user) async for user in users]
         return connection_from_list(data=data, args=args)
@@ -179,7 +179,7 @@ class Query:
         self,
         info: Info[Context, None],
     ) -> list[UserRole]:
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             roles = await session.scalars(
                 select(models.UserRole).where(models.UserRole.name != enums.UserRole.SYSTEM.value)
             )
@@ -199,7 +199,7 @@ class Query:
             .join(models.UserRole)
             .where(models.UserRole.name != enums.UserRole.SYSTEM.value)
         )
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             api_keys = await session.scalars(stmt)
         return [to_gql_api_key(api_key) for api_key in api_keys]
 
@@ -211,7 +211,7 @@ class Query:
             .join(models.UserRole)
             .where(models.UserRole.name == enums.UserRole.SYSTEM.value)
         )
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             api_keys = await session.scalars(stmt)
         return [
             SystemApiKey(
@@ -251,7 +251,7 @@ class Query:
             .where(models.Experiment.project_name.is_(None))
             .order_by(models.Project.id)
         )
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             projects = await session.stream_scalars(stmt)
             data = [
                 Project(
@@ -288,7 +288,7 @@ class Query:
         if sort:
             sort_col = getattr(models.Dataset, sort.col.value)
             stmt = stmt.order_by(sort_col.desc() if sort.dir is SortDir.desc else sort_col.asc())
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             datasets = await session.scalars(stmt)
         return connection_from_list(
             data=[to_gql_dataset(dataset) for dataset in datasets], args=args
@@ -312,7 +312,7 @@ class Query:
         if len(set(experiment_ids_)) != len(experiment_ids_):
             raise ValueError("Experiment IDs must be unique.")
 
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             validation_result = (
                 await session.execute(
                     select(
@@ -446,7 +446,7 @@ class Query:
     @strawberry.field
     async def functionality(self, info: Info[Context, None]) -> "Functionality":
         has_model_inferences = not info.context.model.is_empty
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             has_traces = (await session.scalar(select(models.Trace).limit(1))) is not None
         return Functionality(
             model_inferences=has_model_inferences,
@@ -473,7 +473,7 @@ class Query:
                 models.Project.gradient_start_color,
                 models.Project.gradient_end_color,
             ).where(models.Project.id == node_id)
-            async with info.context.db() as session:
+            async with info.context.db.read() as session:
                 project = (await session.execute(project_stmt)).first()
             if project is None:
                 raise NotFound(f"Unknown project: {id}")
@@ -485,7 +485,7 @@ class Query:
             )
         elif type_name == "Trace":
             trace_stmt = select(models.Trace).filter_by(id=node_id)
-            async with info.context.db() as session:
+            async with info.context.db.read() as session:
                 trace = await session.scalar(trace_stmt)
             if trace is None:
                 raise NotFound(f"Unknown trace: {id}")
@@ -498,14 +498,14 @@ class Query:
                 )
                 .where(models.Span.id == node_id)
             )
-            async with info.context.db() as session:
+            async with info.context.db.read() as session:
                 span = await session.scalar(span_stmt)
             if span is None:
                 raise NotFound(f"Unknown span: {id}")
             return to_gql_span(span)
         elif type_name == Dataset.__name__:
             dataset_stmt = select(models.Dataset).where(models.Dataset.id == node_id)
-            async with info.context.db() as session:
+            async with info.context.db.read() as session:
                 if (dataset := await session.scalar(dataset_stmt)) is None:
                     raise NotFound(f"Unknown dataset: {id}")
             return to_gql_dataset(dataset)
@@ -516,7 +516,7 @@ class Query:
                 .where(models.DatasetExampleRevision.dataset_example_id == example_id)
                 .scalar_subquery()
             )
-            async with info.context.db() as session:
+            async with info.context.db.read() as session:
                 example = await session.scalar(
                     select(models.DatasetExample)
                     .join(
@@ -539,7 +539,7 @@ class Query:
                 created_at=example.created_at,
             )
         elif type_name == Experiment.__name__:
-            async with info.context.db() as session:
+            async with info.context.db.read() as session:
                 experiment = await session.scalar(
                     select(models.Experiment).where(models.Experiment.id == node_id)
                 )
@@ -555,7 +555,7 @@ class Query:
                 metadata=experiment.metadata_,
             )
         elif type_name == ExperimentRun.__name__:
-            async with info.context.db() as session:
+            async with info.context.db.read() as session:
                 if not (
                     run := await session.scalar(
                         select(models.ExperimentRun)
@@ -570,7 +570,7 @@ class Query:
         elif type_name == User.__name__:
             if int((user := info.context.user).identity) != node_id and not user.is_admin:
                 raise Unauthorized(MSG_ADMIN_ONLY)
-            async with info.context.db() as session:
+            async with info.context.db.read() as session:
                 if not (
                     user := await session.scalar(
                         select(models.User).where(models.User.id == node_id)
@@ -579,7 +579,7 @@ class Query:
                     raise NotFound(f"Unknown user: {id}")
             return to_gql_user(user)
         elif type_name == ProjectSession.__name__:
-            async with info.context.db() as session:
+            async with info.context.db.read() as session:
                 if not (
                     project_session := await session.scalar(
                         select(models.ProjectSession).filter_by(id=node_id)
@@ -598,7 +598,7 @@ class Query:
             return None
         if isinstance(user, UnauthenticatedUser):
             return None
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             if (
                 user := await session.scalar(
                     select(models.User)
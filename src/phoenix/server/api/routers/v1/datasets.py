@@ -176,8 +176,8 @@ async def delete_dataset(
         if (await session.scalar(stmt)) is None:
             raise HTTPException(detail="Dataset does not exist", status_code=HTTP_404_NOT_FOUND)
     tasks = BackgroundTasks()
-    tasks.add_task(delete_projects, request.app.state.db, *project_names)
-    tasks.add_task(delete_traces, request.app.state.db, *eval_trace_ids)
+    tasks.add_task(delete_projects, request.app.state.db, request.state.event_queue, *project_names)
+    tasks.add_task(delete_traces, request.app.state.db, request.state.event_queue, *eval_trace_ids)
 
 
 class DatasetWithExampleCount(Dataset):
@@ -128,7 +128,7 @@ async def get_evaluations(
     )
 
     db: DbSessionFactory = request.app.state.db
-    async with db() as session:
+    async with db.read() as session:
         connection = await session.connection()
         trace_evals_dataframe = await connection.run_sync(
             _read_sql_trace_evaluations_into_dataframe,
@@ -8,6 +8,7 @@ import pandas as pd
 from fastapi import APIRouter, Header, HTTPException, Query
 from pydantic import Field
 from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
 from starlette.responses import Response, StreamingResponse
 from starlette.status import HTTP_404_NOT_FOUND, HTTP_422_UNPROCESSABLE_ENTITY
@@ -99,25 +100,36 @@ async def query_spans_handler(
             detail=f"Invalid query: {e}",
             status_code=HTTP_422_UNPROCESSABLE_ENTITY,
         )
-    async with request.app.state.db() as session:
+    start_time = normalize_datetime(request_body.start_time, timezone.utc)
+    end_time = normalize_datetime(end_time, timezone.utc)
+    async with request.app.state.db.read() as session:
         results = []
         for query in span_queries:
             results.append(
                 await session.run_sync(
                     query,
                     project_name=project_name,
-                    start_time=normalize_datetime(
-                        request_body.start_time,
-                        timezone.utc,
-                    ),
-                    end_time=normalize_datetime(
-                        end_time,
-                        timezone.utc,
-                    ),
+                    start_time=start_time,
+                    end_time=end_time,
                     limit=request_body.limit,
                     root_spans_only=request_body.root_spans_only,
                 )
             )
+    if (archive := request.app.state.trace_archive) is not None:
+        # Archived spans are read from files, so not on the event loop.
+        results = [
+            await run_in_threadpool(
+                archive.extend,
+                query,
+                result,
+                project_name,
+                start_time=start_time,
+                end_time=end_time,
+                limit=request_body.limit,
+                root_spans_only=request_body.root_spans_only,
+            )
+            for query, result in zip(span_queries, results)
+        ]
     if not results:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND)
 
@@ -1,8 +1,9 @@
 import gzip
 import zlib
+from time import perf_counter
 from typing import Any, Literal, Optional
 
-from fastapi import APIRouter, BackgroundTasks, Header, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query
 from google.protobuf.json_format import MessageToJson
 from google.protobuf.message import DecodeError
 from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
@@ -19,22 +20,25 @@ from starlette.status import (
     HTTP_404_NOT_FOUND,
     HTTP_415_UNSUPPORTED_MEDIA_TYPE,
     HTTP_422_UNPROCESSABLE_ENTITY,
+    HTTP_503_SERVICE_UNAVAILABLE,
 )
 from strawberry.relay import GlobalID
 
+from phoenix.config import get_env_enable_prometheus
 from phoenix.db import models
 from phoenix.db.helpers import SupportedSQLDialect
 from phoenix.db.insertion.helpers import as_kv, insert_on_conflict
 from phoenix.db.insertion.types import Precursors
 from phoenix.server.dml_event import TraceAnnotationInsertEvent
-from phoenix.trace.otel import decode_otlp_span
-from phoenix.utilities.project import get_project_name
+from phoenix.trace.otel import decode_otlp_spans
 
 from .pydantic_compat import V1RoutesBaseModel
 from .utils import RequestBody, ResponseBody, add_errors_to_responses
 
 router = APIRouter(tags=["traces"])
 
+_RETRY_AFTER_SECONDS = 1
+
 
 @router.post(
     "/traces",
@@ -49,6 +53,10 @@ router = APIRouter(tags=["traces"])
                 ),
             },
             {"status_code": HTTP_422_UNPROCESSABLE_ENTITY, "description": "Invalid request body"},
+            {
+                "status_code": HTTP_503_SERVICE_UNAVAILABLE,
+                "description": "Server is busy ingesting spans, please retry later",
+            },
         ]
     ),
     openapi_extra={
@@ -63,7 +71,6 @@ router = APIRouter(tags=["traces"])
 )
 async def post_traces(
     request: Request,
-    background_tasks: BackgroundTasks,
     content_type: Optional[str] = Header(default=None),
     content_encoding: Optional[str] = Header(default=None),
 ) -> JSONResponse:
@@ -77,6 +84,12 @@ async def post_traces(
             detail=f"Unsupported content encoding: {content_encoding}",
             status_code=HTTP_415_UNSUPPORTED_MEDIA_TYPE,
         )
+    if not request.state.admit_spans_for_bulk_insert():
+        raise HTTPException(
+            detail="Server is busy ingesting spans, please retry later",
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(_RETRY_AFTER_SECONDS)},
+        )
     body = await request.body()
     if content_encoding == "gzip":
         body = await run_in_threadpool(gzip.decompress, body)
@@ -90,7 +103,7 @@ async def post_traces(
             detail="Request body is invalid ExportTraceServiceRequest",
             status_code=HTTP_422_UNPROCESSABLE_ENTITY,
         )
-    background_tasks.add_task(_add_spans, req, request.state)
+    await _add_spans(req, request.state)
     return JSONResponse(MessageToJson(ExportTraceServiceResponse()))
 
 
@@ -200,9 +213,14 @@ async def annotate_traces(
 
 
 async def _add_spans(req: ExportTraceServiceRequest, state: State) -> None:
-    for resource_spans in req.resource_spans:
-        project_name = get_project_name(resource_spans.resource.attributes)
-        for scope_span in resource_spans.scope_spans:
-            for otlp_span in scope_span.spans:
-                span = await run_in_threadpool(decode_otlp_span, otlp_span)
-                await state.queue_span_for_bulk_insert(span, project_name)
+    start = perf_counter()
+    spans = await run_in_threadpool(
+        decode_otlp_spans, req.resource_spans, state.otlp_decoding_executor
+    )
+    if get_env_enable_prometheus():
+        from phoenix.server.prometheus import INGESTION_DECODE_TIME
+
+        elapsed = perf_counter() - start
+        for project_name in {project_name for _, project_name in spans}:
+            INGESTION_DECODE_TIME.labels(project=project_name, transport="http").observe(elapsed)
+    await state.queue_spans_for_bulk_insert(spans, transport="http")
@@ -25,6 +25,8 @@ from typing_extensions import TypeAlias, assert_never
 
 from phoenix.datetime_utils import local_now, normalize_datetime
 from phoenix.db import models
+from phoenix.db.rollups import insert_span_rollups
+from phoenix.db.trace_aggregates import refresh_trace_aggregates
 from phoenix.server.api.auth import IsLocked, IsNotReadOnly
 from phoenix.server.api.context import Context
 from phoenix.server.api.exceptions import BadRequest, CustomGraphQLError, NotFound
@@ -164,6 +166,8 @@ class Subscription:
             db_span = get_db_span(span, db_trace)
             session.add(db_span)
             await session.flush()
+            await insert_span_rollups(session, [db_span])
+            await refresh_trace_aggregates(session, models.Trace.id == db_trace.id)
         info.context.event_queue.put(SpanInsertEvent(ids=(playground_project_id,)))
         yield ChatCompletionSubscriptionResult(span=to_gql_span(db_span))
 
@@ -462,6 +466,10 @@ async def _chat_completion_result_payloads(
                 session.add(span)
             session.add(run)
         await session.flush()
+        await insert_span_rollups(session, [span for _, span, _ in results if span])
+        await refresh_trace_aggregates(
+            session, models.Trace.id.in_([span.trace_rowid for _, span, _ in results if span])
+        )
     for example_id, span, run in results:
         yield ChatCompletionSubscriptionResult(
             span=to_gql_span(span) if span else None,
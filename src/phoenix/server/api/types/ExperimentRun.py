@@ -74,7 +74,7 @@ class ExperimentRun(Node):
     ]:  # use lazy types to avoid circular import: https://strawberry.rocks/docs/types/lazy
         from phoenix.server.api.types.DatasetExample import DatasetExample
 
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             assert (
                 result := await session.execute(
                     select(models.DatasetExample, models.Experiment.dataset_version_id)
@@ -4,8 +4,7 @@ from typing import Any, ClassVar, Optional
 
 import strawberry
 from aioitertools.itertools import islice
-from openinference.semconv.trace import SpanAttributes
-from sqlalchemy import and_, desc, distinct, func, or_, select
+from sqlalchemy import and_, desc, distinct, select
 from sqlalchemy.orm import contains_eager
 from sqlalchemy.sql.elements import ColumnElement
 from sqlalchemy.sql.expression import tuple_
@@ -165,7 +164,7 @@ class Project(Node):
             .where(models.Trace.trace_id == str(trace_id))
             .where(models.Trace.project_rowid == self.id_attr)
         )
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             if (trace := await session.scalar(stmt)) is None:
                 return None
         return to_gql_trace(trace)
@@ -204,9 +203,9 @@ class Project(Node):
                 parent,
                 models.Span.parent_id == parent.c.span_id,
             ).where(parent.c.span_id.is_(None))
-        if filter_condition:
-            span_filter = SpanFilter(condition=filter_condition)
-            stmt = span_filter(stmt)
+        span_filter = SpanFilter(condition=filter_condition) if filter_condition else None
+        if span_filter:
+            stmt = span_filter(stmt, include_placeholders=True)
         sort_config: Optional[SpanSortConfig] = None
         cursor_rowid_column: Any = models.Span.id
         if sort:
@@ -233,9 +232,25 @@ class Project(Node):
             )
         stmt = stmt.order_by(cursor_rowid_column)
         cursors_and_nodes = []
-        async with info.context.db() as session:
-            span_records = await session.execute(stmt)
-            async for span_record in islice(span_records, first):
+        async with info.context.db.read() as session:
+            span_records: list[Any] = []
+            offset = 0
+            while True:
+                fetched = (await session.execute(stmt.offset(offset))).all()
+                offset += len(fetched)
+                records = fetched
+                if span_filter and (
+                    excluded := await session.run_sync(
+                        span_filter.post_filter, [record[0].id for record in fetched]
+                    )
+                ):
+                    # The spans whose values are compressed or deduplicated are filtered
+                    # afterwards, so the page is filled up from the next rows if needed.
+                    records = [record for record in fetched if record[0].id not in excluded]
+                span_records.extend(records)
+                if not first or len(fetched) <= first or len(span_records) > first:
+                    break
+            for span_record in span_records[:first]:
                 span = span_record[0]
                 cursor = Cursor(rowid=span.id)
                 if sort_config:
@@ -245,11 +260,7 @@ class Project(Node):
                         value=span_record[1],
                     )
                 cursors_and_nodes.append((cursor, to_gql_span(span)))
-            has_next_page = True
-            try:
-                next(span_records)
-            except StopIteration:
-                has_next_page = False
+            has_next_page = first is not None and len(span_records) > first
 
         return connection_from_cursors_and_nodes(
             cursors_and_nodes,
@@ -275,24 +286,21 @@ class Project(Node):
             if time_range.end:
                 stmt = stmt.where(table.start_time < time_range.end)
         if filter_io_substring:
-            filter_subq = (
+            # The input and output values may be compressed or deduplicated, which
+            # the span filter sees through.
+            span_filter = SpanFilter(
+                condition=f"{filter_io_substring!r} in input.value "
+                f"or {filter_io_substring!r} in output.value",
+            )
+            filter_stmt = (
                 stmt.with_only_columns(distinct(table.id).label("id"))
                 .join_from(table, models.Trace)
                 .join_from(models.Trace, models.Span)
                 .where(models.Span.parent_id.is_(None))
-                .where(
-                    or_(
-                        models.TextContains(
-                            models.Span.attributes[INPUT_VALUE].as_string(),
-                            filter_io_substring,
-                        ),
-                        models.TextContains(
-                            models.Span.attributes[OUTPUT_VALUE].as_string(),
-                            filter_io_substring,
-                        ),
-                    )
-                )
-            ).subquery()
+            )
+            async with info.context.db.read() as session:
+                filter_stmt = await span_filter.apply(session, filter_stmt)
+            filter_subq = filter_stmt.subquery()
             stmt = stmt.join(filter_subq, table.id == filter_subq.c.id)
         if sort:
             key: ColumnElement[Any]
@@ -300,31 +308,10 @@ class Project(Node):
                 key = table.start_time.label("key")
             elif sort.col is ProjectSessionColumn.endTime:
                 key = table.end_time.label("key")
-            elif (
-                sort.col is ProjectSessionColumn.tokenCountTotal
-                or sort.col is ProjectSessionColumn.numTraces
-            ):
-                if sort.col is ProjectSessionColumn.tokenCountTotal:
-                    sort_subq = (
-                        select(
-                            models.Trace.project_session_rowid.label("id"),
-                            func.sum(models.Span.cumulative_llm_token_count_total).label("key"),
-                        )
-                        .join_from(models.Trace, models.Span)
-                        .where(models.Span.parent_id.is_(None))
-                        .group_by(models.Trace.project_session_rowid)
-                    ).subquery()
-                elif sort.col is ProjectSessionColumn.numTraces:
-                    sort_subq = (
-                        select(
-                            models.Trace.project_session_rowid.label("id"),
-                            func.count(models.Trace.id).label("key"),
-                        ).group_by(models.Trace.project_session_rowid)
-                    ).subquery()
-                else:
-                    assert_never(sort.col)
-                key = sort_subq.c.key
-                stmt = stmt.join(sort_subq, table.id == sort_subq.c.id)
+            elif sort.col is ProjectSessionColumn.tokenCountTotal:
+                key = table.llm_token_count_total.label("key")
+            elif sort.col is ProjectSessionColumn.numTraces:
+                key = table.num_traces.label("key")
             else:
                 assert_never(sort.col)
             stmt = stmt.add_columns(key)
@@ -352,7 +339,7 @@ class Project(Node):
                 first + 1  # over-fetch by one to determine whether there's a next page
             )
         cursors_and_nodes = []
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             records = await session.stream(stmt)
             async for record in islice(records, first):
                 project_session = record[0]
@@ -388,7 +375,7 @@ class Project(Node):
             .join(models.Trace)
             .where(models.Trace.project_rowid == self.id_attr)
         )
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             return list(await session.scalars(stmt))
 
     @strawberry.field(
@@ -405,7 +392,7 @@ class Project(Node):
             .join(models.Trace, models.Span.trace_rowid == models.Trace.id)
             .where(models.Trace.project_rowid == self.id_attr)
         )
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             return list(await session.scalars(stmt))
 
     @strawberry.field(
@@ -425,7 +412,7 @@ class Project(Node):
         )
         if span_id:
             stmt = stmt.where(models.Span.span_id == str(span_id))
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             return list(await session.scalars(stmt))
 
     @strawberry.field
@@ -497,7 +484,3 @@ def to_gql_project(project: models.Project) -> Project:
         gradient_start_color=project.gradient_start_color,
         gradient_end_color=project.gradient_end_color,
     )
-
-
-INPUT_VALUE = SpanAttributes.INPUT_VALUE.split(".")
-OUTPUT_VALUE = SpanAttributes.OUTPUT_VALUE.split(".")
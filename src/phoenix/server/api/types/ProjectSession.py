@@ -26,6 +26,11 @@ class ProjectSession(Node):
     session_id: str
     start_time: datetime
     end_time: datetime
+    num_traces: int
+    num_traces_with_error: int
+    first_input: Optional[SpanIOValue]
+    last_output: Optional[SpanIOValue]
+    token_usage: TokenUsage
 
     @strawberry.field
     async def project_id(self) -> GlobalID:
@@ -33,57 +38,6 @@ class ProjectSession(Node):
 
         return GlobalID(type_name=Project.__name__, node_id=str(self.project_rowid))
 
-    @strawberry.field
-    async def num_traces(
-        self,
-        info: Info[Context, None],
-    ) -> int:
-        return await info.context.data_loaders.session_num_traces.load(self.id_attr)
-
-    @strawberry.field
-    async def num_traces_with_error(
-        self,
-        info: Info[Context, None],
-    ) -> int:
-        return await info.context.data_loaders.session_num_traces_with_error.load(self.id_attr)
-
-    @strawberry.field
-    async def first_input(
-        self,
-        info: Info[Context, None],
-    ) -> Optional[SpanIOValue]:
-        record = await info.context.data_loaders.session_first_inputs.load(self.id_attr)
-        if record is None:
-            return None
-        return SpanIOValue(
-            mime_type=MimeType(record.mime_type.value),
-            value=record.value,
-        )
-
-    @strawberry.field
-    async def last_output(
-        self,
-        info: Info[Context, None],
-    ) -> Optional[SpanIOValue]:
-        record = await info.context.data_loaders.session_last_outputs.load(self.id_attr)
-        if record is None:
-            return None
-        return SpanIOValue(
-            mime_type=MimeType(record.mime_type.value),
-            value=record.value,
-        )
-
-    @strawberry.field
-    async def token_usage(
-        self,
-        info: Info[Context, None],
-    ) -> TokenUsage:
-        usage = await info.context.data_loaders.session_token_usages.load(self.id_attr)
-        return TokenUsage(
-            prompt=usage.prompt,
-            completion=usage.completion,
-        )
-
     @strawberry.field
     async def traces(
         self,
@@ -107,7 +61,7 @@ class ProjectSession(Node):
             .order_by(models.Trace.start_time)
             .limit(first)
         )
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             traces = await session.stream_scalars(stmt)
             data = [to_gql_trace(trace) async for trace in traces]
         return connection_from_list(data=data, args=args)
@@ -130,6 +84,29 @@ def to_gql_project_session(project_session: models.ProjectSession) -> ProjectSes
         start_time=project_session.start_time,
         project_rowid=project_session.project_id,
         end_time=project_session.end_time,
+        num_traces=project_session.num_traces,
+        num_traces_with_error=project_session.num_error_traces,
+        first_input=_to_gql_span_io_value(
+            project_session.first_input_value,
+            project_session.first_input_mime_type,
+        ),
+        last_output=_to_gql_span_io_value(
+            project_session.last_output_value,
+            project_session.last_output_mime_type,
+        ),
+        token_usage=TokenUsage(
+            prompt=project_session.llm_token_count_prompt,
+            completion=project_session.llm_token_count_completion,
+        ),
+    )
+
+
+def _to_gql_span_io_value(value: Optional[str], mime_type: Optional[str]) -> Optional[SpanIOValue]:
+    if value is None:
+        return None
+    return SpanIOValue(
+        mime_type=MimeType(mime_type),
+        value=value,
     )
 
 
@@ -14,6 +14,9 @@ from typing_extensions import Annotated
 
 import phoenix.trace.schemas as trace_schema
 from phoenix.db import models
+from phoenix.db.compression import decompress_attributes
+from phoenix.db.span_attribute_blobs import get_blob_hashes, resolve_blobs
+from phoenix.db.span_vectors import replace_vector_references
 from phoenix.server.api.context import Context
 from phoenix.server.api.helpers.dataset_helpers import (
     get_dataset_example_input,
@@ -102,6 +105,52 @@ class SpanEvent:
 class SpanAsExampleRevision(ExampleRevision): ...
 
 
+async def _resolve_attributes(root: "Span", info: Info[Context, None]) -> str:
+    attributes = decompress_attributes(root.db_span.attributes)
+    attributes = await _resolve_blobs(info, attributes)
+    return json.dumps(_hide_embedding_vectors(attributes), cls=_JSONEncoder)
+
+
+async def _resolve_input(root: "Span", info: Info[Context, None]) -> Optional[SpanIOValue]:
+    return await _get_io_value(info, root.db_span, INPUT_VALUE, INPUT_MIME_TYPE)
+
+
+async def _resolve_output(root: "Span", info: Info[Context, None]) -> Optional[SpanIOValue]:
+    return await _get_io_value(info, root.db_span, OUTPUT_VALUE, OUTPUT_MIME_TYPE)
+
+
+async def _get_io_value(
+    info: Info[Context, None],
+    span: models.Span,
+    value_key: str,
+    mime_type_key: str,
+) -> Optional[SpanIOValue]:
+    value = get_attribute_value(span.attributes, value_key)
+    if value is None:
+        return None
+    value = await _resolve_blobs(info, decompress_attributes(value))
+    return SpanIOValue(
+        mime_type=MimeType(get_attribute_value(span.attributes, mime_type_key)),
+        value=str(value),
+    )
+
+
+async def _resolve_blobs(info: Info[Context, None], value: Any) -> Any:
+    """
+    Resolves the references to the deduplicated attribute values in `value`.
+    """
+    if not (blobs := await _get_blobs(info, value)):
+        return value
+    return resolve_blobs(value, blobs)
+
+
+async def _get_blobs(info: Info[Context, None], value: Any) -> dict[str, str]:
+    if not (hashes := list(get_blob_hashes(value))):
+        return {}
+    blobs = await info.context.data_loaders.span_attribute_blobs.load_many(hashes)
+    return {blob_hash: blob for blob_hash, blob in zip(hashes, blobs) if blob is not None}
+
+
 @strawberry.type
 class Span(Node):
     id_attr: NodeID[int]
@@ -119,6 +168,7 @@ class Span(Node):
     context: SpanContext
     attributes: str = strawberry.field(
         description="Span attributes as a JSON string",
+        resolver=_resolve_attributes,
     )
     metadata: Optional[str] = strawberry.field(
         description="Metadata as a JSON string",
@@ -127,8 +177,8 @@ class Span(Node):
     token_count_total: Optional[int]
     token_count_prompt: Optional[int]
     token_count_completion: Optional[int]
-    input: Optional[SpanIOValue]
-    output: Optional[SpanIOValue]
+    input: Optional[SpanIOValue] = strawberry.field(resolver=_resolve_input)
+    output: Optional[SpanIOValue] = strawberry.field(resolver=_resolve_output)
     events: list[SpanEvent]
     cumulative_token_count_total: Optional[int] = strawberry.field(
         description="Cumulative (prompt plus completion) token count from "
@@ -229,9 +279,10 @@ class Span(Node):
             **({"annotations": annotations} if annotations else {}),
         }
 
+        blobs = await _get_blobs(info, span.attributes)
         return SpanAsExampleRevision(
-            input=get_dataset_example_input(span),
-            output=get_dataset_example_output(span),
+            input=get_dataset_example_input(span, blobs),
+            output=get_dataset_example_output(span, blobs),
             metadata=metadata,
         )
 
@@ -290,14 +341,6 @@ class Span(Node):
 
 def to_gql_span(span: models.Span) -> Span:
     events: list[SpanEvent] = list(map(SpanEvent.from_dict, span.events))
-    input_value = get_attribute_value(span.attributes, INPUT_VALUE)
-    if input_value is not None:
-        input_value = str(input_value)
-    assert input_value is None or isinstance(input_value, str)
-    output_value = get_attribute_value(span.attributes, OUTPUT_VALUE)
-    if output_value is not None:
-        output_value = str(output_value)
-    assert output_value is None or isinstance(output_value, str)
     retrieval_documents = get_attribute_value(span.attributes, RETRIEVAL_DOCUMENTS)
     num_documents = len(retrieval_documents) if isinstance(retrieval_documents, Sized) else None
     return Span(
@@ -315,7 +358,6 @@ def to_gql_span(span: models.Span) -> Span:
             trace_id=cast(ID, span.trace.trace_id),
             span_id=cast(ID, span.span_id),
         ),
-        attributes=json.dumps(_hide_embedding_vectors(span.attributes), cls=_JSONEncoder),
         metadata=_convert_metadata_to_string(get_attribute_value(span.attributes, METADATA)),
         num_documents=num_documents,
         token_count_total=span.llm_token_count_total,
@@ -331,26 +373,15 @@ def to_gql_span(span: models.Span) -> Span:
             else SpanStatusCode(span.status_code)
         ),
         events=events,
-        input=(
-            SpanIOValue(
-                mime_type=MimeType(get_attribute_value(span.attributes, INPUT_MIME_TYPE)),
-                value=input_value,
-            )
-            if input_value is not None
-            else None
-        ),
-        output=(
-            SpanIOValue(
-                mime_type=MimeType(get_attribute_value(span.attributes, OUTPUT_MIME_TYPE)),
-                value=output_value,
-            )
-            if output_value is not None
-            else None
-        ),
     )
 
 
 def _hide_embedding_vectors(attributes: Mapping[str, Any]) -> Mapping[str, Any]:
+    # Vectors stored in the side-car table are never loaded here.
+    attributes = replace_vector_references(
+        attributes,
+        lambda reference: f"<{reference.get('dimensions')} dimensional vector>",
+    )
     if not (
         isinstance(em := attributes.get("embedding"), dict)
         and isinstance(embeddings := em.get("embeddings"), list)
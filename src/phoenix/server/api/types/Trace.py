@@ -35,13 +35,18 @@ class Trace(Node):
     trace_id: str
     start_time: datetime
     end_time: datetime
+    num_spans: int
+    num_error_spans: int
+    token_count_total: int
+    token_count_prompt: int
+    token_count_completion: int
 
     @strawberry.field
     async def latency_ms(
         self,
         info: Info[Context, None],
     ) -> Optional[float]:
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             latency = await session.scalar(
                 select(
                     models.Trace.latency_ms,
@@ -73,7 +78,7 @@ class Trace(Node):
         from phoenix.server.api.types.ProjectSession import to_gql_project_session
 
         stmt = select(models.ProjectSession).filter_by(id=self.project_session_rowid)
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             project_session = await session.scalar(stmt)
         if project_session is None:
             return None
@@ -114,7 +119,7 @@ class Trace(Node):
             .order_by(desc(models.Span.id))
             .limit(first)
         )
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             spans = await session.stream_scalars(stmt)
             data = [to_gql_span(span) async for span in spans]
         return connection_from_list(data=data, args=args)
@@ -125,7 +130,7 @@ class Trace(Node):
         info: Info[Context, None],
         sort: Optional[TraceAnnotationSort] = None,
     ) -> list[TraceAnnotation]:
-        async with info.context.db() as session:
+        async with info.context.db.read() as session:
             stmt = select(models.TraceAnnotation).filter_by(span_rowid=self.id_attr)
             if sort:
                 sort_col = getattr(models.TraceAnnotation, sort.col.value)
@@ -147,6 +152,11 @@ def to_gql_trace(trace: models.Trace) -> Trace:
         trace_id=trace.trace_id,
         start_time=trace.start_time,
         end_time=trace.end_time,
+        num_spans=trace.num_spans,
+        num_error_spans=trace.num_error_spans,
+        token_count_total=trace.llm_token_count_total,
+        token_count_prompt=trace.llm_token_count_prompt,
+        token_count_completion=trace.llm_token_count_completion,
     )
 
 
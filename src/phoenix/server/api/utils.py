@@ -1,11 +1,17 @@
 from sqlalchemy import delete
 
 from phoenix.db import models
-from phoenix.server.types import DbSessionFactory
+from phoenix.db.trace_deletion import (
+    delete_traces_in_chunks,
+    delete_unreferenced_blobs_in_chunks,
+)
+from phoenix.server.dml_event import DmlEvent, ProjectDeleteEvent
+from phoenix.server.types import CanPutItem, DbSessionFactory
 
 
 async def delete_projects(
     db: DbSessionFactory,
+    event_queue: CanPutItem[DmlEvent],
     *project_names: str,
 ) -> list[int]:
     if not project_names:
@@ -16,19 +22,18 @@ async def delete_projects(
         .returning(models.Project.id)
     )
     async with db() as session:
-        return list(await session.scalars(stmt))
+        project_rowids = list(await session.scalars(stmt))
+    event_queue.put(ProjectDeleteEvent(tuple(project_rowids)))
+    if project_rowids:
+        await delete_unreferenced_blobs_in_chunks(db)
+    return project_rowids
 
 
 async def delete_traces(
     db: DbSessionFactory,
+    event_queue: CanPutItem[DmlEvent],
     *trace_ids: str,
-) -> list[int]:
+) -> int:
     if not trace_ids:
-        return []
-    stmt = (
-        delete(models.Trace)
-        .where(models.Trace.trace_id.in_(set(trace_ids)))
-        .returning(models.Trace.id)
-    )
-    async with db() as session:
-        return list(await session.scalars(stmt))
+        return 0
+    return await delete_traces_in_chunks(db, event_queue, models.Trace.trace_id.in_(set(trace_ids)))
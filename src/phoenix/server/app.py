@@ -5,10 +5,12 @@ import json
 import logging
 import os
 from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import AbstractAsyncContextManager, AsyncExitStack
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from functools import cached_property
+from functools import cached_property, partial
+from multiprocessing import get_context
 from pathlib import Path
 from types import MethodType
 from typing import (
@@ -53,11 +55,24 @@ from phoenix.config import (
     SERVER_DIR,
     OAuth2ClientConfig,
     get_env_csrf_trusted_origins,
+    get_env_database_read_max_lag_seconds,
     get_env_fastapi_middleware_paths,
     get_env_gql_extension_paths,
     get_env_grpc_interceptor_paths,
     get_env_host,
+    get_env_ingestion_buffer_max_bytes,
+    get_env_ingestion_buffer_max_items,
+    get_env_ingestion_spool_dir,
+    get_env_ingestion_use_copy,
+    get_env_otlp_decoding_processes,
     get_env_port,
+    get_env_span_attribute_compression_threshold,
+    get_env_span_attribute_deduplication_threshold,
+    get_env_span_partition_interval,
+    get_env_trace_archive_after_days,
+    get_env_trace_archive_dir,
+    get_env_trace_retention_policies,
+    get_env_trace_retention_sweep_interval_seconds,
     server_instrumentation_is_enabled,
 )
 from phoenix.core.model_schema import Model
@@ -66,6 +81,8 @@ from phoenix.db.bulk_inserter import BulkInserter
 from phoenix.db.engines import create_engine
 from phoenix.db.facilitator import Facilitator
 from phoenix.db.helpers import SupportedSQLDialect
+from phoenix.db.insertion.spool import Spool
+from phoenix.db.replicas import ReplicaLag
 from phoenix.exceptions import PhoenixMigrationError
 from phoenix.pointcloud.umap_parameters import UMAPParameters
 from phoenix.server.api.context import Context, DataLoaders
@@ -87,12 +104,9 @@ from phoenix.server.api.dataloaders import (
     MinStartOrMaxEndTimeDataLoader,
     ProjectByNameDataLoader,
     RecordCountDataLoader,
-    SessionIODataLoader,
-    SessionNumTracesDataLoader,
-    SessionNumTracesWithErrorDataLoader,
-    SessionTokenUsagesDataLoader,
     SessionTraceLatencyMsQuantileDataLoader,
     SpanAnnotationsDataLoader,
+    SpanAttributeBlobsDataLoader,
     SpanDatasetExamplesDataLoader,
     SpanDescendantsDataLoader,
     SpanProjectsDataLoader,
@@ -110,6 +124,7 @@ from phoenix.server.api.routers import (
 )
 from phoenix.server.api.routers.v1 import REST_API_VERSION
 from phoenix.server.api.schema import build_graphql_schema
+from phoenix.server.archiver import TraceArchiver
 from phoenix.server.bearer_auth import BearerTokenAuthBackend, is_authenticated
 from phoenix.server.dml_event import DmlEvent
 from phoenix.server.dml_event_handler import DmlEventHandler
@@ -117,6 +132,7 @@ from phoenix.server.email.types import EmailSender
 from phoenix.server.grpc_server import GrpcServer
 from phoenix.server.jwt_store import JwtStore
 from phoenix.server.oauth2 import OAuth2Clients
+from phoenix.server.retention import TraceRetentionManager
 from phoenix.server.telemetry import initialize_opentelemetry_tracer_provider
 from phoenix.server.types import (
     CanGetLastUpdatedAt,
@@ -126,6 +142,7 @@ from phoenix.server.types import (
     LastUpdatedAt,
     TokenStore,
 )
+from phoenix.trace.archive import TraceArchive
 from phoenix.trace.fixtures import (
     TracesFixture,
     get_dataset_fixtures,
@@ -350,6 +367,28 @@ def _db(
     return factory
 
 
+def _read_db(
+    engine: AsyncEngine,
+    db: Callable[[], AbstractAsyncContextManager[AsyncSession]],
+) -> Callable[[], AbstractAsyncContextManager[AsyncSession]]:
+    """
+    Returns the factory of the sessions of the read engine (see `create_read_engine`),
+    which falls back to the given factory of the primary database when the engine is
+    that of a read replica that lags behind.
+    """
+    if SupportedSQLDialect(engine.dialect.name) is SupportedSQLDialect.SQLITE:
+        return _db(engine, bypass_lock=True)
+    replica = _db(engine, bypass_lock=True)
+    replica_lag = ReplicaLag(engine, get_env_database_read_max_lag_seconds())
+
+    @contextlib.asynccontextmanager
+    async def factory() -> AsyncIterator[AsyncSession]:
+        async with (replica if await replica_lag.is_acceptable() else db)() as session:
+            yield session
+
+    return factory
+
+
 @dataclass(frozen=True)
 class ScaffolderConfig:
     db: DbSessionFactory
@@ -363,12 +402,12 @@ class Scaffolder(DaemonTask):
     def __init__(
         self,
         config: ScaffolderConfig,
-        queue_span: Callable[[Span, ProjectName], Awaitable[None]],
+        queue_spans: Callable[[Sequence[tuple[Span, ProjectName]]], Awaitable[None]],
         queue_evaluation: Callable[[pb.Evaluation], Awaitable[None]],
     ) -> None:
         super().__init__()
         self._db = config.db
-        self._queue_span = queue_span
+        self._queue_spans = queue_spans
         self._queue_evaluation = queue_evaluation
         self._tracing_fixtures = [
             get_trace_fixture_by_name(name) for name in set(config.tracing_fixture_names)
@@ -439,8 +478,7 @@ class Scaffolder(DaemonTask):
 
                 project_name = fixture.project_name or fixture.name
                 logger.info(f"Loading '{project_name}' fixtures...")
-                for span in fixture_spans:
-                    await self._queue_span(span, project_name)
+                await self._queue_spans([(span, project_name) for span in fixture_spans])
                 for evaluation in fixture_evals:
                     await self._queue_evaluation(evaluation)
 
@@ -471,12 +509,15 @@ def _lifespan(
     bulk_inserter: BulkInserter,
     dml_event_handler: DmlEventHandler,
     token_store: Optional[TokenStore] = None,
+    trace_retention_manager: Optional[TraceRetentionManager] = None,
+    trace_archiver: Optional[TraceArchiver] = None,
     tracer_provider: Optional["TracerProvider"] = None,
     enable_prometheus: bool = False,
     startup_callbacks: Iterable[_Callback] = (),
     shutdown_callbacks: Iterable[_Callback] = (),
     read_only: bool = False,
     scaffolder_config: Optional[ScaffolderConfig] = None,
+    otlp_decoding_processes: int = 0,
 ) -> StatefulLifespan[FastAPI]:
     @contextlib.asynccontextmanager
     async def lifespan(_: FastAPI) -> AsyncIterator[dict[str, Any]]:
@@ -486,14 +527,27 @@ def _lifespan(
         global DB_MUTEX
         DB_MUTEX = asyncio.Lock() if db.dialect is SupportedSQLDialect.SQLITE else None
         async with AsyncExitStack() as stack:
+            otlp_decoding_executor = (
+                stack.enter_context(
+                    ProcessPoolExecutor(
+                        max_workers=otlp_decoding_processes,
+                        # Forking a process with running threads is unsafe.
+                        mp_context=get_context("spawn"),
+                    )
+                )
+                if otlp_decoding_processes and not read_only
+                else None
+            )
             (
                 enqueue,
-                queue_span,
+                queue_spans,
                 queue_evaluation,
                 enqueue_operation,
             ) = await stack.enter_async_context(bulk_inserter)
             grpc_server = GrpcServer(
-                queue_span,
+                partial(queue_spans, transport="grpc"),
+                admit=bulk_inserter.admit,
+                otlp_decoding_executor=otlp_decoding_executor,
                 disabled=read_only,
                 tracer_provider=tracer_provider,
                 enable_prometheus=enable_prometheus,
@@ -502,10 +556,14 @@ def _lifespan(
             )
             await stack.enter_async_context(grpc_server)
             await stack.enter_async_context(dml_event_handler)
+            if trace_retention_manager and not read_only:
+                await stack.enter_async_context(trace_retention_manager)
+            if trace_archiver and not read_only:
+                await stack.enter_async_context(trace_archiver)
             if scaffolder_config:
                 scaffolder = Scaffolder(
                     config=scaffolder_config,
-                    queue_span=queue_span,
+                    queue_spans=queue_spans,
                     queue_evaluation=queue_evaluation,
                 )
                 await stack.enter_async_context(scaffolder)
@@ -514,9 +572,11 @@ def _lifespan(
             yield {
                 "event_queue": dml_event_handler,
                 "enqueue": enqueue,
-                "queue_span_for_bulk_insert": queue_span,
+                "admit_spans_for_bulk_insert": bulk_inserter.admit,
+                "queue_spans_for_bulk_insert": queue_spans,
                 "queue_evaluation_for_bulk_insert": queue_evaluation,
                 "enqueue_operation": enqueue_operation,
+                "otlp_decoding_executor": otlp_decoding_executor,
             }
         for callback in shutdown_callbacks:
             if isinstance((res := callback()), Awaitable):
@@ -615,13 +675,9 @@ def create_graphql_router(
                     db,
                     cache_map=cache_for_dataloaders.record_count if cache_for_dataloaders else None,
                 ),
-                session_first_inputs=SessionIODataLoader(db, "first_input"),
-                session_last_outputs=SessionIODataLoader(db, "last_output"),
-                session_num_traces=SessionNumTracesDataLoader(db),
-                session_num_traces_with_error=SessionNumTracesWithErrorDataLoader(db),
-                session_token_usages=SessionTokenUsagesDataLoader(db),
                 session_trace_latency_ms_quantile=SessionTraceLatencyMsQuantileDataLoader(db),
                 span_annotations=SpanAnnotationsDataLoader(db),
+                span_attribute_blobs=SpanAttributeBlobsDataLoader(db),
                 span_dataset_examples=SpanDatasetExamplesDataLoader(db),
                 span_descendants=SpanDescendantsDataLoader(db),
                 span_projects=SpanProjectsDataLoader(db),
@@ -674,14 +730,14 @@ def create_engine_and_run_migrations(
         raise PhoenixMigrationError(msg) from e
 
 
-def instrument_engine_if_enabled(engine: AsyncEngine) -> list[Callable[[], None]]:
+def instrument_engine_if_enabled(*engines: AsyncEngine) -> list[Callable[[], None]]:
     instrumentation_cleanups = []
     if server_instrumentation_is_enabled():
         from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
 
         tracer_provider = initialize_opentelemetry_tracer_provider()
         SQLAlchemyInstrumentor().instrument(
-            engine=engine.sync_engine,
+            engines=[engine.sync_engine for engine in engines],
             tracer_provider=tracer_provider,
         )
         instrumentation_cleanups.append(SQLAlchemyInstrumentor().uninstrument)
@@ -758,6 +814,14 @@ def create_app(
                 "To visualize embeddings, please install `umap-learn` and `fast-hdbscan` "
                 "via `pip install arize-phoenix[embeddings]`"
             ) from exc
+    if (compression_threshold := get_env_span_attribute_compression_threshold()) is not None:
+        try:
+            import zstandard  # noqa: F401
+        except ImportError as exc:
+            raise ImportError(
+                "To compress span attributes, please install `zstandard` "
+                "via `pip install arize-phoenix[compression]`"
+            ) from exc
     logger.info(f"Server umap params: {umap_params}")
     bulk_inserter_factory = bulk_inserter_factory or BulkInserter
     startup_callbacks_list: list[_Callback] = list(startup_callbacks)
@@ -814,7 +878,32 @@ def create_app(
         event_queue=dml_event_handler,
         initial_batch_of_spans=initial_batch_of_spans,
         initial_batch_of_evaluations=initial_batch_of_evaluations,
+        max_buffered_items=get_env_ingestion_buffer_max_items(),
+        max_buffered_bytes=get_env_ingestion_buffer_max_bytes(),
+        spool=None if (spool_dir := get_env_ingestion_spool_dir()) is None else Spool(spool_dir),
+        use_copy=get_env_ingestion_use_copy(),
+        compression_threshold=compression_threshold,
+        deduplication_threshold=get_env_span_attribute_deduplication_threshold(),
     )
+    dml_event_handler.subscribe(bulk_inserter.identity_cache)
+    trace_retention_manager = TraceRetentionManager(
+        db,
+        get_env_trace_retention_policies(),
+        dml_event_handler,
+        sweep_interval_seconds=get_env_trace_retention_sweep_interval_seconds(),
+        partition_interval=get_env_span_partition_interval(),
+        enable_prometheus=enable_prometheus,
+    )
+    trace_archive = None
+    trace_archiver = None
+    if (trace_archive_dir := get_env_trace_archive_dir()) is not None:
+        trace_archive = TraceArchive(trace_archive_dir)
+        trace_archiver = TraceArchiver(
+            db,
+            trace_archive,
+            dml_event_handler,
+            max_age=timedelta(days=get_env_trace_archive_after_days()),
+        )
     tracer_provider = None
     graphql_schema_extensions: list[Union[type[SchemaExtension], SchemaExtension]] = []
     graphql_schema_extensions.extend(user_gql_extensions())
@@ -865,11 +954,14 @@ def create_app(
             bulk_inserter=bulk_inserter,
             dml_event_handler=dml_event_handler,
             token_store=token_store,
+            trace_retention_manager=trace_retention_manager,
+            trace_archiver=trace_archiver,
             tracer_provider=tracer_provider,
             enable_prometheus=enable_prometheus,
             shutdown_callbacks=shutdown_callbacks_list,
             startup_callbacks=startup_callbacks_list,
             scaffolder_config=scaffolder_config,
+            otlp_decoding_processes=get_env_otlp_decoding_processes(),
         ),
         middleware=middlewares,
         exception_handlers={
@@ -921,6 +1013,7 @@ def create_app(
     app.state.refresh_token_expiry = refresh_token_expiry
     app.state.oauth2_clients = OAuth2Clients.from_configs(oauth2_client_configs or [])
     app.state.db = db
+    app.state.trace_archive = trace_archive
     app.state.email_sender = email_sender
     app = _add_get_secret_method(app=app, secret=secret)
     app = _add_get_token_store_method(app=app, token_store=token_store)
@@ -0,0 +1,119 @@
+import logging
+from asyncio import create_task, get_running_loop, sleep
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from phoenix.db import models
+from phoenix.db.compression import decompress_attributes
+from phoenix.db.span_attribute_blobs import get_blob_hashes, get_blobs, resolve_blobs
+from phoenix.db.span_vectors import get_span_vectors, hydrate
+from phoenix.db.trace_deletion import delete_traces_in_chunks
+from phoenix.server.dml_event import DmlEvent
+from phoenix.server.types import CanPutItem, DaemonTask, DbSessionFactory
+from phoenix.trace.archive import TraceArchive
+
+logger = logging.getLogger(__name__)
+
+
+class TraceArchiver(DaemonTask):
+    """
+    Periodically moves the traces that started more than `max_age` ago out of the
+    database and into the Parquet files of the archive, where span queries still
+    find their spans.
+
+    Traces are moved in chunks of at most `chunk_size` traces, whose spans are
+    written to the archive with their attributes fully materialized before the
+    traces are deleted, each chunk followed by a pause. A trace that is archived
+    but not deleted, e.g. because the server stopped in between, is archived again
+    by the next sweep, and its spans are then read from the archive only once. The
+    annotations of archived spans are deleted along with them, and everything else
+    derived from the traces is deleted or recomputed as when traces are deleted
+    (see `phoenix.db.trace_deletion`).
+    """
+
+    def __init__(
+        self,
+        db: DbSessionFactory,
+        archive: TraceArchive,
+        event_queue: CanPutItem[DmlEvent],
+        *,
+        max_age: timedelta,
+        sweep_interval_seconds: float = 600,
+        chunk_size: int = 100,
+        pause_seconds: float = 0.1,
+        **kwargs: Any,
+    ) -> None:
+        assert sweep_interval_seconds > 0
+        assert chunk_size > 0
+        super().__init__(**kwargs)
+        self._db = db
+        self._archive = archive
+        self._event_queue = event_queue
+        self._max_age = max_age
+        self._sweep_interval_seconds = sweep_interval_seconds
+        self._chunk_size = chunk_size
+        self._pause_seconds = pause_seconds
+
+    async def _run(self) -> None:
+        while self._running:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Failed to archive traces")
+            self._tasks.append(create_task(sleep(self._sweep_interval_seconds)))
+            await self._tasks[-1]
+            self._tasks.pop()
+
+    async def sweep(self) -> int:
+        """
+        Archives the expired traces of all projects once, and returns the number of
+        traces archived.
+        """
+        cutoff = datetime.now(timezone.utc) - self._max_age
+        async with self._db() as session:
+            projects = (await session.execute(select(models.Project.id, models.Project.name))).all()
+        num_archived_traces = 0
+        for project_rowid, project_name in projects:
+            num_archived_traces += await self._archive_traces(project_rowid, project_name, cutoff)
+        return num_archived_traces
+
+    async def _archive_traces(self, project_rowid: int, project_name: str, cutoff: datetime) -> int:
+        loop = get_running_loop()
+
+        async def archive(trace_rowids: list[int]) -> None:
+            async with self._db() as session:
+                spans = list(
+                    await session.scalars(
+                        select(models.Span)
+                        .where(models.Span.trace_rowid.in_(trace_rowids))
+                        .options(selectinload(models.Span.trace))
+                    )
+                )
+                blobs = await get_blobs(
+                    session, {h for span in spans for h in get_blob_hashes(span.attributes)}
+                )
+                vectors = await get_span_vectors(session, [span.id for span in spans])
+                # Detached, so that materializing the attributes is not flushed.
+                session.expunge_all()
+            for span in spans:
+                span.attributes = hydrate(
+                    resolve_blobs(decompress_attributes(span.attributes), blobs),
+                    vectors.get(span.id, {}),
+                )
+            await loop.run_in_executor(None, self._archive.write, project_name, spans)
+
+        num_archived_traces = await delete_traces_in_chunks(
+            self._db,
+            self._event_queue,
+            models.Trace.project_rowid == project_rowid,
+            models.Trace.start_time < cutoff,
+            chunk_size=self._chunk_size,
+            pause_seconds=self._pause_seconds,
+            before_delete=archive,
+        )
+        if num_archived_traces:
+            logger.info(f"Archived {num_archived_traces} traces of project {project_name}")
+        return num_archived_traces
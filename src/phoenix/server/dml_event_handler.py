@@ -5,11 +5,13 @@ from asyncio import gather
 from collections.abc import Callable, Iterable, Iterator, Mapping
 from inspect import getmro
 from itertools import chain
+from time import monotonic
 from typing import Any, Generic, Optional, TypedDict, TypeVar, Union, cast
 
 from sqlalchemy import Select, select
 from typing_extensions import TypeAlias, Unpack
 
+from phoenix.config import get_env_enable_prometheus
 from phoenix.db.models import (
     Base,
     DocumentAnnotation,
@@ -30,6 +32,7 @@ from phoenix.server.dml_event import (
 )
 from phoenix.server.types import (
     BatchedCaller,
+    CanPutItem,
     CanSetLastUpdatedAt,
     DbSessionFactory,
 )
@@ -41,16 +44,20 @@ class _DmlEventQueue(Generic[_DmlEventT]):
     def __init__(self, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         self._events: set[_DmlEventT] = set()
+        self.first_put_at: Optional[float] = None
 
     @property
     def empty(self) -> bool:
         return not self._events
 
     def put(self, event: _DmlEventT) -> None:
+        if self.first_put_at is None:
+            self.first_put_at = monotonic()
         self._events.add(event)
 
     def clear(self) -> None:
         self._events.clear()
+        self.first_put_at = None
 
     def __iter__(self) -> Iterator[_DmlEventT]:
         yield from self._events
@@ -99,6 +106,18 @@ class _DmlEventHandler(
     def __hash__(self) -> int:
         return id(self)
 
+    def _observe_propagation_time(self, table: type[Base]) -> None:
+        """
+        Records the time elapsed since the oldest event of the batch was put.
+        """
+        batch = cast(_DmlEventQueue[_DmlEventT], self._batch)
+        if (first_put_at := batch.first_put_at) is not None and get_env_enable_prometheus():
+            from phoenix.server.prometheus import DML_EVENT_PROPAGATION_TIME
+
+            DML_EVENT_PROPAGATION_TIME.labels(table=table.__tablename__).observe(
+                monotonic() - first_put_at
+            )
+
 
 class _GenericDmlEventHandler(_DmlEventHandler[DmlEvent]):
     async def __call__(self) -> None:
@@ -115,6 +134,7 @@ class _SpanDmlEventHandler(_DmlEventHandler[SpanDmlEvent]):
         if cache := self._cache_for_dataloaders:
             for id_ in set(chain.from_iterable(e.ids for e in self._batch)):
                 self._clear(cache, id_)
+            self._observe_propagation_time(Span)
 
     @staticmethod
     def _clear(cache: CacheForDataLoaders, project_id: int) -> None:
@@ -175,6 +195,8 @@ class _AnnotationDmlEventHandler(
                 self._last_updated_at.set(Project, row.id)
                 if cache := self._cache_for_dataloaders:
                     self._clear(cache, row.id, row.name)
+        if self._cache_for_dataloaders:
+            self._observe_propagation_time(self._table)
 
 
 class _SpanAnnotationDmlEventHandler(_AnnotationDmlEventHandler[SpanAnnotationDmlEvent]):
@@ -237,6 +259,14 @@ class DmlEventHandler:
             DocumentAnnotationDmlEvent: [_DocumentAnnotationDmlEventHandler(**kwargs)],
         }
         self._all_handlers = frozenset(chain.from_iterable(self._handlers.values()))
+        self._subscribers: list[CanPutItem[DmlEvent]] = []
+
+    def subscribe(self, subscriber: CanPutItem[DmlEvent]) -> None:
+        """
+        Registers a subscriber that receives every event synchronously upon `put`,
+        e.g. to invalidate an in-process cache before the next insertion.
+        """
+        self._subscribers.append(subscriber)
 
     async def __aenter__(self) -> None:
         await gather(*(h.start() for h in self._all_handlers))
@@ -247,6 +277,8 @@ class DmlEventHandler:
     def put(self, event: DmlEvent) -> None:
         if not (isinstance(event, DmlEvent) and event):
             return
+        for subscriber in self._subscribers:
+            subscriber.put(event)
         for cls in getmro(type(event)):
             if not (issubclass(cls, DmlEvent) and (handlers := self._handlers.get(cls))):
                 continue
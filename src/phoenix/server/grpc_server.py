@@ -1,8 +1,11 @@
-from collections.abc import Awaitable, Callable
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from concurrent.futures import Executor
+from time import perf_counter
 from typing import TYPE_CHECKING, Any, Optional
 
 import grpc
-from grpc.aio import RpcContext, Server, ServerInterceptor
+from grpc.aio import Server, ServerInterceptor, ServicerContext
 from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
     ExportTraceServiceRequest,
     ExportTraceServiceResponse,
@@ -16,9 +19,8 @@ from typing_extensions import TypeAlias
 from phoenix.auth import CanReadToken
 from phoenix.config import get_env_grpc_port
 from phoenix.server.bearer_auth import ApiKeyInterceptor
-from phoenix.trace.otel import decode_otlp_span
+from phoenix.trace.otel import decode_otlp_spans
 from phoenix.trace.schemas import Span
-from phoenix.utilities.project import get_project_name
 
 if TYPE_CHECKING:
     from opentelemetry.trace import TracerProvider
@@ -29,29 +31,53 @@ ProjectName: TypeAlias = str
 class Servicer(TraceServiceServicer):  # type: ignore[misc,unused-ignore]
     def __init__(
         self,
-        callback: Callable[[Span, ProjectName], Awaitable[None]],
+        callback: Callable[[Sequence[tuple[Span, ProjectName]]], Awaitable[None]],
+        admit: Optional[Callable[[], bool]] = None,
+        otlp_decoding_executor: Optional[Executor] = None,
+        enable_prometheus: bool = False,
     ) -> None:
         super().__init__()
         self._callback = callback
+        self._admit = admit
+        self._otlp_decoding_executor = otlp_decoding_executor
+        self._enable_prometheus = enable_prometheus
 
     async def Export(
         self,
         request: ExportTraceServiceRequest,
-        context: RpcContext,
+        context: ServicerContext,
     ) -> ExportTraceServiceResponse:
-        for resource_spans in request.resource_spans:
-            project_name = get_project_name(resource_spans.resource.attributes)
-            for scope_span in resource_spans.scope_spans:
-                for otlp_span in scope_span.spans:
-                    span = decode_otlp_span(otlp_span)
-                    await self._callback(span, project_name)
+        if self._admit is not None and not self._admit():
+            await context.abort(
+                grpc.StatusCode.RESOURCE_EXHAUSTED,
+                "Server is busy ingesting spans, please retry later",
+            )
+        loop = asyncio.get_running_loop()
+        start = perf_counter()
+        spans = await loop.run_in_executor(
+            None,
+            decode_otlp_spans,
+            request.resource_spans,
+            self._otlp_decoding_executor,
+        )
+        if self._enable_prometheus:
+            from phoenix.server.prometheus import INGESTION_DECODE_TIME
+
+            elapsed = perf_counter() - start
+            for project_name in {project_name for _, project_name in spans}:
+                INGESTION_DECODE_TIME.labels(project=project_name, transport="grpc").observe(
+                    elapsed
+                )
+        await self._callback(spans)
         return ExportTraceServiceResponse()
 
 
 class GrpcServer:
     def __init__(
         self,
-        callback: Callable[[Span, ProjectName], Awaitable[None]],
+        callback: Callable[[Sequence[tuple[Span, ProjectName]]], Awaitable[None]],
+        admit: Optional[Callable[[], bool]] = None,
+        otlp_decoding_executor: Optional[Executor] = None,
         tracer_provider: Optional["TracerProvider"] = None,
         enable_prometheus: bool = False,
         disabled: bool = False,
@@ -59,6 +85,8 @@ class GrpcServer:
         interceptors: list[ServerInterceptor] = [],
     ) -> None:
         self._callback = callback
+        self._admit = admit
+        self._otlp_decoding_executor = otlp_decoding_executor
         self._server: Optional[Server] = None
         self._tracer_provider = tracer_provider
         self._enable_prometheus = enable_prometheus
@@ -73,11 +101,9 @@ class GrpcServer:
         if self._token_store:
             interceptors.append(ApiKeyInterceptor(self._token_store))
         if self._enable_prometheus:
-            ...
-            # TODO: convert to async interceptor
-            # from py_grpc_prometheus.prometheus_server_interceptor import PromServerInterceptor
-            #
-            # interceptors.append(PromServerInterceptor())
+            from phoenix.server.prometheus import PrometheusGrpcInterceptor
+
+            interceptors.append(PrometheusGrpcInterceptor())
         if self._tracer_provider is not None:
             from opentelemetry.instrumentation.grpc import GrpcAioInstrumentorServer
 
@@ -87,7 +113,15 @@ class GrpcServer:
             interceptors=interceptors,
         )
         server.add_insecure_port(f"[::]:{get_env_grpc_port()}")
-        add_TraceServiceServicer_to_server(Servicer(self._callback), server)  # type: ignore[no-untyped-call,unused-ignore]
+        add_TraceServiceServicer_to_server(  # type: ignore[no-untyped-call,unused-ignore]
+            Servicer(
+                self._callback,
+                self._admit,
+                self._otlp_decoding_executor,
+                self._enable_prometheus,
+            ),
+            server,
+        )
         await server.start()
         self._server = server
 
@@ -42,6 +42,7 @@ from phoenix.config import (
 )
 from phoenix.core.model_schema_adapter import create_model_from_inferences
 from phoenix.db import get_printable_db_url
+from phoenix.db.engines import create_read_engine
 from phoenix.inferences.fixtures import FIXTURES, get_inferences
 from phoenix.inferences.inferences import EMPTY_INFERENCES, Inferences
 from phoenix.logging import setup_logging
@@ -54,6 +55,7 @@ from phoenix.pointcloud.umap_parameters import (
 from phoenix.server.app import (
     ScaffolderConfig,
     _db,
+    _read_db,
     create_app,
     create_engine_and_run_migrations,
     instrument_engine_if_enabled,
@@ -345,8 +347,15 @@ def main() -> None:
         start_prometheus()
 
     engine = create_engine_and_run_migrations(db_connection_str)
-    instrumentation_cleanups = instrument_engine_if_enabled(engine)
-    factory = DbSessionFactory(db=_db(engine), dialect=engine.dialect.name)
+    read_engine = create_read_engine(db_connection_str)
+    engines = [engine] if read_engine is None else [engine, read_engine]
+    instrumentation_cleanups = instrument_engine_if_enabled(*engines)
+    db = _db(engine)
+    factory = DbSessionFactory(
+        db=db,
+        dialect=engine.dialect.name,
+        read_db=None if read_engine is None else _read_db(read_engine, db),
+    )
     corpus_model = (
         None if corpus_inferences is None else create_model_from_inferences(corpus_inferences)
     )
@@ -1,13 +1,21 @@
 import time
+from collections.abc import Awaitable, Callable
 from threading import Thread
+from typing import Any
 
+import grpc
 import psutil
+from grpc_interceptor import AsyncServerInterceptor
+from grpc_interceptor.exceptions import GrpcException
 from prometheus_client import (
     Counter,
     Gauge,
+    Histogram,
     Summary,
     start_http_server,
 )
+from sqlalchemy import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool, event
+from sqlalchemy.ext.asyncio import AsyncEngine
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
 from starlette.responses import Response
@@ -33,6 +41,12 @@ CPU_METRIC = Gauge(
     documentation="CPU usage percent",
     labelnames=["core"],
 )
+GRPC_REQUESTS_PROCESSING_TIME = Histogram(
+    name="grpc_server_handling_seconds",
+    documentation="Histogram of gRPC request processing time by method and status code "
+    "(in seconds)",
+    labelnames=["method", "code"],
+)
 BULK_LOADER_INSERTION_TIME = Summary(
     name="bulk_loader_insertion_time_seconds_summary",
     documentation="Summary of database insertion time (seconds)",
@@ -49,6 +63,81 @@ BULK_LOADER_EXCEPTIONS = Counter(
     name="bulk_loader_exceptions_total",
     documentation="Total count of bulk loader exceptions",
 )
+BULK_LOADER_IDENTITY_CACHE_HITS = Counter(
+    name="bulk_loader_identity_cache_hits_total",
+    documentation="Total count of bulk loader identity cache hits by kind of row",
+    labelnames=["kind"],
+)
+BULK_LOADER_IDENTITY_CACHE_MISSES = Counter(
+    name="bulk_loader_identity_cache_misses_total",
+    documentation="Total count of bulk loader identity cache misses by kind of row",
+    labelnames=["kind"],
+)
+BULK_LOADER_BUFFERED_ITEMS = Gauge(
+    name="bulk_loader_buffered_items",
+    documentation="Current number of spans and evaluations waiting to be inserted",
+)
+BULK_LOADER_BUFFERED_BYTES = Gauge(
+    name="bulk_loader_buffered_bytes",
+    documentation="Approximate size (bytes) of spans and evaluations waiting to be inserted",
+)
+BULK_LOADER_BATCH_SIZE = Gauge(
+    name="bulk_loader_batch_size",
+    documentation="Current maximum number of spans inserted per transaction",
+)
+BULK_LOADER_FLUSH_INTERVAL = Gauge(
+    name="bulk_loader_flush_interval_seconds",
+    documentation="Current interval between flushes of the bulk loader (seconds)",
+)
+BULK_LOADER_FLUSHES = Counter(
+    name="bulk_loader_flushes_total",
+    documentation="Total count of bulk loader flushes by trigger",
+    labelnames=["trigger"],
+)
+BULK_LOADER_REJECTIONS = Counter(
+    name="bulk_loader_rejections_total",
+    documentation="Total count of export requests rejected because the bulk loader is full",
+)
+TRACE_RETENTION_DELETED_TRACES = Counter(
+    name="trace_retention_deleted_traces_total",
+    documentation="Total count of traces deleted according to the trace retention policies",
+)
+INGESTION_DECODE_TIME = Histogram(
+    name="ingestion_decode_seconds",
+    documentation="Histogram of OTLP export request decoding time by project and transport "
+    "(in seconds)",
+    labelnames=["project", "transport"],
+)
+INGESTION_BUFFER_WAIT_TIME = Histogram(
+    name="ingestion_buffer_wait_seconds",
+    documentation="Histogram of time spent by spans waiting to be inserted by project and "
+    "transport (in seconds)",
+    labelnames=["project", "transport"],
+)
+INGESTION_TRANSACTION_TIME = Histogram(
+    name="ingestion_transaction_seconds",
+    documentation="Histogram of database transaction time of batches of spans by project and "
+    "transport (in seconds)",
+    labelnames=["project", "transport"],
+)
+INGESTION_END_TO_VISIBLE_TIME = Histogram(
+    name="ingestion_span_end_to_visible_seconds",
+    documentation="Histogram of time from the end of a span to its insertion into the database "
+    "by project and transport (in seconds)",
+    labelnames=["project", "transport"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600, float("inf")),
+)
+INGESTION_LAG = Gauge(
+    name="ingestion_lag_seconds",
+    documentation="Time elapsed since the oldest span yet to be inserted was received "
+    "(in seconds)",
+)
+DML_EVENT_PROPAGATION_TIME = Histogram(
+    name="dml_event_propagation_seconds",
+    documentation="Histogram of time from a DML event to the invalidation of the "
+    "corresponding dataloader caches by table (in seconds)",
+    labelnames=["table"],
+)
 
 RATE_LIMITER_CACHE_SIZE = Gauge(
     name="rate_limiter_cache_size",
@@ -70,6 +159,68 @@ JWT_STORE_API_KEYS_ACTIVE = Gauge(
     documentation="Current number of API keys in the JWT store",
 )
 
+DB_POOL_CHECKOUT_TIME = Histogram(
+    name="db_pool_checkout_time_seconds",
+    documentation="Histogram of time spent checking out connections from the pools of the "
+    "database, including waits for connections to be returned, by pool (in seconds)",
+    labelnames=["pool"],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30],
+)
+
+DB_POOL_CHECKED_OUT_CONNECTIONS = Gauge(
+    name="db_pool_checked_out_connections",
+    documentation="Current number of connections checked out from the pools of the database "
+    "by pool",
+    labelnames=["pool"],
+)
+
+DB_POOL_OVERFLOWS = Counter(
+    name="db_pool_overflows_total",
+    documentation="Total count of connections opened beyond the sizes of the pools of the "
+    "database by pool",
+    labelnames=["pool"],
+)
+
+
+class PrometheusQueuePool(AsyncAdaptedQueuePool):
+    """
+    A pool of connections that records its checkouts, which must be named by its
+    logging name (see `instrument_pool`).
+    """
+
+    def connect(self) -> PoolProxiedConnection:
+        start_time = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_CHECKOUT_TIME.labels(pool=self.logging_name).observe(
+                time.perf_counter() - start_time
+            )
+
+
+def instrument_pool(engine: AsyncEngine) -> None:
+    """
+    Records the checked out connections and the overflows of the pool of the engine,
+    which is labeled by its logging name.
+    """
+    pool = engine.pool
+    name = pool.logging_name
+
+    def on_checkout(*_: Any) -> None:
+        DB_POOL_CHECKED_OUT_CONNECTIONS.labels(pool=name).inc()
+
+    def on_checkin(*_: Any) -> None:
+        DB_POOL_CHECKED_OUT_CONNECTIONS.labels(pool=name).dec()
+
+    def on_connect(*_: Any) -> None:
+        if isinstance(pool := engine.pool, QueuePool) and pool.overflow() > 0:
+            DB_POOL_OVERFLOWS.labels(pool=name).inc()
+
+    # The listeners carry over to the pools that replace this one, e.g. on `dispose`.
+    event.listen(pool, "checkout", on_checkout)
+    event.listen(pool, "checkin", on_checkin)
+    event.listen(pool, "connect", on_connect)
+
 
 class PrometheusMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
@@ -92,6 +243,30 @@ class PrometheusMiddleware(BaseHTTPMiddleware):
         return response
 
 
+class PrometheusGrpcInterceptor(AsyncServerInterceptor):
+    async def intercept(
+        self,
+        method: Callable[[Any, grpc.ServicerContext], Awaitable[Any]],
+        request_or_iterator: Any,
+        context: grpc.ServicerContext,
+        method_name: str,
+    ) -> Any:
+        start_time = time.perf_counter()
+        code = grpc.StatusCode.OK
+        try:
+            return await method(request_or_iterator, context)
+        except GrpcException as e:
+            code = e.status_code
+            raise
+        except BaseException:
+            code = context.code() or grpc.StatusCode.UNKNOWN
+            raise
+        finally:
+            GRPC_REQUESTS_PROCESSING_TIME.labels(method=method_name, code=code.name).observe(
+                time.perf_counter() - start_time
+            )
+
+
 def start_prometheus() -> None:
     Thread(target=gather_system_data, daemon=True).start()
     start_http_server(9090, addr="::")
@@ -0,0 +1,289 @@
+import logging
+from asyncio import create_task, sleep
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import ColumnElement, exists, func, or_, select
+
+from phoenix.config import SpanPartitionInterval, TraceRetentionPolicy
+from phoenix.db import models
+from phoenix.db.helpers import SupportedSQLDialect
+from phoenix.db.partitioning import (
+    create_partitions,
+    delete_orphaned_span_references,
+    drop_partitions,
+    is_partitioned,
+)
+from phoenix.db.rollups import refresh_span_rollups
+from phoenix.db.session_aggregates import refresh_session_aggregates
+from phoenix.db.trace_aggregates import refresh_trace_aggregates
+from phoenix.db.trace_deletion import delete_traces_in_chunks, delete_unreferenced_blobs_in_chunks
+from phoenix.server.dml_event import DmlEvent, SpanDeleteEvent
+from phoenix.server.types import CanPutItem, DaemonTask, DbSessionFactory
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLICY_KEY = "*"
+"""
+Key of the policy that applies to the projects without a policy of their own.
+"""
+
+PARTITIONS_AHEAD = timedelta(days=7)
+"""
+How far ahead of time the partitions of the spans table are created.
+"""
+
+
+class TraceRetentionManager(DaemonTask):
+    """
+    Periodically deletes the oldest traces of each project for as long as they
+    exceed the project's retention policy, i.e. its maximum age, number of spans
+    or number of bytes.
+
+    Traces are deleted in chunks of at most `chunk_size` traces, selected through
+    the index on their start times, each in a transaction of its own and followed
+    by a pause, so that ingestion and other writers are never blocked for long.
+    A `SpanDeleteEvent` is emitted after each chunk so that caches are
+    invalidated. Everything derived from the traces is deleted or recomputed along
+    with them (see `phoenix.db.trace_deletion`).
+
+    The size of a project is estimated from the average size of the attributes and
+    events of its most recent spans, so the byte limit is approximate.
+
+    When the spans table is partitioned, the partitions are created ahead of time,
+    and when every project has a maximum age, the partitions of the spans older than
+    the longest one are dropped as a whole instead of having their rows deleted, so
+    that spans are kept for up to one more partition interval.
+    """
+
+    def __init__(
+        self,
+        db: DbSessionFactory,
+        policies: Mapping[str, TraceRetentionPolicy],
+        event_queue: CanPutItem[DmlEvent],
+        *,
+        sweep_interval_seconds: float = 600,
+        chunk_size: int = 500,
+        pause_seconds: float = 0.1,
+        sample_size: int = 1000,
+        partition_interval: Optional[SpanPartitionInterval] = None,
+        enable_prometheus: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        assert sweep_interval_seconds > 0
+        assert chunk_size > 0
+        super().__init__(**kwargs)
+        self._db = db
+        self._policies = dict(policies)
+        self._event_queue = event_queue
+        self._sweep_interval_seconds = sweep_interval_seconds
+        self._chunk_size = chunk_size
+        self._pause_seconds = pause_seconds
+        self._sample_size = sample_size
+        self._partition_interval = partition_interval
+        self._enable_prometheus = enable_prometheus
+
+    async def __aenter__(self) -> None:
+        if not self._policies and self._partition_interval is None:
+            return
+        await self.start()
+
+    async def _run(self) -> None:
+        while self._running:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Failed to apply trace retention policies")
+            self._tasks.append(create_task(sleep(self._sweep_interval_seconds)))
+            await self._tasks[-1]
+            self._tasks.pop()
+
+    async def sweep(self) -> int:
+        """
+        Applies the retention policies to all projects once, and returns the number
+        of traces deleted.
+        """
+        async with self._db() as session:
+            projects = (await session.execute(select(models.Project.id, models.Project.name))).all()
+        partitioned_max_age = None
+        if (
+            self._partition_interval is not None
+            and self._db.dialect is SupportedSQLDialect.POSTGRESQL
+        ):
+            partitioned_max_age = await self._maintain_partitions(
+                self._partition_interval, [project_rowid for project_rowid, _ in projects]
+            )
+        num_deleted_traces = 0
+        for project_rowid, project_name in projects:
+            if (policy := self._policies.get(project_name)) is None and (
+                policy := self._policies.get(DEFAULT_POLICY_KEY)
+            ) is None:
+                continue
+            if (
+                condition := await self._get_expiry_condition(
+                    project_rowid, policy, partitioned_max_age
+                )
+            ) is None:
+                continue
+            if num_deleted := await self._delete_traces(
+                models.Trace.project_rowid == project_rowid, condition
+            ):
+                logger.info(
+                    f"Deleted {num_deleted} traces of project {project_name} "
+                    "according to its retention policy"
+                )
+            num_deleted_traces += num_deleted
+        return num_deleted_traces
+
+    async def _get_expiry_condition(
+        self,
+        project_rowid: int,
+        policy: TraceRetentionPolicy,
+        partitioned_max_age: Optional[timedelta] = None,
+    ) -> Optional[ColumnElement[bool]]:
+        """
+        Returns the condition satisfied by the traces of the project that exceed the
+        policy, if any do. The maximum age is left out if it is enforced by dropping
+        partitions instead.
+        """
+        conditions: list[ColumnElement[bool]] = []
+        if policy.max_age is not None and not (
+            partitioned_max_age is not None and policy.max_age >= partitioned_max_age
+        ):
+            cutoff = datetime.now(timezone.utc) - policy.max_age
+            conditions.append(models.Trace.start_time < cutoff)
+        max_spans = policy.max_spans
+        if policy.max_bytes is not None and (
+            bytes_per_span := await self._get_bytes_per_span(project_rowid)
+        ):
+            max_spans_by_size = max(int(policy.max_bytes // bytes_per_span), 1)
+            max_spans = min(max_spans, max_spans_by_size) if max_spans else max_spans_by_size
+        if max_spans is not None:
+            # The most recent traces are counted from their numbers of spans, and since
+            # each of them has at least one span, at most `max_spans + 1` of them need
+            # to be read to reach the limit.
+            recent_traces = (
+                select(models.Trace.id, models.Trace.start_time, models.Trace.num_spans)
+                .where(models.Trace.project_rowid == project_rowid)
+                .where(models.Trace.num_spans > 0)
+                .order_by(models.Trace.start_time.desc(), models.Trace.id.desc())
+                .limit(max_spans + 1)
+                .subquery()
+            )
+            running_totals = select(
+                recent_traces.c.start_time,
+                func.sum(recent_traces.c.num_spans)
+                .over(order_by=[recent_traces.c.start_time.desc(), recent_traces.c.id.desc()])
+                .label("num_spans"),
+            ).subquery()
+            async with self._db() as session:
+                # Start time of the most recent trace whose spans, along with those of
+                # the traces that start after it, exceed the limit. Every trace that
+                # starts no later than it must go, whereas the traces that start after
+                # it have at most `max_spans` spans in total.
+                last_excess_start_time = await session.scalar(
+                    select(func.max(running_totals.c.start_time)).where(
+                        running_totals.c.num_spans > max_spans
+                    )
+                )
+            if last_excess_start_time is not None:
+                conditions.append(models.Trace.start_time <= last_excess_start_time)
+        return or_(*conditions) if conditions else None
+
+    async def _maintain_partitions(
+        self,
+        interval: SpanPartitionInterval,
+        project_rowids: list[int],
+    ) -> Optional[timedelta]:
+        """
+        Creates the partitions of the spans table ahead of time and drops the expired
+        ones, if the table is partitioned. Returns the maximum age enforced by dropping
+        partitions, if any.
+        """
+        now = datetime.now(timezone.utc)
+        async with self._db() as session:
+            conn = await session.connection()
+            if not await conn.run_sync(is_partitioned):
+                return None
+            if created := await conn.run_sync(create_partitions, interval, now + PARTITIONS_AHEAD):
+                logger.info(f"Created partitions of the spans table: {', '.join(created)}")
+        max_age = self._get_partitioned_max_age()
+        if max_age is not None:
+            async with self._db() as session:
+                conn = await session.connection()
+                dropped = await conn.run_sync(drop_partitions, now - max_age)
+            if dropped:
+                logger.info(
+                    "Dropped partitions of the spans table according to the retention "
+                    f"policies: {', '.join(p.name for p in dropped)}"
+                )
+                upper = max(p.upper for p in dropped if p.upper is not None)
+                async with self._db() as session:
+                    await refresh_span_rollups(session, end_time=upper)
+                await self._delete_traces(
+                    models.Trace.start_time < upper,
+                    ~exists().where(models.Span.trace_rowid == models.Trace.id),
+                )
+                # The remaining traces that started before the dropped partitions
+                # have lost some of their spans, and so have their sessions.
+                async with self._db() as session:
+                    await refresh_trace_aggregates(session, models.Trace.start_time < upper)
+                    await refresh_session_aggregates(
+                        session, models.ProjectSession.start_time < upper
+                    )
+                self._event_queue.put(SpanDeleteEvent(tuple(project_rowids)))
+        while True:
+            async with self._db() as session:
+                conn = await session.connection()
+                if not await conn.run_sync(delete_orphaned_span_references, self._chunk_size):
+                    break
+            await sleep(self._pause_seconds)
+        await delete_unreferenced_blobs_in_chunks(
+            self._db, chunk_size=self._chunk_size, pause_seconds=self._pause_seconds
+        )
+        return max_age
+
+    def _get_partitioned_max_age(self) -> Optional[timedelta]:
+        """
+        Returns the longest maximum age of the policies if every project is subject to
+        one, in which case the spans older than it can be dropped by partition.
+        """
+        if DEFAULT_POLICY_KEY not in self._policies:
+            return None
+        max_ages = [policy.max_age for policy in self._policies.values()]
+        if any(max_age is None for max_age in max_ages):
+            return None
+        return max(max_age for max_age in max_ages if max_age is not None)
+
+    async def _get_bytes_per_span(self, project_rowid: int) -> Optional[float]:
+        async with self._db() as session:
+            size = (
+                func.pg_column_size
+                if self._db.dialect is SupportedSQLDialect.POSTGRESQL
+                else func.length
+            )
+            sample = (
+                select((size(models.Span.attributes) + size(models.Span.events)).label("num_bytes"))
+                .join(models.Trace)
+                .where(models.Trace.project_rowid == project_rowid)
+                .order_by(models.Span.start_time.desc())
+                .limit(self._sample_size)
+                .subquery()
+            )
+            bytes_per_span = await session.scalar(select(func.avg(sample.c.num_bytes)))
+        return float(bytes_per_span) if bytes_per_span else None
+
+    async def _delete_traces(self, *whereclause: ColumnElement[bool]) -> int:
+        num_deleted_traces = await delete_traces_in_chunks(
+            self._db,
+            self._event_queue,
+            *whereclause,
+            chunk_size=self._chunk_size,
+            pause_seconds=self._pause_seconds,
+        )
+        if num_deleted_traces and self._enable_prometheus:
+            from phoenix.server.prometheus import TRACE_RETENTION_DELETED_TRACES
+
+            TRACE_RETENTION_DELETED_TRACES.inc(num_deleted_traces)
+        return num_deleted_traces
@@ -5,6 +5,7 @@ from asyncio import Task, create_task, sleep
 from collections import defaultdict
 from collections.abc import Callable, Iterator
 from contextlib import AbstractAsyncContextManager
+from contextvars import ContextVar
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Generic, Optional, Protocol, TypeVar, final
@@ -26,18 +27,42 @@ class CanGetLastUpdatedAt(Protocol):
 
 
 class DbSessionFactory:
+    """
+    Creates the sessions of the database. Sessions that don't write should be
+    created by `read`, which may draw on a separate pool of read-only connections
+    (see `phoenix.db.engines.create_read_engine`), and all other sessions by
+    `write`, which is the same as calling the factory. Once a session has been
+    created by `write` in a context, e.g. while handling a request, the sessions
+    created by `read` in that context go to the primary database as well, so that
+    the reads see the writes that precede them even if a read replica lags behind.
+    """
+
     def __init__(
         self,
         db: Callable[[], AbstractAsyncContextManager[AsyncSession]],
         dialect: str,
+        read_db: Optional[Callable[[], AbstractAsyncContextManager[AsyncSession]]] = None,
     ):
         self._db = db
+        self._read_db = read_db or db
         self.dialect = SupportedSQLDialect(dialect)
 
     def __call__(self) -> AbstractAsyncContextManager[AsyncSession]:
+        return self.write()
+
+    def read(self) -> AbstractAsyncContextManager[AsyncSession]:
+        if _HAS_WRITTEN.get():
+            return self._db()
+        return self._read_db()
+
+    def write(self) -> AbstractAsyncContextManager[AsyncSession]:
+        _HAS_WRITTEN.set(True)
         return self._db()
 
 
+_HAS_WRITTEN: ContextVar[bool] = ContextVar("has_written", default=False)
+
+
 _AnyT = TypeVar("_AnyT")
 _ItemT_contra = TypeVar("_ItemT_contra", contravariant=True)
 
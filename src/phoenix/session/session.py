@@ -31,10 +31,12 @@ from phoenix.config import (
     get_working_dir,
 )
 from phoenix.core.model_schema_adapter import create_model_from_inferences
+from phoenix.db.engines import create_read_engine
 from phoenix.inferences.inferences import EMPTY_INFERENCES, Inferences
 from phoenix.pointcloud.umap_parameters import get_umap_parameters
 from phoenix.server.app import (
     _db,
+    _read_db,
     create_app,
     create_engine_and_run_migrations,
     instrument_engine_if_enabled,
@@ -372,8 +374,15 @@ class ThreadSession(Session):
         )
         # Initialize an app service that keeps the server running
         engine = create_engine_and_run_migrations(database_url)
-        instrumentation_cleanups = instrument_engine_if_enabled(engine)
-        factory = DbSessionFactory(db=_db(engine), dialect=engine.dialect.name)
+        read_engine = create_read_engine(database_url)
+        engines = [engine] if read_engine is None else [engine, read_engine]
+        instrumentation_cleanups = instrument_engine_if_enabled(*engines)
+        db = _db(engine)
+        factory = DbSessionFactory(
+            db=db,
+            dialect=engine.dialect.name,
+            read_db=None if read_engine is None else _read_db(read_engine, db),
+        )
         self.app = create_app(
             db=factory,
             export_path=self.export_path,
@@ -0,0 +1,336 @@
+"""
+Cold tier of spans archived to Parquet files, which span queries merge with the
+spans in the database (see `SpanQuery.__call__`).
+
+The files are laid out with Hive partitioning by project and day of the start times
+of the spans, i.e. `<root>/project=<name>/date=<YYYY-MM-DD>/<uuid>.parquet`, where
+the project names are percent-encoded. Each file has the columns that span
+dataframes are made of (see `ARCHIVE_SCHEMA`), with the attributes and events
+encoded as JSON, so that the files are readable by any Parquet reader.
+
+Archived spans are read with predicate pushdown on the project, the time range, and
+the conditions of a filter on `span_kind` and `name`, and are then loaded into a
+private in-memory SQLite database on which the span query runs as it would on the
+main database, so that every feature of the query DSL is supported. Annotations are
+not archived, so filter conditions on evaluations match no archived span.
+"""
+
+import ast
+import json
+import os
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, cast
+from urllib.parse import quote
+from uuid import uuid4
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from phoenix.db import models
+from phoenix.db.engines import sqlite_memory_engine
+from phoenix.utilities.json import jsonify
+
+if TYPE_CHECKING:
+    from phoenix.trace.dsl.query import SpanQuery
+
+ARCHIVE_SCHEMA = pa.schema(
+    [
+        ("name", pa.string()),
+        ("span_kind", pa.string()),
+        ("parent_id", pa.string()),
+        ("start_time", pa.timestamp("us", tz="UTC")),
+        ("end_time", pa.timestamp("us", tz="UTC")),
+        ("status_code", pa.string()),
+        ("status_message", pa.string()),
+        ("events", pa.string()),
+        ("context.span_id", pa.string()),
+        ("context.trace_id", pa.string()),
+        ("attributes", pa.string()),
+        ("cumulative_error_count", pa.int64()),
+        ("cumulative_llm_token_count_prompt", pa.int64()),
+        ("cumulative_llm_token_count_completion", pa.int64()),
+        ("llm_token_count_prompt", pa.int64()),
+        ("llm_token_count_completion", pa.int64()),
+    ]
+)
+"""
+Schema of the archive files, whose first columns are those of the dataframes of
+spans before their attributes are flattened (see `_get_spans_dataframe`).
+"""
+
+_PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+_PUSHDOWN_COLUMNS = ("span_kind", "name")
+
+
+class TraceArchive:
+    def __init__(self, root: Path) -> None:
+        self._root = root
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def write(self, project_name: str, spans: Iterable[models.Span]) -> list[Path]:
+        """
+        Writes the spans of a project, whose attributes must be fully materialized,
+        i.e. neither compressed, deduplicated nor referring to vectors, into one new
+        file per day. Returns the paths of the files.
+        """
+        records_by_date: defaultdict[str, list[dict[str, Any]]] = defaultdict(list)
+        for span in spans:
+            records_by_date[span.start_time.astimezone(timezone.utc).date().isoformat()].append(
+                _to_record(span)
+            )
+        project_dir = self._root / f"project={quote(project_name, safe='')}"
+        paths = []
+        for date, records in sorted(records_by_date.items()):
+            directory = project_dir / f"date={date}"
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"{uuid4().hex}.parquet"
+            # Written under a temporary name, so that readers never see a partial file.
+            tmp_path = directory / f".{path.name}.tmp"
+            pq.write_table(pa.Table.from_pylist(records, schema=ARCHIVE_SCHEMA), tmp_path)
+            os.replace(tmp_path, path)
+            paths.append(path)
+        return paths
+
+    def read(
+        self,
+        project_name: str,
+        *,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        condition: str = "",
+    ) -> pd.DataFrame:
+        """
+        Returns the archived spans of the project that start in the time range,
+        reading only the files of the days in range, and only the rows that may
+        satisfy the conditions on `span_kind` and `name` that the filter condition
+        requires. Spans archived more than once are returned once.
+        """
+        if not (project_dir := self._root / f"project={quote(project_name, safe='')}").is_dir():
+            return ARCHIVE_SCHEMA.empty_table().to_pandas()
+        dataset = ds.dataset(project_dir, format="parquet", partitioning=_PARTITIONING)
+        timestamp = ARCHIVE_SCHEMA.field("start_time").type
+        expression = ds.scalar(True)
+        if start_time is not None:
+            start_time = start_time.astimezone(timezone.utc)
+            expression &= ds.field("date") >= start_time.date().isoformat()
+            expression &= ds.field("start_time") >= pa.scalar(start_time, timestamp)
+        if end_time is not None:
+            end_time = end_time.astimezone(timezone.utc)
+            expression &= ds.field("date") <= end_time.date().isoformat()
+            expression &= ds.field("start_time") < pa.scalar(end_time, timestamp)
+        for column, values in get_pushdown_conditions(condition).items():
+            expression &= ds.field(column).isin(values)
+        table = dataset.to_table(columns=ARCHIVE_SCHEMA.names, filter=expression)
+        return table.to_pandas().drop_duplicates("context.span_id", keep="last")
+
+    def query_spans(
+        self,
+        query: "SpanQuery",
+        project_name: str,
+        *,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        root_spans_only: Optional[bool] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Runs the span query on the archived spans of the project, or returns None if
+        none of them may match.
+        """
+        df = self.read(
+            project_name,
+            start_time=start_time,
+            end_time=end_time,
+            condition=query._filter.condition if query._filter else "",
+        )
+        if df.empty:
+            return None
+        engine = sqlite_memory_engine()
+        try:
+            with Session(engine) as session:
+                _load(session, project_name, df)
+                return query(
+                    session,
+                    project_name=project_name,
+                    start_time=start_time,
+                    end_time=end_time,
+                    limit=limit,
+                    root_spans_only=root_spans_only,
+                )
+        finally:
+            engine.dispose()
+
+    def extend(
+        self,
+        query: "SpanQuery",
+        df: pd.DataFrame,
+        project_name: str,
+        *,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        root_spans_only: Optional[bool] = None,
+    ) -> pd.DataFrame:
+        """
+        Appends to the result of the span query on the database the result of the
+        query on the archived spans, up to the limit. Archived spans that are still in
+        the database are left out.
+        """
+        if limit is not None and len(df) >= limit:
+            return df
+        df_archived = self.query_spans(
+            query,
+            project_name,
+            start_time=start_time,
+            end_time=end_time,
+            limit=None if limit is None else limit - len(df),
+            root_spans_only=root_spans_only,
+        )
+        if df_archived is None or df_archived.empty:
+            return df
+        df_archived = df_archived.loc[~df_archived.index.isin(df.index)]
+        return pd.concat([df, df_archived]) if not df.empty else df_archived
+
+
+def get_pushdown_conditions(condition: str) -> dict[str, list[str]]:
+    """
+    Returns the values of `span_kind` and `name` to which a filter condition is
+    restricted, i.e. those of the equality and membership tests on them that the
+    condition requires as a whole or in a conjunction.
+    """
+    if not condition:
+        return {}
+    try:
+        root = ast.parse(condition, mode="eval").body
+    except SyntaxError:
+        return {}
+    conditions: dict[str, list[str]] = {}
+    terms = root.values if isinstance(root, ast.BoolOp) and isinstance(root.op, ast.And) else [root]
+    for term in terms:
+        if not (isinstance(term, ast.Compare) and len(term.ops) == 1):
+            continue
+        left, op, right = term.left, term.ops[0], term.comparators[0]
+        if isinstance(op, ast.Eq) and isinstance(left, ast.Constant):
+            left, right = right, left
+        if not (isinstance(left, ast.Name) and left.id in _PUSHDOWN_COLUMNS):
+            continue
+        if isinstance(op, ast.Eq):
+            values = _get_str_constants([right])
+        elif isinstance(op, ast.In) and isinstance(right, (ast.Tuple, ast.List, ast.Set)):
+            values = _get_str_constants(right.elts)
+        else:
+            values = None
+        if values is None:
+            continue
+        if left.id in conditions:
+            values = [v for v in conditions[left.id] if v in values]
+        conditions[left.id] = values
+    return conditions
+
+
+def _get_str_constants(nodes: Iterable[ast.expr]) -> Optional[list[str]]:
+    values = []
+    for node in nodes:
+        if not (isinstance(node, ast.Constant) and isinstance(node.value, str)):
+            return None
+        values.append(node.value)
+    return values
+
+
+def _to_record(span: models.Span) -> dict[str, Any]:
+    return {
+        "name": span.name,
+        "span_kind": span.span_kind,
+        "parent_id": span.parent_id,
+        "start_time": span.start_time,
+        "end_time": span.end_time,
+        "status_code": span.status_code,
+        "status_message": span.status_message,
+        "events": json.dumps(jsonify(span.events)),
+        "context.span_id": span.span_id,
+        "context.trace_id": span.trace.trace_id,
+        "attributes": json.dumps(jsonify(span.attributes)),
+        "cumulative_error_count": span.cumulative_error_count,
+        "cumulative_llm_token_count_prompt": span.cumulative_llm_token_count_prompt,
+        "cumulative_llm_token_count_completion": span.cumulative_llm_token_count_completion,
+        "llm_token_count_prompt": span.llm_token_count_prompt,
+        "llm_token_count_completion": span.llm_token_count_completion,
+    }
+
+
+def _load(session: Session, project_name: str, df: pd.DataFrame) -> None:
+    """
+    Inserts the archived spans into the database of the session, along with their
+    project and traces.
+    """
+    project_rowid = session.scalar(
+        insert(models.Project).values(name=project_name).returning(models.Project.id)
+    )
+    traces = df.groupby("context.trace_id").agg(
+        start_time=("start_time", "min"),
+        end_time=("end_time", "max"),
+    )
+    trace_rowids: Mapping[str, int] = {}
+    if not traces.empty:
+        trace_rowids = dict(
+            session.execute(
+                insert(models.Trace).returning(models.Trace.trace_id, models.Trace.id),
+                [
+                    {
+                        "trace_id": trace_id,
+                        "project_rowid": project_rowid,
+                        "start_time": row.start_time.to_pydatetime(),
+                        "end_time": row.end_time.to_pydatetime(),
+                    }
+                    for trace_id, row in traces.iterrows()
+                ],
+            )
+            .tuples()
+            .all()
+        )
+    session.execute(
+        insert(models.Span),
+        [
+            {
+                "trace_rowid": trace_rowids[record["context.trace_id"]],
+                "span_id": record["context.span_id"],
+                "parent_id": record["parent_id"],
+                "name": record["name"],
+                "span_kind": record["span_kind"],
+                "start_time": record["start_time"].to_pydatetime(),
+                "end_time": record["end_time"].to_pydatetime(),
+                "attributes": json.loads(record["attributes"]),
+                "events": json.loads(record["events"]),
+                "status_code": record["status_code"],
+                "status_message": record["status_message"],
+                "cumulative_error_count": int(record["cumulative_error_count"]),
+                "cumulative_llm_token_count_prompt": int(
+                    record["cumulative_llm_token_count_prompt"]
+                ),
+                "cumulative_llm_token_count_completion": int(
+                    record["cumulative_llm_token_count_completion"]
+                ),
+                "llm_token_count_prompt": _optional_int(record["llm_token_count_prompt"]),
+                "llm_token_count_completion": _optional_int(record["llm_token_count_completion"]),
+            }
+            for record in _records(df)
+        ],
+    )
+
+
+def _records(df: pd.DataFrame) -> Sequence[dict[str, Any]]:
+    return cast(Sequence[dict[str, Any]], df.to_dict("records"))
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    return None if pd.isna(value) else int(value)
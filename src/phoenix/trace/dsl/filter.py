@@ -9,13 +9,23 @@ from types import MappingProxyType
 from uuid import uuid4
 
 import sqlalchemy
-from sqlalchemy.orm import Mapped, aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, Session, aliased
 from sqlalchemy.orm.util import AliasedClass
 from sqlalchemy.sql.expression import Select
 from typing_extensions import TypeAlias, TypeGuard, assert_never
 
 import phoenix.trace.v1 as pb
 from phoenix.db import models
+from phoenix.db.compression import COMPRESSED_KEY, decompress_attributes, is_compressible_path
+from phoenix.db.promoted_attributes import PromotedSpanAttribute, get_promoted_span_attributes
+from phoenix.db.span_attribute_blobs import (
+    BLOB_REFERENCE_KEY,
+    get_blob_hashes,
+    get_blobs_sync,
+    is_deduplicated_path,
+    resolve_blobs,
+)
 
 _VALID_EVAL_ATTRIBUTES: tuple[str, ...] = tuple(
     field.name for field in pb.Evaluation.Result.DESCRIPTOR.fields
@@ -136,6 +146,32 @@ _BACKWARD_COMPATIBILITY_REPLACEMENTS: typing.Mapping[str, str] = MappingProxyTyp
 )
 
 
+_CASTS: typing.Mapping[str, typing.Any] = MappingProxyType({"str": str, "float": float, "int": int})
+_POST_FILTER_BATCH_SIZE = 1000
+
+
+class _AttributeLookup:
+    """
+    Resolves the attribute keys of a filter condition evaluated in Python.
+    """
+
+    def __init__(self, attributes: typing.Any) -> None:
+        self._attributes = attributes
+
+    def __getitem__(self, keys: list[typing.Union[str, int]]) -> typing.Any:
+        value = self._attributes
+        for key in keys:
+            if isinstance(value, typing.Mapping) and isinstance(key, str):
+                value = value.get(key)
+            elif (
+                isinstance(value, list) and isinstance(key, int) and -len(value) <= key < len(value)
+            ):
+                value = value[key]
+            else:
+                return None
+        return value
+
+
 @dataclass(frozen=True)
 class SpanFilter:
     condition: str = ""
@@ -144,6 +180,10 @@ class SpanFilter:
     compiled: typing.Any = field(init=False, repr=False)
     _aliased_annotation_relations: tuple[AliasedAnnotationRelation] = field(init=False, repr=False)
     _aliased_annotation_attributes: dict[str, Mapped[typing.Any]] = field(init=False, repr=False)
+    _placeholder_keys: tuple[tuple[typing.Union[str, int], ...], ...] = field(
+        init=False, repr=False, default=()
+    )
+    _post_filter_compiled: typing.Any = field(init=False, repr=False, default=None)
 
     def __bool__(self) -> bool:
         return bool(self.condition)
@@ -162,6 +202,7 @@ class SpanFilter:
                 for alias, _ in aliased_annotation.attributes
             ),
         ).visit(root)
+        translated = _PromotedAttributeTranslator().visit(translated)
         ast.fix_missing_locations(translated)
         compiled = compile(translated, filename="", mode="eval")
         aliased_annotation_attributes = {
@@ -173,24 +214,159 @@ class SpanFilter:
         object.__setattr__(self, "compiled", compiled)
         object.__setattr__(self, "_aliased_annotation_relations", aliased_annotation_relations)
         object.__setattr__(self, "_aliased_annotation_attributes", aliased_annotation_attributes)
+        # Keys of the attribute values that may be replaced by placeholders, i.e.
+        # compressed or deduplicated, which the database cannot see through.
+        placeholder_keys = tuple(
+            {
+                (*keys, placeholder_key)
+                for node in ast.walk(translated)
+                if (keys := _get_translated_attribute_keys(node)) is not None
+                for placeholder_key, applies in (
+                    (COMPRESSED_KEY, is_compressible_path),
+                    (BLOB_REFERENCE_KEY, is_deduplicated_path),
+                )
+                if applies(keys)
+            }
+        )
+        if placeholder_keys:
+            # For the spans whose attribute values are replaced by placeholders, the
+            # condition is evaluated in Python on the actual values instead (see
+            # `post_filter`).
+            post_filter_translated = _ProjectionTranslator(
+                reserved_keywords=chain(aliased_annotation_attributes, _CASTS),
+            ).visit(ast.parse(source, mode="eval"))
+            ast.fix_missing_locations(post_filter_translated)
+            object.__setattr__(self, "_placeholder_keys", placeholder_keys)
+            object.__setattr__(
+                self,
+                "_post_filter_compiled",
+                compile(post_filter_translated, filename="", mode="eval"),
+            )
 
-    def __call__(self, select: Select[typing.Any]) -> Select[typing.Any]:
+    def __call__(
+        self,
+        select: Select[typing.Any],
+        *,
+        include_placeholders: bool = False,
+    ) -> Select[typing.Any]:
+        """
+        Applies the condition to the given statement. If `include_placeholders` is
+        true, the spans whose attribute values referenced by the condition are
+        compressed or deduplicated are kept regardless of the condition, since the
+        database cannot evaluate it on them, and should be filtered afterwards with
+        `post_filter`.
+        """
         if not self.condition:
             return select
-        return self._join_aliased_relations(select).where(
-            eval(
-                self.compiled,
-                {
-                    **_NAMES,
-                    **self._aliased_annotation_attributes,
-                    "not_": sqlalchemy.not_,
-                    "and_": sqlalchemy.and_,
-                    "or_": sqlalchemy.or_,
-                    "cast": sqlalchemy.cast,
-                    "Float": sqlalchemy.Float,
-                    "String": sqlalchemy.String,
-                    "TextContains": models.TextContains,
-                },
+        condition = eval(
+            self.compiled,
+            {
+                **_NAMES,
+                **self._aliased_annotation_attributes,
+                "not_": sqlalchemy.not_,
+                "and_": sqlalchemy.and_,
+                "or_": sqlalchemy.or_,
+                "cast": sqlalchemy.cast,
+                "Float": sqlalchemy.Float,
+                "String": sqlalchemy.String,
+                "TextContains": models.TextContains,
+                "SpanTextContains": models.SpanTextContains,
+                "PromotedSpanAttribute": PromotedSpanAttribute,
+            },
+        )
+        if include_placeholders and self._placeholder_keys:
+            condition = sqlalchemy.or_(condition, self._has_placeholders())
+        return self._join_aliased_relations(select).where(condition)
+
+    def post_filter(self, session: Session, span_rowids: typing.Iterable[int]) -> set[int]:
+        """
+        Evaluates the condition on the actual attribute values of the spans, among
+        those given, whose attribute values referenced by the condition are
+        compressed or deduplicated, and returns the row ids of the spans that don't
+        satisfy it.
+        """
+        if not self._placeholder_keys:
+            return set()
+        columns: list[typing.Any] = [
+            column.label(name) for name, column in _NAMES.items() if name.isidentifier()
+        ] + [
+            attribute.label(alias)
+            for alias, attribute in self._aliased_annotation_attributes.items()
+        ]
+        stmt = self._join_aliased_relations(
+            sqlalchemy.select(models.Span.id.label("_span_rowid"), *columns)
+            .join(models.Trace)
+            .where(self._has_placeholders())
+        )
+        excluded: set[int] = set()
+        span_rowids = list(span_rowids)
+        for i in range(0, len(span_rowids), _POST_FILTER_BATCH_SIZE):
+            batch = span_rowids[i : i + _POST_FILTER_BATCH_SIZE]
+            rows = [
+                dict(row._mapping) for row in session.execute(stmt.where(models.Span.id.in_(batch)))
+            ]
+            blobs = get_blobs_sync(
+                session, {h for values in rows for h in get_blob_hashes(values["attributes"])}
+            )
+            for values in rows:
+                span_rowid = values.pop("_span_rowid")
+                attributes = resolve_blobs(decompress_attributes(values["attributes"]), blobs)
+                values["attributes"] = _AttributeLookup(attributes)
+                try:
+                    satisfied = bool(
+                        eval(self._post_filter_compiled, {"__builtins__": dict(_CASTS), **values})
+                    )
+                except Exception:
+                    # e.g. comparisons with missing values, which are false in SQL
+                    satisfied = False
+                if not satisfied:
+                    excluded.add(span_rowid)
+        return excluded
+
+    async def apply(
+        self,
+        session: AsyncSession,
+        select: Select[typing.Any],
+    ) -> Select[typing.Any]:
+        """
+        Applies the condition to the given statement over spans, including to the
+        spans whose attribute values referenced by the condition are compressed or
+        deduplicated, on which it is evaluated in Python (see `post_filter`). The
+        statement should otherwise be complete, since it determines the spans that
+        are evaluated.
+        """
+        select = self(select, include_placeholders=True)
+        if not self._placeholder_keys:
+            return select
+        candidates = (
+            select.with_only_columns(models.Span.id, maintain_column_froms=True)
+            .where(self._has_placeholders())
+            .distinct()
+            .group_by(None)
+            .order_by(None)
+            .limit(None)
+            .offset(None)
+        )
+        span_rowids = (await session.scalars(candidates)).all()
+        if excluded := await session.run_sync(self.post_filter, span_rowids):
+            # The row ids are rendered inline to stay clear of the bind parameter limit.
+            select = select.where(
+                models.Span.id.not_in(
+                    sqlalchemy.bindparam(
+                        "excluded_span_rowids",
+                        sorted(excluded),
+                        expanding=True,
+                        literal_execute=True,
+                    )
+                )
+            )
+        return select
+
+    def _has_placeholders(self) -> sqlalchemy.ColumnElement[bool]:
+        return sqlalchemy.or_(
+            *(
+                models.Span.attributes[list(keys)].as_string().isnot(None)
+                for keys in self._placeholder_keys
             )
         )
 
@@ -250,6 +426,7 @@ class Projector:
             raise ValueError("missing expression")
         root = ast.parse(source, mode="eval")
         translated = _ProjectionTranslator(source).visit(root)
+        translated = _PromotedAttributeTranslator().visit(translated)
         ast.fix_missing_locations(translated)
         compiled = compile(translated, filename="", mode="eval")
         object.__setattr__(self, "translated", translated)
@@ -258,7 +435,7 @@ class Projector:
     def __call__(self) -> sqlalchemy.SQLColumnExpression[typing.Any]:
         return typing.cast(
             sqlalchemy.SQLColumnExpression[typing.Any],
-            eval(self.compiled, {**_NAMES}),
+            eval(self.compiled, {**_NAMES, "PromotedSpanAttribute": PromotedSpanAttribute}),
         )
 
 
@@ -281,6 +458,26 @@ def _is_string_attribute(node: typing.Any) -> TypeGuard[ast.Call]:
     )
 
 
+_SPAN_SEARCH_ATTRIBUTES: typing.Mapping[tuple[typing.Union[str, int], ...], str] = MappingProxyType(
+    {
+        ("input", "value"): "input",
+        ("output", "value"): "output",
+    }
+)
+
+
+def _get_span_search_field(node: typing.Any) -> typing.Optional[str]:
+    # e.g. `name` -> `"name"`
+    # e.g. `attributes[["input", "value"]].as_string()` -> `"input"`
+    if isinstance(node, ast.Name) and node.id in ("name", "status_message"):
+        return node.id
+    if _is_string_attribute(node) and (
+        keys := _get_translated_attribute_keys(typing.cast(ast.Attribute, node.func).value)
+    ):
+        return _SPAN_SEARCH_ATTRIBUTES.get(keys)
+    return None
+
+
 def _is_float_attribute(node: typing.Any) -> TypeGuard[ast.Call]:
     return (
         isinstance(node, ast.Call)
@@ -432,6 +629,35 @@ class _ProjectionTranslator(ast.NodeTransformer):
         raise SyntaxError(f"invalid expression: {ast.unparse(node)}")
 
 
+class _PromotedAttributeTranslator(ast.NodeTransformer):
+    """
+    Replaces the string values of promoted attributes in translated expressions,
+    e.g. `attributes[['llm', 'model_name']].as_string()`, by the expressions that
+    their indexes are on, i.e. `PromotedSpanAttribute('llm', 'model_name')`.
+    """
+
+    def __init__(self) -> None:
+        self._promoted = frozenset(get_promoted_span_attributes())
+
+    def visit_Call(self, node: ast.Call) -> typing.Any:
+        if (
+            _is_string_attribute(node)
+            and (
+                keys := _get_translated_attribute_keys(typing.cast(ast.Attribute, node.func).value)
+            )
+            in self._promoted
+            # values that may be replaced by placeholders are left for the post-filter
+            and not is_compressible_path(keys)
+            and not is_deduplicated_path(keys)
+        ):
+            return ast.Call(
+                func=ast.Name(id="PromotedSpanAttribute", ctx=ast.Load()),
+                args=[ast.Constant(value=key, kind=None) for key in keys],
+                keywords=[],
+            )
+        return self.generic_visit(node)
+
+
 class _FilterTranslator(_ProjectionTranslator):
     def visit_Compare(self, node: ast.Compare) -> typing.Any:
         if len(node.comparators) > 1:
@@ -451,6 +677,13 @@ class _FilterTranslator(_ProjectionTranslator):
         elif not _is_float(left) and _is_float(right):
             left = _cast_as("Float", left)
         if isinstance(op, (ast.In, ast.NotIn)):
+            if isinstance(op, ast.In) and (field := _get_span_search_field(right)):
+                # narrowed down by the full-text index of the spans
+                return ast.Call(
+                    func=ast.Name(id="SpanTextContains", ctx=ast.Load()),
+                    args=[ast.Constant(value=field, kind=None), right, left],
+                    keywords=[],
+                )
             if _is_string_attribute(right) or ast.unparse(right) in _NAMES:
                 call = ast.Call(
                     func=ast.Name(id="TextContains", ctx=ast.Load()),
@@ -646,6 +879,21 @@ def _as_attribute(
     )
 
 
+def _get_translated_attribute_keys(
+    node: typing.Any,
+) -> typing.Optional[tuple[typing.Union[str, int], ...]]:
+    # e.g. `attributes[["input", "value"]]` -> `("input", "value")`
+    if (
+        isinstance(node, ast.Subscript)
+        and isinstance(node.value, ast.Name)
+        and node.value.id == "attributes"
+        and isinstance(node.slice, ast.List)
+        and all(isinstance(elt, ast.Constant) for elt in node.slice.elts)
+    ):
+        return tuple(typing.cast(ast.Constant, elt).value for elt in node.slice.elts)
+    return None
+
+
 def _is_annotation(node: typing.Any) -> TypeGuard[ast.Subscript]:
     # e.g. `evals["name"]`
     return (
@@ -7,7 +7,7 @@ from functools import cached_property
 from itertools import chain
 from random import randint, random
 from types import MappingProxyType
-from typing import Any, Optional, cast
+from typing import TYPE_CHECKING, Any, Optional, cast
 
 import pandas as pd
 from openinference.semconv.trace import SpanAttributes
@@ -18,7 +18,15 @@ from typing_extensions import assert_never
 
 from phoenix.config import DEFAULT_PROJECT_NAME
 from phoenix.db import models
+from phoenix.db.compression import decompress_attributes, has_compressed_values
 from phoenix.db.helpers import SupportedSQLDialect
+from phoenix.db.span_attribute_blobs import (
+    get_blob_hashes,
+    get_blobs_sync,
+    has_blob_references,
+    resolve_blobs,
+)
+from phoenix.db.span_vectors import get_span_vectors_sync, has_vector_references, hydrate
 from phoenix.trace.attributes import (
     JSON_STRING_ATTRIBUTES,
     SEMANTIC_CONVENTIONS,
@@ -31,6 +39,9 @@ from phoenix.trace.dsl import SpanFilter
 from phoenix.trace.dsl.filter import Projector
 from phoenix.trace.schemas import ATTRIBUTE_PREFIX
 
+if TYPE_CHECKING:
+    from phoenix.trace.archive import TraceArchive
+
 DEFAULT_SPAN_LIMIT = 1000
 
 RETRIEVAL_DOCUMENTS = SpanAttributes.RETRIEVAL_DOCUMENTS
@@ -508,7 +519,13 @@ class SpanQuery(_HasTmpSuffix):
         root_spans_only: Optional[bool] = None,
         # Deprecated
         stop_time: Optional[datetime] = None,
+        *,
+        archive: Optional["TraceArchive"] = None,
     ) -> pd.DataFrame:
+        """
+        Runs the query on the spans of the project in the database, followed by the
+        spans archived in `archive`, if any, up to the limit.
+        """
         if not project_name:
             project_name = DEFAULT_PROJECT_NAME
         if stop_time:
@@ -518,6 +535,28 @@ class SpanQuery(_HasTmpSuffix):
                 DeprecationWarning,
             )
             end_time = end_time or stop_time
+        df = self._query(session, project_name, start_time, end_time, limit, root_spans_only)
+        if archive is None:
+            return df
+        return archive.extend(
+            self,
+            df,
+            project_name,
+            start_time=start_time,
+            end_time=end_time,
+            limit=limit,
+            root_spans_only=root_spans_only,
+        )
+
+    def _query(
+        self,
+        session: Session,
+        project_name: str,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        limit: Optional[int],
+        root_spans_only: Optional[bool],
+    ) -> pd.DataFrame:
         if not (self._select or self._explode or self._concat):
             return _get_spans_dataframe(
                 session,
@@ -554,7 +593,7 @@ class SpanQuery(_HasTmpSuffix):
         stmt0_orig: Select[Any] = stmt
         stmt1_filter: Optional[Select[Any]] = None
         if self._filter:
-            stmt = stmt1_filter = self._filter(stmt)
+            stmt = stmt1_filter = self._filter(stmt, include_placeholders=True)
         stmt2_select: Optional[Select[Any]] = None
         if self._select:
             columns: Iterable[Label[Any]] = (
@@ -575,6 +614,9 @@ class SpanQuery(_HasTmpSuffix):
             if index.name not in stmt.selected_columns.keys():
                 stmt = stmt.add_columns(index)
             df = pd.read_sql_query(stmt, conn, self._pk_tmp_col_label)
+            df = _decompress(df)
+            df = _resolve_blobs(session, df)
+            df = _hydrate_vectors(session, df, df.index.to_series())
         if self._concat:
             if df is not None:
                 assert stmt3_explode is not None
@@ -596,6 +638,16 @@ class SpanQuery(_HasTmpSuffix):
             df_concat = pd.read_sql_query(stmt4_concat, conn, self._pk_tmp_col_label)
             df_concat = self._concat.update_df(df_concat, dialect)
         assert df is not None or df_concat is not None
+        if self._filter and (
+            excluded := self._filter.post_filter(
+                session,
+                {rowid for d in (df, df_concat) if d is not None for rowid in d.index.tolist()},
+            )
+        ):
+            if df is not None:
+                df = df.loc[~df.index.isin(excluded)]
+            if df_concat is not None:
+                df_concat = df_concat.loc[~df_concat.index.isin(excluded)]
         if df is None:
             df = df_concat
         elif df_concat is not None:
@@ -694,6 +746,7 @@ def _get_spans_dataframe(
     # use legacy labels for backward-compatibility
     span_id_label = "context.span_id"
     trace_id_label = "context.trace_id"
+    span_rowid_label = "__span_rowid__"
     if stop_time:
         # Deprecated. Raise a warning
         warnings.warn(
@@ -714,13 +767,14 @@ def _get_spans_dataframe(
             models.Span.span_id.label(span_id_label),
             models.Trace.trace_id.label(trace_id_label),
             models.Span.attributes,
+            models.Span.id.label(span_rowid_label),
         )
         .join(models.Trace)
         .join(models.Project)
         .where(models.Project.name == project_name)
     )
     if span_filter:
-        stmt = span_filter(stmt)
+        stmt = span_filter(stmt, include_placeholders=True)
     if start_time:
         stmt = stmt.where(start_time <= models.Span.start_time)
     if end_time:
@@ -736,8 +790,15 @@ def _get_spans_dataframe(
     conn = session.connection()
     # set `drop=False` for backward-compatibility
     df = pd.read_sql_query(stmt, conn).set_index(span_id_label, drop=False)
+    span_rowids = df.pop(span_rowid_label)
+    if span_filter and (excluded := span_filter.post_filter(session, span_rowids.tolist())):
+        kept = ~span_rowids.isin(excluded)
+        df, span_rowids = df.loc[kept], span_rowids.loc[kept]
     if df.empty:
         return df.drop("attributes", axis=1)
+    df = _decompress(df)
+    df = _resolve_blobs(session, df)
+    df = _hydrate_vectors(session, df, span_rowids)
     df_attributes = pd.DataFrame.from_records(
         df.attributes.map(_flatten_semantic_conventions),
     ).set_axis(df.index, axis=0)
@@ -751,6 +812,71 @@ def _get_spans_dataframe(
     return df
 
 
+def _decompress(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Decompresses the compressed string attribute values in the object columns.
+    """
+    columns = [
+        column
+        for column, dtype in df.dtypes.items()
+        if dtype.kind == "O" and df[column].map(has_compressed_values).any()
+    ]
+    if not columns:
+        return df
+    df = df.copy()
+    for column in columns:
+        df[column] = df[column].map(decompress_attributes)
+    return df
+
+
+def _resolve_blobs(session: Session, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replaces the references to the deduplicated string attribute values in the
+    object columns by the values themselves.
+    """
+    columns = [
+        column
+        for column, dtype in df.dtypes.items()
+        if dtype.kind == "O" and df[column].map(has_blob_references).any()
+    ]
+    if not columns:
+        return df
+    blobs = get_blobs_sync(
+        session, {h for column in columns for value in df[column] for h in get_blob_hashes(value)}
+    )
+    df = df.copy()
+    for column in columns:
+        df[column] = df[column].map(lambda value: resolve_blobs(value, blobs))
+    return df
+
+
+def _hydrate_vectors(
+    session: Session, df: pd.DataFrame, span_rowids: "pd.Series[int]"
+) -> pd.DataFrame:
+    """
+    Replaces the references to the vectors stored in the side-car table by the
+    vectors themselves, loading only the vectors of the spans that refer to any.
+    """
+    masks = {
+        column: mask
+        for column, dtype in df.dtypes.items()
+        if dtype.kind == "O" and (mask := df[column].map(has_vector_references).to_numpy()).any()
+    }
+    if not masks:
+        return df
+    rowids = span_rowids.to_numpy()
+    vectors = get_span_vectors_sync(
+        session, {int(rowid) for mask in masks.values() for rowid in rowids[mask]}
+    )
+    df = df.copy()
+    for column, mask in masks.items():
+        df[column] = [
+            hydrate(value, vectors.get(rowid, {})) if has_references else value
+            for value, rowid, has_references in zip(df[column], rowids, mask)
+        ]
+    return df
+
+
 def _outer_join(left: pd.DataFrame, right: pd.DataFrame) -> pd.DataFrame:
     if (columns_intersection := left.columns.intersection(right.columns)).empty:
         df = left.join(right, how="outer")
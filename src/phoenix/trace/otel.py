@@ -1,6 +1,7 @@
 import json
 from binascii import hexlify, unhexlify
 from collections.abc import Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import Executor
 from datetime import datetime, timezone
 from types import MappingProxyType
 from typing import Any, Optional, SupportsFloat, cast
@@ -39,6 +40,7 @@ from phoenix.trace.schemas import (
     TraceID,
 )
 from phoenix.utilities.json import jsonify
+from phoenix.utilities.project import get_project_name
 
 DOCUMENT_METADATA = DocumentAttributes.DOCUMENT_METADATA
 INPUT_MIME_TYPE = SpanAttributes.INPUT_MIME_TYPE
@@ -106,6 +108,52 @@ def decode_otlp_span(otlp_span: otlp.Span) -> Span:
     )
 
 
+ProjectName: TypeAlias = str
+
+_SPANS_PER_TASK = 256
+
+
+def decode_otlp_spans(
+    resource_spans: Iterable[otlp.ResourceSpans],
+    executor: Optional[Executor] = None,
+) -> list[tuple[Span, ProjectName]]:
+    """
+    Decodes the spans of an OTLP export request, along with the names of the
+    projects they belong to. If an executor (e.g. a `ProcessPoolExecutor`) is
+    given, chunks of spans are serialized and decoded in parallel, unless the
+    request is too small to benefit from it.
+    """
+    chunks = [
+        (get_project_name(resource.resource.attributes), scope_spans.spans)
+        for resource in resource_spans
+        for scope_spans in resource.scope_spans
+    ]
+    if executor is None or sum(len(spans) for _, spans in chunks) <= _SPANS_PER_TASK:
+        return [
+            (decode_otlp_span(otlp_span), project_name)
+            for project_name, otlp_spans in chunks
+            for otlp_span in otlp_spans
+        ]
+    futures = [
+        (
+            project_name,
+            executor.submit(
+                _decode_serialized_scope_spans,
+                otlp.ScopeSpans(spans=otlp_spans[i : i + _SPANS_PER_TASK]).SerializeToString(),
+            ),
+        )
+        for project_name, otlp_spans in chunks
+        for i in range(0, len(otlp_spans), _SPANS_PER_TASK)
+    ]
+    return [(span, project_name) for project_name, future in futures for span in future.result()]
+
+
+def _decode_serialized_scope_spans(serialized: bytes) -> list[Span]:
+    scope_spans = otlp.ScopeSpans()
+    scope_spans.ParseFromString(serialized)
+    return [decode_otlp_span(otlp_span) for otlp_span in scope_spans.spans]
+
+
 def _decode_identifier(identifier: bytes) -> Optional[str]:
     if not identifier:
         return None
@@ -4,8 +4,10 @@ from sqlalchemy import (
     INTEGER,
     TIMESTAMP,
     VARCHAR,
+    CheckConstraint,
     Engine,
     ForeignKeyConstraint,
+    LargeBinary,
     MetaData,
     PrimaryKeyConstraint,
     UniqueConstraint,
@@ -288,3 +290,475 @@ def test_up_and_down_migrations(
         assert not constraints
         del constraints
     _up(_engine, _alembic_config, "4ded9e43755f")
+
+    for _ in range(2):
+        _up(_engine, _alembic_config, "8a3764fe7f1a")
+
+        metadata = MetaData()
+        metadata.reflect(bind=_engine)
+
+        assert (span_vectors := metadata.tables.get("span_vectors")) is not None
+
+        columns = {str(col.name): col for col in span_vectors.columns}
+
+        column = columns.pop("id", None)
+        assert column is not None
+        assert column.primary_key
+        assert isinstance(column.type, INTEGER)
+        del column
+
+        column = columns.pop("span_rowid", None)
+        assert column is not None
+        assert not column.nullable
+        assert isinstance(column.type, INTEGER)
+        del column
+
+        column = columns.pop("path", None)
+        assert column is not None
+        assert not column.nullable
+        assert isinstance(column.type, VARCHAR)
+        del column
+
+        column = columns.pop("vector", None)
+        assert column is not None
+        assert not column.nullable
+        assert isinstance(column.type, LargeBinary)
+        del column
+
+        assert not columns
+        del columns
+
+        indexes = {str(idx.name): idx for idx in span_vectors.indexes}
+
+        index = indexes.pop("ix_span_vectors_span_rowid", None)
+        assert index is not None
+        assert not index.unique
+        del index
+
+        assert not indexes
+        del indexes
+
+        constraints = {str(con.name): con for con in span_vectors.constraints}
+
+        constraint = constraints.pop("pk_span_vectors", None)
+        assert isinstance(constraint, PrimaryKeyConstraint)
+        del constraint
+
+        constraint = constraints.pop("uq_span_vectors_span_rowid_path", None)
+        assert isinstance(constraint, UniqueConstraint)
+        del constraint
+
+        constraint = constraints.pop("fk_span_vectors_span_rowid_spans", None)
+        assert isinstance(constraint, ForeignKeyConstraint)
+        assert constraint.ondelete == "CASCADE"
+        del constraint
+
+        assert not constraints
+        del constraints
+
+        _down(_engine, _alembic_config, "4ded9e43755f")
+
+        metadata = MetaData()
+        metadata.reflect(bind=_engine)
+
+        assert metadata.tables.get("span_vectors") is None
+    _up(_engine, _alembic_config, "8a3764fe7f1a")
+
+    for _ in range(2):
+        _up(_engine, _alembic_config, "f5590d210fd4")
+
+        metadata = MetaData()
+        metadata.reflect(bind=_engine)
+
+        assert (span_attribute_blobs := metadata.tables.get("span_attribute_blobs")) is not None
+
+        columns = {str(col.name): col for col in span_attribute_blobs.columns}
+
+        column = columns.pop("id", None)
+        assert column is not None
+        assert column.primary_key
+        assert isinstance(column.type, INTEGER)
+        del column
+
+        column = columns.pop("hash", None)
+        assert column is not None
+        assert not column.nullable
+        assert isinstance(column.type, VARCHAR)
+        del column
+
+        column = columns.pop("value", None)
+        assert column is not None
+        assert not column.nullable
+        assert isinstance(column.type, VARCHAR)
+        del column
+
+        assert not columns
+        del columns
+
+        constraints = {str(con.name): con for con in span_attribute_blobs.constraints}
+
+        constraint = constraints.pop("pk_span_attribute_blobs", None)
+        assert isinstance(constraint, PrimaryKeyConstraint)
+        del constraint
+
+        constraint = constraints.pop("uq_span_attribute_blobs_hash", None)
+        assert isinstance(constraint, UniqueConstraint)
+        del constraint
+
+        assert not constraints
+        del constraints
+
+        assert (references := metadata.tables.get("span_attribute_blob_references")) is not None
+
+        columns = {str(col.name): col for col in references.columns}
+
+        column = columns.pop("id", None)
+        assert column is not None
+        assert column.primary_key
+        assert isinstance(column.type, INTEGER)
+        del column
+
+        column = columns.pop("span_rowid", None)
+        assert column is not None
+        assert not column.nullable
+        assert isinstance(column.type, INTEGER)
+        del column
+
+        column = columns.pop("blob_hash", None)
+        assert column is not None
+        assert not column.nullable
+        assert isinstance(column.type, VARCHAR)
+        del column
+
+        assert not columns
+        del columns
+
+        indexes = {str(idx.name): idx for idx in references.indexes}
+
+        for name in (
+            "ix_span_attribute_blob_references_span_rowid",
+            "ix_span_attribute_blob_references_blob_hash",
+        ):
+            index = indexes.pop(name, None)
+            assert index is not None
+            assert not index.unique
+            del index
+
+        assert not indexes
+        del indexes
+
+        constraints = {str(con.name): con for con in references.constraints}
+
+        constraint = constraints.pop("pk_span_attribute_blob_references", None)
+        assert isinstance(constraint, PrimaryKeyConstraint)
+        del constraint
+
+        constraint = constraints.pop("uq_span_attribute_blob_references_span_rowid_blob_hash", None)
+        assert isinstance(constraint, UniqueConstraint)
+        del constraint
+
+        constraint = constraints.pop("fk_span_attribute_blob_references_span_rowid_spans", None)
+        assert isinstance(constraint, ForeignKeyConstraint)
+        assert constraint.ondelete == "CASCADE"
+        del constraint
+
+        constraint = constraints.pop("fk_span_attribute_blob_references_blob_hash", None)
+        assert isinstance(constraint, ForeignKeyConstraint)
+        assert constraint.ondelete is None
+        del constraint
+
+        assert not constraints
+        del constraints
+
+        _down(_engine, _alembic_config, "8a3764fe7f1a")
+
+        metadata = MetaData()
+        metadata.reflect(bind=_engine)
+
+        assert metadata.tables.get("span_attribute_blobs") is None
+        assert metadata.tables.get("span_attribute_blob_references") is None
+    _up(_engine, _alembic_config, "f5590d210fd4")
+
+    for _ in range(2):
+        _up(_engine, _alembic_config, "c3a7e2d915b8")
+
+        metadata = MetaData()
+        metadata.reflect(bind=_engine)
+
+        assert (span_rollups := metadata.tables.get("span_rollups")) is not None
+
+        columns = {str(col.name): col for col in span_rollups.columns}
+
+        column = columns.pop("id", None)
+        assert column is not None
+        assert column.primary_key
+        assert isinstance(column.type, INTEGER)
+        del column
+
+        for name in (
+            "project_rowid",
+            "span_count",
+            "llm_token_count_prompt",
+            "llm_token_count_completion",
+        ):
+            column = columns.pop(name, None)
+            assert column is not None
+            assert not column.nullable
+            assert isinstance(column.type, INTEGER)
+            del column
+
+        for name in ("hour", "min_start_time", "max_end_time"):
+            column = columns.pop(name, None)
+            assert column is not None
+            assert not column.nullable
+            assert isinstance(column.type, TIMESTAMP)
+            del column
+
+        for name in ("span_kind", "status_code"):
+            column = columns.pop(name, None)
+            assert column is not None
+            assert not column.nullable
+            assert isinstance(column.type, VARCHAR)
+            del column
+
+        column = columns.pop("is_root", None)
+        assert column is not None
+        assert not column.nullable
+        del column
+
+        assert not columns
+        del columns
+
+        constraints = {str(con.name): con for con in span_rollups.constraints}
+
+        constraint = constraints.pop("pk_span_rollups", None)
+        assert isinstance(constraint, PrimaryKeyConstraint)
+        del constraint
+
+        constraint = constraints.pop("uq_span_rollups_key", None)
+        assert isinstance(constraint, UniqueConstraint)
+        del constraint
+
+        constraint = constraints.pop("fk_span_rollups_project_rowid_projects", None)
+        assert isinstance(constraint, ForeignKeyConstraint)
+        del constraint
+
+        assert not constraints
+        del constraints
+
+        _down(_engine, _alembic_config, "f5590d210fd4")
+
+        metadata = MetaData()
+        metadata.reflect(bind=_engine)
+
+        assert metadata.tables.get("span_rollups") is None
+    _up(_engine, _alembic_config, "c3a7e2d915b8")
+
+    for _ in range(2):
+        _up(_engine, _alembic_config, "d4b8f3a6c1e9")
+
+        metadata = MetaData()
+        metadata.reflect(bind=_engine)
+
+        assert (latency_sketch_bins := metadata.tables.get("latency_sketch_bins")) is not None
+
+        columns = {str(col.name): col for col in latency_sketch_bins.columns}
+
+        column = columns.pop("id", None)
+        assert column is not None
+        assert column.primary_key
+        assert isinstance(column.type, INTEGER)
+        del column
+
+        for name in ("project_rowid", "bin_index", "count"):
+            column = columns.pop(name, None)
+            assert column is not None
+            assert not column.nullable
+            assert isinstance(column.type, INTEGER)
+            del column
+
+        column = columns.pop("hour", None)
+        assert column is not None
+        assert not column.nullable
+        assert isinstance(column.type, TIMESTAMP)
+        del column
+
+        column = columns.pop("kind", None)
+        assert column is not None
+        assert not column.nullable
+        assert isinstance(column.type, VARCHAR)
+        del column
+
+        assert not columns
+        del columns
+
+        constraints = {
+            str(con.name): con
+            for con in latency_sketch_bins.constraints
+            if not isinstance(con, CheckConstraint)
+        }
+
+        constraint = constraints.pop("pk_latency_sketch_bins", None)
+        assert isinstance(constraint, PrimaryKeyConstraint)
+        del constraint
+
+        constraint = constraints.pop("uq_latency_sketch_bins_key", None)
+        assert isinstance(constraint, UniqueConstraint)
+        del constraint
+
+        constraint = constraints.pop("fk_latency_sketch_bins_project_rowid_projects", None)
+        assert isinstance(constraint, ForeignKeyConstraint)
+        del constraint
+
+        assert not constraints
+        del constraints
+
+        _down(_engine, _alembic_config, "c3a7e2d915b8")
+
+        metadata = MetaData()
+        metadata.reflect(bind=_engine)
+
+        assert metadata.tables.get("latency_sketch_bins") is None
+    _up(_engine, _alembic_config, "d4b8f3a6c1e9")
+
+    for _ in range(2):
+        _up(_engine, _alembic_config, "e5c9a2b7d3f1")
+
+        metadata = MetaData()
+        metadata.reflect(bind=_engine)
+
+        assert (traces := metadata.tables.get("traces")) is not None
+
+        columns = {str(col.name): col for col in traces.columns}
+
+        column = columns.pop("root_span_rowid", None)
+        assert column is not None
+        assert column.nullable
+        assert isinstance(column.type, INTEGER)
+        del column
+
+        for name in (
+            "num_spans",
+            "num_error_spans",
+            "llm_token_count_prompt",
+            "llm_token_count_completion",
+        ):
+            column = columns.pop(name, None)
+            assert column is not None
+            assert not column.nullable
+            assert isinstance(column.type, INTEGER)
+            del column
+
+        _down(_engine, _alembic_config, "d4b8f3a6c1e9")
+
+        metadata = MetaData()
+        metadata.reflect(bind=_engine)
+
+        assert (traces := metadata.tables.get("traces")) is not None
+
+        columns = {str(col.name): col for col in traces.columns}
+
+        for name in (
+            "root_span_rowid",
+            "num_spans",
+            "num_error_spans",
+            "llm_token_count_prompt",
+            "llm_token_count_completion",
+        ):
+            assert name not in columns
+    _up(_engine, _alembic_config, "e5c9a2b7d3f1")
+
+    for _ in range(2):
+        _up(_engine, _alembic_config, "f7d2b4e8a6c3")
+
+        metadata = MetaData()
+        metadata.reflect(bind=_engine)
+
+        assert (project_sessions := metadata.tables.get("project_sessions")) is not None
+
+        columns = {str(col.name): col for col in project_sessions.columns}
+
+        for name in (
+            "num_traces",
+            "num_error_traces",
+            "llm_token_count_prompt",
+            "llm_token_count_completion",
+        ):
+            column = columns.pop(name, None)
+            assert column is not None
+            assert not column.nullable
+            assert isinstance(column.type, INTEGER)
+            del column
+
+        for name in (
+            "first_input_value",
+            "first_input_mime_type",
+            "last_output_value",
+            "last_output_mime_type",
+        ):
+            column = columns.pop(name, None)
+            assert column is not None
+            assert column.nullable
+            assert isinstance(column.type, VARCHAR)
+            del column
+
+        indexes = {str(index.name) for index in project_sessions.indexes}
+        assert "ix_project_sessions_project_id_num_traces" in indexes
+        assert "ix_project_sessions_project_id_llm_token_count_total" in indexes
+        del indexes
+
+        _down(_engine, _alembic_config, "e5c9a2b7d3f1")
+
+        metadata = MetaData()
+        metadata.reflect(bind=_engine)
+
+        assert (project_sessions := metadata.tables.get("project_sessions")) is not None
+
+        columns = {str(col.name): col for col in project_sessions.columns}
+
+        for name in (
+            "num_traces",
+            "num_error_traces",
+            "llm_token_count_prompt",
+            "llm_token_count_completion",
+            "first_input_value",
+            "first_input_mime_type",
+            "last_output_value",
+            "last_output_mime_type",
+        ):
+            assert name not in columns
+    _up(_engine, _alembic_config, "f7d2b4e8a6c3")
+
+    for _ in range(2):
+        _up(_engine, _alembic_config, "a1c6e9d4f2b8")
+
+        metadata = MetaData()
+        metadata.reflect(bind=_engine)
+
+        if _engine.dialect.name == "sqlite":
+            assert "span_search" in metadata.tables
+        else:
+            assert (spans := metadata.tables.get("spans")) is not None
+            indexes = {str(index.name) for index in spans.indexes}
+            if "ix_spans_name_trgm" in indexes:
+                assert "ix_spans_input_trgm" in indexes
+                assert "ix_spans_output_trgm" in indexes
+                assert "ix_spans_status_message_trgm" in indexes
+            del indexes
+
+        _down(_engine, _alembic_config, "f7d2b4e8a6c3")
+
+        metadata = MetaData()
+        metadata.reflect(bind=_engine)
+
+        assert "span_search" not in metadata.tables
+        assert (spans := metadata.tables.get("spans")) is not None
+        assert not {str(index.name) for index in spans.indexes if index.name}.intersection(
+            (
+                "ix_spans_name_trgm",
+                "ix_spans_input_trgm",
+                "ix_spans_output_trgm",
+                "ix_spans_status_message_trgm",
+            )
+        )
+    _up(_engine, _alembic_config, "a1c6e9d4f2b8")
@@ -1,3 +1,4 @@
+from copy import deepcopy
 from datetime import datetime, timedelta, timezone
 from functools import singledispatch
 from secrets import token_hex
@@ -9,7 +10,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from strawberry.relay import GlobalID
 
 from phoenix.db import models
+from phoenix.db.session_aggregates import (
+    refresh_session_aggregates,
+    refresh_session_aggregates_of_traces,
+)
+from phoenix.db.trace_aggregates import refresh_trace_aggregates
 from phoenix.server.api.types.ProjectSession import ProjectSession
+from phoenix.trace.schemas import Span, SpanContext, SpanKind, SpanStatusCode
+
+_T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
 
 
 @singledispatch
@@ -81,6 +90,7 @@ async def _add_trace(
     )
     session.add(trace)
     await session.flush()
+    await refresh_session_aggregates_of_traces(session, [trace.project_session_rowid])
     assert isinstance(await _get_record_by_id(session, models.Trace, trace.id), models.Trace)
     return trace
 
@@ -125,10 +135,72 @@ async def _add_span(
     )
     session.add(span)
     await session.flush()
+    await refresh_trace_aggregates(session, models.Trace.id == trace_rowid)
+    await refresh_session_aggregates(
+        session,
+        models.ProjectSession.id
+        == select(models.Trace.project_session_rowid)
+        .where(models.Trace.id == trace_rowid)
+        .scalar_subquery(),
+    )
     assert isinstance(await _get_record_by_id(session, models.Span, span.id), models.Span)
     return span
 
 
+def _make_span(
+    span_id: str,
+    trace_id: str = "t",
+    parent_id: Optional[str] = None,
+    *,
+    name: Optional[str] = None,
+    span_kind: Optional[SpanKind] = None,
+    start_time: datetime = _T0,
+    offset: float = 0,
+    duration: float = 1,
+    status_code: SpanStatusCode = SpanStatusCode.OK,
+    status_message: str = "",
+    attributes: Optional[Dict[str, Any]] = None,
+    prompt_tokens: Optional[int] = None,
+    completion_tokens: Optional[int] = None,
+    session_id: Optional[str] = None,
+    input_value: Optional[str] = None,
+    output_value: Optional[str] = None,
+) -> Span:
+    """
+    Builds a span to be inserted, e.g. by `insert_spans`, that starts `offset`
+    seconds after `start_time`, i.e. the start of 2024 by default, and lasts
+    `duration` seconds. Root spans are
+    chains and other spans are LLM spans unless `span_kind` is given, and the token
+    counts, session id and input and output values are added to the attributes.
+    """
+    attributes = deepcopy(attributes or {})
+    if prompt_tokens is not None or completion_tokens is not None:
+        attributes.setdefault("llm", {})["token_count"] = {
+            "prompt": prompt_tokens or 0,
+            "completion": completion_tokens or 0,
+        }
+    if session_id is not None:
+        attributes.setdefault("session", {})["id"] = session_id
+    if input_value is not None:
+        attributes.setdefault("input", {})["value"] = input_value
+    if output_value is not None:
+        attributes.setdefault("output", {})["value"] = output_value
+    start_time += timedelta(seconds=offset)
+    return Span(
+        name=span_id if name is None else name,
+        context=SpanContext(trace_id=trace_id, span_id=span_id),
+        span_kind=span_kind or (SpanKind.LLM if parent_id else SpanKind.CHAIN),
+        parent_id=parent_id,
+        start_time=start_time,
+        end_time=start_time + timedelta(seconds=duration),
+        status_code=status_code,
+        status_message=status_message,
+        attributes=attributes,
+        events=[],
+        conversation=None,
+    )
+
+
 async def _add_project_session(
     session: AsyncSession,
     project: models.Project,
@@ -3,7 +3,7 @@ import contextlib
 import os
 import tempfile
 from asyncio import AbstractEventLoop
-from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Sequence
 from functools import partial
 from importlib.metadata import version
 from random import getrandbits
@@ -29,7 +29,7 @@ import phoenix.trace.v1 as pb
 from phoenix.config import EXPORT_DIR
 from phoenix.core.model_schema_adapter import create_model_from_inferences
 from phoenix.db import models
-from phoenix.db.bulk_inserter import BulkInserter
+from phoenix.db.bulk_inserter import BulkInserter, QueueSpans
 from phoenix.db.engines import aio_postgresql_engine, aio_sqlite_engine
 from phoenix.db.insertion.helpers import DataManipulation
 from phoenix.inferences.inferences import EMPTY_INFERENCES
@@ -291,14 +291,14 @@ class TestBulkInserter(BulkInserter):
         self,
     ) -> tuple[
         Callable[..., Awaitable[None]],
-        Callable[[Span, str], Awaitable[None]],
+        QueueSpans,
         Callable[[pb.Evaluation], Awaitable[None]],
         Callable[[DataManipulation], None],
     ]:
         # Return the overridden methods
         return (
             self._enqueue_immediate,
-            self._queue_span_immediate,
+            self._queue_spans_immediate,
             self._queue_evaluation_immediate,
             self._enqueue_operation_immediate,
         )
@@ -316,8 +316,12 @@ class TestBulkInserter(BulkInserter):
     def _enqueue_operation_immediate(self, operation: DataManipulation) -> None:
         raise NotImplementedError
 
-    async def _queue_span_immediate(self, span: Span, project_name: str) -> None:
-        await self._insert_spans([(span, project_name)])
+    async def _queue_spans_immediate(
+        self,
+        spans: Sequence[tuple[Span, str]],
+        transport: str = "internal",
+    ) -> None:
+        await self._insert_spans(list(spans))
 
     async def _queue_evaluation_immediate(self, evaluation: pb.Evaluation) -> None:
         await self._insert_evaluations([evaluation])
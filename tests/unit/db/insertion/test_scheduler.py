@@ -0,0 +1,59 @@
+from phoenix.db.insertion.scheduler import AdaptiveScheduler
+
+
+class TestAdaptiveScheduler:
+    def test_grows_batches_while_commit_time_per_span_falls(self) -> None:
+        scheduler = AdaptiveScheduler(batch_size=1000, step=2, max_commit_seconds=10)
+        scheduler.observe_commit(1000, 1.0)
+        assert scheduler.batch_size == 2000
+        scheduler.observe_commit(2000, 0.5)
+        assert scheduler.batch_size == 4000
+        scheduler.observe_commit(4000, 1.6)
+        assert scheduler.batch_size == 2000
+
+    def test_shrinks_batches_when_commits_are_too_slow(self) -> None:
+        scheduler = AdaptiveScheduler(batch_size=1000, step=2, max_commit_seconds=1)
+        scheduler.observe_commit(1000, 2.0)
+        assert scheduler.batch_size == 500
+
+    def test_ignores_partial_batches(self) -> None:
+        scheduler = AdaptiveScheduler(batch_size=1000)
+        scheduler.observe_commit(10, 100.0)
+        assert scheduler.batch_size == 1000
+
+    def test_keeps_batch_size_within_bounds(self) -> None:
+        scheduler = AdaptiveScheduler(batch_size=1000, max_batch_size=1500, step=2)
+        scheduler.observe_commit(1000, 0.1)
+        assert scheduler.batch_size == 1500
+        scheduler.observe_commit(1500, 0.1)
+        assert scheduler.batch_size == 750
+
+    def test_halves_batches_that_fail(self) -> None:
+        scheduler = AdaptiveScheduler(batch_size=1000, min_batch_size=300, step=2)
+        scheduler.observe_failure(1000)
+        assert scheduler.batch_size == 500
+        scheduler.observe_failure(500)
+        assert scheduler.batch_size == 300
+        # the size keeps shrinking until commits get slower per span
+        scheduler = AdaptiveScheduler(batch_size=1000, step=2)
+        scheduler.observe_failure(1000)
+        scheduler.observe_commit(500, 0.5)
+        assert scheduler.batch_size == 250
+
+    def test_flush_interval_follows_queue_depth(self) -> None:
+        scheduler = AdaptiveScheduler(
+            batch_size=100,
+            flush_interval=0.1,
+            min_flush_interval=0.04,
+            max_flush_interval=0.2,
+            step=2,
+        )
+        scheduler.observe_backlog(100)
+        assert scheduler.flush_interval == 0.05
+        scheduler.observe_backlog(1000)
+        assert scheduler.flush_interval == 0.04
+        assert scheduler.should_flush(100)
+        assert not scheduler.should_flush(99)
+        for _ in range(3):
+            scheduler.observe_backlog(1)
+        assert scheduler.flush_interval == 0.2
@@ -0,0 +1,383 @@
+from collections.abc import Iterator
+from dataclasses import replace
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from phoenix.db import models
+from phoenix.db.compression import decompress_attributes
+from phoenix.db.insertion.identity_cache import IdentityCache
+from phoenix.db.insertion.span import insert_span, insert_spans
+from phoenix.db.span_attribute_blobs import hash_blob, resolve_blobs
+from phoenix.db.span_vectors import get_span_vectors
+from phoenix.server.api.utils import delete_projects, delete_traces
+from phoenix.server.dml_event import SpanDeleteEvent
+from phoenix.server.types import DbSessionFactory
+from phoenix.trace.schemas import Span, SpanContext, SpanEvent, SpanStatusCode
+from tests.unit._helpers import _T0, _make_span
+
+
+def _batches() -> Iterator[list[tuple[Span, str]]]:
+    # first batch: children of a root that has not arrived yet
+    yield [
+        (
+            _make_span(
+                "c1", "t1", "r1", offset=1, status_code=SpanStatusCode.ERROR, prompt_tokens=1
+            ),
+            "p1",
+        ),
+        (_make_span("g1", "t1", "c1", offset=2, prompt_tokens=2, completion_tokens=3), "p1"),
+        (_make_span("x1", "t2", None, offset=5, session_id="s1"), "p2"),
+    ]
+    # second batch: the root, a late child, a duplicate and a span sharing a session
+    yield [
+        (_make_span("r1", "t1", None, offset=0, duration=10, completion_tokens=4), "p1"),
+        (
+            _make_span(
+                "g2", "t1", "c1", offset=3, status_code=SpanStatusCode.ERROR, completion_tokens=5
+            ),
+            "p1",
+        ),
+        (_make_span("g1", "t1", "c1", offset=2, prompt_tokens=2, completion_tokens=3), "p1"),
+        (_make_span("y1", "t3", None, offset=-5, session_id="s1"), "p2"),
+        (_make_span("x2", "t2", "x1", offset=6, duration=9, session_id="s2"), "p2"),
+    ]
+
+
+async def _snapshot(db: DbSessionFactory) -> dict[str, Any]:
+    async with db() as session:
+        spans = {
+            span.span_id: (
+                span.cumulative_error_count,
+                span.cumulative_llm_token_count_prompt,
+                span.cumulative_llm_token_count_completion,
+                span.llm_token_count_prompt,
+                span.llm_token_count_completion,
+            )
+            for span in await session.scalars(select(models.Span))
+        }
+        traces = {
+            trace_id: (project_name, start_time, end_time, session_id)
+            for trace_id, project_name, start_time, end_time, session_id in (
+                await session.execute(
+                    select(
+                        models.Trace.trace_id,
+                        models.Project.name,
+                        models.Trace.start_time,
+                        models.Trace.end_time,
+                        models.ProjectSession.session_id,
+                    )
+                    .join(models.Project, models.Trace.project_rowid == models.Project.id)
+                    .outerjoin(
+                        models.ProjectSession,
+                        models.Trace.project_session_rowid == models.ProjectSession.id,
+                    )
+                )
+            ).all()
+        }
+        sessions = {
+            session_id: (start_time, end_time)
+            for session_id, start_time, end_time in (
+                await session.execute(
+                    select(
+                        models.ProjectSession.session_id,
+                        models.ProjectSession.start_time,
+                        models.ProjectSession.end_time,
+                    )
+                )
+            ).all()
+        }
+    return dict(spans=spans, traces=traces, sessions=sessions)
+
+
+class TestInsertSpans:
+    @pytest.mark.parametrize("use_copy", [False, True])
+    @pytest.mark.parametrize("use_cache", [False, True])
+    async def test_matches_sequential_insertion(
+        self,
+        use_cache: bool,
+        use_copy: bool,
+        db: DbSessionFactory,
+    ) -> None:
+        cache = IdentityCache() if use_cache else None
+        for batch in _batches():
+            async with db() as session:
+                events = await insert_spans(session, batch, cache, use_copy)
+            assert events
+        if cache is not None:
+            assert cache.hits["project"] and cache.hits["trace"]
+        actual = await _snapshot(db)
+        async with db() as session:
+            await session.execute(delete(models.Project))
+        for batch in _batches():
+            async with db() as session:
+                for span, project_name in batch:
+                    async with session.begin_nested():
+                        await insert_span(session, span, project_name)
+        expected = await _snapshot(db)
+        assert actual == expected
+        assert actual["spans"]["r1"] == (2, 3, 12, 0, 4)
+        assert actual["traces"]["t3"][3] == "s1"
+        assert actual["sessions"]["s1"] == (_T0 - timedelta(seconds=5), _T0 + timedelta(seconds=15))
+        async with db() as session:
+            trace_ids = await session.scalars(
+                select(models.Trace.trace_id).where(
+                    models.Trace.end_time > _T0 + timedelta(seconds=10)
+                )
+            )
+            assert set(trace_ids) == {"t2"}
+
+    async def test_copy_loads_the_same_rows_as_insert(
+        self,
+        db: DbSessionFactory,
+    ) -> None:
+        span = replace(
+            _make_span(
+                "a",
+                "t",
+                attributes={"input": {"value": "x" * 100}, "metadata": {"k": [1, 2.5, None]}},
+            ),
+            events=[SpanEvent(name="e", timestamp=_T0, attributes={"message": '"\\\n\t'})],
+        )
+        columns = [c for c in models.Span.__table__.c if c.name not in ("id", "trace_rowid")]
+        rows = []
+        for use_copy in (False, True):
+            async with db() as session:
+                await insert_spans(session, [(span, "p")], use_copy=use_copy)
+                # The staging table can be reused within the same transaction.
+                other = replace(span, context=SpanContext(trace_id="t", span_id="b"))
+                await insert_spans(session, [(other, "p")], use_copy=use_copy)
+            async with db() as session:
+                rows.append((await session.execute(select(*columns))).all())
+                await session.execute(delete(models.Project))
+        assert rows[0] == rows[1]
+
+    async def test_inserts_batches_that_exceed_the_bind_parameter_limit(
+        self,
+        db: DbSessionFactory,
+    ) -> None:
+        n = 2500
+        async with db() as session:
+            await insert_spans(
+                session, [(_make_span(f"r{i}", f"t{i}", session_id=f"s{i}"), "p") for i in range(n)]
+            )
+        async with db() as session:
+            await insert_spans(
+                session,
+                [(_make_span(f"c{i}", f"t{i}", f"r{i}", prompt_tokens=1), "p") for i in range(n)],
+            )
+        async with db() as session:
+            assert await session.scalar(select(func.count(models.Span.id))) == 2 * n
+            assert await session.scalar(select(func.count(models.ProjectSession.id))) == n
+            cumulative_counts = await session.scalars(
+                select(models.Span.cumulative_llm_token_count_prompt).where(
+                    models.Span.parent_id.is_(None)
+                )
+            )
+            assert set(cumulative_counts) == {1}
+
+    async def test_returns_no_events_when_all_spans_exist(
+        self,
+        db: DbSessionFactory,
+    ) -> None:
+        batch = next(_batches())
+        async with db() as session:
+            assert await insert_spans(session, batch)
+        async with db() as session:
+            assert await insert_spans(session, batch) == []
+
+    async def test_rolls_up_late_children_to_all_persisted_ancestors(
+        self,
+        db: DbSessionFactory,
+    ) -> None:
+        async with db() as session:
+            await insert_spans(
+                session,
+                [
+                    (_make_span("r", "t"), "p"),
+                    (_make_span("a", "t", "r"), "p"),
+                    (_make_span("b", "t", "a", prompt_tokens=1), "p"),
+                ],
+            )
+        async with db() as session:
+            await insert_spans(
+                session,
+                [
+                    (
+                        _make_span(
+                            "c1", "t", "b", status_code=SpanStatusCode.ERROR, prompt_tokens=2
+                        ),
+                        "p",
+                    ),
+                    (
+                        _make_span(
+                            "c2", "t", "b", status_code=SpanStatusCode.ERROR, completion_tokens=3
+                        ),
+                        "p",
+                    ),
+                    (_make_span("d", "t", "c1", prompt_tokens=4), "p"),
+                    (_make_span("e", "t", "a", status_code=SpanStatusCode.ERROR), "p"),
+                ],
+            )
+        spans = (await _snapshot(db))["spans"]
+        assert spans["d"][:3] == (0, 4, 0)
+        assert spans["c1"][:3] == (1, 6, 0)
+        assert spans["b"][:3] == (2, 7, 3)
+        assert spans["a"][:3] == (3, 7, 3)
+        assert spans["r"][:3] == (3, 7, 3)
+
+    async def test_cached_rows_of_cleared_project_are_not_reused(
+        self,
+        db: DbSessionFactory,
+    ) -> None:
+        cache = IdentityCache()
+        async with db() as session:
+            await insert_spans(session, [(_make_span("a", "t", session_id="s"), "p")], cache)
+        async with db() as session:
+            project_rowid = await session.scalar(
+                select(models.Project.id).where(models.Project.name == "p")
+            )
+            await session.execute(delete(models.Trace))
+            await session.execute(delete(models.ProjectSession))
+        assert project_rowid is not None
+        cache.put(SpanDeleteEvent((project_rowid,)))
+        async with db() as session:
+            await insert_spans(session, [(_make_span("b", "t", session_id="s"), "p")], cache)
+        snapshot = await _snapshot(db)
+        assert set(snapshot["spans"]) == {"b"}
+        assert snapshot["traces"]["t"][3] == "s"
+
+    async def test_cached_rows_of_deleted_traces_and_projects_are_not_reused(
+        self,
+        db: DbSessionFactory,
+    ) -> None:
+        cache = IdentityCache()
+        async with db() as session:
+            await insert_spans(session, [(_make_span("a", "t", session_id="s"), "p")], cache)
+        assert await delete_traces(db, cache, "t")
+        async with db() as session:
+            await insert_spans(session, [(_make_span("b", "t", session_id="s"), "p")], cache)
+        assert await delete_projects(db, cache, "p")
+        async with db() as session:
+            await insert_spans(session, [(_make_span("c", "t", session_id="s"), "p")], cache)
+        snapshot = await _snapshot(db)
+        assert set(snapshot["spans"]) == {"c"}
+        assert snapshot["traces"]["t"] == ("p", _T0, _T0 + timedelta(seconds=1), "s")
+
+    @pytest.mark.parametrize("use_copy", [False, True])
+    async def test_stores_vectors_in_side_car_table(
+        self,
+        use_copy: bool,
+        db: DbSessionFactory,
+    ) -> None:
+        vector = [0.5 * i for i in range(16)]
+        attributes = {
+            "embedding": {"embeddings": [{"embedding": {"vector": vector}}]},
+            "metadata": {"vector": vector},
+            "short": [0.5],
+        }
+        async with db() as session:
+            await insert_spans(
+                session, [(_make_span("a", "t", attributes=attributes), "p")], use_copy=use_copy
+            )
+            await insert_span(session, _make_span("b", "t", attributes=attributes), "p")
+        async with db() as session:
+            for span_id in ("a", "b"):
+                span = await session.scalar(select(models.Span).filter_by(span_id=span_id))
+                assert span is not None
+                path = "embedding.embeddings.0.embedding.vector"
+                assert span.attributes == {
+                    **attributes,
+                    "embedding": {
+                        "embeddings": [
+                            {"embedding": {"vector": {"__vector__": path, "dimensions": 16}}}
+                        ]
+                    },
+                }
+                vectors = await get_span_vectors(session, [span.id])
+                assert vectors == {span.id: {path: vector}}
+
+    @pytest.mark.parametrize("use_copy", [False, True])
+    async def test_compresses_large_string_attributes(
+        self,
+        use_copy: bool,
+        db: DbSessionFactory,
+    ) -> None:
+        attributes = {"input": {"value": "x" * 1000}, "output": {"value": "y"}}
+        async with db() as session:
+            await insert_spans(
+                session,
+                [(_make_span("a", "t", attributes=attributes), "p")],
+                use_copy=use_copy,
+                compression_threshold=100,
+            )
+            await insert_span(
+                session,
+                _make_span("b", "t", attributes=attributes),
+                "p",
+                compression_threshold=100,
+            )
+        async with db() as session:
+            for span in await session.scalars(select(models.Span)):
+                assert set(span.attributes["input"]["value"]) == {"__zstd__"}
+                assert span.attributes["output"] == {"value": "y"}
+                assert decompress_attributes(span.attributes) == attributes
+
+    @pytest.mark.parametrize("use_copy", [False, True])
+    async def test_deduplicates_large_string_attributes(
+        self,
+        use_copy: bool,
+        db: DbSessionFactory,
+    ) -> None:
+        prompt = "You are a helpful assistant. " * 10
+        attributes = {
+            "llm": {"prompt_template": {"template": prompt}},
+            "output": {"value": prompt + "!"},
+        }
+        cache = IdentityCache()
+        for span_ids in (["a", "b"], ["c"]):
+            async with db() as session:
+                await insert_spans(
+                    session,
+                    [
+                        (_make_span(span_id, "t", attributes=attributes), "p")
+                        for span_id in span_ids
+                    ],
+                    cache,
+                    use_copy=use_copy,
+                    deduplication_threshold=100,
+                )
+        assert cache.hits["blob"] == 2
+        async with db() as session:
+            await insert_span(
+                session,
+                _make_span("d", "t", attributes=attributes),
+                "p",
+                deduplication_threshold=100,
+            )
+        async with db() as session:
+            blobs: dict[str, str] = dict(
+                (
+                    await session.execute(
+                        select(models.SpanAttributeBlob.hash, models.SpanAttributeBlob.value)
+                    )
+                )
+                .tuples()
+                .all()
+            )
+            assert sorted(blobs.values()) == [prompt, prompt + "!"]
+            references = await session.execute(
+                select(models.Span.span_id, models.SpanAttributeBlobReference.blob_hash).join(
+                    models.SpanAttributeBlobReference
+                )
+            )
+            assert sorted(references.tuples()) == [
+                (span_id, blob_hash) for span_id in "abcd" for blob_hash in sorted(blobs)
+            ]
+            for span in await session.scalars(select(models.Span)):
+                assert span.attributes["llm"]["prompt_template"]["template"] == {
+                    "__blob__": hash_blob(prompt)
+                }
+                assert resolve_blobs(span.attributes, blobs) == attributes
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import phoenix.trace.v1 as pb
+from phoenix.db.insertion.spool import Spool, encode_evaluation, encode_spans
+from tests.unit._helpers import _make_span
+
+_TRACE_ID = "0" * 32
+_ATTRIBUTES = {"openinference": {"span": {"kind": "CHAIN"}}, "input": {"value": "x" * 100}}
+
+
+class TestSpool:
+    def test_replays_records_after_the_last_commit(self, tmp_path: Path) -> None:
+        spool = Spool(tmp_path)
+        assert spool.open() == ([], [])
+        spool.append(
+            encode_spans(
+                [
+                    (_make_span("a" * 16, _TRACE_ID, attributes=_ATTRIBUTES), "p1"),
+                    (_make_span("b" * 16, _TRACE_ID, attributes=_ATTRIBUTES), "p2"),
+                ]
+            )
+        )
+        position = spool.sync()
+        spool.append(
+            encode_spans([(_make_span("c" * 16, _TRACE_ID, attributes=_ATTRIBUTES), "p1")])
+        )
+        spool.append([encode_evaluation(pb.Evaluation(name="eval"))])
+        spool.close()
+
+        spool = Spool(tmp_path)
+        spans, evaluations = spool.open()
+        assert [(span.context.span_id, name) for span, name in spans] == [
+            ("a" * 16, "p1"),
+            ("b" * 16, "p2"),
+            ("c" * 16, "p1"),
+        ]
+        assert spans[0][0] == _make_span("a" * 16, _TRACE_ID, attributes=_ATTRIBUTES)
+        assert [evaluation.name for evaluation in evaluations] == ["eval"]
+        spool.commit(position)
+        spool.close()
+
+        spool = Spool(tmp_path)
+        spans, evaluations = spool.open()
+        assert [span.context.span_id for span, _ in spans] == ["c" * 16]
+        assert [evaluation.name for evaluation in evaluations] == ["eval"]
+        spool.commit(spool.sync())
+        spool.close()
+
+        assert Spool(tmp_path).open() == ([], [])
+
+    def test_rotates_segments_and_deletes_committed_ones(self, tmp_path: Path) -> None:
+        spool = Spool(tmp_path, max_segment_bytes=512)
+        spool.open()
+        for i in range(10):
+            spool.append(
+                encode_spans([(_make_span(f"{i:016x}", _TRACE_ID, attributes=_ATTRIBUTES), "p")])
+            )
+        assert len(list(tmp_path.glob("*.log"))) > 2
+        spool.commit(spool.sync())
+        assert len(list(tmp_path.glob("*.log"))) == 1
+        spool.close()
+
+    def test_ignores_torn_record_at_the_end_of_a_segment(self, tmp_path: Path) -> None:
+        spool = Spool(tmp_path)
+        spool.open()
+        spool.append(encode_spans([(_make_span("a" * 16, _TRACE_ID, attributes=_ATTRIBUTES), "p")]))
+        spool.append(encode_spans([(_make_span("b" * 16, _TRACE_ID, attributes=_ATTRIBUTES), "p")]))
+        spool.close()
+        (segment,) = tmp_path.glob("*.log")
+        segment.write_bytes(segment.read_bytes()[:-1])
+        spans, _ = Spool(tmp_path).open()
+        assert [span.context.span_id for span, _ in spans] == ["a" * 16]
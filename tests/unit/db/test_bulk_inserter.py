@@ -0,0 +1,216 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import select
+
+import phoenix.trace.v1 as pb
+from phoenix.db import models
+from phoenix.db.bulk_inserter import BulkInserter
+from phoenix.db.insertion.spool import Spool, encode_spans
+from phoenix.server.dml_event import DmlEvent
+from phoenix.server.types import DbSessionFactory
+from tests.unit._helpers import _make_span
+
+
+class _Events:
+    def __init__(self) -> None:
+        self.items: list[DmlEvent] = []
+
+    def put(self, item: DmlEvent) -> None:
+        self.items.append(item)
+
+
+_TRACE_ID = "0" * 32
+
+
+class TestAdmit:
+    @pytest.mark.parametrize("dialect", ["sqlite"])
+    async def test_rejects_when_buffer_is_over_max_items(
+        self,
+        db: DbSessionFactory,
+    ) -> None:
+        bulk_inserter = BulkInserter(db, event_queue=_Events(), max_buffered_items=2)
+        _, queue_spans, queue_evaluation, _ = await bulk_inserter.__aenter__()
+        await bulk_inserter.__aexit__()
+        assert bulk_inserter.admit()
+        await queue_spans([(_make_span("1".zfill(16), _TRACE_ID), "project")])
+        assert bulk_inserter.admit()
+        await queue_evaluation(pb.Evaluation(name="eval"))
+        assert not bulk_inserter.admit()
+
+    @pytest.mark.parametrize("dialect", ["sqlite"])
+    async def test_rejects_when_buffer_is_over_max_bytes(
+        self,
+        db: DbSessionFactory,
+    ) -> None:
+        bulk_inserter = BulkInserter(db, event_queue=_Events(), max_buffered_bytes=1000)
+        _, queue_spans, _, _ = await bulk_inserter.__aenter__()
+        await bulk_inserter.__aexit__()
+        await queue_spans(
+            [(_make_span("1".zfill(16), _TRACE_ID, input_value="x" * 500), "project")]
+        )
+        assert bulk_inserter.admit()
+        await queue_spans(
+            [(_make_span("2".zfill(16), _TRACE_ID, input_value="x" * 500), "project")]
+        )
+        assert not bulk_inserter.admit()
+
+    async def test_admits_again_after_buffer_is_flushed(
+        self,
+        db: DbSessionFactory,
+    ) -> None:
+        events = _Events()
+        bulk_inserter = BulkInserter(db, event_queue=events, sleep=0.001, max_buffered_items=1)
+        async with bulk_inserter as (_, queue_spans, _, _):
+            await queue_spans([(_make_span("1".zfill(16), _TRACE_ID), "project")])
+            assert not bulk_inserter.admit()
+            for _ in range(100):
+                if events.items:
+                    break
+                await asyncio.sleep(0.01)
+            assert bulk_inserter.admit()
+
+
+class TestFlushScheduling:
+    async def test_flushes_as_soon_as_the_buffer_holds_a_full_batch(
+        self,
+        db: DbSessionFactory,
+    ) -> None:
+        events = _Events()
+        bulk_inserter = BulkInserter(db, event_queue=events, sleep=60, max_ops_per_transaction=2)
+        async with bulk_inserter as (_, queue_spans, _, _):
+            # The first span wakes up the idle inserter.
+            await queue_spans([(_make_span("1".zfill(16), _TRACE_ID), "project")])
+            for _ in range(100):
+                if events.items:
+                    break
+                await asyncio.sleep(0.01)
+            assert len(events.items) == 1
+            # The next one waits for the flush interval...
+            await queue_spans([(_make_span("2".zfill(16), _TRACE_ID), "project")])
+            await asyncio.sleep(0.1)
+            assert len(events.items) == 1
+            # ...until there is a full batch.
+            await queue_spans([(_make_span("3".zfill(16), _TRACE_ID), "project")])
+            for _ in range(100):
+                if len(events.items) > 1:
+                    break
+                await asyncio.sleep(0.01)
+            assert len(events.items) == 2
+        async with db() as session:
+            assert len((await session.scalars(select(models.Span.id))).all()) == 3
+
+    async def test_halves_the_batch_size_when_a_batch_falls_back(
+        self,
+        db: DbSessionFactory,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        async def insert_spans(*args: Any, **kwargs: Any) -> Any:
+            raise RuntimeError("batch failed")
+
+        monkeypatch.setattr("phoenix.db.bulk_inserter.insert_spans", insert_spans)
+        bulk_inserter = BulkInserter(db, event_queue=_Events(), max_ops_per_transaction=400)
+        assert bulk_inserter._scheduler.batch_size == 400
+        spans = [(_make_span(str(i).zfill(16), _TRACE_ID), "project") for i in range(400)]
+        assert await bulk_inserter._insert_spans(spans) == ([], [])
+        assert bulk_inserter._scheduler.batch_size == 200
+        async with db() as session:
+            assert len((await session.scalars(select(models.Span.id))).all()) == 400
+
+
+class TestIngestionMetrics:
+    async def test_observes_stages_by_project_and_transport(
+        self,
+        db: DbSessionFactory,
+    ) -> None:
+        from prometheus_client import REGISTRY
+
+        def count(name: str) -> float:
+            labels = {"project": "metrics", "transport": "grpc"}
+            return REGISTRY.get_sample_value(f"{name}_count", labels) or 0
+
+        names = (
+            "ingestion_buffer_wait_seconds",
+            "ingestion_transaction_seconds",
+            "ingestion_span_end_to_visible_seconds",
+        )
+        counts = [count(name) for name in names]
+        events = _Events()
+        bulk_inserter = BulkInserter(
+            db, event_queue=events, sleep=60, max_ops_per_transaction=3, enable_prometheus=True
+        )
+        async with bulk_inserter as (_, queue_spans, _, _):
+            await queue_spans([(_make_span("1".zfill(16), _TRACE_ID), "metrics")], transport="grpc")
+            for _ in range(100):
+                if events.items:
+                    break
+                await asyncio.sleep(0.01)
+            assert REGISTRY.get_sample_value("ingestion_lag_seconds") == 0
+            await queue_spans(
+                [
+                    (_make_span("2".zfill(16), _TRACE_ID), "metrics"),
+                    (_make_span("3".zfill(16), _TRACE_ID), "metrics"),
+                ],
+                "grpc",
+            )
+            await asyncio.sleep(0.01)
+            assert (REGISTRY.get_sample_value("ingestion_lag_seconds") or 0) > 0
+        assert [count(name) for name in names] == [counts[0] + 1, counts[1] + 1, counts[2] + 1]
+
+
+class TestSpool:
+    async def test_inserts_spans_replayed_from_spool(
+        self,
+        db: DbSessionFactory,
+        tmp_path: Path,
+    ) -> None:
+        spool = Spool(tmp_path)
+        spool.open()
+        spool.append(encode_spans([(_make_span("1".zfill(16), _TRACE_ID), "project")]))
+        spool.close()
+        bulk_inserter = BulkInserter(db, event_queue=_Events(), sleep=0.001, spool=Spool(tmp_path))
+        async with bulk_inserter:
+            for _ in range(100):
+                if (tmp_path / "checkpoint").exists():
+                    break
+                await asyncio.sleep(0.01)
+        async with db() as session:
+            assert await session.scalar(select(models.Span.span_id)) == "0000000000000001"
+        assert Spool(tmp_path).open() == ([], [])
+
+    async def test_moves_records_that_keep_failing_to_dead_letters(
+        self,
+        db: DbSessionFactory,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        attempts = 0
+
+        async def insert_evaluation(*args: Any, **kwargs: Any) -> Any:
+            nonlocal attempts
+            attempts += 1
+            raise RuntimeError("poison")
+
+        monkeypatch.setattr("phoenix.db.bulk_inserter.insert_evaluation", insert_evaluation)
+        bulk_inserter = BulkInserter(
+            db,
+            event_queue=_Events(),
+            sleep=0.001,
+            retry_delay_sec=0,
+            retry_allowance=2,
+            spool=Spool(tmp_path),
+        )
+        async with bulk_inserter as (_, queue_spans, queue_evaluation, _):
+            await queue_spans([(_make_span("1".zfill(16), _TRACE_ID), "project")])
+            await queue_evaluation(pb.Evaluation(name="eval"))
+            for _ in range(100):
+                if (tmp_path / "checkpoint").exists():
+                    break
+                await asyncio.sleep(0.01)
+        assert attempts == 3
+        async with db() as session:
+            assert await session.scalar(select(models.Span.span_id)) == "0000000000000001"
+        assert Spool(tmp_path).open() == ([], [])
+        assert (tmp_path / "dead_letters.log").stat().st_size > 0
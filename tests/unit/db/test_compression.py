@@ -0,0 +1,55 @@
+import json
+from typing import Any
+
+from phoenix.db.compression import (
+    compress_attributes,
+    decompress_attributes,
+    decompress_text,
+    has_compressed_values,
+    is_compressible_path,
+)
+
+
+def test_compress_attributes_round_trip() -> None:
+    text = "abc " * 100
+    attributes: dict[str, Any] = {
+        "input": {"value": text, "mime_type": "text/plain"},
+        "output": {"value": "short"},
+        "llm": {
+            "input_messages": [
+                {"message": {"role": "user", "content": text}},
+                {"message": {"role": "user", "content": "short"}},
+            ],
+        },
+        "metadata": {"value": text},
+    }
+    compressed = compress_attributes(attributes, 100)
+    assert set(compressed["input"]["value"]) == {"__zstd__"}
+    assert set(compressed["llm"]["input_messages"][0]["message"]["content"]) == {"__zstd__"}
+    assert compressed["output"] is attributes["output"]
+    assert compressed["llm"]["input_messages"][1] is attributes["llm"]["input_messages"][1]
+    assert compressed["metadata"] is attributes["metadata"]
+    assert len(json.dumps(compressed["input"])) < len(text) / 3
+    assert has_compressed_values(compressed)
+    assert decompress_attributes(compressed) == attributes
+
+
+def test_compress_attributes_keeps_values_below_threshold() -> None:
+    attributes = {"input": {"value": "abc " * 100}}
+    assert compress_attributes(attributes, 1000) is attributes
+    assert decompress_attributes(attributes) is attributes
+    assert not has_compressed_values(attributes)
+
+
+def test_decompress_text() -> None:
+    compressed = compress_attributes({"input": {"value": "abc " * 100}}, 1)
+    assert decompress_text(json.dumps(compressed["input"]["value"])) == "abc " * 100
+    assert decompress_text('{"a": 1}') == '{"a": 1}'
+    assert decompress_text("abc") == "abc"
+
+
+def test_is_compressible_path() -> None:
+    assert is_compressible_path(("input", "value"))
+    assert is_compressible_path(("llm", "output_messages", 0, "message", "content"))
+    assert not is_compressible_path(("llm", "output_messages", "0", "message", "content"))
+    assert not is_compressible_path(("input", "mime_type"))
@@ -0,0 +1,61 @@
+import random
+
+import numpy as np
+import pytest
+import sqlean
+from sqlalchemy import create_engine, literal, select
+
+from phoenix.db.latency_sketches import (
+    RELATIVE_ACCURACY,
+    ZERO_INDEX,
+    LatencySketch,
+    get_index,
+    get_index_expression,
+    get_value,
+)
+
+
+@pytest.mark.parametrize("probability", [0, 0.01, 0.25, 0.5, 0.9, 0.99, 1])
+def test_quantile_is_within_relative_accuracy(probability: float) -> None:
+    rng = random.Random(42)
+    latencies = [round(rng.lognormvariate(5, 2), 1) for _ in range(10_001)]
+    sketch = LatencySketch()
+    for latency in latencies:
+        sketch.add(latency)
+    expected = np.quantile(latencies, probability)
+    assert sketch.quantile(probability) == pytest.approx(expected, rel=RELATIVE_ACCURACY)
+
+
+def test_merged_sketches_equal_sketch_of_all_latencies() -> None:
+    latencies = [0.0, 0.1, 3.5, 12.0, 12.1, 250.0, 8000.0]
+    merged = LatencySketch()
+    for i in range(0, len(latencies), 3):
+        sketch = LatencySketch()
+        for latency in latencies[i : i + 3]:
+            sketch.add(latency)
+        merged.merge(sketch)
+    sketch = LatencySketch((get_index(latency), 1) for latency in latencies)
+    for probability in (0, 0.3, 0.5, 0.7, 1):
+        assert merged.quantile(probability) == sketch.quantile(probability)
+    assert merged.quantile(0) == 0
+
+
+def test_empty_sketch_has_no_quantiles() -> None:
+    assert LatencySketch().quantile(0.5) is None
+    assert LatencySketch([(get_index(1.0), 1), (get_index(1.0), -1)]).quantile(0.5) is None
+
+
+def test_value_is_within_relative_accuracy_of_latencies_in_bin() -> None:
+    for latency in (0.1, 1.0, 99.9, 12345.6, 3_600_000.0):
+        assert get_value(get_index(latency)) == pytest.approx(latency, rel=RELATIVE_ACCURACY)
+    assert get_index(0) == get_index(-1.0) == ZERO_INDEX
+
+
+def test_index_expression_agrees_with_index() -> None:
+    engine = create_engine("sqlite://", creator=lambda: sqlean.connect(":memory:"))
+    latencies = [-1.0, 0.0, 0.1, 1.0, 2.5, 99.9, 12345.6, 3_600_000.0]
+    with engine.connect() as connection:
+        assert [
+            connection.scalar(select(get_index_expression(literal(latency))))
+            for latency in latencies
+        ] == [get_index(latency) for latency in latencies]
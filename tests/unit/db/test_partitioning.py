@@ -0,0 +1,232 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from sqlalchemy import func, select, text
+
+from phoenix.config import SpanPartitionInterval, TraceRetentionPolicy
+from phoenix.db import models
+from phoenix.db.helpers import SupportedSQLDialect
+from phoenix.db.insertion.span import insert_span, insert_spans
+from phoenix.db.partitioning import (
+    create_partitions,
+    delete_orphaned_span_references,
+    drop_partitions,
+    get_partitions,
+    get_period_start,
+    is_partitioned,
+    partition_spans_table,
+    unpartition_spans_table,
+)
+from phoenix.db.promoted_attributes import (
+    _get_index_name,
+    ensure_promoted_span_attribute_indexes,
+    get_promoted_span_attributes,
+)
+from phoenix.server.retention import TraceRetentionManager
+from phoenix.server.types import DbSessionFactory
+from tests.unit._helpers import _add_project, _add_span, _add_trace, _make_span
+
+
+@pytest.fixture
+async def spans(db: DbSessionFactory) -> list[models.Span]:
+    """
+    Spans started one per day over the last ten days.
+    """
+    now = datetime.now(timezone.utc)
+    async with db() as session:
+        project = await _add_project(session)
+        trace = await _add_trace(session, project, start_time=now - timedelta(days=10))
+        spans = [
+            await _add_span(session, trace, start_time=now - timedelta(days=days, hours=1))
+            for days in range(10)
+        ]
+        session.add(
+            models.SpanAnnotation(
+                span_rowid=spans[-1].id,
+                name="correctness",
+                label="correct",
+                score=1,
+                explanation=None,
+                metadata_={},
+                annotator_kind="HUMAN",
+            )
+        )
+    return spans
+
+
+_FOREIGN_KEYS_ON_SPANS = text(
+    "SELECT count(*) FROM pg_constraint WHERE contype = 'f' AND confrelid = 'spans'::regclass"
+)
+
+
+@pytest.fixture
+async def partitioned_db(
+    db: DbSessionFactory,
+    spans: list[models.Span],
+) -> DbSessionFactory:
+    if db.dialect is not SupportedSQLDialect.POSTGRESQL:
+        pytest.skip("Partitioning is specific to PostgreSQL")
+    async with db() as session:
+        assert await session.scalar(_FOREIGN_KEYS_ON_SPANS) == 5
+        conn = await session.connection()
+        await conn.run_sync(partition_spans_table, SpanPartitionInterval.DAY)
+    return db
+
+
+async def test_partitioning_attaches_existing_spans_as_partition(
+    partitioned_db: DbSessionFactory,
+) -> None:
+    async with partitioned_db() as session:
+        conn = await session.connection()
+        assert await conn.run_sync(is_partitioned)
+        partitions = await conn.run_sync(get_partitions)
+        assert [p.name for p in partitions] == ["spans_legacy", "spans_default"]
+        assert partitions[0].lower is None
+        assert partitions[0].upper == get_period_start(
+            datetime.now(timezone.utc), SpanPartitionInterval.DAY
+        ) + timedelta(days=1)
+        assert partitions[1].is_default
+        assert await session.scalar(select(func.count(models.Span.id))) == 10
+        assert not await session.scalar(_FOREIGN_KEYS_ON_SPANS)
+
+
+async def test_create_partitions_moves_rows_out_of_default_partition(
+    partitioned_db: DbSessionFactory,
+    spans: list[models.Span],
+) -> None:
+    now = datetime.now(timezone.utc)
+    async with partitioned_db() as session:
+        trace = await session.get(models.Trace, spans[0].trace_rowid)
+        span = await _add_span(session, trace, start_time=now + timedelta(days=3))
+    async with partitioned_db() as session:
+        assert await session.scalar(text("SELECT count(*) FROM spans_default")) == 1
+        conn = await session.connection()
+        names = await conn.run_sync(
+            create_partitions, SpanPartitionInterval.DAY, now + timedelta(days=5)
+        )
+    assert len(names) == 5
+    async with partitioned_db() as session:
+        assert await session.scalar(text("SELECT count(*) FROM spans_default")) == 0
+        assert (
+            await session.scalar(
+                select(text("tableoid::regclass::text"))
+                .select_from(models.Span)
+                .where(models.Span.id == span.id)
+            )
+            == f"spans_p{now + timedelta(days=3):%Y%m%d}"
+        )
+        conn = await session.connection()
+        assert not await conn.run_sync(
+            create_partitions, SpanPartitionInterval.DAY, now + timedelta(days=5)
+        )
+
+
+@pytest.mark.parametrize("use_copy", [False, True])
+async def test_spans_are_inserted_once(
+    partitioned_db: DbSessionFactory,
+    use_copy: bool,
+) -> None:
+    start_time = datetime.now(timezone.utc)
+    spans = [_make_span(span_id, start_time=start_time) for span_id in ("a", "b")]
+    for _ in range(2):
+        async with partitioned_db() as session:
+            await insert_spans(session, [(span, "p") for span in spans], use_copy=use_copy)
+            await insert_span(session, spans[0], "p")
+    async with partitioned_db() as session:
+        assert (
+            await session.scalar(
+                select(func.count(models.Span.id)).where(models.Span.span_id.in_(["a", "b"]))
+            )
+            == 2
+        )
+
+
+async def test_drop_partitions_and_delete_orphaned_span_references(
+    partitioned_db: DbSessionFactory,
+) -> None:
+    now = datetime.now(timezone.utc)
+    async with partitioned_db() as session:
+        conn = await session.connection()
+        assert not await conn.run_sync(drop_partitions, now - timedelta(days=1))
+        dropped = await conn.run_sync(drop_partitions, now + timedelta(days=1))
+        assert [p.name for p in dropped] == ["spans_legacy"]
+        assert await conn.run_sync(delete_orphaned_span_references, 100) == 1
+        assert not await session.scalar(select(func.count(models.Span.id)))
+        assert not await session.scalar(select(func.count(models.SpanAnnotation.id)))
+
+
+async def test_unpartitioning_restores_spans_and_foreign_keys(
+    partitioned_db: DbSessionFactory,
+    spans: list[models.Span],
+) -> None:
+    async with partitioned_db() as session:
+        conn = await session.connection()
+        await conn.run_sync(unpartition_spans_table)
+        assert not await conn.run_sync(is_partitioned)
+        assert await session.scalar(select(func.count(models.Span.id))) == 10
+        assert await session.scalar(_FOREIGN_KEYS_ON_SPANS) == 5
+    async with partitioned_db() as session:
+        await session.delete(await session.get(models.Span, spans[-1].id))
+    async with partitioned_db() as session:
+        assert not await session.scalar(select(func.count(models.SpanAnnotation.id)))
+        await _add_span(session, await session.get(models.Trace, spans[0].trace_rowid))
+
+
+async def test_promoted_attribute_indexes_of_partitioned_spans_table(
+    partitioned_db: DbSessionFactory,
+) -> None:
+    async with partitioned_db() as session:
+        await ensure_promoted_span_attribute_indexes(session)
+    async with partitioned_db() as session:
+        conn = await session.connection()
+        await conn.run_sync(
+            create_partitions, SpanPartitionInterval.DAY, datetime.now(timezone.utc)
+        )
+    async with partitioned_db() as session:
+        # indexes that already exist are left as they are
+        await ensure_promoted_span_attribute_indexes(session)
+    async with partitioned_db() as session:
+        conn = await session.connection()
+        num_partitions = len(await conn.run_sync(get_partitions))
+        for keys in get_promoted_span_attributes():
+            name = _get_index_name(keys)
+            assert await session.scalar(
+                text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+                {"name": name},
+            )
+            assert (
+                await session.scalar(
+                    text("SELECT count(*) FROM pg_inherits WHERE inhparent = to_regclass(:name)"),
+                    {"name": name},
+                )
+                == num_partitions
+            )
+
+
+async def test_retention_manager_maintains_partitions(
+    partitioned_db: DbSessionFactory,
+) -> None:
+    events: list[Any] = []
+    manager = TraceRetentionManager(
+        partitioned_db,
+        {"*": TraceRetentionPolicy(max_age=timedelta(days=3))},
+        SimpleNamespace(put=events.append),
+        partition_interval=SpanPartitionInterval.DAY,
+        pause_seconds=0,
+    )
+    async with partitioned_db() as session:
+        conn = await session.connection()
+        # The legacy partition, which holds the spans of the current day, is kept.
+        await manager.sweep()
+        partitions = await conn.run_sync(get_partitions)
+        assert len(partitions) == 9
+        assert partitions[0].name == "spans_legacy"
+        assert await session.scalar(select(func.count(models.Span.id))) == 10
+    async with partitioned_db() as session:
+        conn = await session.connection()
+        await conn.run_sync(drop_partitions, datetime.now(timezone.utc) + timedelta(days=1))
+    await manager.sweep()
+    async with partitioned_db() as session:
+        assert not await session.scalar(select(func.count(models.SpanAnnotation.id)))
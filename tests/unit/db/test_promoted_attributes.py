@@ -0,0 +1,120 @@
+import pytest
+from sqlalchemy import select, text
+
+from phoenix.config import ENV_PHOENIX_PROMOTED_SPAN_ATTRIBUTES, get_env_promoted_span_attributes
+from phoenix.db import models
+from phoenix.db.insertion.span import insert_spans
+from phoenix.db.promoted_attributes import (
+    PromotedSpanAttribute,
+    _get_index_name,
+    ensure_promoted_span_attribute_indexes,
+    get_promoted_span_attributes,
+)
+from phoenix.server.types import DbSessionFactory
+from phoenix.trace.dsl.filter import SpanFilter
+from tests.unit._helpers import _make_span
+
+
+def test_get_env_promoted_span_attributes(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(ENV_PHOENIX_PROMOTED_SPAN_ATTRIBUTES, " metadata.tenant, llm.model_name,")
+    assert get_env_promoted_span_attributes() == [("metadata", "tenant"), ("llm", "model_name")]
+    assert get_promoted_span_attributes()[-1] == ("metadata", "tenant")
+    assert get_promoted_span_attributes().count(("llm", "model_name")) == 1
+    for value in ("metadata.'tenant'", 'metadata."tenant"', "metadata.{tenant}", "a}.b{"):
+        monkeypatch.setenv(ENV_PHOENIX_PROMOTED_SPAN_ATTRIBUTES, value)
+        with pytest.raises(ValueError):
+            get_env_promoted_span_attributes()
+
+
+def test_get_index_name() -> None:
+    assert _get_index_name(("llm", "model_name")) == "ix_spans_attributes_llm_model_name"
+    assert _get_index_name(("metadata", "a-b")) == "ix_spans_attributes_metadata_a_b"
+    assert _get_index_name(("metadata", "A")) != _get_index_name(("metadata", "a"))
+    assert len(_get_index_name(("metadata", "x" * 100))) == 63
+
+
+async def test_span_filter_on_promoted_attributes(
+    db: DbSessionFactory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv(ENV_PHOENIX_PROMOTED_SPAN_ATTRIBUTES, "metadata.tenant")
+    async with db() as session:
+        await ensure_promoted_span_attribute_indexes(session)
+    async with db() as session:
+        await insert_spans(
+            session,
+            [
+                (
+                    _make_span(
+                        "s0",
+                        "t0",
+                        attributes={"llm": {"model_name": "gpt-4"}, "metadata": {"tenant": "a"}},
+                    ),
+                    "p",
+                ),
+                (
+                    _make_span(
+                        "s1",
+                        "t1",
+                        attributes={"llm": {"model_name": "gpt-3"}, "user": {"id": "u"}},
+                    ),
+                    "p",
+                ),
+                (
+                    _make_span("s2", "t2", attributes={"metadata": {"tenant": 1}}),
+                    "p",
+                ),
+            ],
+        )
+    async with db() as session:
+        # indexes that already exist are left as they are
+        await ensure_promoted_span_attribute_indexes(session)
+    for condition, expected in (
+        ("llm.model_name == 'gpt-4'", {"s0"}),
+        ("llm.model_name in ('gpt-3', 'gpt-5')", {"s1"}),
+        ("'gpt' in llm.model_name and user.id is not None", {"s1"}),
+        ("llm.model_name is None", {"s2"}),
+        ("metadata['tenant'] == 'a'", {"s0"}),
+    ):
+        span_filter = SpanFilter(condition)
+        assert "PromotedSpanAttribute" in str(span_filter.compiled.co_names)
+        async with db() as session:
+            span_ids = set(await session.scalars(span_filter(select(models.Span.span_id))))
+        assert span_ids == expected, condition
+
+
+async def test_promoted_attribute_indexes_are_used(
+    db: DbSessionFactory,
+    dialect: str,
+) -> None:
+    if dialect != "sqlite":
+        pytest.skip("The query plan is only checked on SQLite")
+    async with db() as session:
+        await ensure_promoted_span_attribute_indexes(session)
+        stmt = select(models.Span.id).where(PromotedSpanAttribute("llm", "model_name") == "x")
+        compiled = stmt.compile(session.bind, compile_kwargs={"literal_binds": True})
+        plan = (await session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))).all()
+    assert any("ix_spans_attributes_llm_model_name" in str(row) for row in plan)
+
+
+async def test_invalid_promoted_attribute_indexes_are_recreated(
+    db: DbSessionFactory,
+    dialect: str,
+) -> None:
+    if dialect != "postgresql":
+        pytest.skip("Indexes are only created concurrently on PostgreSQL")
+    name = _get_index_name(("llm", "model_name"))
+    stmt = text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)")
+    async with db() as session:
+        await ensure_promoted_span_attribute_indexes(session)
+    async with db() as session:
+        assert await session.scalar(stmt, {"name": name}) is True
+        # as if the concurrent creation of the index had been interrupted
+        await session.execute(
+            text("UPDATE pg_index SET indisvalid = false WHERE indexrelid = to_regclass(:name)"),
+            {"name": name},
+        )
+    async with db() as session:
+        await ensure_promoted_span_attribute_indexes(session)
+    async with db() as session:
+        assert await session.scalar(stmt, {"name": name}) is True
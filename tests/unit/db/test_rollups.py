@@ -0,0 +1,347 @@
+from datetime import datetime, timedelta
+from typing import Any, Literal, Optional
+
+import numpy as np
+import pytest
+from sqlalchemy import delete, func, select
+
+from phoenix.db import models
+from phoenix.db.insertion.span import insert_span, insert_spans
+from phoenix.db.latency_sketches import RELATIVE_ACCURACY
+from phoenix.db.rollups import (
+    refresh_span_rollups,
+    refresh_span_rollups_of_traces,
+    split_time_range,
+)
+from phoenix.server.api.dataloaders import (
+    LatencyMsQuantileDataLoader,
+    MinStartOrMaxEndTimeDataLoader,
+    RecordCountDataLoader,
+    TokenCountDataLoader,
+)
+from phoenix.server.api.input_types.TimeRange import TimeRange
+from phoenix.server.types import DbSessionFactory
+from phoenix.trace.schemas import SpanStatusCode
+from tests.unit._helpers import _T0, _make_span
+
+
+@pytest.fixture
+async def spans(db: DbSessionFactory) -> None:
+    """
+    Two traces of each of two projects every 20 minutes over five hours, where each
+    trace has a root span and a child span, and every third child span has an error.
+    """
+    async with db() as session:
+        for minutes in range(0, 300, 20):
+            batch = []
+            for project_name in ("a", "b"):
+                trace_id = f"{project_name}{minutes}"
+                batch.append(
+                    (
+                        _make_span(
+                            f"{trace_id}-root",
+                            trace_id,
+                            offset=minutes * 60,
+                            duration=30,
+                            prompt_tokens=minutes,
+                            completion_tokens=1,
+                        ),
+                        project_name,
+                    )
+                )
+                batch.append(
+                    (
+                        _make_span(
+                            f"{trace_id}-child",
+                            trace_id,
+                            f"{trace_id}-root",
+                            offset=(minutes + 1) * 60,
+                            duration=30,
+                            prompt_tokens=minutes + 1,
+                            completion_tokens=1,
+                            status_code=(
+                                SpanStatusCode.ERROR if minutes % 60 == 0 else SpanStatusCode.OK
+                            ),
+                        ),
+                        project_name,
+                    )
+                )
+            await insert_spans(session, batch)
+
+
+async def _get_rollups(db: DbSessionFactory) -> list[tuple[Any, ...]]:
+    async with db() as session:
+        return sorted(
+            (
+                await session.execute(
+                    select(
+                        models.SpanRollup.project_rowid,
+                        models.SpanRollup.hour,
+                        models.SpanRollup.span_kind,
+                        models.SpanRollup.is_root,
+                        models.SpanRollup.status_code,
+                        models.SpanRollup.span_count,
+                        models.SpanRollup.llm_token_count_prompt,
+                        models.SpanRollup.llm_token_count_completion,
+                        models.SpanRollup.min_start_time,
+                        models.SpanRollup.max_end_time,
+                    )
+                )
+            )
+            .tuples()
+            .all()
+        )
+
+
+async def _get_latency_sketch_bins(db: DbSessionFactory) -> list[tuple[Any, ...]]:
+    async with db() as session:
+        return sorted(
+            (
+                await session.execute(
+                    select(
+                        models.LatencySketchBin.project_rowid,
+                        models.LatencySketchBin.hour,
+                        models.LatencySketchBin.kind,
+                        models.LatencySketchBin.bin_index,
+                        models.LatencySketchBin.count,
+                    ).where(models.LatencySketchBin.count != 0)
+                )
+            )
+            .tuples()
+            .all()
+        )
+
+
+async def _recompute_rollups(
+    db: DbSessionFactory,
+) -> tuple[list[tuple[Any, ...]], list[tuple[Any, ...]]]:
+    async with db() as session:
+        await session.execute(delete(models.SpanRollup))
+        await session.execute(delete(models.LatencySketchBin))
+        await refresh_span_rollups(session)
+    return await _get_rollups(db), await _get_latency_sketch_bins(db)
+
+
+async def test_rollups_are_maintained_at_insertion(
+    db: DbSessionFactory,
+    spans: None,
+) -> None:
+    rollups = await _get_rollups(db)
+    assert len(rollups) == 2 * 5 * 3
+    assert sum(rollup[5] for rollup in rollups) == 60
+    assert rollups[0][1] == _T0
+    async with db() as session:
+        await insert_span(
+            session,
+            _make_span(
+                "late",
+                "a0",
+                "a0-root",
+                offset=59 * 60,
+                duration=30,
+                prompt_tokens=59,
+                completion_tokens=1,
+            ),
+            "a",
+        )
+        await insert_spans(
+            session,
+            [
+                (
+                    _make_span(
+                        "later",
+                        "a20",
+                        "a20-root",
+                        offset=99 * 60,
+                        duration=30,
+                        prompt_tokens=99,
+                        completion_tokens=1,
+                    ),
+                    "a",
+                )
+            ],
+        )
+    rollups = await _get_rollups(db)
+    assert len(rollups) == 2 * 5 * 3
+    bins = await _get_latency_sketch_bins(db)
+    assert sum(count for *_, kind, _, count in bins if kind == "trace") == 30
+    assert await _recompute_rollups(db) == (rollups, bins)
+
+
+async def test_refresh_after_deletion(
+    db: DbSessionFactory,
+    spans: None,
+) -> None:
+    async with db() as session:
+        deleted_traces = (
+            await session.execute(
+                delete(models.Trace)
+                .where(models.Trace.trace_id.in_(["a40", "a60", "b100"]))
+                .returning(
+                    models.Trace.project_rowid,
+                    models.Trace.start_time,
+                    models.Trace.end_time,
+                )
+            )
+        ).tuples()
+        await refresh_span_rollups_of_traces(session, deleted_traces)
+    rollups = await _get_rollups(db)
+    assert sum(rollup[5] for rollup in rollups) == 54
+    bins = await _get_latency_sketch_bins(db)
+    assert await _recompute_rollups(db) == (rollups, bins)
+
+
+@pytest.mark.parametrize(
+    "start_time,end_time",
+    [
+        pytest.param(None, None, id="unbounded"),
+        pytest.param(_T0 + timedelta(hours=1), _T0 + timedelta(hours=3), id="aligned"),
+        pytest.param(
+            _T0 + timedelta(minutes=30), _T0 + timedelta(hours=3, minutes=30), id="unaligned"
+        ),
+        pytest.param(_T0 + timedelta(minutes=10), _T0 + timedelta(minutes=50), id="within-hour"),
+        pytest.param(_T0 + timedelta(minutes=130), None, id="open-ended"),
+    ],
+)
+async def test_dataloaders_match_spans(
+    db: DbSessionFactory,
+    spans: None,
+    start_time: Optional[datetime],
+    end_time: Optional[datetime],
+) -> None:
+    time_range = TimeRange(start=start_time, end=end_time)
+    stmt = (
+        select(
+            models.Trace.project_rowid,
+            func.count(),
+            func.sum(models.Span.llm_token_count_prompt),
+            func.sum(models.Span.llm_token_count_completion),
+        )
+        .join_from(models.Span, models.Trace)
+        .group_by(models.Trace.project_rowid)
+        .order_by(models.Trace.project_rowid)
+    )
+    if start_time:
+        stmt = stmt.where(start_time <= models.Span.start_time)
+    if end_time:
+        stmt = stmt.where(models.Span.start_time < end_time)
+    async with db() as session:
+        expected = (await session.execute(stmt)).tuples().all()
+    project_rowids = [project_rowid for project_rowid, *_ in expected]
+    assert await RecordCountDataLoader(db)._load_fn(
+        [("span", project_rowid, time_range, None) for project_rowid in project_rowids]
+    ) == [count for _, count, *_ in expected]
+    kinds: list[Literal["prompt", "completion", "total"]] = ["prompt", "completion", "total"]
+    assert await TokenCountDataLoader(db)._load_fn(
+        [
+            (kind, project_rowid, time_range, None)
+            for project_rowid in project_rowids
+            for kind in kinds
+        ]
+    ) == [
+        count
+        for _, _, prompt, completion in expected
+        for count in (prompt, completion, (prompt or 0) + (completion or 0))
+    ]
+
+
+@pytest.mark.parametrize(
+    "start_time,end_time",
+    [
+        pytest.param(None, None, id="unbounded"),
+        pytest.param(
+            _T0 + timedelta(minutes=30), _T0 + timedelta(hours=3, minutes=30), id="unaligned"
+        ),
+        pytest.param(_T0 + timedelta(minutes=10), _T0 + timedelta(minutes=50), id="within-hour"),
+    ],
+)
+@pytest.mark.parametrize("kind", ["span", "trace"])
+async def test_latency_ms_quantiles_are_within_relative_accuracy(
+    db: DbSessionFactory,
+    spans: None,
+    kind: Literal["span", "trace"],
+    start_time: Optional[datetime],
+    end_time: Optional[datetime],
+) -> None:
+    async with db() as session:
+        await insert_spans(
+            session,
+            [
+                (
+                    _make_span(
+                        f"{trace_id}-slow",
+                        trace_id,
+                        f"{trace_id}-root",
+                        offset=(minutes + 2) * 60,
+                        duration=minutes * 7.3,
+                        prompt_tokens=minutes + 2,
+                        completion_tokens=1,
+                    ),
+                    trace_id[0],
+                )
+                for minutes in range(0, 300, 20)
+                for trace_id in (f"a{minutes}", f"b{minutes}")
+            ],
+        )
+    time_range = TimeRange(start=start_time, end=end_time)
+    table = models.Span if kind == "span" else models.Trace
+    stmt = select(models.Trace.project_rowid, table.start_time, table.end_time).order_by(
+        models.Trace.project_rowid
+    )
+    if kind == "span":
+        stmt = stmt.join_from(models.Span, models.Trace)
+    if start_time:
+        stmt = stmt.where(start_time <= table.start_time)
+    if end_time:
+        stmt = stmt.where(table.start_time < end_time)
+    async with db() as session:
+        latencies: dict[int, list[float]] = {}
+        for project_rowid, start, end in (await session.execute(stmt)).tuples():
+            latencies.setdefault(project_rowid, []).append((end - start).total_seconds() * 1000)
+    probabilities = [0.01, 0.5, 0.99]
+    keys = [
+        (kind, project_rowid, time_range, None, probability)
+        for project_rowid in latencies
+        for probability in probabilities
+    ]
+    actual = await LatencyMsQuantileDataLoader(db)._load_fn(keys)  # type: ignore[arg-type]
+    for (_, project_rowid, *_, probability), quantile_value in zip(keys, actual):
+        expected = np.quantile(latencies[project_rowid], probability)
+        assert quantile_value == pytest.approx(expected, rel=RELATIVE_ACCURACY)
+
+
+async def test_min_start_or_max_end_times(
+    db: DbSessionFactory,
+    spans: None,
+) -> None:
+    async with db() as session:
+        project_rowid = await session.scalar(select(models.Project.id).filter_by(name="a"))
+    assert project_rowid is not None
+    assert await MinStartOrMaxEndTimeDataLoader(db)._load_fn(
+        [(project_rowid, "start"), (project_rowid, "end")]
+    ) == [_T0, _T0 + timedelta(minutes=281, seconds=30)]
+
+
+@pytest.mark.parametrize(
+    "start_time,end_time,expected_hours,has_edges",
+    [
+        pytest.param(None, None, (None, None), False, id="unbounded"),
+        pytest.param(
+            _T0 + timedelta(minutes=30),
+            _T0 + timedelta(hours=2),
+            (_T0 + timedelta(hours=1), _T0 + timedelta(hours=2)),
+            True,
+            id="partial-start",
+        ),
+        pytest.param(_T0, _T0 + timedelta(minutes=59), None, True, id="within-hour"),
+    ],
+)
+def test_split_time_range(
+    start_time: Optional[datetime],
+    end_time: Optional[datetime],
+    expected_hours: Optional[tuple[Optional[datetime], Optional[datetime]]],
+    has_edges: bool,
+) -> None:
+    hours, edges = split_time_range(start_time, end_time)
+    assert (None if hours is None else tuple(hours)) == expected_hours
+    assert (edges is not None) is has_edges
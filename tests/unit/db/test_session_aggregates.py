@@ -0,0 +1,207 @@
+from typing import Any
+
+from sqlalchemy import select, update
+
+from phoenix.db import models
+from phoenix.db.insertion.identity_cache import IdentityCache
+from phoenix.db.insertion.span import insert_span, insert_spans
+from phoenix.db.session_aggregates import MAX_PREVIEW_LENGTH, refresh_session_aggregates
+from phoenix.server.api.utils import delete_traces
+from phoenix.server.types import DbSessionFactory
+from phoenix.trace.schemas import SpanStatusCode
+from tests.unit._helpers import _make_span
+
+_TEXT_OUTPUT = {"output": {"mime_type": "text/plain"}}
+
+
+async def _get_session_aggregates(db: DbSessionFactory) -> list[tuple[Any, ...]]:
+    async with db() as session:
+        return sorted(
+            (
+                await session.execute(
+                    select(
+                        models.ProjectSession.session_id,
+                        models.ProjectSession.num_traces,
+                        models.ProjectSession.num_error_traces,
+                        models.ProjectSession.llm_token_count_prompt,
+                        models.ProjectSession.llm_token_count_completion,
+                        models.ProjectSession.first_input_value,
+                        models.ProjectSession.last_output_value,
+                        models.ProjectSession.last_output_mime_type,
+                    )
+                )
+            )
+            .tuples()
+            .all()
+        )
+
+
+async def test_session_aggregates_are_maintained(
+    db: DbSessionFactory,
+) -> None:
+    long_input = "x" * (MAX_PREVIEW_LENGTH + 1)
+    async with db() as session:
+        await insert_spans(
+            session,
+            [
+                (
+                    _make_span(
+                        "b-child",
+                        "b",
+                        "b-root",
+                        offset=21,
+                        status_code=SpanStatusCode.ERROR,
+                        session_id="s",
+                        prompt_tokens=21,
+                        completion_tokens=1,
+                    ),
+                    "p",
+                ),
+                (
+                    _make_span(
+                        "b-root",
+                        "b",
+                        offset=20,
+                        session_id="s",
+                        prompt_tokens=20,
+                        completion_tokens=1,
+                        input_value="second",
+                        output_value="SECOND",
+                        attributes=_TEXT_OUTPUT,
+                    ),
+                    "p",
+                ),
+                (
+                    _make_span(
+                        "c-root",
+                        "c",
+                        offset=30,
+                        session_id="t",
+                        prompt_tokens=30,
+                        completion_tokens=1,
+                        input_value=long_input,
+                        output_value=long_input.upper(),
+                        attributes=_TEXT_OUTPUT,
+                    ),
+                    "p",
+                ),
+            ],
+        )
+        await insert_span(
+            session,
+            _make_span(
+                "a-root",
+                "a",
+                offset=10,
+                session_id="s",
+                prompt_tokens=10,
+                completion_tokens=1,
+                input_value="first",
+                output_value="FIRST",
+                attributes=_TEXT_OUTPUT,
+            ),
+            "p",
+        )
+        await insert_spans(
+            session,
+            [
+                (
+                    _make_span(
+                        "d-child",
+                        "d",
+                        "d-root",
+                        offset=40,
+                        session_id="s",
+                        prompt_tokens=40,
+                        completion_tokens=1,
+                    ),
+                    "p",
+                )
+            ],
+        )
+    assert (await _get_session_aggregates(db))[0] == (
+        "s",
+        3,
+        1,
+        51,
+        3,
+        "first",
+        "SECOND",
+        "text/plain",
+    )
+    async with db() as session:
+        # the child arrives after its root span
+        await insert_span(
+            session,
+            _make_span(
+                "a-child",
+                "a",
+                "a-root",
+                offset=11,
+                status_code=SpanStatusCode.ERROR,
+                session_id="s",
+                prompt_tokens=11,
+                completion_tokens=1,
+            ),
+            "p",
+        )
+    assert (await _get_session_aggregates(db))[0] == (
+        "s",
+        3,
+        2,
+        62,
+        4,
+        "first",
+        "SECOND",
+        "text/plain",
+    )
+    async with db() as session:
+        await insert_spans(
+            session,
+            [
+                (
+                    _make_span(
+                        "e-root",
+                        "e",
+                        offset=50,
+                        session_id="s",
+                        prompt_tokens=50,
+                        completion_tokens=1,
+                        input_value="third",
+                        output_value="THIRD",
+                        attributes=_TEXT_OUTPUT,
+                    ),
+                    "p",
+                )
+            ],
+        )
+    aggregates = await _get_session_aggregates(db)
+    assert aggregates == [
+        ("s", 4, 2, 112, 5, "first", "THIRD", "text/plain"),
+        ("t", 1, 0, 30, 1, long_input[:MAX_PREVIEW_LENGTH], long_input.upper()[:-1], "text/plain"),
+    ]
+    async with db() as session:
+        await session.execute(
+            update(models.ProjectSession).values(
+                num_traces=0,
+                num_error_traces=0,
+                llm_token_count_prompt=0,
+                llm_token_count_completion=0,
+                first_input_value=None,
+                last_output_value=None,
+                last_output_mime_type=None,
+            )
+        )
+        await refresh_session_aggregates(session)
+    assert await _get_session_aggregates(db) == aggregates
+    await delete_traces(db, IdentityCache(), "a", "b")
+    assert (await _get_session_aggregates(db))[0] == (
+        "s",
+        2,
+        0,
+        50,
+        1,
+        "third",
+        "THIRD",
+        "text/plain",
+    )
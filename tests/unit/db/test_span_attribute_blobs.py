@@ -0,0 +1,90 @@
+import json
+from typing import Any
+
+from sqlalchemy import insert
+
+from phoenix.db import models
+from phoenix.db.span_attribute_blobs import (
+    BlobCache,
+    extract_blobs,
+    get_blob_hash_from_text,
+    get_blob_hashes,
+    get_blobs,
+    has_blob_references,
+    hash_blob,
+    is_deduplicated_path,
+    resolve_blobs,
+)
+from phoenix.server.types import DbSessionFactory
+
+
+def test_extract_blobs_round_trip() -> None:
+    prompt = "You are a helpful assistant. " * 10
+    attributes: dict[str, Any] = {
+        "input": {"value": "short", "mime_type": "text/plain"},
+        "llm": {
+            "prompt_template": {"template": prompt},
+            "input_messages": [
+                {"message": {"role": "system", "content": prompt}},
+                {"message": {"role": "user", "content": "short"}},
+            ],
+        },
+        "metadata": {"template": prompt},
+    }
+    extracted, blobs = extract_blobs(attributes, 100)
+    reference = {"__blob__": hash_blob(prompt)}
+    assert blobs == {hash_blob(prompt): prompt}
+    assert extracted["llm"]["prompt_template"]["template"] == reference
+    assert extracted["llm"]["input_messages"][0]["message"]["content"] == reference
+    assert extracted["llm"]["input_messages"][1] is attributes["llm"]["input_messages"][1]
+    assert extracted["input"] is attributes["input"]
+    assert extracted["metadata"] is attributes["metadata"]
+    assert has_blob_references(extracted)
+    assert get_blob_hashes(extracted) == set(blobs)
+    assert resolve_blobs(extracted, blobs) == attributes
+    assert resolve_blobs(extracted, {}) == extracted
+
+
+def test_extract_blobs_keeps_values_below_threshold() -> None:
+    attributes = {"input": {"value": "abc " * 100}}
+    extracted, blobs = extract_blobs(attributes, 1000)
+    assert extracted is attributes
+    assert not blobs
+    assert not has_blob_references(attributes)
+
+
+def test_get_blob_hash_from_text() -> None:
+    extracted, _ = extract_blobs({"output": {"value": "abc " * 100}}, 1)
+    blob_hash = hash_blob("abc " * 100)
+    assert get_blob_hash_from_text(json.dumps(extracted["output"]["value"])) == blob_hash
+    assert get_blob_hash_from_text('{"a": 1}') is None
+    assert get_blob_hash_from_text("abc") is None
+
+
+def test_is_deduplicated_path() -> None:
+    assert is_deduplicated_path(("llm", "prompt_template", "template"))
+    assert is_deduplicated_path(("retrieval", "documents", 3, "document", "content"))
+    assert not is_deduplicated_path(("llm", "input_messages", "0", "message", "content"))
+    assert not is_deduplicated_path(("input", "mime_type"))
+
+
+def test_blob_cache_is_bounded_by_characters() -> None:
+    cache = BlobCache(max_chars=10)
+    cache.put_many({"a": "x" * 6, "b": "y" * 6, "c": "z" * 11})
+    assert cache.get_many(["a", "b", "c"]) == ({"b": "y" * 6}, {"a", "c"})
+
+
+async def test_get_blobs_loads_only_uncached_values(db: DbSessionFactory) -> None:
+    cache = BlobCache()
+    cache.put_many({"cached": "not in the database"})
+    async with db() as session:
+        await session.execute(
+            insert(models.SpanAttributeBlob),
+            [dict(hash="a", value="abc"), dict(hash="cached", value="in the database")],
+        )
+    async with db() as session:
+        assert await get_blobs(session, ["a", "cached", "missing"], cache) == {
+            "a": "abc",
+            "cached": "not in the database",
+        }
+    assert cache.get_many(["a"]) == ({"a": "abc"}, set())
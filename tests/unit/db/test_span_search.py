@@ -0,0 +1,113 @@
+from typing import Any, Optional
+
+import pytest
+from sqlalchemy import delete, select
+
+from phoenix.db import models
+from phoenix.db.compression import COMPRESSED_KEY
+from phoenix.db.helpers import SupportedSQLDialect
+from phoenix.db.insertion.span import insert_spans
+from phoenix.db.span_attribute_blobs import BLOB_REFERENCE_KEY
+from phoenix.server.types import DbSessionFactory
+from phoenix.trace.dsl import SpanFilter
+from phoenix.trace.schemas import SpanStatusCode
+from tests.unit._helpers import _make_span
+
+_TEXTS = ["hello world", 'say "hi" 100%', "snake_case\\path", "HELLO", "héllo wörld"]
+
+_SPANS = [
+    _make_span(
+        f"s{i}",
+        f"t{i}",
+        name=text,
+        status_code=SpanStatusCode.ERROR,
+        status_message=text,
+        input_value=text,
+        output_value=text[::-1],
+    )
+    for i, text in enumerate(_TEXTS)
+]
+
+
+@pytest.mark.parametrize(
+    "substring",
+    ["hello", "llo", "lo", "o", "ELL", '"hi"', "0%", "100%", "e_c", "_", "\\pa", "wör", "xyz"],
+)
+async def test_span_text_contains_agrees_with_text_contains(
+    db: DbSessionFactory,
+    substring: str,
+) -> None:
+    async with db() as session:
+        await insert_spans(session, [(span, "p") for span in _SPANS])
+    fields: dict[str, Any] = {
+        "name": models.Span.name,
+        "input": models.Span.attributes[["input", "value"]].as_string(),
+        "output": models.Span.attributes[["output", "value"]].as_string(),
+        "status_message": models.Span.status_message,
+    }
+    async with db() as session:
+        for field, string in fields.items():
+            expected = set(
+                await session.scalars(
+                    select(models.Span.span_id).where(models.TextContains(string, substring))
+                )
+            )
+            actual = set(
+                await session.scalars(
+                    select(models.Span.span_id).where(
+                        models.SpanTextContains(field, string, substring)
+                    )
+                )
+            )
+            assert actual == expected, field
+
+
+async def test_span_search_index_follows_deleted_spans(
+    db: DbSessionFactory,
+) -> None:
+    async with db() as session:
+        await insert_spans(session, [(span, "p") for span in _SPANS])
+        await session.execute(delete(models.Span).where(models.Span.span_id == "s0"))
+        await insert_spans(session, [(_make_span("s5", "t5", name="another hello"), "p")])
+    async with db() as session:
+        span_ids = set(
+            await session.scalars(
+                select(models.Span.span_id).where(
+                    models.SpanTextContains("name", models.Span.name, "hello")
+                )
+            )
+        )
+    assert span_ids == {"s5"}
+
+
+@pytest.mark.parametrize(
+    "compression_threshold,deduplication_threshold",
+    [
+        pytest.param(100, None, id="compressed"),
+        pytest.param(None, 100, id="deduplicated"),
+    ],
+)
+async def test_span_filters_search_compressed_and_deduplicated_values(
+    db: DbSessionFactory,
+    compression_threshold: Optional[int],
+    deduplication_threshold: Optional[int],
+) -> None:
+    spans = [_make_span(f"s{i}", f"t{i}", input_value=value * 50) for i, value in enumerate(_TEXTS)]
+    async with db() as session:
+        await insert_spans(
+            session,
+            [(span, "p") for span in spans],
+            compression_threshold=compression_threshold,
+            deduplication_threshold=deduplication_threshold,
+        )
+        if db.dialect is SupportedSQLDialect.SQLITE:
+            # the placeholders are left out of the index
+            string = models.Span.attributes[["input", "value"]].as_string()
+            for key in (COMPRESSED_KEY, BLOB_REFERENCE_KEY):
+                assert not await session.scalar(
+                    select(models.Span.span_id).where(models.SpanTextContains("input", string, key))
+                )
+    span_filter = SpanFilter("'hello' in input.value")
+    async with db() as session:
+        stmt = await span_filter.apply(session, select(models.Span.span_id))
+        assert set(await session.scalars(stmt)) == {"s0"}
@@ -0,0 +1,63 @@
+import numpy as np
+
+from phoenix.db.span_vectors import (
+    decode_vector,
+    encode_vector,
+    extract_vectors,
+    has_vector_references,
+    hydrate,
+)
+
+
+def test_extract_vectors_and_hydrate_round_trip() -> None:
+    vector = [0.25 * i for i in range(16)]
+    attributes = {
+        "embedding": {
+            "embeddings": [
+                {"embedding": {"vector": vector, "text": "a"}},
+                {"embedding": {"vector": np.array(vector), "text": "b"}},
+            ]
+        },
+        "llm": {"invocation_parameters": "{}"},
+        "metadata": {"vector": vector},
+        "ints": list(range(16)),
+        "short": [0.5, 1.5],
+    }
+    extracted, vectors = extract_vectors(attributes)
+    assert set(vectors) == {
+        "embedding.embeddings.0.embedding.vector",
+        "embedding.embeddings.1.embedding.vector",
+    }
+    assert extracted["embedding"]["embeddings"][1] == {
+        "embedding": {
+            "vector": {"__vector__": "embedding.embeddings.1.embedding.vector", "dimensions": 16},
+            "text": "b",
+        }
+    }
+    for key in ("llm", "metadata", "ints", "short"):
+        assert extracted[key] is attributes[key]
+    assert has_vector_references(extracted)
+    decoded = {path: decode_vector(data) for path, data in vectors.items()}
+    assert hydrate(extracted, decoded) == {
+        **attributes,
+        "embedding": {
+            "embeddings": [
+                {"embedding": {"vector": vector, "text": "a"}},
+                {"embedding": {"vector": vector, "text": "b"}},
+            ]
+        },
+    }
+
+
+def test_extract_vectors_returns_attributes_without_vectors_unchanged() -> None:
+    attributes = {"input": {"value": "x"}, "short": [0.5]}
+    extracted, vectors = extract_vectors(attributes)
+    assert extracted is attributes
+    assert not vectors
+    assert not has_vector_references(extracted)
+
+
+def test_vectors_are_encoded_as_little_endian_float32() -> None:
+    data = encode_vector([1.0, 0.1])
+    assert data == np.array([1.0, 0.1], dtype="<f4").tobytes()
+    assert decode_vector(data) == [1.0, float(np.float32(0.1))]
@@ -0,0 +1,89 @@
+from typing import Any
+
+from sqlalchemy import select, update
+
+from phoenix.db import models
+from phoenix.db.insertion.span import insert_span, insert_spans
+from phoenix.db.trace_aggregates import refresh_trace_aggregates
+from phoenix.server.types import DbSessionFactory
+from phoenix.trace.schemas import SpanStatusCode
+from tests.unit._helpers import _make_span
+
+
+async def _get_trace_aggregates(db: DbSessionFactory) -> list[tuple[Any, ...]]:
+    async with db() as session:
+        return sorted(
+            (
+                await session.execute(
+                    select(
+                        models.Trace.trace_id,
+                        models.Trace.root_span_rowid,
+                        models.Trace.num_spans,
+                        models.Trace.num_error_spans,
+                        models.Trace.llm_token_count_prompt,
+                        models.Trace.llm_token_count_completion,
+                    )
+                )
+            )
+            .tuples()
+            .all()
+        )
+
+
+async def test_trace_aggregates_are_maintained_at_insertion(
+    db: DbSessionFactory,
+) -> None:
+    async with db() as session:
+        await insert_spans(
+            session,
+            [
+                (
+                    _make_span(
+                        "a-child",
+                        "a",
+                        "a-root",
+                        status_code=SpanStatusCode.ERROR,
+                        prompt_tokens=3,
+                        completion_tokens=1,
+                    ),
+                    "p",
+                ),
+                (_make_span("b-root", "b", prompt_tokens=5, completion_tokens=1), "p"),
+                (_make_span("b-child", "b", "b-root", prompt_tokens=7, completion_tokens=1), "p"),
+            ],
+        )
+        await insert_span(
+            session,
+            _make_span("a-other-child", "a", "a-root", prompt_tokens=2, completion_tokens=1),
+            "p",
+        )
+        await insert_span(session, _make_span("a-root", "a"), "p")
+        await insert_spans(session, [(_make_span("b-late", "b", "b-child"), "p")])
+        root_span_rowids = dict(
+            (
+                await session.execute(
+                    select(models.Span.span_id, models.Span.id).where(
+                        models.Span.parent_id.is_(None)
+                    )
+                )
+            )
+            .tuples()
+            .all()
+        )
+    aggregates = await _get_trace_aggregates(db)
+    assert aggregates == [
+        ("a", root_span_rowids["a-root"], 3, 1, 5, 2),
+        ("b", root_span_rowids["b-root"], 3, 0, 12, 2),
+    ]
+    async with db() as session:
+        await session.execute(
+            update(models.Trace).values(
+                root_span_rowid=None,
+                num_spans=0,
+                num_error_spans=0,
+                llm_token_count_prompt=0,
+                llm_token_count_completion=0,
+            )
+        )
+        await refresh_trace_aggregates(session)
+    assert await _get_trace_aggregates(db) == aggregates
@@ -7,6 +7,7 @@ import pytest
 from sqlalchemy import select
 
 from phoenix.db import models
+from phoenix.db.latency_sketches import RELATIVE_ACCURACY
 from phoenix.server.api.dataloaders import LatencyMsQuantileDataLoader
 from phoenix.server.api.dataloaders.latency_ms_quantile import Key
 from phoenix.server.api.input_types.TimeRange import TimeRange
@@ -39,12 +40,17 @@ async def test_latency_ms_quantiles_p25_p50_p75(
                 s.connection(),
             )
         )
-    expected = (
+    # Unfiltered quantiles are estimated from the latency sketches, which count the
+    # latencies that are not positive as zero.
+    trace_df["latency_ms"] = trace_df["latency_ms"].clip(lower=0)
+    expected_trace = (
         trace_df.groupby("project_rowid")["latency_ms"]
         .quantile(np.array([0.25, 0.50, 0.75]))
         .sort_index()
         .to_list()
-        + span_df.groupby("project_rowid")["latency_ms"]
+    )
+    expected_span = (
+        span_df.groupby("project_rowid")["latency_ms"]
         .quantile(np.array([0.25, 0.50, 0.75]))
         .sort_index()
         .to_list()
@@ -63,4 +69,5 @@ async def test_latency_ms_quantiles_p25_p50_p75(
         for probability in (0.25, 0.50, 0.75)
     ]
     actual = await LatencyMsQuantileDataLoader(db)._load_fn(keys)
-    assert actual == pytest.approx(expected, 1e-7)
+    assert actual[: len(expected_trace)] == pytest.approx(expected_trace, rel=RELATIVE_ACCURACY)
+    assert actual[len(expected_trace) :] == pytest.approx(expected_span, 1e-7)
@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from sqlalchemy import func, select
+from strawberry.relay import GlobalID
+
+from phoenix.db import models
+from phoenix.db.insertion.span import insert_spans
+from phoenix.server.api.utils import delete_projects
+from phoenix.server.types import DbSessionFactory
+from tests.unit._helpers import _make_span
+from tests.unit.graphql import AsyncGraphQLClient
+
+
+@pytest.fixture
+async def project_with_deduplicated_values(db: DbSessionFactory) -> int:
+    prompt = "You are a helpful assistant. " * 10
+    attributes = {"llm": {"prompt_template": {"template": prompt}}}
+    async with db() as session:
+        await insert_spans(
+            session,
+            [(_make_span(span_id, "t", attributes=attributes), "p") for span_id in "ab"],
+            deduplication_threshold=100,
+        )
+        assert await session.scalar(select(func.count(models.SpanAttributeBlob.hash))) == 1
+        project_rowid = await session.scalar(
+            select(models.Project.id).where(models.Project.name == "p")
+        )
+    assert project_rowid is not None
+    return project_rowid
+
+
+@pytest.mark.parametrize(
+    "mutation",
+    [
+        pytest.param(
+            "mutation ($id: GlobalID!) { clearProject(input: {id: $id}) { __typename } }",
+            id="clear",
+        ),
+        pytest.param(
+            "mutation ($id: GlobalID!) { deleteProject(id: $id) { __typename } }",
+            id="delete",
+        ),
+    ],
+)
+async def test_clearing_or_deleting_project_deletes_unreferenced_blobs(
+    db: DbSessionFactory,
+    gql_client: AsyncGraphQLClient,
+    project_with_deduplicated_values: int,
+    mutation: str,
+) -> None:
+    response = await gql_client.execute(
+        query=mutation,
+        variables={"id": str(GlobalID("Project", str(project_with_deduplicated_values)))},
+    )
+    assert not response.errors
+    async with db() as session:
+        assert not await session.scalar(select(func.count(models.Span.id)))
+        assert not await session.scalar(select(func.count(models.SpanAttributeBlob.hash)))
+
+
+async def test_deleting_projects_deletes_unreferenced_blobs(
+    db: DbSessionFactory,
+    project_with_deduplicated_values: int,
+) -> None:
+    events: list[Any] = []
+    assert await delete_projects(db, SimpleNamespace(put=events.append), "p") == [
+        project_with_deduplicated_values
+    ]
+    async with db() as session:
+        assert not await session.scalar(select(func.count(models.SpanAttributeBlob.hash)))
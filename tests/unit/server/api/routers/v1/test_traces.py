@@ -5,10 +5,15 @@ from typing import Any
 import httpx
 import pytest
 from faker import Faker
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import ExportTraceServiceRequest
+from opentelemetry.proto.trace.v1.trace_pb2 import ResourceSpans, ScopeSpans
 from sqlalchemy import insert, select
 
 from phoenix.db import models
+from phoenix.db.bulk_inserter import BulkInserter
 from phoenix.server.types import DbSessionFactory
+from phoenix.trace.otel import encode_span_to_otlp
+from tests.unit._helpers import _make_span
 
 
 @pytest.fixture
@@ -98,3 +103,44 @@ async def test_rest_trace_annotation(
     assert orm_annotation.score == 0.95
     assert orm_annotation.explanation == "This is a test annotation."
     assert orm_annotation.metadata_ == dict()
+
+
+async def test_post_traces(
+    db: DbSessionFactory,
+    httpx_client: httpx.AsyncClient,
+) -> None:
+    span = _make_span(
+        "f0d808aedd5591b6",
+        "82c6c9c33ccc586e0d3bdf46b20db309",
+        attributes={"openinference": {"span": {"kind": "CHAIN"}}},
+    )
+    request = ExportTraceServiceRequest(
+        resource_spans=[ResourceSpans(scope_spans=[ScopeSpans(spans=[encode_span_to_otlp(span)])])]
+    )
+    response = await httpx_client.post(
+        "v1/traces",
+        content=request.SerializeToString(),
+        headers={"content-type": "application/x-protobuf"},
+    )
+    assert response.status_code == 200
+    async with db() as session:
+        span_ids = await session.scalars(select(models.Span.span_id))
+        assert list(span_ids) == ["f0d808aedd5591b6"]
+
+
+@pytest.fixture
+def full_ingestion_buffer(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(BulkInserter, "admit", lambda _: False)
+
+
+async def test_post_traces_is_rejected_with_retry_after_when_ingestion_buffer_is_full(
+    full_ingestion_buffer: None,
+    httpx_client: httpx.AsyncClient,
+) -> None:
+    response = await httpx_client.post(
+        "v1/traces",
+        content=ExportTraceServiceRequest().SerializeToString(),
+        headers={"content-type": "application/x-protobuf"},
+    )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
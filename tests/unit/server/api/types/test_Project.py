@@ -1,6 +1,7 @@
 # ruff: noqa: E501
 import base64
-from datetime import datetime
+from collections.abc import Mapping
+from datetime import datetime, timedelta
 from typing import Any, NamedTuple
 
 import httpx
@@ -10,6 +11,8 @@ from strawberry.relay import GlobalID
 
 from phoenix.config import DEFAULT_PROJECT_NAME
 from phoenix.db import models
+from phoenix.db.compression import compress_attributes
+from phoenix.db.span_attribute_blobs import extract_blobs
 from phoenix.server.api.types.pagination import Cursor, CursorSortColumn, CursorSortColumnDataType
 from phoenix.server.api.types.Project import Project
 from phoenix.server.types import DbSessionFactory
@@ -529,6 +532,112 @@ async def test_project_spans(
     assert Cursor.from_string(edges[-1]["cursor"]) == end_cursor
 
 
+async def test_filter_conditions_on_compressed_and_deduplicated_values(
+    gql_client: AsyncGraphQLClient,
+    db: DbSessionFactory,
+) -> None:
+    inputs = [
+        "needle" + "x" * 1000,  # compressed
+        "y" * 1000,  # compressed
+        "needle",
+        "needle" + "z" * 1000,  # deduplicated
+        "w" * 1000,  # deduplicated
+    ]
+    start_time = datetime.fromisoformat("2021-01-01T00:00:00+00:00")
+    async with db() as session:
+        project = await _add_project(session)
+        trace = await _add_trace(session, project)
+        for i, value in enumerate(inputs):
+            attributes: Mapping[str, Any] = {
+                "input": {"value": value},
+                "retrieval": {"documents": [{"document": {"content": "c"}}]},
+            }
+            if i < 2:
+                attributes = compress_attributes(attributes, 100)
+            elif i > 2:
+                attributes, blobs = extract_blobs(attributes, 100)
+                await session.execute(
+                    insert(models.SpanAttributeBlob),
+                    [dict(hash=blob_hash, value=value) for blob_hash, value in blobs.items()],
+                )
+            span = await _add_span(
+                session,
+                trace,
+                attributes=dict(attributes),
+                start_time=start_time,
+                end_time=start_time + timedelta(seconds=i + 1),
+            )
+            span.llm_token_count_prompt = 10**i
+            await session.execute(
+                insert(models.SpanAnnotation).values(
+                    span_rowid=span.id,
+                    name="A",
+                    score=i,
+                    metadata_={},
+                    annotator_kind="LLM",
+                )
+            )
+            await session.execute(
+                insert(models.DocumentAnnotation).values(
+                    span_rowid=span.id,
+                    document_position=0,
+                    name="B",
+                    score=1,
+                    metadata_={},
+                    annotator_kind="LLM",
+                )
+            )
+    query = """
+      query ($projectId: GlobalID!, $filterCondition: String!, $after: String = null) {
+        node(id: $projectId) {
+          ... on Project {
+            recordCount(filterCondition: $filterCondition)
+            tokenCountTotal(filterCondition: $filterCondition)
+            spanLatencyMsQuantile(probability: 1, filterCondition: $filterCondition)
+            spanAnnotationSummary(annotationName: "A", filterCondition: $filterCondition) {
+              meanScore
+            }
+            documentEvaluationSummary(evaluationName: "B", filterCondition: $filterCondition) {
+              countNdcg
+            }
+            spans(first: 1, after: $after, filterCondition: $filterCondition) {
+              edges {
+                cursor
+              }
+              pageInfo {
+                hasNextPage
+              }
+            }
+          }
+        }
+      }
+    """
+    variables = {
+        "projectId": str(GlobalID(Project.__name__, str(project.id))),
+        "filterCondition": "'needle' in input.value",
+    }
+    response = await gql_client.execute(query=query, variables=variables)
+    assert not response.errors
+    assert (data := response.data) is not None
+    assert data["node"]["recordCount"] == 3
+    assert data["node"]["tokenCountTotal"] == 1 + 100 + 1000
+    assert data["node"]["spanLatencyMsQuantile"] == 4000
+    assert data["node"]["spanAnnotationSummary"] == {"meanScore": (0 + 2 + 3) / 3}
+    assert data["node"]["documentEvaluationSummary"] == {"countNdcg": 3}
+    cursors: list[int] = []
+    while True:
+        spans = data["node"]["spans"]
+        cursors.extend(Cursor.from_string(edge["cursor"]).rowid for edge in spans["edges"])
+        if not spans["pageInfo"]["hasNextPage"]:
+            break
+        response = await gql_client.execute(
+            query=query, variables={**variables, "after": spans["edges"][-1]["cursor"]}
+        )
+        assert not response.errors
+        assert (data := response.data) is not None
+    assert cursors == [1, 3, 4]
+
+
 @pytest.fixture
 async def llama_index_rag_spans(db: DbSessionFactory) -> None:
     # Inserts the first three traces from the llama-index-rag trace fixture
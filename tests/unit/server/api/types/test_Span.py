@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 
 import pytest
@@ -5,8 +6,10 @@ from sqlalchemy import insert
 from strawberry.relay import GlobalID
 
 from phoenix.db import models
+from phoenix.db.compression import compress_attributes
+from phoenix.db.span_attribute_blobs import extract_blobs
 from phoenix.server.api.types.Project import Project
-from phoenix.server.api.types.Span import Span
+from phoenix.server.api.types.Span import Span, _hide_embedding_vectors
 from phoenix.server.types import DbSessionFactory
 from tests.unit.graphql import AsyncGraphQLClient
 
@@ -95,6 +98,92 @@ async def test_querying_spans_not_contained_in_datasets(
     assert actual_contained_in_dataset is False
 
 
+async def test_querying_compressed_input_and_output(
+    gql_client: AsyncGraphQLClient,
+    db: DbSessionFactory,
+    project_with_a_single_trace_and_span: None,
+) -> None:
+    async with db() as session:
+        span = await session.get(models.Span, 1)
+        assert span is not None
+        span.attributes = dict(
+            compress_attributes({"input": {"value": "x" * 1000}, "output": {"value": "y"}}, 100)
+        )
+        assert "__zstd__" in span.attributes["input"]["value"]
+    query = """
+      query ($spanId: GlobalID!) {
+        span: node(id: $spanId) {
+          ... on Span {
+            input {
+              value
+            }
+            output {
+              value
+            }
+            attributes
+          }
+        }
+      }
+    """
+    span_id = str(GlobalID(Span.__name__, str(1)))
+    response = await gql_client.execute(
+        query=query,
+        variables={"spanId": span_id},
+    )
+    assert not response.errors
+    assert (data := response.data) is not None
+    assert data["span"]["input"] == {"value": "x" * 1000}
+    assert data["span"]["output"] == {"value": "y"}
+    assert "__zstd__" not in data["span"]["attributes"]
+
+
+async def test_querying_deduplicated_input_and_output(
+    gql_client: AsyncGraphQLClient,
+    db: DbSessionFactory,
+    project_with_a_single_trace_and_span: None,
+) -> None:
+    attributes, blobs = extract_blobs(
+        {"input": {"value": "x" * 1000, "mime_type": "text/plain"}, "output": {"value": "y"}}, 100
+    )
+    async with db() as session:
+        span = await session.get(models.Span, 1)
+        assert span is not None
+        span.attributes = dict(attributes)
+        await session.execute(
+            insert(models.SpanAttributeBlob),
+            [dict(hash=blob_hash, value=value) for blob_hash, value in blobs.items()],
+        )
+    query = """
+      query ($spanId: GlobalID!) {
+        span: node(id: $spanId) {
+          ... on Span {
+            input {
+              value
+            }
+            output {
+              value
+            }
+            attributes
+            asExampleRevision {
+              input
+            }
+          }
+        }
+      }
+    """
+    span_id = str(GlobalID(Span.__name__, str(1)))
+    response = await gql_client.execute(
+        query=query,
+        variables={"spanId": span_id},
+    )
+    assert not response.errors
+    assert (data := response.data) is not None
+    assert data["span"]["input"] == {"value": "x" * 1000}
+    assert data["span"]["output"] == {"value": "y"}
+    assert json.loads(data["span"]["attributes"])["input"]["value"] == "x" * 1000
+    assert data["span"]["asExampleRevision"]["input"] == {"input": "x" * 1000}
+
+
 @pytest.fixture
 async def project_with_a_single_trace_and_span(
     db: DbSessionFactory,
@@ -186,3 +275,23 @@ async def simple_dataset(
         )
         session.add(example_0_revision_0)
         await session.flush()
+
+
+def test_hide_embedding_vectors_replaces_inline_vectors_and_references() -> None:
+    path = "embedding.embeddings.1.embedding.vector"
+    attributes = {
+        "embedding": {
+            "embeddings": [
+                {"embedding": {"vector": [1.0, 2.0]}},
+                {"embedding": {"vector": {"__vector__": path, "dimensions": 1536}}},
+            ]
+        }
+    }
+    assert _hide_embedding_vectors(attributes) == {
+        "embedding": {
+            "embeddings": [
+                {"embedding": {"vector": "<2 dimensional vector>"}},
+                {"embedding": {"vector": "<1536 dimensional vector>"}},
+            ]
+        }
+    }
@@ -0,0 +1,130 @@
+from collections.abc import Sequence
+from typing import Any, Optional
+
+import grpc
+import pytest
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
+    ExportTraceServiceRequest,
+    ExportTraceServiceResponse,
+)
+from opentelemetry.proto.common.v1.common_pb2 import AnyValue, KeyValue
+from opentelemetry.proto.resource.v1.resource_pb2 import Resource
+from opentelemetry.proto.trace.v1.trace_pb2 import ResourceSpans, ScopeSpans
+
+from phoenix.server.grpc_server import Servicer
+from phoenix.trace.otel import encode_span_to_otlp
+from phoenix.trace.schemas import Span
+from tests.unit._helpers import _make_span
+
+
+class _Abort(Exception):
+    pass
+
+
+class _Context:
+    def __init__(self) -> None:
+        self._code: Optional[grpc.StatusCode] = None
+
+    async def abort(self, code: grpc.StatusCode, details: str) -> None:
+        self._code = code
+        raise _Abort(details)
+
+    def code(self) -> Optional[grpc.StatusCode]:
+        return self._code
+
+
+def _request(*project_names: str) -> ExportTraceServiceRequest:
+    return ExportTraceServiceRequest(
+        resource_spans=[
+            ResourceSpans(
+                resource=Resource(
+                    attributes=[
+                        KeyValue(
+                            key="openinference.project.name",
+                            value=AnyValue(string_value=project_name),
+                        )
+                    ]
+                ),
+                scope_spans=[
+                    ScopeSpans(
+                        spans=[
+                            encode_span_to_otlp(
+                                _make_span(
+                                    f"{i:016x}",
+                                    "0" * 32,
+                                    attributes={"openinference": {"span": {"kind": "CHAIN"}}},
+                                )
+                            )
+                            for i in range(2)
+                        ]
+                    )
+                ],
+            )
+            for project_name in project_names
+        ]
+    )
+
+
+class TestServicer:
+    async def test_export_queues_all_spans_of_a_request_as_one_batch(self) -> None:
+        batches: list[Sequence[tuple[Span, str]]] = []
+
+        async def callback(spans: Sequence[tuple[Span, str]]) -> None:
+            batches.append(spans)
+
+        response = await Servicer(callback).Export(_request("a", "b"), _Context())  # type: ignore[arg-type,unused-ignore]
+        assert isinstance(response, ExportTraceServiceResponse)
+        assert len(batches) == 1
+        assert [project_name for _, project_name in batches[0]] == ["a", "a", "b", "b"]
+
+    async def test_export_is_rejected_with_resource_exhausted_when_not_admitted(self) -> None:
+        batches: list[Sequence[tuple[Span, str]]] = []
+
+        async def callback(spans: Sequence[tuple[Span, str]]) -> None:
+            batches.append(spans)
+
+        context = _Context()
+        with pytest.raises(_Abort):
+            await Servicer(callback, admit=lambda: False).Export(_request("a"), context)  # type: ignore[arg-type,unused-ignore]
+        assert context.code() is grpc.StatusCode.RESOURCE_EXHAUSTED
+        assert not batches
+
+    async def test_export_observes_decoding_time_by_project(self) -> None:
+        from prometheus_client import REGISTRY
+
+        async def callback(spans: Sequence[tuple[Span, str]]) -> None:
+            pass
+
+        def count(project_name: str) -> float:
+            labels = {"project": project_name, "transport": "grpc"}
+            return REGISTRY.get_sample_value("ingestion_decode_seconds_count", labels) or 0
+
+        counts = count("a"), count("b")
+        servicer = Servicer(callback, enable_prometheus=True)
+        await servicer.Export(_request("a", "b"), _Context())  # type: ignore[arg-type,unused-ignore]
+        assert (count("a"), count("b")) == (counts[0] + 1, counts[1] + 1)
+
+
+class TestPrometheusGrpcInterceptor:
+    async def test_observes_processing_time_by_method_and_code(self) -> None:
+        from prometheus_client import REGISTRY
+
+        from phoenix.server.prometheus import PrometheusGrpcInterceptor
+
+        async def ok(request: Any, context: Any) -> str:
+            return "ok"
+
+        async def reject(request: Any, context: Any) -> None:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "busy")
+
+        def count(code: str) -> float:
+            labels = {"method": "/Export", "code": code}
+            return REGISTRY.get_sample_value("grpc_server_handling_seconds_count", labels) or 0
+
+        interceptor = PrometheusGrpcInterceptor()
+        ok_count, rejected_count = count("OK"), count("RESOURCE_EXHAUSTED")
+        assert await interceptor.intercept(ok, None, _Context(), "/Export") == "ok"  # type: ignore[arg-type,unused-ignore]
+        with pytest.raises(_Abort):
+            await interceptor.intercept(reject, None, _Context(), "/Export")  # type: ignore[arg-type,unused-ignore]
+        assert count("OK") == ok_count + 1
+        assert count("RESOURCE_EXHAUSTED") == rejected_count + 1
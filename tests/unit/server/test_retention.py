@@ -0,0 +1,219 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from phoenix.config import TraceRetentionPolicy, get_env_trace_retention_policies
+from phoenix.db import models
+from phoenix.db.span_attribute_blobs import hash_blob
+from phoenix.server.dml_event import DmlEvent, SpanDeleteEvent
+from phoenix.server.retention import TraceRetentionManager
+from phoenix.server.types import DbSessionFactory
+from tests.unit._helpers import _add_project, _add_project_session, _add_span, _add_trace
+
+
+class _EventQueue:
+    def __init__(self) -> None:
+        self.events: list[DmlEvent] = []
+
+    def put(self, item: DmlEvent) -> None:
+        self.events.append(item)
+
+
+@pytest.fixture
+async def projects(db: DbSessionFactory) -> None:
+    """
+    Two projects with ten single-span traces each, one per day over the last ten
+    days, where the five oldest traces of each project belong to a session.
+    """
+    now = datetime.now(timezone.utc)
+    async with db() as session:
+        for name in ("chatbot", "agent"):
+            project = await _add_project(session, name=name)
+            project_session = await _add_project_session(session, project)
+            for days in range(10):
+                start_time = now - timedelta(days=days, hours=1)
+                trace = await _add_trace(
+                    session,
+                    project,
+                    project_session=project_session if days >= 5 else None,
+                    start_time=start_time,
+                )
+                await _add_span(
+                    session,
+                    trace,
+                    attributes={"input": {"value": "x" * 100}},
+                    start_time=start_time,
+                )
+
+
+async def _count_traces(db: DbSessionFactory) -> dict[str, int]:
+    async with db() as session:
+        return dict(
+            (
+                await session.execute(
+                    select(models.Project.name, func.count(models.Trace.id))
+                    .join(models.Trace)
+                    .group_by(models.Project.name)
+                )
+            )
+            .tuples()
+            .all()
+        )
+
+
+async def _count_project_sessions(db: DbSessionFactory) -> int:
+    async with db() as session:
+        return await session.scalar(select(func.count(models.ProjectSession.id))) or 0
+
+
+def _manager(
+    db: DbSessionFactory, event_queue: _EventQueue, **policies: TraceRetentionPolicy
+) -> TraceRetentionManager:
+    return TraceRetentionManager(
+        db,
+        policies,
+        event_queue,
+        chunk_size=2,
+        pause_seconds=0,
+    )
+
+
+async def test_max_age_deletes_old_traces_and_orphaned_sessions(
+    db: DbSessionFactory,
+    projects: None,
+) -> None:
+    event_queue = _EventQueue()
+    manager = _manager(db, event_queue, chatbot=TraceRetentionPolicy(max_age=timedelta(days=3)))
+    assert await manager.sweep() == 7
+    assert await _count_traces(db) == {"chatbot": 3, "agent": 10}
+    assert await _count_project_sessions(db) == 1
+    async with db() as session:
+        assert await session.scalar(select(func.count(models.Span.id))) == 13
+    assert len(event_queue.events) == 4
+    assert all(isinstance(event, SpanDeleteEvent) for event in event_queue.events)
+    assert await manager.sweep() == 0
+
+
+async def test_blobs_are_deleted_once_unreferenced(
+    db: DbSessionFactory,
+    projects: None,
+) -> None:
+    shared, unshared = "x" * 100, "y" * 100
+    async with db() as session:
+        spans = (
+            await session.scalars(
+                select(models.Span)
+                .join(models.Trace)
+                .join(models.Project)
+                .where(models.Project.name == "chatbot")
+                .order_by(models.Span.start_time)
+            )
+        ).all()
+        await session.execute(
+            insert(models.SpanAttributeBlob),
+            [dict(hash=hash_blob(value), value=value) for value in (shared, unshared)],
+        )
+        await session.execute(
+            insert(models.SpanAttributeBlobReference),
+            [
+                dict(span_rowid=spans[0].id, blob_hash=hash_blob(shared)),
+                dict(span_rowid=spans[0].id, blob_hash=hash_blob(unshared)),
+                dict(span_rowid=spans[-1].id, blob_hash=hash_blob(shared)),
+            ],
+        )
+    manager = _manager(db, _EventQueue(), chatbot=TraceRetentionPolicy(max_age=timedelta(days=3)))
+    assert await manager.sweep() == 7
+    async with db() as session:
+        assert list(await session.scalars(select(models.SpanAttributeBlob.value))) == [shared]
+        assert await session.scalar(select(func.count(models.SpanAttributeBlobReference.id))) == 1
+
+
+async def test_max_spans_keeps_most_recent_traces(
+    db: DbSessionFactory,
+    projects: None,
+) -> None:
+    manager = _manager(db, _EventQueue(), **{"*": TraceRetentionPolicy(max_spans=4)})
+    assert await manager.sweep() == 12
+    assert await _count_traces(db) == {"chatbot": 4, "agent": 4}
+    assert await _count_project_sessions(db) == 0
+
+
+async def test_max_spans_counts_the_spans_of_each_trace(
+    db: DbSessionFactory,
+) -> None:
+    now = datetime.now(timezone.utc)
+    async with db() as session:
+        project = await _add_project(session, name="agent")
+        for days in range(4):
+            start_time = now - timedelta(days=days)
+            trace = await _add_trace(session, project, start_time=start_time)
+            for _ in range(3):
+                await _add_span(session, trace, start_time=start_time)
+    manager = _manager(db, _EventQueue(), agent=TraceRetentionPolicy(max_spans=5))
+    assert await manager.sweep() == 3
+    assert await _count_traces(db) == {"agent": 1}
+    manager = _manager(db, _EventQueue(), agent=TraceRetentionPolicy(max_spans=3))
+    assert await manager.sweep() == 0
+
+
+async def test_max_bytes_is_estimated_from_span_sizes(
+    db: DbSessionFactory,
+    projects: None,
+) -> None:
+    manager = _manager(db, _EventQueue(), agent=TraceRetentionPolicy(max_bytes=1))
+    assert await manager.sweep() == 9
+    assert await _count_traces(db) == {"chatbot": 10, "agent": 1}
+    manager = _manager(db, _EventQueue(), chatbot=TraceRetentionPolicy(max_bytes=1_000_000))
+    assert await manager.sweep() == 0
+
+
+async def test_projects_without_policies_are_kept(
+    db: DbSessionFactory,
+    projects: None,
+) -> None:
+    manager = _manager(db, _EventQueue(), other=TraceRetentionPolicy(max_spans=1))
+    assert await manager.sweep() == 0
+    assert await _count_traces(db) == {"chatbot": 10, "agent": 10}
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        pytest.param("", {}, id="unset"),
+        pytest.param(
+            '{"*": {"max_age_days": 30}, "chatbot": {"max_spans": 1000, "max_bytes": 1e9}}',
+            {
+                "*": TraceRetentionPolicy(max_age=timedelta(days=30)),
+                "chatbot": TraceRetentionPolicy(max_spans=1000, max_bytes=1_000_000_000),
+            },
+            id="policies",
+        ),
+    ],
+)
+def test_get_env_trace_retention_policies(
+    value: str,
+    expected: dict[str, TraceRetentionPolicy],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("PHOENIX_TRACE_RETENTION_POLICIES", value)
+    assert get_env_trace_retention_policies() == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        pytest.param("[]", id="not-an-object"),
+        pytest.param('{"*": {"max_age": 30}}', id="unknown-key"),
+        pytest.param('{"*": {"max_spans": 0}}', id="not-positive"),
+        pytest.param('{"*": {"max_spans": true}}', id="bool"),
+        pytest.param("{", id="invalid-json"),
+    ],
+)
+def test_get_env_trace_retention_policies_raises_on_invalid_values(
+    value: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("PHOENIX_TRACE_RETENTION_POLICIES", value)
+    with pytest.raises(ValueError, match="PHOENIX_TRACE_RETENTION_POLICIES"):
+        get_env_trace_retention_policies()
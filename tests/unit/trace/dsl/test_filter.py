@@ -75,9 +75,9 @@ def test_get_attribute_keys_list(expression: str, expected: Optional[list[str]])
     [
         (
             "parent_id is not None and 'abc' in name or span_kind == 'LLM' and span_id in ('123',)",  # noqa E501
-            "or_(and_(parent_id != None, TextContains(name, 'abc')), and_(span_kind == 'LLM', span_id.in_(('123',))))"  # noqa E501
+            "or_(and_(parent_id != None, SpanTextContains('name', name, 'abc')), and_(span_kind == 'LLM', span_id.in_(('123',))))"  # noqa E501
             if sys.version_info >= (3, 9)
-            else "or_(and_((parent_id != None), TextContains(name, 'abc')), and_((span_kind == 'LLM'), span_id.in_(('123',))))",  # noqa E501
+            else "or_(and_((parent_id != None), SpanTextContains('name', name, 'abc')), and_((span_kind == 'LLM'), span_id.in_(('123',))))",  # noqa E501
         ),
         (
             "(parent_id is None or 'abc' not in name) and not (span_kind != 'LLM' or span_id not in ('123',))",  # noqa E501
@@ -101,6 +101,10 @@ def test_get_attribute_keys_list(expression: str, expected: Optional[list[str]])
             "first.value in (1,) and second.value in ('2',) and '3' in third.value",
             "and_(attributes[['first', 'value']].as_float().in_((1,)), attributes[['second', 'value']].as_string().in_(('2',)), TextContains(attributes[['third', 'value']].as_string(), '3'))",  # noqa E501
         ),
+        (
+            "'abc' in input.value and 'abc' not in output.value",
+            "and_(SpanTextContains('input', attributes[['input', 'value']].as_string(), 'abc'), not_(TextContains(attributes[['output', 'value']].as_string(), 'abc')))",  # noqa E501
+        ),
         (
             "'1.0' < my.value < 2.0",
             "and_('1.0' < attributes[['my', 'value']].as_string(), attributes[['my', 'value']].as_float() < 2.0)"  # noqa E501
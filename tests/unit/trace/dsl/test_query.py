@@ -4,10 +4,15 @@ from typing import Any
 import pandas as pd
 import pytest
 from pandas.testing import assert_frame_equal
+from sqlalchemy import func, select
 from sqlalchemy.engine.base import Engine
 
+from phoenix.db import models
+from phoenix.db.insertion.span import insert_spans
 from phoenix.server.types import DbSessionFactory
 from phoenix.trace.dsl import SpanQuery
+from phoenix.trace.schemas import SpanKind
+from tests.unit._helpers import _make_span
 
 
 async def test_select_all(
@@ -1382,3 +1387,147 @@ async def test_explode_and_concat_on_same_array_with_non_ascii_kwargs(
         actual.sort_index().sort_index(axis=1),
         expected.sort_index().sort_index(axis=1),
     )
+
+
+@pytest.fixture
+async def vectors_project(db: DbSessionFactory) -> None:
+    attributes = {
+        "embedding": {
+            "model_name": "xyz",
+            "embeddings": [
+                {"embedding": {"vector": _VECTORS[0], "text": "a"}},
+                {"embedding": {"vector": _VECTORS[1], "text": "b"}},
+            ],
+        },
+        "metadata": {"vector": [0.5] * 16},
+    }
+    span = _make_span(
+        "s", name="embedding span", span_kind=SpanKind.EMBEDDING, attributes=attributes
+    )
+    async with db() as session:
+        await insert_spans(session, [(span, "vectors")])
+
+
+_VECTORS = [[0.25 * i for i in range(16)], [0.5 * i for i in range(32)]]
+
+
+async def test_select_all_rehydrates_vectors(
+    db: DbSessionFactory,
+    vectors_project: Any,
+) -> None:
+    async with db() as session:
+        assert await session.scalar(select(func.count(models.SpanVector.id))) == 2
+        actual = await session.run_sync(SpanQuery(), project_name="vectors")
+    assert actual.loc["s", "attributes.embedding.embeddings"] == [
+        {"embedding.vector": _VECTORS[0], "embedding.text": "a"},
+        {"embedding.vector": _VECTORS[1], "embedding.text": "b"},
+    ]
+    assert actual.loc["s", "attributes.metadata"] == {"vector": [0.5] * 16}
+
+
+async def test_explode_embeddings_rehydrates_vectors(
+    db: DbSessionFactory,
+    vectors_project: Any,
+) -> None:
+    sq = SpanQuery().explode("embedding.embeddings", vector="embedding.vector")
+    expected = pd.DataFrame(
+        {
+            "context.span_id": ["s", "s"],
+            "position": [0, 1],
+            "vector": _VECTORS,
+        }
+    ).set_index(["context.span_id", "position"])
+    async with db() as session:
+        actual = await session.run_sync(sq, project_name="vectors")
+    assert_frame_equal(
+        actual.sort_index().sort_index(axis=1),
+        expected.sort_index().sort_index(axis=1),
+    )
+
+
+async def test_select_vector_rehydrates_vectors(
+    db: DbSessionFactory,
+    vectors_project: Any,
+) -> None:
+    sq = SpanQuery().select(embeddings="embedding.embeddings")
+    async with db() as session:
+        actual = await session.run_sync(sq, project_name="vectors")
+    assert [e["embedding"]["vector"] for e in actual.loc["s", "embeddings"]] == _VECTORS
+
+
+@pytest.fixture(params=["compression_threshold", "deduplication_threshold"])
+async def large_attributes_project(request: pytest.FixtureRequest, db: DbSessionFactory) -> None:
+    spans = []
+    for i, (span_kind, text) in enumerate(
+        [
+            (SpanKind.LLM, "needle " + "x" * 1000),
+            (SpanKind.LLM, "y" * 1000),
+            (SpanKind.CHAIN, "needle " + "z" * 1000),
+            (SpanKind.LLM, "needle"),
+        ]
+    ):
+        spans.append(
+            (
+                _make_span(
+                    str(i),
+                    name=f"span {i}",
+                    span_kind=span_kind,
+                    attributes={"llm": {"input_messages": [{"message": {"content": text}}]}},
+                    input_value=text,
+                ),
+                "large",
+            )
+        )
+    thresholds: dict[str, Any] = {request.param: 100}
+    async with db() as session:
+        await insert_spans(session, spans, **thresholds)
+
+
+async def test_select_all_restores_large_attributes(
+    db: DbSessionFactory,
+    large_attributes_project: Any,
+) -> None:
+    async with db() as session:
+        actual = await session.run_sync(SpanQuery(), project_name="large")
+    assert actual.loc["1", "attributes.input.value"] == "y" * 1000
+    assert actual.loc["1", "attributes.llm.input_messages"] == [{"message.content": "y" * 1000}]
+
+
+async def test_select_and_explode_restore_large_attributes(
+    db: DbSessionFactory,
+    large_attributes_project: Any,
+) -> None:
+    async with db() as session:
+        selected = await session.run_sync(
+            SpanQuery().select(input="input.value"), project_name="large"
+        )
+        exploded = await session.run_sync(
+            SpanQuery().explode("llm.input_messages", content="message.content"),
+            project_name="large",
+        )
+    assert selected.loc["1", "input"] == "y" * 1000
+    assert exploded.loc[("1", 0), "content"] == "y" * 1000
+
+
+@pytest.mark.parametrize(
+    "condition,expected",
+    [
+        ("'needle' in input.value", ["0", "2", "3"]),
+        ("'needle' not in input.value", ["1"]),
+        ("span_kind == 'LLM' and 'needle' in input.value", ["0", "3"]),
+        ("'needle' in input.value or name == 'span 1'", ["0", "1", "2", "3"]),
+    ],
+)
+async def test_filter_on_large_attributes(
+    condition: str,
+    expected: list[str],
+    db: DbSessionFactory,
+    large_attributes_project: Any,
+) -> None:
+    async with db() as session:
+        df = await session.run_sync(SpanQuery().where(condition), project_name="large")
+        selected = await session.run_sync(
+            SpanQuery().where(condition).select("name"), project_name="large"
+        )
+    assert sorted(df.index) == expected
+    assert sorted(selected.index) == expected
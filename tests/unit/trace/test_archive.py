@@ -0,0 +1,190 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+
+from phoenix.db import models
+from phoenix.server.archiver import TraceArchiver
+from phoenix.server.dml_event import DmlEvent, SpanDeleteEvent
+from phoenix.server.types import DbSessionFactory
+from phoenix.trace.archive import TraceArchive, get_pushdown_conditions
+from phoenix.trace.dsl import SpanQuery
+from tests.unit._helpers import _add_project, _add_project_session, _add_span, _add_trace
+
+
+class _EventQueue:
+    def __init__(self) -> None:
+        self.events: list[DmlEvent] = []
+
+    def put(self, item: DmlEvent) -> None:
+        self.events.append(item)
+
+
+@pytest.fixture
+async def project(db: DbSessionFactory) -> None:
+    """
+    A project with ten traces, one per day over the last ten days, each with an LLM
+    span as the child of a CHAIN span.
+    """
+    now = datetime.now(timezone.utc)
+    async with db() as session:
+        project = await _add_project(session, name="chatbot")
+        for days in range(10):
+            start_time = now - timedelta(days=days, hours=1)
+            trace = await _add_trace(session, project, start_time=start_time)
+            root = await _add_span(
+                session,
+                trace,
+                attributes={"input": {"value": f"question {days}"}},
+                start_time=start_time,
+                span_kind="CHAIN",
+            )
+            await _add_span(
+                session,
+                parent_span=root,
+                attributes={"llm": {"model_name": "gpt-4o"}},
+                start_time=start_time + timedelta(seconds=1),
+                cumulative_llm_token_count_prompt=days,
+            )
+
+
+@pytest.fixture
+async def archive(db: DbSessionFactory, project: None, tmp_path: Path) -> TraceArchive:
+    """
+    The archive of the traces of the project that are more than five days old.
+    """
+    archive = TraceArchive(tmp_path)
+    archiver = TraceArchiver(
+        db, archive, _EventQueue(), max_age=timedelta(days=5), chunk_size=2, pause_seconds=0
+    )
+    assert await archiver.sweep() == 5
+    return archive
+
+
+async def test_archiver_moves_old_traces_into_archive(
+    db: DbSessionFactory,
+    project: None,
+    tmp_path: Path,
+) -> None:
+    event_queue = _EventQueue()
+    archive = TraceArchive(tmp_path)
+    archiver = TraceArchiver(
+        db, archive, event_queue, max_age=timedelta(days=5), chunk_size=2, pause_seconds=0
+    )
+    assert await archiver.sweep() == 5
+    async with db() as session:
+        assert await session.scalar(select(func.count(models.Trace.id))) == 5
+        assert await session.scalar(select(func.count(models.Span.id))) == 10
+    assert len(event_queue.events) == 3
+    assert all(isinstance(event, SpanDeleteEvent) for event in event_queue.events)
+    assert len(list(tmp_path.glob("project=chatbot/date=*/*.parquet"))) == 5
+    df = archive.read("chatbot")
+    assert len(df) == 10
+    assert set(df.span_kind) == {"CHAIN", "LLM"}
+    assert await archiver.sweep() == 0
+
+
+async def test_archiver_deletes_sessions_left_without_traces(
+    db: DbSessionFactory,
+    tmp_path: Path,
+) -> None:
+    now = datetime.now(timezone.utc)
+    async with db() as session:
+        project = await _add_project(session, name="chatbot")
+        old = await _add_project_session(session, project)
+        recent = await _add_project_session(session, project)
+        for days, project_session in ((10, old), (9, recent), (1, recent)):
+            start_time = now - timedelta(days=days)
+            trace = await _add_trace(
+                session, project, project_session=project_session, start_time=start_time
+            )
+            await _add_span(session, trace, start_time=start_time)
+    archiver = TraceArchiver(
+        db, TraceArchive(tmp_path), _EventQueue(), max_age=timedelta(days=5), pause_seconds=0
+    )
+    assert await archiver.sweep() == 2
+    async with db() as session:
+        project_sessions = (await session.scalars(select(models.ProjectSession))).all()
+    assert [(s.id, s.num_traces) for s in project_sessions] == [(recent.id, 1)]
+
+
+async def test_read_prunes_by_time_range_and_condition(archive: TraceArchive) -> None:
+    now = datetime.now(timezone.utc)
+    assert len(archive.read("chatbot", start_time=now - timedelta(days=7))) == 4
+    assert len(archive.read("chatbot", end_time=now - timedelta(days=8))) == 4
+    assert len(archive.read("chatbot", condition="span_kind == 'LLM'")) == 5
+    assert archive.read("chatbot", condition="name == 'x' and span_kind == 'LLM'").empty
+    assert archive.read("other").empty
+
+
+async def test_span_query_merges_archived_spans(
+    db: DbSessionFactory,
+    archive: TraceArchive,
+) -> None:
+    query = (
+        SpanQuery()
+        .where("span_kind == 'LLM' and cumulative_llm_token_count_prompt >= 3")
+        .select("llm.model_name", tokens="cumulative_llm_token_count_prompt")
+    )
+    async with db() as session:
+        df = await session.run_sync(query, project_name="chatbot", archive=archive)
+    assert sorted(df.tokens) == list(range(3, 10))
+    assert set(df["llm.model_name"]) == {"gpt-4o"}
+    async with db() as session:
+        df = await session.run_sync(query, project_name="chatbot", limit=5, archive=archive)
+    assert len(df) == 5
+    async with db() as session:
+        df = await session.run_sync(
+            SpanQuery(), project_name="chatbot", root_spans_only=True, archive=archive
+        )
+    assert len(df) == 10
+    assert set(df["attributes.input.value"]) == {f"question {days}" for days in range(10)}
+
+
+async def test_spans_archived_twice_are_read_once(
+    db: DbSessionFactory,
+    archive: TraceArchive,
+) -> None:
+    df = archive.read("chatbot")
+    async with db() as session:
+        spans = list(
+            await session.scalars(
+                select(models.Span)
+                .join(models.Trace)
+                .order_by(models.Trace.start_time)
+                .limit(1)
+                .execution_options(populate_existing=True)
+            )
+        )
+        await session.refresh(spans[0], ["trace"])
+    archive.write("chatbot", spans)
+    assert len(archive.read("chatbot")) == len(df) + 1
+    async with db() as session:
+        df_merged = await session.run_sync(SpanQuery(), project_name="chatbot", archive=archive)
+    assert len(df_merged) == 20
+
+
+@pytest.mark.parametrize(
+    "condition,expected",
+    [
+        pytest.param("", {}, id="empty"),
+        pytest.param("span_kind == 'LLM'", {"span_kind": ["LLM"]}, id="eq"),
+        pytest.param("'LLM' == span_kind", {"span_kind": ["LLM"]}, id="eq-reversed"),
+        pytest.param(
+            "span_kind in ('LLM', 'TOOL') and name == 'x'",
+            {"span_kind": ["LLM", "TOOL"], "name": ["x"]},
+            id="and",
+        ),
+        pytest.param(
+            "span_kind in ['LLM', 'TOOL'] and span_kind == 'TOOL'",
+            {"span_kind": ["TOOL"]},
+            id="intersection",
+        ),
+        pytest.param("span_kind == 'LLM' or name == 'x'", {}, id="or"),
+        pytest.param("span_kind != 'LLM'", {}, id="ne"),
+        pytest.param("llm.model_name == 'gpt-4o'", {}, id="attribute"),
+    ],
+)
+def test_get_pushdown_conditions(condition: str, expected: dict[str, list[str]]) -> None:
+    assert get_pushdown_conditions(condition) == expected
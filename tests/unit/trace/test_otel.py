@@ -1,4 +1,5 @@
 import json
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import replace
 from datetime import datetime, timezone
 from random import random
@@ -10,6 +11,7 @@ import pytest
 from google.protobuf.json_format import MessageToJson  # type: ignore[import-untyped]
 from openinference.semconv.trace import SpanAttributes
 from opentelemetry.proto.common.v1.common_pb2 import AnyValue, ArrayValue, KeyValue
+from opentelemetry.proto.resource.v1.resource_pb2 import Resource
 from pytest import approx
 
 from phoenix.trace.otel import (
@@ -17,6 +19,7 @@ from phoenix.trace.otel import (
     _encode_identifier,
     coerce_otlp_span_attributes,
     decode_otlp_span,
+    decode_otlp_spans,
     encode_span_to_otlp,
 )
 from phoenix.trace.schemas import (
@@ -499,6 +502,45 @@ def test_coerce_otlp_span_attributes() -> None:
     assert result == invalid_attrs
 
 
+@pytest.mark.parametrize("use_executor", [False, True])
+def test_decode_otlp_spans(span: Span, use_executor: bool) -> None:
+    resource_spans = [
+        otlp.ResourceSpans(
+            resource=Resource(
+                attributes=[
+                    KeyValue(
+                        key="openinference.project.name",
+                        value=AnyValue(string_value=project_name),
+                    )
+                ]
+                if project_name
+                else []
+            ),
+            scope_spans=[
+                otlp.ScopeSpans(
+                    spans=[
+                        encode_span_to_otlp(
+                            replace(span, context=replace(span.context, span_id=f"{i:016x}"))
+                        )
+                        for i in range(n)
+                    ]
+                )
+            ],
+        )
+        for project_name, n in (("abc", 300), ("", 2))
+    ]
+    expected = [
+        (decode_otlp_span(otlp_span), project_name)
+        for project_name, resource in zip(("abc", "default"), resource_spans)
+        for otlp_span in resource.scope_spans[0].spans
+    ]
+    if not use_executor:
+        assert decode_otlp_spans(resource_spans) == expected
+        return
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        assert decode_otlp_spans(resource_spans, executor) == expected
+
+
 @pytest.fixture
 def span() -> Span:
     trace_id = "f096b681-b8d4-44eb-bc4a-1db0b5a8d556"